@@ -0,0 +1,199 @@
+"""
+Batches: many objects serialized into one buffer.
+
+serialize() on each item of a list starts from scratch every time, so a
+chunk of Pool items that all carry the same __main__ class or lambda sends
+its definition once per item. serialize_many() encodes the items as
+records of one buffer, sharing a Session-style definition table between
+them: each definition is sent by the first record that needs it, and later
+records refer to it by id.
+
+Records are otherwise independent - any other object that appears in two
+records is serialized (and later rebuilt) twice, as with iter_dump().
+
+The buffer starts with an index (see streams.py), so BatchReader can
+decode any record without decoding the ones before it - except for
+records that sent definitions, which are decoded first (once) so the
+definitions are there. Those records' results are kept by the reader.
+"""
+
+import pickle
+import threading
+from typing import Any, Dict, Iterable, Iterator, List
+
+from . import compact
+from .serializer import Serializer, SerializationError, WIRE_FORMATS, _SessionTable
+from .deserializer import Deserializer, DeserializationError
+from .streams import BATCH_MAGIC, BATCH_COUNT, BATCH_ENTRY, BATCH_DEFINES
+
+
+def serialize_many(serializer: Serializer, objs: Iterable[Any], format: str = "pickle") -> bytes:
+    """
+    Serialize each object as one record of a batch.
+
+    Args:
+        serializer: Serializer to use (its plan cache is shared by every record)
+        objs: Objects to serialize
+        format: Wire format of each record - "pickle" (default) or "compact"
+
+    Returns:
+        bytes: The batch
+
+    Raises:
+        SerializationError: If any object fails to serialize
+    """
+    if format not in WIRE_FORMATS:
+        raise ValueError(
+            f"Unknown format {format!r}, expected one of: {', '.join(WIRE_FORMATS)}"
+        )
+
+    table = _SessionTable()
+    records: List[bytes] = []
+    entries: List[bytes] = []
+    serializer._session = table
+    try:
+        for index, obj in enumerate(objs):
+            first_id = table.next_id
+            try:
+                records.append(_encode_record(serializer, obj, format))
+            except SerializationError as e:
+                raise SerializationError(f"Batch record {index} failed to serialize: {e}") from e
+            flags = BATCH_DEFINES if table.next_id > first_id else 0
+            entries.append(BATCH_ENTRY.pack(len(records[-1]), flags))
+            table.commit()
+    finally:
+        serializer._session = None
+
+    return b"".join([BATCH_MAGIC, BATCH_COUNT.pack(len(records))] + entries + records)
+
+
+def _encode_record(serializer: Serializer, obj: Any, format: str) -> bytes:
+    """Build one record's IR and write it (no string table shared between records)."""
+    ir = serializer.serialize_ir(obj)
+
+    # same deep-IR fallback as Serializer.serialize()
+    if format == "compact" or not serializer._fits_pickle():
+        try:
+            return compact.encode(ir)
+        except Exception as e:
+            raise SerializationError(f"Compact encoding failed: {e}") from e
+    try:
+        return pickle.dumps(ir, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        serializer._forget_picklable()
+        raise SerializationError(f"Pickling the IR failed: {e}") from e
+
+
+class BatchReader:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+
+        data = cucumber.serialize_many(items)
+
+        reader = cucumber.BatchReader(data)
+        len(reader)
+        item = reader[42]
+        for item in reader:
+            ...
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Random access to the records of a batch from serialize_many().
+
+    Only the index is read up front. Indexing decodes one record (plus,
+    the first time, any earlier records that sent definitions it may
+    need) and returns a new object each time, except for records that
+    sent definitions, whose result is kept and returned again.
+
+    Safe to use from several threads.
+    """
+
+    def __init__(self, data: Any, debug: bool = False, verbose: bool = False):
+        """
+        Args:
+            data: Bytes from serialize_many()
+            debug: Enable debug mode (more detailed error messages)
+            verbose: Enable verbose mode (print progress)
+
+        Raises:
+            DeserializationError: If data isn't a batch, or is truncated
+        """
+        view = memoryview(data).cast("B")
+        if bytes(view[:len(BATCH_MAGIC)]) != BATCH_MAGIC:
+            raise DeserializationError("Data is not a batch from serialize_many()")
+        try:
+            pos = len(BATCH_MAGIC)
+            (count,) = BATCH_COUNT.unpack_from(view, pos)
+            pos += BATCH_COUNT.size
+            entries = [BATCH_ENTRY.unpack_from(view, pos + i * BATCH_ENTRY.size) for i in range(count)]
+        except Exception as e:
+            raise DeserializationError(f"Truncated batch index: {e}") from e
+        pos += count * BATCH_ENTRY.size
+
+        self._view = view
+        self._spans: List[tuple] = []
+        self._defining: List[int] = []  # records that send definitions, in order
+        for index, (length, flags) in enumerate(entries):
+            self._spans.append((pos, pos + length))
+            if flags & BATCH_DEFINES:
+                self._defining.append(index)
+            pos += length
+        if pos > len(view):
+            raise DeserializationError(
+                f"Truncated batch: index needs {pos} bytes, got {len(view)}"
+            )
+
+        # definitions received so far, shared by every record (as in a Session)
+        self._deserializer = Deserializer(debug=debug, verbose=verbose)
+        self._deserializer._session_objects = {}
+        self._defined: Dict[int, Any] = {}  # results of records that sent definitions
+        self._next_defining = 0  # position in _defining of the next one to decode
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __getitem__(self, index: int) -> Any:
+        """
+        Decode one record.
+
+        Raises:
+            IndexError: If there is no such record
+            DeserializationError: If the record fails to deserialize
+        """
+        count = len(self._spans)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError(f"batch record {index} out of range ({count} records)")
+        with self._lock:
+            # earlier records that sent definitions go first, in order, once
+            defining = self._defining
+            while self._next_defining < len(defining) and defining[self._next_defining] <= index:
+                record = defining[self._next_defining]
+                self._defined[record] = self._decode(record)
+                self._next_defining += 1
+            if index in self._defined:
+                return self._defined[index]
+            return self._decode(index)
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(len(self._spans)):
+            yield self[index]
+
+    def _decode(self, index: int) -> Any:
+        start, end = self._spans[index]
+        data = self._view[start:end]
+        try:
+            if compact.is_compact(data):
+                ir = compact.decode(data)
+            else:
+                ir = pickle.loads(data)
+        except Exception as e:
+            raise DeserializationError(f"Batch record {index} failed to decode: {e}") from e
+        try:
+            return self._deserializer.deserialize_ir(ir)
+        except DeserializationError as e:
+            raise DeserializationError(f"Batch record {index} failed to deserialize: {e}") from e
@@ -0,0 +1,87 @@
+"""
+Content digests for cucumber.digest() and cucumber.Hasher.
+
+A digest is a blake2b hash of an object's canonical encoding
+(Serializer.serialize_canonical()): the compact format with object ids
+numbered in traversal order and dict items, set items and instance
+attributes in sorted order. Equal objects built the same way hash the
+same, in any process, so digests work as memoization and cache keys.
+
+Encodings are self-delimiting, so feeding several objects to one Hasher
+is the same as hashing each one's encoding back to back.
+"""
+
+import hashlib
+from typing import Any
+
+from .serializer import Serializer
+
+# default digest size in bytes (blake2b allows 1 - 64)
+DIGEST_SIZE = 32
+
+
+def digest(serializer: Serializer, obj: Any, digest_size: int = DIGEST_SIZE, key: bytes = b"") -> bytes:
+    """Hash one object's canonical encoding with the given Serializer."""
+    hasher = hashlib.blake2b(digest_size=digest_size, key=key)
+    serializer.write_canonical(obj, hasher.update)
+    return hasher.digest()
+
+
+class Hasher:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+
+        hasher = cucumber.Hasher()
+        hasher.update(config)
+        hasher.update(dataset)
+        key = hasher.hexdigest()
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Incremental content digest over any number of objects.
+
+    Each update() hashes the canonical encoding of one object, so the
+    result only depends on the objects' contents and the order they
+    were added in.
+    """
+
+    def __init__(self, digest_size: int = DIGEST_SIZE, key: bytes = b"", debug: bool = False, verbose: bool = False):
+        """
+        Args:
+            digest_size: Digest size in bytes, 1 to 64 (default 32)
+            key: Optional blake2b key (up to 64 bytes) for keyed hashing
+            debug: Enable debug mode (more detailed error messages)
+            verbose: Enable verbose mode (print progress)
+        """
+        self._hash = hashlib.blake2b(digest_size=digest_size, key=key)
+        self._serializer = Serializer(debug=debug, verbose=verbose)
+
+    @property
+    def digest_size(self) -> int:
+        return self._hash.digest_size
+
+    def update(self, obj: Any) -> None:
+        """
+        Add an object to the digest.
+
+        Raises:
+            SerializationError: If the object can't be serialized
+        """
+        self._serializer.write_canonical(obj, self._hash.update)
+
+    def digest(self) -> bytes:
+        """Digest of everything added so far, as bytes."""
+        return self._hash.digest()
+
+    def hexdigest(self) -> str:
+        """Digest of everything added so far, as a hex string."""
+        return self._hash.hexdigest()
+
+    def copy(self) -> "Hasher":
+        """Independent copy of this hasher, with the same state."""
+        other = Hasher.__new__(Hasher)
+        other._hash = self._hash.copy()
+        other._serializer = Serializer(debug=self._serializer.debug, verbose=self._serializer.verbose)
+        return other
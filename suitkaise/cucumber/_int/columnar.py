@@ -0,0 +1,92 @@
+"""
+Column packing for cucumber's columnar instance lists.
+
+A list or tuple of simple instances that all share one class and one
+attribute layout is serialized as a single "instance_columns" node: the
+class and attribute names once, then one column of values per attribute.
+
+Columns of plain ints, floats or bools are packed into array buffers - a
+(typecode, bytes) tuple in the IR, always little-endian - so 100k rows of
+an int attribute are one bytes object instead of 100k pickled ints. Ints
+use the narrowest of 1, 2, 4 or 8 bytes that fits the column.
+
+Any other column stays a plain list of values. Equal strings in a column
+are made the same object first, so pickle writes each distinct string once
+and refers back to it.
+"""
+
+import array
+import sys
+from typing import Any, Dict, List
+
+# lists and tuples shorter than this keep one node per instance
+MIN_ROWS = 8
+
+# int typecodes from narrowest to widest, with the range each one holds
+_INT_TYPECODES = (
+    ("b", -(1 << 7), (1 << 7) - 1),
+    ("h", -(1 << 15), (1 << 15) - 1),
+    ("i", -(1 << 31), (1 << 31) - 1),
+    ("q", -(1 << 63), (1 << 63) - 1),
+)
+
+# bools are stored as "b" arrays of 0 / 1, under their own typecode
+_BOOL_TYPECODE = "?"
+
+_ARRAY_TYPECODES = {"b", "h", "i", "q", "d"}
+
+_SWAP_BYTES = sys.byteorder == "big"
+
+
+def pack_column(values: List[Any]) -> Any:
+    """
+    Pack a column of ints, floats or bools into a (typecode, bytes) tuple.
+
+    Returns a list instead if it mixes types, holds anything else (int
+    subclasses included), or has an int that doesn't fit in 64 bits - with
+    equal strings deduplicated.
+    """
+    value_types = set(map(type, values))
+    if len(value_types) != 1:
+        return values
+    value_type = value_types.pop()
+
+    if value_type is str:
+        distinct: Dict[str, str] = {}
+        return list(map(distinct.setdefault, values, values))
+
+    if value_type is int:
+        low, high = min(values), max(values)
+        for typecode, type_min, type_max in _INT_TYPECODES:
+            if type_min <= low and high <= type_max:
+                return _pack(typecode, typecode, values)
+        return values
+    if value_type is float:
+        return _pack("d", "d", values)
+    if value_type is bool:
+        return _pack(_BOOL_TYPECODE, "b", values)
+    return values
+
+
+def unpack_column(column: Any) -> List[Any]:
+    """Turn a column from the IR back into a list of values."""
+    if type(column) is not tuple:
+        return column
+    typecode, data = column
+    array_typecode = "b" if typecode == _BOOL_TYPECODE else typecode
+    if array_typecode not in _ARRAY_TYPECODES:
+        raise ValueError(f"Unknown column typecode {typecode!r}")
+    packed = array.array(array_typecode)
+    packed.frombytes(data)
+    if _SWAP_BYTES:
+        packed.byteswap()
+    if typecode == _BOOL_TYPECODE:
+        return list(map(bool, packed))
+    return packed.tolist()
+
+
+def _pack(typecode: str, array_typecode: str, values: List[Any]) -> tuple:
+    packed = array.array(array_typecode, values)
+    if _SWAP_BYTES:
+        packed.byteswap()
+    return (typecode, packed.tobytes())
@@ -0,0 +1,598 @@
+"""
+Compact binary wire format for cucumber.
+
+The default wire format pickles the IR as-is, which means every node carries
+string keys like "__cucumber_type__" and "__object_id__", plus a 64-bit id().
+
+The compact format writes the same IR as a flat byte stream instead:
+- one byte type tag per node
+- object ids renumbered to small sequential varints
+- repeated strings (attr names, handler names, qualnames) written once
+  and referenced by index afterwards
+- leaves pickle can't describe more compactly (datetime, complex, etc.)
+  are written as small pickled blobs
+
+Output always starts with MAGIC, so deserialize() can tell it apart from
+pickled output (which always starts with the PROTO opcode, b"\\x80").
+
+Both the encoder and decoder use an explicit stack, so nesting depth is
+not limited by the Python recursion limit.
+
+A Session passes the same string table to every encode()/decode() call,
+so strings sent in one message are referenced by index in later ones.
+"""
+
+import pickle
+import struct
+from typing import Any, Callable, Dict, List, Optional
+
+MAGIC = b"CUKE\x01"
+
+# node tags
+_T_NONE = 0
+_T_TRUE = 1
+_T_FALSE = 2
+_T_INT = 3              # zigzag varint
+_T_FLOAT = 4            # 8 byte little-endian double
+_T_STR = 5              # new string: varint length + utf-8, added to string table
+_T_STR_REF = 6          # varint index into string table
+_T_BYTES = 7            # varint length + raw bytes
+_T_REF = 8              # __cucumber_ref__: varint object index
+_T_DICT = 9             # wrapped dict: object index, count, key/value pairs
+_T_LIST = 10            # wrapped list: object index, count, items
+_T_TUPLE = 11           # wrapped tuple
+_T_SET = 12             # wrapped set
+_T_FROZENSET = 13       # wrapped frozenset
+_T_HANDLER = 14         # handler node: type name, handler name, object index, state
+_T_INSTANCE = 15        # simple_class_instance: object index, module, qualname, attrs
+_T_NATIVE = 16          # pickle_native: object index, pickled value
+_T_NATIVE_FUNC = 17     # pickle_native_func: object index, pickled value
+_T_RAW_LIST = 18        # plain list inside the IR
+_T_RAW_TUPLE = 19       # plain tuple inside the IR
+_T_RAW_DICT = 20        # plain dict inside the IR
+_T_PICKLED = 21         # any other leaf: varint length + pickle bytes
+_T_SESSION_HANDLER = 22 # handler node a Session sends once: as _T_HANDLER, then session id
+_T_SESSION_DEF = 23     # definition a Session sends once: session id, value
+_T_SESSION_REF = 24     # definition a Session already sent: session id, object index
+_T_COLUMNS = 25         # instance_columns: object index, container, module, qualname,
+                        #   attr names, referenced rows, then the columns
+
+_WRAPPED_TAGS = {
+    "dict": _T_DICT,
+    "list": _T_LIST,
+    "tuple": _T_TUPLE,
+    "set": _T_SET,
+    "frozenset": _T_FROZENSET,
+}
+_WRAPPED_NAMES = {tag: name for name, tag in _WRAPPED_TAGS.items()}
+
+# exact key sets of the IR node shapes the serializer produces
+_WRAPPED_KEYS = frozenset(("__cucumber_type__", "items", "__object_id__"))
+_HANDLER_KEYS = frozenset(("__cucumber_type__", "__handler__", "__object_id__", "state"))
+_INSTANCE_KEYS = frozenset(("__cucumber_type__", "__object_id__", "module", "qualname", "attrs"))
+_NATIVE_KEYS = frozenset(("__cucumber_type__", "__object_id__", "value"))
+_SESSION_HANDLER_KEYS = _HANDLER_KEYS | {"__session_id__"}
+_SESSION_DEF_KEYS = frozenset(("__cucumber_type__", "__session_id__", "value"))
+_SESSION_REF_KEYS = frozenset(("__cucumber_type__", "__session_id__", "__object_id__"))
+_COLUMNS_KEYS = frozenset((
+    "__cucumber_type__", "__object_id__", "container", "module", "qualname",
+    "names", "columns", "refs",
+))
+
+# encode_to() hands output to the writer in chunks of at least this size
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# strings longer than this are written inline every time instead of interned
+_MAX_INTERNED_LEN = 64
+
+_DOUBLE = struct.Struct("<d")
+
+
+class CompactFormatError(Exception):
+    """Raised when compact data can't be encoded or decoded."""
+    pass
+
+
+def is_compact(data: Any) -> bool:
+    """Check if serialized data is in the compact format."""
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def encode(ir: Any, strings: Optional[Dict[str, int]] = None) -> bytes:
+    """
+    Encode an IR into the compact binary format.
+
+    Args:
+        ir: Intermediate representation from Serializer.serialize_ir()
+        strings: String table shared across messages (Session only) -
+            updated in place with the strings this message adds
+
+    Returns:
+        bytes: Compact encoding, starting with MAGIC
+    """
+    return bytes(_encode(ir, None, strings))
+
+
+def encode_to(ir: Any, write: Callable[[Any], Any]) -> int:
+    """
+    Encode an IR into the compact binary format, writing it out in chunks.
+
+    The full encoding is never held in memory at once: output is handed to
+    `write` every STREAM_CHUNK_SIZE bytes, and large bytes values are passed
+    to `write` directly instead of being copied into the chunk buffer.
+
+    Args:
+        ir: Intermediate representation from Serializer.serialize_ir()
+        write: Callable that accepts a bytes-like object (e.g. file.write)
+
+    Returns:
+        int: Total number of bytes written
+    """
+    return _encode(ir, write)
+
+
+def _encode(
+    ir: Any,
+    write: Optional[Callable[[Any], Any]],
+    strings: Optional[Dict[str, int]] = None,
+) -> Any:
+    """Shared encoder - returns the buffer if write is None, else the bytes written."""
+    out = bytearray(MAGIC)
+    streaming = write is not None
+    written = 0
+
+    # original object id -> sequential index
+    object_index: Dict[int, int] = {}
+    # string -> string table index
+    if strings is None:
+        strings = {}
+
+    def write_varint(value: int) -> None:
+        while value > 0x7F:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+    def write_str(value: str) -> None:
+        index = strings.get(value)
+        if index is not None:
+            out.append(_T_STR_REF)
+            if index < 0x80:
+                out.append(index)
+            else:
+                write_varint(index)
+            return
+        encoded = value.encode("utf-8", "surrogatepass")
+        out.append(_T_STR)
+        write_varint(len(encoded))
+        out.extend(encoded)
+        if len(value) <= _MAX_INTERNED_LEN:
+            strings[value] = len(strings)
+
+    def write_object_id(obj_id: Any) -> None:
+        # 0 means "no object id", otherwise index + 1
+        if obj_id is None:
+            out.append(0)
+            return
+        index = len(object_index)
+        object_index[obj_id] = index
+        write_varint(index + 1)
+
+    def write_pickled(tag: int, value: Any) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        out.append(tag)
+        write_varint(len(blob))
+        out.extend(blob)
+
+    def flush() -> None:
+        # the chunk is handed off, not reused - write() may keep a reference
+        # to it (a buffered or async transport), so it must not change after
+        nonlocal out, written
+        if out:
+            write(out)
+            written += len(out)
+            out = bytearray()
+
+    stack: List[Any] = [ir]
+    while stack:
+        if streaming and len(out) >= STREAM_CHUNK_SIZE:
+            flush()
+
+        value = stack.pop()
+        value_type = type(value)
+
+        if value is None:
+            out.append(_T_NONE)
+        elif value is True:
+            out.append(_T_TRUE)
+        elif value is False:
+            out.append(_T_FALSE)
+        elif value_type is int:
+            out.append(_T_INT)
+            zigzag = (value << 1) if value >= 0 else ((-value << 1) - 1)
+            if zigzag < 0x80:
+                out.append(zigzag)
+            else:
+                write_varint(zigzag)
+        elif value_type is float:
+            out.append(_T_FLOAT)
+            out += _DOUBLE.pack(value)
+        elif value_type is str:
+            write_str(value)
+        elif value_type is bytes:
+            out.append(_T_BYTES)
+            write_varint(len(value))
+            if streaming and len(value) >= STREAM_CHUNK_SIZE:
+                # large payloads go straight to the writer, no copy
+                flush()
+                write(value)
+                written += len(value)
+            else:
+                out += value
+
+        elif value_type is dict:
+            keys = value.keys()
+            cucumber_type = value.get("__cucumber_type__")
+
+            if "__cucumber_ref__" in value and len(value) == 1:
+                obj_id = value["__cucumber_ref__"]
+                if obj_id not in object_index:
+                    raise CompactFormatError(f"Reference to unknown object id {obj_id}")
+                out.append(_T_REF)
+                write_varint(object_index[obj_id])
+                continue
+
+            if cucumber_type in _WRAPPED_TAGS and keys == _WRAPPED_KEYS:
+                items = value["items"]
+                out.append(_WRAPPED_TAGS[cucumber_type])
+                write_object_id(value["__object_id__"])
+                write_varint(len(items))
+                if cucumber_type == "dict":
+                    for key, item in reversed(items):
+                        stack.append(item)
+                        stack.append(key)
+                else:
+                    stack.extend(reversed(items))
+                continue
+
+            if "__handler__" in value and keys == _HANDLER_KEYS and isinstance(cucumber_type, str):
+                out.append(_T_HANDLER)
+                write_str(cucumber_type)
+                write_str(value["__handler__"])
+                write_object_id(value["__object_id__"])
+                stack.append(value["state"])
+                continue
+
+            if "__session_id__" in value:
+                if cucumber_type == "session_ref" and keys == _SESSION_REF_KEYS:
+                    out.append(_T_SESSION_REF)
+                    write_varint(value["__session_id__"])
+                    write_object_id(value["__object_id__"])
+                    continue
+                if cucumber_type == "session_def" and keys == _SESSION_DEF_KEYS:
+                    out.append(_T_SESSION_DEF)
+                    write_varint(value["__session_id__"])
+                    stack.append(value["value"])
+                    continue
+                if keys == _SESSION_HANDLER_KEYS and isinstance(cucumber_type, str):
+                    out.append(_T_SESSION_HANDLER)
+                    write_str(cucumber_type)
+                    write_str(value["__handler__"])
+                    write_object_id(value["__object_id__"])
+                    write_varint(value["__session_id__"])
+                    stack.append(value["state"])
+                    continue
+
+            if cucumber_type == "simple_class_instance" and keys == _INSTANCE_KEYS:
+                attrs = value["attrs"]
+                out.append(_T_INSTANCE)
+                write_object_id(value["__object_id__"])
+                write_str(value["module"])
+                write_str(value["qualname"])
+                write_varint(len(attrs))
+                for key, item in reversed(list(attrs.items())):
+                    stack.append(item)
+                    stack.append(key)
+                continue
+
+            if cucumber_type == "instance_columns" and keys == _COLUMNS_KEYS:
+                names = value["names"]
+                refs = value["refs"]
+                out.append(_T_COLUMNS)
+                write_object_id(value["__object_id__"])
+                write_str(value["container"])
+                write_str(value["module"])
+                write_str(value["qualname"])
+                write_varint(len(names))
+                for name in names:
+                    write_str(name)
+                write_varint(len(refs))
+                for row, row_id in refs:
+                    write_varint(row)
+                    write_object_id(row_id)
+                stack.append(value["columns"])
+                continue
+
+            if cucumber_type in ("pickle_native", "pickle_native_func") and keys == _NATIVE_KEYS:
+                tag = _T_NATIVE if cucumber_type == "pickle_native" else _T_NATIVE_FUNC
+                out.append(tag)
+                write_object_id(value["__object_id__"])
+                blob = pickle.dumps(value["value"], protocol=pickle.HIGHEST_PROTOCOL)
+                write_varint(len(blob))
+                out += blob
+                continue
+
+            # any other dict is written as a plain dict
+            out.append(_T_RAW_DICT)
+            write_varint(len(value))
+            for key, item in reversed(list(value.items())):
+                stack.append(item)
+                stack.append(key)
+
+        elif value_type is list:
+            out.append(_T_RAW_LIST)
+            write_varint(len(value))
+            stack.extend(reversed(value))
+
+        elif value_type is tuple:
+            out.append(_T_RAW_TUPLE)
+            write_varint(len(value))
+            stack.extend(reversed(value))
+
+        else:
+            # complex, bytearray, subclasses of primitives, and anything else
+            try:
+                write_pickled(_T_PICKLED, value)
+            except Exception as e:
+                raise CompactFormatError(
+                    f"Cannot encode {value_type.__name__} in compact format: {e}"
+                ) from e
+
+    if streaming:
+        flush()
+        return written
+    return out
+
+
+def decode(data: Any, strings: Optional[List[str]] = None) -> Any:
+    """
+    Decode compact binary data back into an IR.
+
+    Object ids in the returned IR are the sequential indexes from the
+    encoding, not the original id() values - they are only used to link
+    references to their objects, so this doesn't change the result.
+
+    Args:
+        data: Bytes produced by encode()
+        strings: String table shared across messages (Session only) -
+            must have gone through the same messages as the encoder's
+
+    Returns:
+        IR ready for Deserializer.deserialize_ir()
+    """
+    if not is_compact(data):
+        raise CompactFormatError("Data is not in cucumber compact format")
+
+    buf = bytes(data)
+    pos = len(MAGIC)
+    end = len(buf)
+    if strings is None:
+        strings = []
+
+    def read_varint() -> int:
+        nonlocal pos
+        result = 0
+        shift = 0
+        while True:
+            byte = buf[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def read_bytes(length: int) -> bytes:
+        nonlocal pos
+        if pos + length > end:
+            raise CompactFormatError("Unexpected end of compact data")
+        chunk = buf[pos:pos + length]
+        pos += length
+        return chunk
+
+    def read_str() -> str:
+        nonlocal pos
+        tag = buf[pos]
+        pos += 1
+        if tag == _T_STR_REF:
+            return strings[read_varint()]
+        if tag == _T_STR:
+            value = read_bytes(read_varint()).decode("utf-8", "surrogatepass")
+            if len(value) <= _MAX_INTERNED_LEN:
+                strings.append(value)
+            return value
+        raise CompactFormatError(f"Expected a string in compact data, got tag {tag}")
+
+    def read_object_id() -> Any:
+        # 0 means "no object id", otherwise index + 1
+        value = read_varint()
+        return None if value == 0 else value - 1
+
+    # frame kinds
+    SEQ = 0     # append values to a list
+    PAIRS = 1   # alternate key/value, append (key, value) tuples to a list
+    MAP = 2     # alternate key/value, set on a dict
+    STATE = 3   # single value stored as node["state"]
+    VALUE = 4   # single value stored as node["value"]
+    COLUMNS = 5 # single value stored as node["columns"]
+
+    # each frame: [container, kind, remaining values, finished result]
+    # finished result is what gets attached to the parent once the frame is done
+    # (the node dict for wrapped nodes, None for raw tuples, else the container).
+    # PAIRS/MAP frames temporarily hold a pending key as a 5th element.
+    root: List[Any] = []
+    stack: List[List[Any]] = [[root, SEQ, 1, root]]
+    frame = stack[-1]
+
+    try:
+        while True:
+            tag = buf[pos]
+            pos += 1
+            value: Any
+
+            # leaves produce a value; containers open a frame and continue
+            if tag == _T_INT:
+                raw = buf[pos]
+                if raw < 0x80:
+                    pos += 1
+                else:
+                    raw = read_varint()
+                value = (raw >> 1) if not raw & 1 else -((raw + 1) >> 1)
+            elif tag == _T_STR_REF:
+                index = buf[pos]
+                if index < 0x80:
+                    pos += 1
+                else:
+                    index = read_varint()
+                value = strings[index]
+            elif tag == _T_STR:
+                value = read_bytes(read_varint()).decode("utf-8", "surrogatepass")
+                if len(value) <= _MAX_INTERNED_LEN:
+                    strings.append(value)
+            elif tag == _T_NONE:
+                value = None
+            elif tag == _T_TRUE:
+                value = True
+            elif tag == _T_FALSE:
+                value = False
+            elif tag == _T_FLOAT:
+                value = _DOUBLE.unpack(read_bytes(8))[0]
+            elif tag == _T_BYTES:
+                value = read_bytes(read_varint())
+            elif tag == _T_PICKLED:
+                value = pickle.loads(read_bytes(read_varint()))
+            elif tag == _T_REF:
+                value = {"__cucumber_ref__": read_varint()}
+            elif tag == _T_SESSION_REF:
+                value = {
+                    "__cucumber_type__": "session_ref",
+                    "__session_id__": read_varint(),
+                    "__object_id__": read_object_id(),
+                }
+            elif tag == _T_NATIVE or tag == _T_NATIVE_FUNC:
+                obj_id = read_object_id()
+                value = {
+                    "__cucumber_type__": "pickle_native" if tag == _T_NATIVE else "pickle_native_func",
+                    "__object_id__": obj_id,
+                    "value": pickle.loads(read_bytes(read_varint())),
+                }
+
+            else:
+                if tag in _WRAPPED_NAMES:
+                    name = _WRAPPED_NAMES[tag]
+                    items: List[Any] = []
+                    node = {"__cucumber_type__": name, "items": items, "__object_id__": read_object_id()}
+                    frame = [items, PAIRS if tag == _T_DICT else SEQ, read_varint(), node]
+                elif tag == _T_HANDLER or tag == _T_SESSION_HANDLER:
+                    type_name = read_str()
+                    handler_name = read_str()
+                    node = {
+                        "__cucumber_type__": type_name,
+                        "__handler__": handler_name,
+                        "__object_id__": read_object_id(),
+                    }
+                    if tag == _T_SESSION_HANDLER:
+                        node["__session_id__"] = read_varint()
+                    frame = [node, STATE, 1, node]
+                elif tag == _T_SESSION_DEF:
+                    node = {"__cucumber_type__": "session_def", "__session_id__": read_varint()}
+                    frame = [node, VALUE, 1, node]
+                elif tag == _T_INSTANCE:
+                    obj_id = read_object_id()
+                    attrs: Dict[str, Any] = {}
+                    node = {
+                        "__cucumber_type__": "simple_class_instance",
+                        "__object_id__": obj_id,
+                        "module": read_str(),
+                        "qualname": read_str(),
+                        "attrs": attrs,
+                    }
+                    frame = [attrs, MAP, read_varint(), node]
+                elif tag == _T_COLUMNS:
+                    node = {
+                        "__cucumber_type__": "instance_columns",
+                        "__object_id__": read_object_id(),
+                        "container": read_str(),
+                        "module": read_str(),
+                        "qualname": read_str(),
+                        "names": [read_str() for _ in range(read_varint())],
+                    }
+                    node["refs"] = [(read_varint(), read_object_id()) for _ in range(read_varint())]
+                    frame = [node, COLUMNS, 1, node]
+                elif tag == _T_RAW_LIST:
+                    items = []
+                    frame = [items, SEQ, read_varint(), items]
+                elif tag == _T_RAW_TUPLE:
+                    # finished result is filled in as a tuple when the frame closes
+                    frame = [[], SEQ, read_varint(), None]
+                elif tag == _T_RAW_DICT:
+                    raw_dict: Dict[Any, Any] = {}
+                    frame = [raw_dict, MAP, read_varint(), raw_dict]
+                else:
+                    raise CompactFormatError(f"Unknown tag {tag} at offset {pos - 1}")
+
+                stack.append(frame)
+                if frame[2]:
+                    continue
+                # empty container - finished right away
+                stack.pop()
+                value = frame[3] if frame[3] is not None else ()
+                frame = stack[-1]
+
+            # attach the value to the current frame, closing finished frames
+            while True:
+                kind = frame[1]
+                if kind == SEQ:
+                    frame[0].append(value)
+                elif kind == STATE:
+                    frame[0]["state"] = value
+                elif kind == VALUE:
+                    frame[0]["value"] = value
+                elif kind == COLUMNS:
+                    frame[0]["columns"] = value
+                elif len(frame) == 4:
+                    # value is a key - hold it until its value arrives
+                    frame.append(value)
+                    break
+                else:
+                    key = frame.pop()
+                    if kind == PAIRS:
+                        frame[0].append((key, value))
+                    else:
+                        frame[0][key] = value
+                frame[2] -= 1
+                if frame[2]:
+                    break
+                stack.pop()
+                if not stack:
+                    break
+                value = frame[3] if frame[3] is not None else tuple(frame[0])
+                frame = stack[-1]
+
+            if not stack:
+                break
+
+    except CompactFormatError:
+        raise
+    except IndexError as e:
+        if pos < end:
+            # a string reference past the end of the table, not truncated data
+            raise CompactFormatError(
+                "Invalid string reference in compact data (data from a "
+                "cucumber.Session can only be deserialized by its peer Session)"
+            ) from e
+        raise CompactFormatError("Unexpected end of compact data") from e
+
+    if pos != end:
+        raise CompactFormatError(f"Trailing data after compact payload ({end - pos} bytes)")
+
+    return root[0]
@@ -0,0 +1,123 @@
+"""
+Compression framing for cucumber payloads.
+
+serialize(obj, compress=...) runs the finished bytes (either wire format)
+through a standard library codec and puts a small frame header in front:
+
+    MAGIC (5 bytes) | codec id (1 byte) | compressed payload
+
+deserialize() checks for MAGIC and picks the codec from the header, so the
+caller never has to say how something was compressed.
+
+Payloads shorter than the threshold are returned as they are - for a
+small message the header and the codec's own overhead cost more than they
+save. So are payloads that don't shrink enough to be worth decompressing.
+
+"auto" uses zlib at a low level: IR is very repetitive (the same keys,
+handler names and qualnames over and over), so the fast levels already
+get most of the gain, and the processes on either end of a Pipe, Queue or
+Manager proxy shouldn't stall on compression.
+"""
+
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import lzma
+except ImportError:  # Python built without liblzma
+    lzma = None
+
+try:
+    import bz2
+except ImportError:  # Python built without libbz2
+    bz2 = None
+
+MAGIC = b"CUKZ\x01"
+
+# codecs accepted by serialize(compress=...)
+CODECS = ("auto", "zlib", "lzma", "bz2")
+
+# payloads smaller than this are never compressed
+COMPRESS_THRESHOLD = 1024
+
+# compressed output has to be at most this fraction of the input to be kept
+_MAX_RATIO = 0.9
+
+# zlib level used by "auto"
+_AUTO_ZLIB_LEVEL = 1
+
+_CODEC_IDS = {"zlib": 1, "lzma": 2, "bz2": 3}
+_CODEC_NAMES = {codec_id: name for name, codec_id in _CODEC_IDS.items()}
+
+
+def _modules() -> Dict[str, Any]:
+    return {"zlib": zlib, "lzma": lzma, "bz2": bz2}
+
+
+def check_codec(codec: Optional[str]) -> None:
+    """
+    Check a compress= argument before anything is serialized.
+
+    Raises:
+        ValueError: If the codec is unknown or this Python was built without it
+    """
+    if codec is None:
+        return
+    if codec not in CODECS:
+        raise ValueError(
+            f"Unknown compression {codec!r}, expected one of: {', '.join(CODECS)}"
+        )
+    if codec != "auto" and _modules()[codec] is None:
+        raise ValueError(f"Compression {codec!r} is not available in this Python build")
+
+
+def _compressor(codec: str) -> Tuple[str, Callable[[bytes], bytes]]:
+    if codec == "auto":
+        return "zlib", lambda data: zlib.compress(data, _AUTO_ZLIB_LEVEL)
+    return codec, _modules()[codec].compress
+
+
+def compress(data: bytes, codec: Optional[str], threshold: int = COMPRESS_THRESHOLD) -> bytes:
+    """
+    Compress serialized bytes and frame them.
+
+    Returns data unchanged if codec is None, data is shorter than the
+    threshold, or compressing doesn't make it meaningfully smaller.
+    """
+    if codec is None or len(data) < threshold:
+        return data
+    name, compress_fn = _compressor(codec)
+    compressed = compress_fn(data)
+    if len(compressed) + len(MAGIC) + 1 > len(data) * _MAX_RATIO:
+        return data
+    return b"".join((MAGIC, bytes((_CODEC_IDS[name],)), compressed))
+
+
+def is_compressed(data: Any) -> bool:
+    """Check if serialized data is a compression frame."""
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def codec_of(data: Any) -> Optional[str]:
+    """Name of the codec a frame was compressed with (None if it isn't a frame)."""
+    if not is_compressed(data) or len(data) <= len(MAGIC):
+        return None
+    return _CODEC_NAMES.get(data[len(MAGIC)])
+
+
+def decompress(data: Any) -> bytes:
+    """
+    Unwrap a compression frame.
+
+    Raises:
+        ValueError: If the frame names an unknown codec, or one this Python
+            was built without
+    """
+    codec_id = data[len(MAGIC)] if len(data) > len(MAGIC) else None
+    name = _CODEC_NAMES.get(codec_id)
+    if name is None:
+        raise ValueError(f"Unknown compression codec id {codec_id!r}")
+    module = _modules()[name]
+    if module is None:
+        raise ValueError(f"Data was compressed with {name}, which is not available in this Python build")
+    return module.decompress(memoryview(data)[len(MAGIC) + 1:])
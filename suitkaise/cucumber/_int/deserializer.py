@@ -25,11 +25,14 @@ This is the inverse of serializer.py.
 # - Collections (list, dict, tuple) need their contents reconstructed recursively
 # - Handler-marked objects need to be passed to their handler's reconstruct method
 
-# STEP 3: HANDLE CIRCULAR REFERENCES (TWO-PASS APPROACH)
-# - First pass: Create placeholder objects for everything that has an "__object_id__"
-# - Build a lookup table: object_id -> placeholder object
-# - When we encounter a "__cucumber_ref__" marker, replace it with the placeholder
-# - Second pass: Fill in the actual state of each placeholder
+# STEP 3: HANDLE CIRCULAR REFERENCES (SINGLE PASS WITH BACK-PATCHING)
+# - Register each object under its "__object_id__" as soon as reconstruction starts:
+#   mutable containers register the real (still empty) object, handler objects
+#   and tuples register a placeholder until they are finished
+# - A "__cucumber_ref__" always points to an object that was already started,
+#   because the serializer writes the full node at its first occurrence
+# - If a ref resolves to a placeholder, record the slot it is stored in (fix-up site)
+# - Once everything is reconstructed, patch only the recorded slots with the real objects
 # - This prevents infinite loops when objects reference each other
 
 # STEP 4: DISPATCH TO HANDLERS FOR RECONSTRUCTION
@@ -68,31 +71,73 @@ This is the inverse of serializer.py.
 
 import pickle
 import sys
+import time
 import types
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
 
-from .handlers import ALL_HANDLERS
+from . import compact
+from . import compression
+from . import profiling
+from .columnar import unpack_column
+from .resolve import resolve
+from .streams import RECORD_HEADER, PrefixedReader, is_batch, read_exact
+from .registry import DEFAULT_REGISTRY, HandlerRegistry
 from .handlers.base_class import Handler
 
 
+# registry lookup default (None is a valid registered object)
+_MISSING = object()
+
+# IR values that are always final - reconstructed as themselves
+_FINAL_TYPES = frozenset((type(None), bool, int, float, complex, str, bytes, bytearray))
+
+
 class DeserializationError(Exception):
     """Raised when deserialization fails."""
     pass
 
 
+# fix-up site kinds - how a placeholder stored in a slot gets patched
+_FIX_ITEM = 0    # container[key] = real (list index, dict value)
+_FIX_ATTR = 1    # setattr(container, key, real)
+_FIX_KEY = 2     # dict key: container[real] = container.pop(placeholder)
+_FIX_MEMBER = 3  # set member: discard placeholder, add real
+
+
 class _ReconstructionPlaceholder:
     """
-    Placeholder object used during two-pass reconstruction.
+    Placeholder for an object that is referenced before it is finished.
     
-    When reconstructing an object with circular references in its state,
-    we register this placeholder first, then reconstruct the state (which
-    may contain circular refs back to this object), then replace the
-    placeholder with the real reconstructed object.
+    Handler objects and tuples register one when their reconstruction
+    starts. A circular reference back to the object while its state is still
+    being reconstructed gets the placeholder, and the slot it is stored in is
+    recorded as a fix-up site, to be patched once the real object exists.
+    
+    Tuples and frozensets that end up containing placeholders can't be
+    patched in place, so they are deferred instead: the placeholder keeps
+    their `items` and builds them once everything inside is resolved.
     """
-    def __init__(self, obj_id: int, type_name: str):
+    __slots__ = ("obj_id", "type_name", "real_object", "resolved", "items")
+    
+    def __init__(self, obj_id: Any, type_name: str):
         self.obj_id = obj_id
         self.type_name = type_name
         self.real_object = None  # will be set after reconstruction
+        self.resolved = False
+        self.items: Optional[List[Any]] = None  # deferred tuple/frozenset contents
+    
+    def resolve(self) -> Any:
+        """Return the real object, or the placeholder itself if it never got one."""
+        if not self.resolved and self.items is not None:
+            items = self.items
+            self.items = None  # a tuple containing itself stays unresolved
+            values = [
+                item.resolve() if type(item) is _ReconstructionPlaceholder else item
+                for item in items
+            ]
+            self.real_object = tuple(values) if self.type_name == "tuple" else frozenset(values)
+            self.resolved = True
+        return self.real_object if self.resolved else self
     
     def __repr__(self):
         return f"<Placeholder for {self.type_name} id={self.obj_id}>"
@@ -105,7 +150,7 @@ class Deserializer:
     The deserializer:
     1. Unpickles bytes to get the intermediate representation (IR)
     2. Recursively reconstructs objects from the IR
-    3. Handles circular references using a two-pass approach
+    3. Handles circular references with placeholders and back-patching
     4. Dispatches to handlers for complex object reconstruction
     5. Tracks reconstruction path for error reporting
     """
@@ -120,11 +165,12 @@ class Deserializer:
         Initialize the deserializer.
         
         Args:
-            handlers: List of handler instances (defaults to ALL_HANDLERS)
+            handlers: List of handler instances (defaults to the shared
+                registry - built-in handlers plus any added with register_handler())
             debug: Enable debug mode (logs all reconstruction steps)
             verbose: Enable verbose mode (detailed output with paths)
         """
-        self.handlers = handlers if handlers is not None else ALL_HANDLERS
+        self._registry = DEFAULT_REGISTRY if handlers is None else HandlerRegistry(handlers)
         self.debug = debug
         self.verbose = verbose
         
@@ -147,17 +193,36 @@ class Deserializer:
         #   we should return the same reconstructed object each time
         self._reconstructed_cache: Dict[int, Any] = {}
         
+        # fix-up sites: (kind, container, key, placeholder) for every slot a
+        #   placeholder was stored in - patched once reconstruction is done
+        self._fixups: List[Tuple[int, Any, Any, _ReconstructionPlaceholder]] = []
+        # set once any placeholder has been handed out, so objects built by
+        #   handlers only get scanned for placeholders when there can be some
+        self._placeholders_out = False
+        
+        # definitions received so far, by session id - only set on the
+        #   Deserializer a Session owns (persists across messages)
+        self._session_objects: Optional[Dict[int, Any]] = None
+        
+        # object_id -> IR node lookup for objects referenced before their node
+        #   was reconstructed - only set by deserialize_lazy(), which reconstructs
+        #   subtrees out of order
+        self._lazy_lookup: Optional[Callable[[Any], Any]] = None
+        
+        # profiles recording this call - read from cucumber.profile() when each call starts
+        self._profiles: Tuple[Any, ...] = ()
+        
         # Debug tracking
-        self._all_registered_ids: set = set()  # all IDs registered in pass 1
+        self._all_registered_ids: set = set()  # all IDs registered
         self._all_encountered_refs: set = set()  # all __cucumber_ref__ values encountered
     
     def deserialize(self, data: bytes) -> Any:
         """
         Deserialize bytes back into a Python object.
         
-        Uses two-pass approach:
-        Pass 1: Scan IR and register placeholders for all objects with __object_id__
-        Pass 2: Reconstruct all objects (circular refs resolve to placeholders)
+        Reconstructs in a single pass: circular refs to objects that aren't
+        finished yet resolve to placeholders, and the slots they land in are
+        patched once everything is reconstructed.
         
         Args:
             data: Pickled bytes from serializer
@@ -168,11 +233,176 @@ class Deserializer:
         Raises:
             DeserializationError: If reconstruction fails
         """
+        return self.deserialize_ir(self._decode(data))
+    
+    def deserialize_lazy(self, data: bytes) -> Any:
+        """
+        Deserialize bytes into views that reconstruct their contents on access.
+        
+        Dicts, lists and class instances come back as LazyDict, LazyList
+        and LazyObject views. Each view reconstructs its direct children
+        the first time they are read, and nested dicts, lists and instances
+        become views of their own. Everything else is reconstructed normally
+        when it is first read.
+        
+        The views share this Deserializer's object registry, so it must
+        not be used for anything else while they are alive.
+        
+        Args:
+            data: Serialized bytes (either wire format)
+            
+        Returns:
+            A view, or the reconstructed object if the root isn't a dict,
+            list or class instance
+            
+        Raises:
+            DeserializationError: If the data can't be decoded
+        """
+        from .lazy import LazyContext
+        
+        ir = self._decode(data)
+        self._object_registry.clear()
+        self._reconstructed_cache.clear()
+        self._reconstructing.clear()
+        self._fixups = []
+        self._placeholders_out = False
+        return LazyContext(self, ir).root()
+    
+    def _decode(self, data: bytes) -> Any:
+        """Decode serialized bytes (either wire format, compressed or not) to the IR."""
+        if is_batch(data):
+            raise DeserializationError(
+                "Data is a batch from serialize_many() - read it with deserialize_many() or BatchReader"
+            )
         try:
-            # inpickle bytes to get intermediate representation
+            if compression.is_compressed(data):
+                self._log(f"Decompressing ({compression.codec_of(data)})...")
+                data = compression.decompress(data)
+            if compact.is_compact(data):
+                # compact binary format - decode straight to the IR
+                self._log("Decoding compact bytes to intermediate representation...")
+                return compact.decode(data)
+            # unpickle bytes to get intermediate representation
             self._log("Unpickling bytes to intermediate representation...")
-            ir = pickle.loads(data)
+            return pickle.loads(data)
+        except Exception as e:
+            raise DeserializationError(f"Failed to deserialize: {e}") from e
+    
+    def deserialize_oob(self, header: bytes, buffers: Any) -> Any:
+        """
+        Deserialize a header and out-of-band buffers from Serializer.serialize_oob().
+        
+        Args:
+            header: Header bytes
+            buffers: Iterable of buffer objects (PickleBuffer, bytes, bytearray,
+                memoryview, ...) in the order they were produced
+            
+        Returns:
+            Reconstructed Python object with exact state
+            
+        Raises:
+            DeserializationError: If reconstruction fails
+        """
+        try:
+            if compression.is_compressed(header):
+                self._log(f"Decompressing header ({compression.codec_of(header)})...")
+                header = compression.decompress(header)
+            if compact.is_compact(header):
+                # IR was too deep for pickle, so the serializer kept the buffers in band
+                self._log("Decoding compact header...")
+                ir = compact.decode(header)
+            else:
+                self._log("Unpickling header with out-of-band buffers...")
+                ir = pickle.loads(header, buffers=buffers)
+        except Exception as e:
+            raise DeserializationError(f"Failed to deserialize: {e}") from e
+        
+        return self.deserialize_ir(ir)
+    
+    def load(self, file: Any) -> Any:
+        """
+        Deserialize one object from a readable binary file-like object.
+        
+        Pickle-format data is read incrementally and only up to the end of
+        the object, so several pickle-format dumps written back to back can be
+        loaded one after another. Compact data is read to the end of the
+        stream before decoding - use iter_dump()/iter_load() for multiple
+        compact records.
+        
+        Args:
+            file: Object with a read() method returning bytes
+            
+        Returns:
+            Reconstructed Python object with exact state
+            
+        Raises:
+            DeserializationError: If the stream is empty or reconstruction fails
+        """
+        try:
+            head = read_exact(file, len(compact.MAGIC))
+            if not head:
+                raise EOFError("stream is empty")
+            
+            if head == compact.MAGIC:
+                self._log("Decoding compact stream to intermediate representation...")
+                ir = compact.decode(head + file.read())
+            else:
+                self._log("Unpickling stream to intermediate representation...")
+                ir = pickle.Unpickler(PrefixedReader(head, file)).load()
+        except Exception as e:
+            raise DeserializationError(f"Failed to load: {e}") from e
+        
+        return self.deserialize_ir(ir)
+    
+    def iter_load(self, file: Any) -> Iterator[Any]:
+        """
+        Deserialize records one at a time from a stream written by Serializer.iter_dump().
+        
+        Args:
+            file: Object with a read() method returning bytes
+            
+        Yields:
+            Each reconstructed record, in order
+            
+        Raises:
+            DeserializationError: If the stream is truncated or a record fails
+        """
+        index = 0
+        while True:
+            header = read_exact(file, RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) < RECORD_HEADER.size:
+                raise DeserializationError(
+                    f"Record stream is truncated: incomplete header for record {index}"
+                )
+            (size,) = RECORD_HEADER.unpack(header)
+            data = read_exact(file, size)
+            if len(data) < size:
+                raise DeserializationError(
+                    f"Record stream is truncated: record {index} expected {size} bytes, "
+                    f"got {len(data)}"
+                )
+            yield self.deserialize(data)
+            index += 1
+    
+    def deserialize_ir(self, ir: Any) -> Any:
+        """
+        Reconstruct a Python object from an intermediate representation.
+        
+        Counterpart to Serializer.serialize_ir() - runs both reconstruction
+        passes on an IR that has already been decoded from bytes.
+        
+        Args:
+            ir: Intermediate representation
+            
+        Returns:
+            Reconstructed Python object with exact state
             
+        Raises:
+            DeserializationError: If reconstruction fails
+        """
+        try:
             # clear state for fresh reconstruction
             self._object_registry.clear()
             self._reconstruction_path.clear()
@@ -181,15 +411,26 @@ class Deserializer:
             self._reconstructed_cache.clear()
             self._all_registered_ids = set()
             self._all_encountered_refs = set()
+            self._fixups = []
+            self._placeholders_out = False
             
-            # PASS 1 - register placeholders for all objects with __object_id__
-            self._log("Pass 1: Registering placeholders for all objects...")
-            self._register_all_placeholders(ir)
-            self._log(f"  Registered {len(self._object_registry)} placeholders")
+            profiles = self._profiles = profiling.active()
+            if profiles:
+                start = time.perf_counter()
             
-            # PASS 2 - reconstruct the object tree
-            self._log("Pass 2: Reconstructing objects...")
-            result = self._reconstruct_recursive(ir)
+            # reconstruct the object tree, registering objects as they start
+            self._log("Reconstructing objects...")
+            result = self._reconstruct(ir)
+            
+            # patch every slot that got a placeholder for an unfinished object
+            if self._fixups:
+                self._log(f"Patching {len(self._fixups)} circular reference sites...")
+                self._apply_fixups()
+            if type(result) is _ReconstructionPlaceholder:
+                result = result.resolve()
+            
+            if profiles:
+                self._record_call(start)
             
             # return the final reconstructed object
             self._log(f"Deserialization complete! Reconstructed {type(result).__name__}")
@@ -200,160 +441,201 @@ class Deserializer:
                 raise
             raise DeserializationError(f"Failed to deserialize: {e}") from e
     
-    def _reconstruct_recursive(self, ir_data: Any) -> Any:
+    def reconstruct_subtree(self, ir: Any) -> Any:
         """
-        Recursively reconstruct objects from intermediate representation.
+        Reconstruct one node of an IR without resetting state.
         
-        This is the core reconstruction logic that:
-        1. Checks if data is a circular reference marker
-        2. Checks if data is primitive (already final)
-        3. Checks if data has cucumber metadata (needs handler reconstruction) - CHECK BEFORE collections!
-        4. Checks if data is a basic collection (list, dict, tuple, set)
-        5. Recursively reconstructs all nested data
+        Used by deserialize_lazy(): objects reconstructed by earlier calls
+        stay in the registry, so every subtree of the same payload shares
+        them, and references into parts of the IR that haven't been
+        reconstructed yet are looked up through _lazy_lookup.
         
         Args:
-            ir_data: Data from the intermediate representation
+            ir: IR node
             
         Returns:
             Fully reconstructed Python object
+            
+        Raises:
+            DeserializationError: If reconstruction fails
         """
-        # track recursion depth
-        self._reconstruction_depth += 1
         try:
-            # check cache for already-reconstructed IR objects
-            # this handles pickle's object deduplication (same dict/list appearing multiple times)
-            ir_id = id(ir_data)
-            if ir_id in self._reconstructed_cache:
-                return self._reconstructed_cache[ir_id]
-            
-            # check for circular reference marker
-            if self._is_circular_reference(ir_data):
-                if self.debug:
-                    obj_id = ir_data["__cucumber_ref__"]
-                    self._log(f"Found circular reference to object {obj_id}")
-                    self._log(f"  Current registry has: {list(self._object_registry.keys())}")
-                return self._resolve_circular_reference(ir_data)
-            
-            # check if data is primitive (already final, no work needed)
-            if self._is_primitive(ir_data):
-                return ir_data
-            
-            # check if data is a special collections type that pickle handled correctly
-            # these are dict/list subclasses that would otherwise be caught by _is_basic_collection
-            #   but should be returned as-is since pickle preserved their type
-            if self._is_special_collection_type(ir_data):
-                return ir_data
-            
-            # check if data has cucumber metadata (needs handler reconstruction)
-            # NOTE: Check this BEFORE basic collections, because cucumber objects
-            #   are dicts with special markers
-            if self._has_cucumber_metadata(ir_data):
-                return self._reconstruct_from_handler(ir_data)
-            
-            # check if data is a basic collection (needs recursive processing)
-            if self._is_basic_collection(ir_data):
-                data_id = id(ir_data)
-                
-                # check if we're already reconstructing this exact IR object
-                if data_id in self._reconstructing:
-                    # this happens when pickle deduplicated an object and it appears
-                    #   in multiple places in the IR. We're currently reconstructing it,
-                    #   so we need to register a placeholder and return it.
-                    # the placeholder will be replaced with the final result once complete.
-                    
-                    # for mutable collections (dict, list, set), create empty placeholder
-                    if isinstance(ir_data, dict):
-                        placeholder = {}
-                    elif isinstance(ir_data, list):
-                        placeholder = []
-                    elif isinstance(ir_data, set):
-                        placeholder = set()
-                    else:
-                        # for immutable collections (tuple, frozenset), we can't use placeholders
-                        # this is a true circular reference that can't be handled
-                        raise DeserializationError(
-                            f"Cannot reconstruct immutable collection {type(ir_data).__name__} "
-                            f"that references itself. Immutable circular refs are not supported."
-                        )
-                    
-                    # cache the placeholder
-                    self._reconstructed_cache[data_id] = placeholder
-                    return placeholder
-                
-                # mark as currently reconstructing
-                self._reconstructing.add(data_id)
-                try:
-                    # reconstruct the collection
-                    result = self._reconstruct_collection(ir_data)
-                    
-                    # if we created a placeholder earlier, update it instead of caching a new object
-                    if data_id in self._reconstructed_cache:
-                        placeholder = self._reconstructed_cache[data_id]
-                        if isinstance(placeholder, dict) and isinstance(result, dict):
-                            placeholder.update(result)
-                            return placeholder
-                        elif isinstance(placeholder, list) and isinstance(result, list):
-                            placeholder.extend(result)
-                            return placeholder
-                        elif isinstance(placeholder, set) and isinstance(result, set):
-                            placeholder.update(result)
-                            return placeholder
-                    
-                    # cache the result for future references
-                    self._reconstructed_cache[data_id] = result
-                    return result
-                finally:
-                    self._reconstructing.discard(data_id)
-            
-            # if none of above, return as-is
-            # this handles edge cases like type objects, modules, etc that pickle handles
-            return ir_data
+            profiles = self._profiles = profiling.active()
+            if profiles:
+                start = time.perf_counter()
+            result = self._reconstruct(ir)
+            if self._fixups:
+                self._apply_fixups()
+                self._fixups = []
+            if type(result) is _ReconstructionPlaceholder:
+                result = result.resolve()
+            if profiles:
+                self._record_call(start)
+            return result
+        except Exception as e:
+            # drop half-finished fix-ups so the next subtree starts clean
+            self._fixups = []
+            if isinstance(e, DeserializationError):
+                raise
+            raise DeserializationError(f"Failed to deserialize: {e}") from e
+    
+    def _record_call(self, start: float) -> None:
+        """Record a finished deserialize in the active profiles."""
+        elapsed = time.perf_counter() - start
+        for profile in self._profiles:
+            profile.record_call("deserialize", elapsed)
+    
+    def _reconstruct(self, root: Any) -> Any:
+        """
+        Reconstruct an object graph from intermediate representation.
+        
+        Works with an explicit stack instead of Python recursion, so nesting
+        depth is only limited by memory. Containers and handler objects are
+        reconstructed by generators that `yield` each child IR they need and
+        receive the reconstructed child back - this loop runs them, so the
+        order of reconstruction is the same as a recursive walk.
+        
+        Args:
+            root: Intermediate representation
             
-        finally:
-            # always decrement depth on exit
-            self._reconstruction_depth -= 1
+        Returns:
+            Fully reconstructed Python object
+        """
+        value = self._reconstruct_step(root)
+        if type(value) is not types.GeneratorType:
+            return value
+        
+        step = self._reconstruct_step
+        stack = [value]
+        sent = None
+        while True:
+            try:
+                child = stack[-1].send(sent)
+            except StopIteration as done:
+                # this node is finished - hand its result to the parent
+                stack.pop()
+                if not stack:
+                    return done.value
+                sent = done.value
+                continue
+            
+            self._reconstruction_depth = len(stack) + 1
+            value = step(child)
+            if type(value) is types.GeneratorType:
+                stack.append(value)
+                sent = None
+            else:
+                sent = value
     
-    def _register_all_placeholders(self, data: Any, visited: Optional[set] = None) -> None:
+    def _reconstruct_step(self, ir_data: Any) -> Any:
         """
-        PASS 1: Scan the entire IR and register placeholders for all objects with __object_id__.
+        Reconstruct one IR value.
         
-        This ensures that when we reconstruct objects in pass 2, any circular or forward
-        references can be resolved immediately.
+        This is the core reconstruction logic that:
+        1. Checks if data is primitive (already final)
+        2. Checks if data is a circular reference marker
+        3. Checks if data has cucumber metadata (needs handler reconstruction) - CHECK BEFORE collections!
+        4. Checks if data is a basic collection (list, dict, tuple, set)
         
         Args:
-            data: IR data to scan
-            visited: Set of Python object IDs we've already visited (to avoid infinite loops)
+            ir_data: Data from the intermediate representation
+            
+        Returns:
+            The reconstructed object, or a generator that reconstructs it
+            (for containers and handler objects - see _reconstruct())
         """
-        if visited is None:
-            visited = set()
+        # check if data is primitive (already final, no work needed)
+        if type(ir_data) in _FINAL_TYPES or self._is_primitive(ir_data):
+            return ir_data
         
-        # avoid infinite loops from Python's own object cycles
-        data_id = id(data)
-        if data_id in visited:
-            return
-        visited.add(data_id)
+        # check cache for already-reconstructed IR objects
+        # this handles pickle's object deduplication (same dict/list appearing multiple times)
+        ir_id = id(ir_data)
+        if ir_id in self._reconstructed_cache:
+            return self._reconstructed_cache[ir_id]
+        
+        # check for circular reference marker
+        if self._is_circular_reference(ir_data):
+            if self.debug:
+                obj_id = ir_data["__cucumber_ref__"]
+                self._log(f"Found circular reference to object {obj_id}")
+                self._log(f"  Current registry has: {list(self._object_registry.keys())}")
+            return self._resolve_circular_reference(ir_data)
+        
+        # check if data is a special collections type that pickle handled correctly
+        # these are dict/list subclasses that would otherwise be caught by _is_basic_collection
+        #   but should be returned as-is since pickle preserved their type
+        if self._is_special_collection_type(ir_data):
+            return ir_data
         
-        # check if this is a cucumber object with __object_id__
-        if isinstance(data, dict):
-            if "__object_id__" in data:
-                obj_id = data["__object_id__"]
-                type_name = data.get("__cucumber_type__", "unknown")
+        # check if data has cucumber metadata (needs handler reconstruction)
+        # NOTE: Check this BEFORE basic collections, because cucumber objects
+        #   are dicts with special markers
+        if self._has_cucumber_metadata(ir_data):
+            return self._reconstruct_from_handler(ir_data)
+        
+        # check if data is a basic collection (needs its items reconstructed)
+        if self._is_basic_collection(ir_data):
+            # check if we're already reconstructing this exact IR object
+            if ir_id in self._reconstructing:
+                # this happens when pickle deduplicated an object and it appears
+                #   in multiple places in the IR. We're currently reconstructing it,
+                #   so we need to register a placeholder and return it.
+                # the placeholder will be replaced with the final result once complete.
                 
-                # only register if not already registered
-                if obj_id not in self._object_registry:
-                    placeholder = _ReconstructionPlaceholder(obj_id, type_name)
-                    self._object_registry[obj_id] = placeholder
-                    self._all_registered_ids.add(obj_id)
-                    self._log(f"  Registered placeholder for {type_name} (id={obj_id})")
+                # for mutable collections (dict, list, set), create empty placeholder
+                if isinstance(ir_data, dict):
+                    placeholder = {}
+                elif isinstance(ir_data, list):
+                    placeholder = []
+                elif isinstance(ir_data, set):
+                    placeholder = set()
+                else:
+                    # for immutable collections (tuple, frozenset), we can't use placeholders
+                    # this is a true circular reference that can't be handled
+                    raise DeserializationError(
+                        f"Cannot reconstruct immutable collection {type(ir_data).__name__} "
+                        f"that references itself. Immutable circular refs are not supported."
+                    )
+                
+                # cache the placeholder
+                self._reconstructed_cache[ir_id] = placeholder
+                return placeholder
             
-            # recursively scan all dict values
-            for value in data.values():
-                self._register_all_placeholders(value, visited)
+            return self._reconstruct_basic_collection(ir_data)
+        
+        # if none of above, return as-is
+        # this handles edge cases like type objects, modules, etc that pickle handles
+        return ir_data
+    
+    def _reconstruct_basic_collection(self, ir_data: Any) -> Iterator[Any]:
+        """Reconstruct a plain IR collection, tracking it to catch self-references."""
+        data_id = id(ir_data)
         
-        elif isinstance(data, (list, tuple)):
-            # recursively scan all list/tuple items
-            for item in data:
-                self._register_all_placeholders(item, visited)
+        # mark as currently reconstructing
+        self._reconstructing.add(data_id)
+        try:
+            # reconstruct the collection
+            result = yield from self._reconstruct_collection(ir_data)
+            
+            # if we created a placeholder earlier, update it instead of caching a new object
+            if data_id in self._reconstructed_cache:
+                placeholder = self._reconstructed_cache[data_id]
+                if isinstance(placeholder, dict) and isinstance(result, dict):
+                    placeholder.update(result)
+                    return placeholder
+                elif isinstance(placeholder, list) and isinstance(result, list):
+                    placeholder.extend(result)
+                    return placeholder
+                elif isinstance(placeholder, set) and isinstance(result, set):
+                    placeholder.update(result)
+                    return placeholder
+            
+            # cache the result for future references
+            self._reconstructed_cache[data_id] = result
+            return result
+        finally:
+            self._reconstructing.discard(data_id)
     
     def _is_circular_reference(self, data: Any) -> bool:
         """
@@ -376,8 +658,9 @@ class Deserializer:
         """
         Resolve a circular reference by looking up object_id in registry.
         
-        With two-pass reconstruction, the object should always be in the registry
-        (either as a placeholder or as a fully reconstructed object).
+        The serializer writes an object's full node before any reference to
+        it, so the object has always been started - it is either finished,
+        a mutable container still being filled, or a placeholder.
         """
         obj_id = data["__cucumber_ref__"]
         self._all_encountered_refs.add(obj_id)
@@ -387,17 +670,29 @@ class Deserializer:
             obj = self._object_registry[obj_id]
             
             # if it's still a placeholder, that's okay - we'll replace it later
-            if isinstance(obj, _ReconstructionPlaceholder):
+            if type(obj) is _ReconstructionPlaceholder:
+                self._placeholders_out = True
                 self._log(f"Resolved circular reference to placeholder {obj_id}")
             else:
                 self._log(f"Resolved circular reference to object {obj_id}")
             
             return obj
         
-        # this should never happen with two-pass reconstruction!
+        # deserialize_lazy() reconstructs subtrees out of order, so the
+        #   object's node may not have been reached yet - reconstruct it now
+        if self._lazy_lookup is not None:
+            node = self._lazy_lookup(obj_id)
+            if node is not None:
+                result = self._reconstruct_step(node)
+                if node.get("__object_id__") != obj_id:
+                    # a row of a columnar list - rebuilding the list registered it
+                    return self._object_registry[obj_id]
+                return result
+        
+        # this should never happen - refs always come after their object
         raise DeserializationError(
             f"Circular reference to object {obj_id} not found in registry. "
-            f"This suggests a bug in the two-pass reconstruction."
+            f"The IR references an object before defining it."
         )
     
     def _is_special_collection_type(self, data: Any) -> bool:
@@ -457,11 +752,11 @@ class Deserializer:
         # can't check dict with __cucumber_type__ here - that's handled separately
         return isinstance(data, (list, tuple, set, frozenset, dict))
     
-    def _reconstruct_collection(self, data: Any) -> Any:
+    def _reconstruct_collection(self, data: Any) -> Iterator[Any]:
         """
         Reconstruct a basic collection (list, dict, tuple, set, frozenset).
         
-        Recursively reconstructs all elements/keys/values.
+        Reconstructs all elements/keys/values.
         
         Note: By the time we get here, we've already checked for cucumber metadata,
         so all dicts here are plain dicts (no __cucumber_type__ marker).
@@ -469,33 +764,86 @@ class Deserializer:
         These are simple collections from the original serialized data that
         pickle handled, not cucumber-wrapped ones.
         """
-        # list: reconstruct each element
-        if isinstance(data, list):
-            return [self._reconstruct_recursive(item) for item in data]
+        # dict: reconstruct both keys and values
+        if isinstance(data, dict):
+            return (yield from self._reconstruct_dict_items(data.items(), {}))
         
-        # tuple: reconstruct each element, convert to tuple
-        if isinstance(data, tuple):
-            return tuple(self._reconstruct_recursive(item) for item in data)
+        if isinstance(data, list):
+            return (yield from self._reconstruct_items(data, []))
         
-        # set: reconstruct each element, convert to set
         if isinstance(data, set):
-            return {self._reconstruct_recursive(item) for item in data}
-        
-        # frozenset: reconstruct each element, convert to frozenset
-        if isinstance(data, frozenset):
-            return frozenset(self._reconstruct_recursive(item) for item in data)
+            return (yield from self._reconstruct_set_items(data, set()))
         
-        # dict: reconstruct both keys and values
-        if isinstance(data, dict):
-            # Plain dict: reconstruct keys and values
-            return {
-                self._reconstruct_recursive(k): self._reconstruct_recursive(v)
-                for k, v in data.items()
-            }
+        if isinstance(data, (tuple, frozenset)):
+            values = yield from self._reconstruct_items(data, [])
+            type_name = "tuple" if isinstance(data, tuple) else "frozenset"
+            return self._build_immutable(type_name, values, None)
         
         # shouldn't reach here
         return data
     
+    def _reconstruct_items(self, items: Any, result: List[Any]) -> Iterator[Any]:
+        """Reconstruct a sequence of IR values, appending them to `result` in order."""
+        append = result.append
+        for item in items:
+            # primitives are final - only yield items that need work
+            if type(item) not in _FINAL_TYPES:
+                item = yield item
+                if type(item) is _ReconstructionPlaceholder:
+                    self._fixups.append((_FIX_ITEM, result, len(result), item))
+            append(item)
+        return result
+    
+    def _reconstruct_dict_items(self, pairs: Any, result: Dict[Any, Any]) -> Iterator[Any]:
+        """Reconstruct (key, value) IR pairs into `result`, in order."""
+        for key, value in pairs:
+            if type(key) not in _FINAL_TYPES:
+                key = yield key
+                if type(key) is _ReconstructionPlaceholder:
+                    self._fixups.append((_FIX_KEY, result, key, key))
+            if type(value) not in _FINAL_TYPES:
+                value = yield value
+                if type(value) is _ReconstructionPlaceholder:
+                    self._fixups.append((_FIX_ITEM, result, key, value))
+            result[key] = value
+        return result
+    
+    def _reconstruct_set_items(self, items: Any, result: set) -> Iterator[Any]:
+        """Reconstruct IR values into the set `result`."""
+        for item in items:
+            if type(item) not in _FINAL_TYPES:
+                item = yield item
+                if type(item) is _ReconstructionPlaceholder:
+                    self._fixups.append((_FIX_MEMBER, result, item, item))
+            result.add(item)
+        return result
+    
+    def _build_immutable(
+        self,
+        type_name: str,
+        values: List[Any],
+        placeholder: Optional[_ReconstructionPlaceholder],
+    ) -> Any:
+        """
+        Build a tuple or frozenset from reconstructed values.
+        
+        If any value is still a placeholder, the result can't be built yet -
+        it is deferred and a placeholder is returned in its place.
+        """
+        for value in values:
+            if type(value) is _ReconstructionPlaceholder:
+                if placeholder is None:
+                    placeholder = _ReconstructionPlaceholder(None, type_name)
+                placeholder.items = values
+                self._placeholders_out = True
+                return placeholder
+        
+        result = tuple(values) if type_name == "tuple" else frozenset(values)
+        if placeholder is not None:
+            placeholder.real_object = result
+            placeholder.resolved = True
+        return result
+    
     def _has_cucumber_metadata(self, data: Any) -> bool:
         """
         Check if data has cucumber metadata markers.
@@ -513,17 +861,22 @@ class Deserializer:
     
     def _reconstruct_from_handler(self, data: Dict[str, Any]) -> Any:
         """
-        Reconstruct an object using its handler.
+        Reconstruct an object from a node with cucumber metadata.
         
-        Two-pass approach for circular references:
-        1. Register placeholder if object has obj_id (might have circular refs)
-        2. Reconstruct state (may reference the placeholder)
-        3. Call handler.reconstruct(state) to get real object
-        4. Replace placeholder with real object in registry
-        5. Post-process to replace any placeholder references in the reconstructed state
+        Leaf nodes (pickle-native values, functions, simple instances,
+        buffers) are reconstructed right away. Wrapped collections and
+        handler objects need their contents reconstructed first, so a
+        generator is returned for _reconstruct() to run.
         """
         type_name = data["__cucumber_type__"]
         
+        # deserialize_lazy() may already have reconstructed this object
+        #   through a reference from another subtree
+        if self._lazy_lookup is not None:
+            existing = self._object_registry.get(data.get("__object_id__"), _MISSING)
+            if existing is not _MISSING and type(existing) is not _ReconstructionPlaceholder:
+                return existing
+        
         # check if this is a wrapped pickle-native object (just needs unwrapping)
         if type_name == "pickle_native":
             return self._reconstruct_pickle_native(data)
@@ -536,11 +889,41 @@ class Deserializer:
         if type_name == "simple_class_instance":
             return self._reconstruct_simple_instance(data)
         
+        # check if this is a list or tuple of simple instances sent as columns
+        if type_name == "instance_columns":
+            return self._reconstruct_instance_columns(data)
+        
+        # check if this is a buffer sent out of band
+        if type_name == "buffer":
+            return self._reconstruct_buffer(data)
+        
         # check if this is a wrapped collection (no handler, just items)
         if "__handler__" not in data and "items" in data:
             return self._reconstruct_wrapped_collection(data)
         
+        # check if this is a definition sent by a Session
+        if type_name == "session_ref":
+            return self._reconstruct_session_ref(data)
+        if type_name == "session_def":
+            return self._reconstruct_session_def(data)
+        
         # otherwise, it's a handler object
+        return self._reconstruct_handler_object(data)
+    
+    def _reconstruct_handler_object(self, data: Dict[str, Any]) -> Iterator[Any]:
+        """
+        Reconstruct an object using its handler.
+        
+        Circular references:
+        1. Register placeholder if object has obj_id (might have circular refs)
+        2. Reconstruct state (refs back to this object get the placeholder,
+           and the slots they land in are recorded as fix-up sites)
+        3. Call handler.reconstruct(state) to get real object
+        4. Replace placeholder with real object in registry
+        5. Record any placeholders the handler put on the object, so
+           deserialize_ir() can patch them along with the other sites
+        """
+        type_name = data["__cucumber_type__"]
         handler_name = data.get("__handler__")
         obj_id = data.get("__object_id__")
         state = data.get("state")
@@ -564,43 +947,58 @@ class Deserializer:
                 indent = "  " * min(self._reconstruction_depth - 1, 5)
                 self._log(f"{indent}[{self._reconstruction_depth}] Reconstructing {type_name} with {handler_name}")
             
-            # get placeholder if it exists (from pass 1)
-            # if no obj_id, we won't have/need a placeholder
+            # register a placeholder while the state is reconstructed, so
+            # circular refs back to this object have something to point to
             placeholder = None
             if obj_id is not None:
-                placeholder = self._object_registry.get(obj_id)
-                if placeholder and isinstance(placeholder, _ReconstructionPlaceholder):
-                    self._log(f"Using placeholder for object {obj_id} ({type_name})")
-                elif placeholder:
+                existing = self._object_registry.get(obj_id, _MISSING)
+                if existing is not _MISSING and type(existing) is not _ReconstructionPlaceholder:
                     # Already fully reconstructed - return it
                     self._log(f"Object {obj_id} already reconstructed, returning cached")
-                    return placeholder
+                    return existing
+                if existing is _MISSING:
+                    placeholder = _ReconstructionPlaceholder(obj_id, type_name)
+                    self._object_registry[obj_id] = placeholder
+                    self._all_registered_ids.add(obj_id)
+                else:
+                    placeholder = existing
             
-            # recursively reconstruct all values in state
+            # reconstruct all values in state first
             # this ensures the handler receives fully-reconstructed state
             # if state has circular refs back to this object, they'll resolve to the placeholder
-            reconstructed_state = self._reconstruct_state_dict(state)
+            reconstructed_state = yield from self._reconstruct_state(state)
             
             # call handler.reconstruct(state)
+            profiles = self._profiles
+            if profiles:
+                start = time.perf_counter()
             try:
                 obj = handler.reconstruct(reconstructed_state)
             except Exception as e:
                 raise DeserializationError(
                     self._format_error(e, data, handler)
                 ) from e
+            if profiles:
+                elapsed = time.perf_counter() - start
+                for profile in profiles:
+                    profile.record_reconstruct(handler_name or handler.__class__.__name__, type(obj), elapsed)
             
             # replace placeholder with real object in registry
-            if obj_id is not None:
+            # (slots that already got the placeholder are patched at the end)
+            if placeholder is not None:
                 self._object_registry[obj_id] = obj
-                if placeholder is not None and isinstance(placeholder, _ReconstructionPlaceholder):
-                    placeholder.real_object = obj  # Update placeholder for any existing references
-                self._log(f"Replaced placeholder with real object {obj_id} ({type_name})")
+                placeholder.real_object = obj
+                placeholder.resolved = True
+                if self.debug:
+                    self._log(f"Replaced placeholder with real object {obj_id} ({type_name})")
             
-            # post-process to replace placeholders in the reconstructed object
-            # if the state contained circular refs, the handler received placeholders
-            # we need to replace those with the real object
-            if placeholder is not None:
-                self._replace_placeholders_in_object(obj, placeholder, obj)
+            # the handler may have put placeholders from its state on the object
+            if self._placeholders_out:
+                self._record_object_fixups(obj)
+            
+            # a Session sends definitions once - keep it for later messages
+            if self._session_objects is not None and "__session_id__" in data:
+                self._session_objects[data["__session_id__"]] = obj
             
             # return reconstructed object
             return obj
@@ -610,6 +1008,69 @@ class Deserializer:
             if self._reconstruction_path:
                 self._reconstruction_path.pop()
     
+    def _reconstruct_session_ref(self, data: Dict[str, Any]) -> Any:
+        """Return a definition that an earlier message of the Session sent."""
+        session_id = data["__session_id__"]
+        if self._session_objects is None:
+            raise DeserializationError(
+                "Data was serialized by a cucumber.Session and refers to definitions "
+                "sent in earlier messages - deserialize it with the peer Session"
+            )
+        try:
+            obj = self._session_objects[session_id]
+        except KeyError:
+            raise DeserializationError(
+                f"Session definition {session_id} was never received - session messages "
+                f"must be deserialized in the order they were serialized"
+            ) from None
+        
+        # later __cucumber_ref__s in this message may point at it too
+        obj_id = data.get("__object_id__")
+        if obj_id is not None:
+            self._object_registry[obj_id] = obj
+            self._all_registered_ids.add(obj_id)
+        return obj
+    
+    def _reconstruct_session_def(self, data: Dict[str, Any]) -> Iterator[Any]:
+        """Reconstruct a definition a Session sends once, and keep it for later messages."""
+        value = yield data["value"]
+        if self._session_objects is not None:
+            self._session_objects[data["__session_id__"]] = value
+        return value
+    
+    def _reconstruct_buffer(self, data: Dict[str, Any]) -> Any:
+        """
+        Reconstruct a bytes / bytearray / memoryview from an out-of-band buffer.
+        
+        The buffer is whatever object was handed to deserialize_oob() (or a
+        PickleBuffer / bytes if the header was loaded in-band). It is used
+        directly whenever it already has the right type, so received buffers
+        are not copied again.
+        """
+        kind = data.get("kind")
+        buf = data["data"]
+        view = buf.raw() if isinstance(buf, pickle.PickleBuffer) else memoryview(buf)
+        owner = view.obj
+        
+        if kind == "memoryview":
+            return view
+        
+        if kind == "bytes":
+            if type(buf) is bytes:
+                return buf
+            if type(owner) is bytes and view.nbytes == len(owner):
+                return owner
+            return view.tobytes()
+        
+        if kind == "bytearray":
+            # only reuse a bytearray that was handed to us for this message,
+            # never the sender's own (still shared) bytearray
+            if type(buf) is bytearray:
+                return buf
+            return bytearray(view)
+        
+        raise DeserializationError(f"Unknown buffer kind '{kind}'")
+    
     def _reconstruct_pickle_native(self, data: Dict[str, Any]) -> Any:
         """
         Reconstruct a wrapped pickle-native object.
@@ -669,33 +1130,11 @@ class Deserializer:
             "attrs": {...}
         }
         """
-        import importlib
-        
         obj_id = data.get("__object_id__")
-        module_name = data["module"]
         qualname = data["qualname"]
         attrs = data["attrs"]
         
-        # import the class
-        try:
-            module = importlib.import_module(module_name)
-        except ImportError as e:
-            raise DeserializationError(
-                f"Cannot import module '{module_name}' for simple instance. "
-                f"Ensure the module exists in the target process."
-            ) from e
-        
-        # navigate to class using qualname (handles nested classes like Outer.Inner)
-        parts = qualname.split('.')
-        cls = module
-        for part in parts:
-            try:
-                cls = getattr(cls, part)
-            except AttributeError as e:
-                raise DeserializationError(
-                    f"Cannot find class '{qualname}' in module '{module_name}'. "
-                    f"Ensure the class definition exists in the target process."
-                ) from e
+        cls = self._import_simple_class(data["module"], qualname)
         
         # create instance using __new__ (skip __init__)
         obj = cls.__new__(cls)
@@ -711,7 +1150,72 @@ class Deserializer:
         self._log(f"Reconstructed simple instance: {qualname}")
         return obj
     
-    def _reconstruct_wrapped_collection(self, data: Dict[str, Any]) -> Any:
+    def _reconstruct_instance_columns(self, data: Dict[str, Any]) -> Any:
+        """
+        Reconstruct a list or tuple of simple instances sent as columns.
+        
+        Format: {
+            "__cucumber_type__": "instance_columns",
+            "__object_id__": <id>,
+            "container": "list" or "tuple",
+            "module": "...",
+            "qualname": "...",
+            "names": [attr names],
+            "columns": [one column of values per attr],
+            "refs": [(row, <id>), ...]
+        }
+        
+        Every value is a primitive, so rows are built straight from the
+        columns. Only the rows listed in refs are registered, since those
+        are the only ones the rest of the IR refers to.
+        """
+        obj_id = data.get("__object_id__")
+        qualname = data["qualname"]
+        names = data["names"]
+        
+        cls = self._import_simple_class(data["module"], qualname)
+        try:
+            columns = [unpack_column(column) for column in data["columns"]]
+        except ValueError as e:
+            raise DeserializationError(f"Invalid column for '{qualname}' list: {e}") from e
+        
+        new = cls.__new__
+        objects = []
+        append = objects.append
+        for row in zip(*columns):
+            obj = new(cls)
+            obj.__dict__.update(zip(names, row))
+            append(obj)
+        
+        for row, row_id in data["refs"]:
+            self._object_registry[row_id] = objects[row]
+            self._all_registered_ids.add(row_id)
+        
+        result = objects if data["container"] == "list" else tuple(objects)
+        if obj_id is not None:
+            self._object_registry[obj_id] = result
+            self._all_registered_ids.add(obj_id)
+        
+        self._log(f"Reconstructed {len(objects)} {qualname} instances from columns")
+        return result
+    
+    def _import_simple_class(self, module_name: str, qualname: str) -> type:
+        """Import the class of a simple instance by module and qualname (cached per process)."""
+        # qualname can name a nested class like Outer.Inner
+        try:
+            return resolve(module_name, qualname)
+        except ImportError as e:
+            raise DeserializationError(
+                f"Cannot import module '{module_name}' for simple instance. "
+                f"Ensure the module exists in the target process."
+            ) from e
+        except AttributeError as e:
+            raise DeserializationError(
+                f"Cannot find class '{qualname}' in module '{module_name}'. "
+                f"Ensure the class definition exists in the target process."
+            ) from e
+    
+    def _reconstruct_wrapped_collection(self, data: Dict[str, Any]) -> Iterator[Any]:
         """
         Reconstruct a cucumber-wrapped collection.
         
@@ -722,88 +1226,47 @@ class Deserializer:
         - set: {"__cucumber_type__": "set", "items": [items], "__object_id__"?}
         - frozenset: {"__cucumber_type__": "frozenset", "items": [items], "__object_id__"?}
         
-        For circular references, we use two-pass approach:
-        1. Create empty placeholder and register it
-        2. Fill in contents (which may reference the placeholder)
+        Mutable collections are registered empty before their contents are
+        reconstructed, so contents can reference them directly. Tuples and
+        frozensets register a placeholder until they are built.
         """
         type_name = data["__cucumber_type__"]
         items = data["items"]
         obj_id = data.get("__object_id__")
         
         if type_name == "dict":
-            # create empty dict placeholder if circular-capable
+            # register the (still empty) dict first so contents can reference it
+            result = {}
             if obj_id is not None:
-                # register empty placeholder first
-                placeholder = {}
-                self._object_registry[obj_id] = placeholder
-                
-                # now reconstruct contents (may reference placeholder)
-                for k, v in items:
-                    reconstructed_key = self._reconstruct_recursive(k)
-                    reconstructed_value = self._reconstruct_recursive(v)
-                    placeholder[reconstructed_key] = reconstructed_value
-                
-                return placeholder
-            else:
-                # no circular refs, simple reconstruction
-                return {
-                    self._reconstruct_recursive(k): self._reconstruct_recursive(v)
-                    for k, v in items
-                }
+                self._object_registry[obj_id] = result
+            return (yield from self._reconstruct_dict_items(items, result))
         
         elif type_name == "list":
-            # lists need special handling - can't pre-create with contents
+            # register the (still empty) list first so contents can reference it
+            result = []
             if obj_id is not None:
-                # register empty placeholder first
-                placeholder = []
-                self._object_registry[obj_id] = placeholder
-                
-                # now reconstruct and append items (may reference placeholder)
-                for item in items:
-                    reconstructed_item = self._reconstruct_recursive(item)
-                    placeholder.append(reconstructed_item)
-                
-                return placeholder
-            else:
-                # no circular refs, simple reconstruction
-                return [self._reconstruct_recursive(item) for item in items]
+                self._object_registry[obj_id] = result
+            return (yield from self._reconstruct_items(items, result))
         
-        elif type_name == "tuple":
-            # tuples are immutable - can't do two-pass
-            # if there's a circular ref to a tuple, we have a problem!
-            # but tuples with circular refs are rare (can't add to themselves after creation)
-            reconstructed_items = [self._reconstruct_recursive(item) for item in items]
-            result = tuple(reconstructed_items)
-            
-            # register after reconstruction
+        elif type_name == "set":
+            # sets are mutable, register before filling
+            result = set()
             if obj_id is not None:
                 self._object_registry[obj_id] = result
-            
-            return result
+            return (yield from self._reconstruct_set_items(items, result))
         
-        elif type_name == "set":
-            # sets are mutable, use two-pass
+        elif type_name in ("tuple", "frozenset"):
+            # tuples and frozensets are immutable - references to one while its
+            # contents are reconstructed get a placeholder, patched afterwards
+            placeholder = None
             if obj_id is not None:
-                # register empty placeholder first
-                placeholder = set()
+                placeholder = _ReconstructionPlaceholder(obj_id, type_name)
                 self._object_registry[obj_id] = placeholder
-                
-                # now reconstruct and add items (may reference placeholder)
-                for item in items:
-                    reconstructed_item = self._reconstruct_recursive(item)
-                    placeholder.add(reconstructed_item)
-                
-                return placeholder
-            else:
-                # no circular refs, simple reconstruction
-                return {self._reconstruct_recursive(item) for item in items}
-        
-        elif type_name == "frozenset":
-            # frozensets are immutable - same as tuple
-            reconstructed_items = [self._reconstruct_recursive(item) for item in items]
-            result = frozenset(reconstructed_items)
             
-            # register after reconstruction
+            values = yield from self._reconstruct_items(items, [])
+            result = self._build_immutable(type_name, values, placeholder)
+            
+            # register after reconstruction (a deferred result stays a placeholder)
             if obj_id is not None:
                 self._object_registry[obj_id] = result
             
@@ -814,147 +1277,124 @@ class Deserializer:
                 f"Unknown wrapped collection type: {type_name}"
             )
     
+    @property
+    def handlers(self) -> List[Handler]:
+        """Handlers in lookup order."""
+        return self._registry.handlers
+    
     def _find_handler(self, type_name: str, handler_name: str) -> Optional[Handler]:
         """
         Find a handler by type_name and handler class name.
         
         Returns None if no matching handler found.
         """
-        # first, try to find by type_name (fast path)
-        for handler in self.handlers:
-            if handler.type_name == type_name:
-                # Double-check the handler class name matches
-                if handler.__class__.__name__ == handler_name:
-                    return handler
+        # first, try to find by type_name and class name (indexed)
+        handler = self._registry.by_name(type_name, handler_name)
+        if handler is not None:
+            return handler
         
         # if not found, try matching just by handler class name
         # (in case type_name changed between versions)
-        for handler in self.handlers:
-            if handler.__class__.__name__ == handler_name:
-                self._log(f"Warning: Handler found by name '{handler_name}' but type_name doesn't match")
-                return handler
-        
-        # no handler found
-        return None
+        handler = self._registry.by_class_name(handler_name)
+        if handler is not None:
+            self._log(f"Warning: Handler found by name '{handler_name}' but type_name doesn't match")
+        return handler
     
-    def _reconstruct_state_dict(self, state: Any) -> Dict[str, Any]:
+    def _reconstruct_state(self, state: Any) -> Iterator[Any]:
         """
-        Recursively reconstruct all values in a state dict.
+        Reconstruct a handler's state.
         
         This ensures handlers receive fully-reconstructed state,
         not intermediate representation fragments.
         
-        The state itself might be a wrapped collection, so we need to
-        reconstruct it first.
+        The serializer always wraps the state (it is serialized like any
+        other object), so reconstructing it once gives the final state.
+        Plain dicts are still accepted for IR built by hand.
         """
-        # first, check if state itself is a wrapped collection
+        # state is wrapped - reconstructing it reconstructs everything inside
         if isinstance(state, dict) and "__cucumber_type__" in state:
-            # State is wrapped - reconstruct it first
-            state = self._reconstruct_recursive(state)
+            # flat state (every key and value already final) is built right
+            # here, without a round trip through the reconstruction loop
+            if state["__cucumber_type__"] == "dict" and self._is_final_items(state["items"]):
+                result = dict(state["items"])
+                obj_id = state.get("__object_id__")
+                if obj_id is not None:
+                    self._object_registry[obj_id] = result
+                return result
+            return (yield state)
         
-        # now state should be a plain dict - reconstruct its values
         if not isinstance(state, dict):
             # State is not a dict (shouldn't happen, but handle gracefully)
             return state
         
-        # recursively reconstruct each value in the state dict
-        reconstructed = {}
-        for key, value in state.items():
-            # keys are typically strings, but reconstruct them just in case
-            reconstructed_key = self._reconstruct_recursive(key) if not isinstance(key, str) else key
-            reconstructed_value = self._reconstruct_recursive(value)
-            reconstructed[reconstructed_key] = reconstructed_value
-        
-        return reconstructed
+        # plain dict: reconstruct each key and value
+        return (yield from self._reconstruct_dict_items(state.items(), {}))
     
-    def _replace_placeholders_in_object(self, obj: Any, placeholder: _ReconstructionPlaceholder, real_obj: Any) -> None:
+    def _is_final_items(self, pairs: Any) -> bool:
+        """Check if every key and value in dict IR items is already final."""
+        for key, value in pairs:
+            if type(key) not in _FINAL_TYPES or type(value) not in _FINAL_TYPES:
+                return False
+        return True
+    
+    def _record_object_fixups(self, obj: Any) -> None:
         """
-        Replace all references to placeholder with real_obj within obj.
+        Record fix-up sites for placeholders a handler stored on its object.
         
-        This is needed when an object's state contains circular references back to itself.
-        The handler receives state with placeholders, and we need to replace them with
-        the real reconstructed object.
+        Handlers usually copy state values onto the new object (attributes,
+        slots), so a placeholder in the state may now sit there too. Only the
+        object's own attributes are checked - containers from the state were
+        already recorded when they were filled.
+        """
+        attrs = getattr(obj, "__dict__", None)
+        if type(attrs) is dict:
+            for key, value in attrs.items():
+                if type(value) is _ReconstructionPlaceholder:
+                    self._fixups.append((_FIX_ATTR, obj, key, value))
+        
+        raw_slots = getattr(type(obj), "__slots__", ())
+        slots = (raw_slots,) if isinstance(raw_slots, str) else raw_slots
+        for slot in slots:
+            if not isinstance(slot, str):
+                continue
+            try:
+                value = getattr(obj, slot)
+            except Exception:
+                continue
+            if type(value) is _ReconstructionPlaceholder:
+                self._fixups.append((_FIX_ATTR, obj, slot, value))
+    
+    def _apply_fixups(self) -> None:
+        """
+        Patch every recorded fix-up site with the real object.
         
-        Args:
-            obj: Object to scan and update
-            placeholder: Placeholder to search for
-            real_obj: Real object to replace placeholder with
+        Slots are patched before dict keys and set members, so an entry
+        whose key and value were both placeholders ends up fully patched.
         """
-        visited: set[int] = set()
-
-        def _replace(value: Any) -> Any:
-            if value is placeholder:
-                return real_obj
-
-            if isinstance(value, (str, bytes, bytearray, int, float, bool, type(None))):
-                return value
-
-            # Never mutate interpreter/runtime metadata objects.
-            if isinstance(value, (
-                type,
-                types.ModuleType,
-                types.FunctionType,
-                types.BuiltinFunctionType,
-                types.MethodType,
-                types.BuiltinMethodType,
-                types.CodeType,
-                property,
-                staticmethod,
-                classmethod,
-            )):
-                return value
-
-            value_id = id(value)
-            if value_id in visited:
-                return value
-            visited.add(value_id)
-
-            if isinstance(value, list):
-                for i, item in enumerate(value):
-                    value[i] = _replace(item)
-                return value
-
-            if isinstance(value, tuple):
-                return tuple(_replace(item) for item in value)
-
-            if isinstance(value, dict):
-                old_items = list(value.items())
-                value.clear()
-                for k, v in old_items:
-                    value[_replace(k)] = _replace(v)
-                return value
-
-            if isinstance(value, set):
-                replaced = {_replace(item) for item in value}
-                value.clear()
-                value.update(replaced)
-                return value
-
-            if isinstance(value, frozenset):
-                return frozenset(_replace(item) for item in value)
-
-            if hasattr(value, '__dict__'):
-                for key, item in list(value.__dict__.items()):
-                    try:
-                        setattr(value, key, _replace(item))
-                    except Exception:
-                        continue
-
-            if hasattr(type(value), '__slots__'):
-                raw_slots = type(value).__slots__
-                slots = (raw_slots,) if isinstance(raw_slots, str) else raw_slots
-                for slot in slots:
-                    if not isinstance(slot, str):
-                        continue
-                    try:
-                        setattr(value, slot, _replace(getattr(value, slot)))
-                    except AttributeError:
-                        pass
-                    except Exception:
-                        continue
-            return value
-
-        _replace(obj)
+        rehash = []
+        for site in self._fixups:
+            kind, container, key, placeholder = site
+            real = placeholder.resolve()
+            if real is placeholder:
+                # never finished (e.g. a tuple that contains itself) - leave it
+                continue
+            if kind == _FIX_ITEM:
+                container[key] = real
+            elif kind == _FIX_ATTR:
+                try:
+                    setattr(container, key, real)
+                except Exception:
+                    continue
+            else:
+                rehash.append(site)
+        
+        for kind, container, placeholder, _ in rehash:
+            real = placeholder.resolve()
+            if kind == _FIX_KEY:
+                container[real] = container.pop(placeholder)
+            else:
+                container.discard(placeholder)
+                container.add(real)
     
     def _log(self, message: str) -> None:
         """Log a message if debug mode is enabled."""
@@ -0,0 +1,481 @@
+"""
+Size estimation for cucumber payloads.
+
+estimate_size() walks an object the way the Serializer does - the same
+per-type plans, the same primitive fast paths, the same handler
+extract_state() calls - but instead of building the IR and pickling it,
+it adds up what each node would cost in the default (pickle) format.
+
+Estimating must leave the object as it was. Handlers whose extract_state()
+uses up or changes the object (Handler.extract_consumes - generators,
+iterators, queues) are not called: those objects are counted as an empty
+node and as `unsized`, and their contents are not seen. Custom
+__serialize__ methods are called, as serialize() calls them.
+
+The costs below follow pickle protocol 5 opcodes: a short string is one
+opcode, a length byte and its UTF-8 bytes, an object written a second
+time is a memo lookup, and so on. Estimates are usually within 10% of
+len(serialize(obj)) - small payloads can be off by a few dozen bytes.
+
+Profiles (cucumber.profile(sizes=True)) don't walk the object again:
+estimate_ir() adds up the IR serialize() just built, counting each node
+against the type of the object it came from.
+
+Sampling: containers with more than `sample` items whose items all share
+one type only have `sample` evenly spaced items walked, and their cost is
+scaled up to the full length. Sharing between the skipped items is not
+seen, so the estimate is an upper bound for those.
+"""
+
+from __future__ import annotations
+
+import io
+import pickle
+from typing import Any, Dict, List, Optional, Tuple
+
+from .columnar import MIN_ROWS
+from .profiling import type_label
+from .serializer import (
+    Serializer,
+    SerializationError,
+    _PLAN_NATIVE,
+    _PLAN_WRAPPED_NATIVE,
+    _PLAN_DICT,
+    _PLAN_LIST,
+    _PLAN_COLLECTION,
+    _PLAN_INSTANCE,
+    _PLAN_FUNCTION,
+    _share_class_fields,
+)
+
+# pickle opcode costs (protocol 5)
+_SHELL = 3  # EMPTY_DICT / EMPTY_LIST + MEMOIZE + MARK ... SETITEMS / APPENDS
+_TUPLE = 2  # TUPLE1-3 + MEMOIZE
+_OBJECT_ID = 8  # id() values are ~47 bit ints - LONG1, length byte, 6 bytes
+_FLOAT = 9  # BINFLOAT
+_BATCH = 1000  # pickle batches APPENDS / SETITEMS every 1000 items
+
+# exact types counted without going through the stack
+_LEAF_TYPES = frozenset((type(None), bool, int, float, str, bytes))
+
+# node keys are written once, then looked up early in the memo (BINGET)
+_KEY = 2
+_NODE_KEYS = 3  # "__cucumber_type__", "__object_id__", and "items" / "value" / "state"
+_FIRST_KEYS = 45  # the first node writes those three keys out in full
+
+# IR node keys holding an object's own items, attrs or state - primitives in
+#   there are counted against their own type, everything else in a node
+#   against the node's type
+_PAYLOAD_KEYS = frozenset(("items", "value", "attrs", "state"))
+
+
+def _int_cost(value: int) -> int:
+    """BININT1, BININT2, BININT or LONG1."""
+    if 0 <= value < 256:
+        return 2
+    if 0 <= value < 65536:
+        return 3
+    if -(1 << 31) <= value < (1 << 31):
+        return 5
+    return 2 + (value.bit_length() + 8) // 8
+
+
+class SizeEstimator:
+    """
+    Estimates the serialized size of an object without building its IR.
+
+    Uses a Serializer for type plans and handlers, so its plan cache is
+    shared with (and warmed by) real serialize() calls.
+    """
+
+    def __init__(
+        self,
+        serializer: Serializer,
+        sample: Optional[int] = None,
+        by_type: bool = False,
+        limit: Optional[int] = None,
+    ):
+        self._serializer = serializer
+        self._sample = sample
+        self._by_type = by_type
+        self._limit = limit  # stop walking once the total passes this
+
+        self._total = 0.0
+        self._types: Dict[str, float] = {}
+        self._seen: set = set()  # ids of tracked objects already counted
+        self._memo: Dict[int, int] = {}  # id of each string / bytes -> its pickle memo index
+        self._memo_count = 0  # memo entries so far (strings, containers, tuples)
+        self._keys_written = False  # the first node writes the node keys in full
+        self._native_costs: Dict[type, int] = {}  # pickled size of pickle-native leaves, by type
+        self._keep: List[Any] = []  # handler states, kept alive so their ids aren't reused
+        self._class_fields: Dict[Tuple[type, str], Any] = {}  # as Serializer._class_fields
+        self.unsized = 0  # objects counted without their contents (extract_consumes handlers)
+
+    def estimate(self, obj: Any) -> Tuple[int, Dict[str, int]]:
+        """
+        Walk an object and add up its cost.
+
+        Returns:
+            (total, by_type): estimated bytes, and the bytes each type
+            contributed (empty unless by_type was set). With a limit, the
+            walk stops as soon as the total passes it, so a total over the
+            limit is only a lower bound.
+        """
+        ser = self._serializer
+        ser._refresh_plans()
+
+        # header: PROTO, FRAME and STOP
+        self._total = 12
+        stack: List[Tuple[Any, float]] = [(obj, 1.0)]
+        pop = stack.pop
+        push = stack.append
+        item = obj
+        limit = self._limit
+        try:
+            while stack:
+                item, weight = pop()
+                self._visit(item, weight, push)
+                if limit is not None and self._total > limit:
+                    break
+        except Exception as e:
+            raise SerializationError(
+                f"Size estimation failed on {type(item).__name__}: {e}"
+            ) from e
+        finally:
+            self._keep.clear()
+            self._class_fields.clear()
+
+        types = {name: int(round(cost)) for name, cost in self._types.items()}
+        return int(round(self._total)), types
+
+    def estimate_ir(self, ir: Any, objects: Dict[int, Any]) -> Tuple[int, Dict[str, int]]:
+        """
+        Add up the cost of an IR that has already been built.
+
+        Nothing is extracted again. Nodes are counted against the type of
+        the object they came from, found by __object_id__ in `objects` (the
+        Serializer's seen_objects), and primitives among an object's items,
+        attrs or state against their own type - the same breakdown as
+        estimate(), from what serialize() really wrote.
+
+        Returns:
+            (total, by_type), as estimate()
+        """
+        self._total = 12
+        # (value, type label of the node it's in, label for its leaves or None for their own)
+        stack: List[Tuple[Any, Optional[str], Optional[str]]] = [(ir, None, None)]
+        pop = stack.pop
+        push = stack.append
+        seen = self._seen
+        while stack:
+            value, owner, leaf_label = pop()
+            value_type = type(value)
+
+            if value_type in _LEAF_TYPES:
+                self._add_to(leaf_label or type_label(value_type), self._leaf_cost(value))
+                continue
+
+            if value_type is not dict and value_type is not list and value_type is not tuple:
+                # pickle-native values and buffers
+                try:
+                    cost = memoryview(value).nbytes + 12
+                except TypeError:
+                    cost = self._native_cost(value)
+                self._add_to(leaf_label or type_label(value_type), cost)
+                continue
+
+            label = owner or type_label(value_type)
+            if id(value) in seen:
+                # the same IR container twice (shared class fields) - a memo lookup
+                self._add_to(label, 2)
+                continue
+            seen.add(id(value))
+
+            if value_type is dict:
+                if "__cucumber_type__" in value or "__cucumber_ref__" in value:
+                    obj = objects.get(value.get("__object_id__", value.get("__cucumber_ref__")))
+                    if obj is not None:
+                        label = type_label(type(obj))
+                    cost = _SHELL
+                    for key, item in value.items():
+                        cost += self._leaf_cost(key)
+                        push((item, label, None if key in _PAYLOAD_KEYS else label))
+                else:
+                    cost = _SHELL
+                    for key, item in value.items():
+                        push((key, label, leaf_label))
+                        push((item, label, leaf_label))
+                self._memo_count += 1
+                self._add_to(label, cost)
+            else:
+                cost = _TUPLE if value_type is tuple and len(value) <= 3 else self._items_cost(len(value))
+                if value_type is tuple:
+                    self._memo_count += 1
+                self._add_to(label, cost)
+                for item in value:
+                    push((item, label, leaf_label))
+
+        self._seen.clear()
+        types = {name: int(round(cost)) for name, cost in self._types.items()}
+        return int(round(self._total)), types
+
+    def _add(self, obj: Any, cost: float, weight: float) -> None:
+        cost *= weight
+        self._total += cost
+        if self._by_type:
+            name = type_label(type(obj))
+            self._types[name] = self._types.get(name, 0.0) + cost
+
+    def _add_to(self, label: str, cost: float) -> None:
+        self._total += cost
+        if self._by_type:
+            self._types[label] = self._types.get(label, 0.0) + cost
+
+    def _memoized(self, obj: Any, size: int) -> int:
+        """Cost of a string or bytes object: full the first time, a memo lookup after."""
+        obj_id = id(obj)
+        index = self._memo.get(obj_id)
+        if index is not None:
+            # BINGET for the first 256 memo entries, LONG_BINGET after
+            return 2 if index < 256 else 5
+        self._memo[obj_id] = self._memo_count
+        self._memo_count += 1
+        # opcode, 1 or 4 length bytes, the data, MEMOIZE
+        return size + (3 if size < 256 else 6)
+
+    def _leaf_cost(self, obj: Any) -> int:
+        """Cost of None, bool, int, float, str or bytes."""
+        obj_type = type(obj)
+        if obj_type is str:
+            size = len(obj) if obj.isascii() else len(obj.encode("utf-8", "surrogatepass"))
+            return self._memoized(obj, size)
+        if obj_type is int:
+            return _int_cost(obj)
+        if obj_type is float:
+            return _FLOAT
+        if obj_type is bytes:
+            return self._memoized(obj, len(obj))
+        if obj is None or obj_type is bool:
+            return 1
+        # int / str / float subclasses are pickled as objects
+        return self._native_cost(obj)
+
+    def _native_cost(self, obj: Any) -> int:
+        """
+        Pickled size of a pickle-native leaf (datetime, Decimal, ...), measured once per type.
+
+        Measured as the second of two equal objects pickled together, so
+        class names that pickle only writes once aren't counted every time.
+        """
+        obj_type = type(obj)
+        cost = self._native_costs.get(obj_type)
+        if cost is None:
+            try:
+                data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+                cost = len(data)
+                buffer = io.BytesIO()
+                pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+                pickler.dump(obj)
+                first = buffer.tell()
+                pickler.dump(pickle.loads(data))  # the memo carries over between dumps
+                cost = buffer.tell() - first
+            except Exception:
+                cost = cost or 28
+            # minus PROTO, FRAME and STOP
+            cost = max(cost - 12, 1)
+            self._native_costs[obj_type] = cost
+        return cost
+
+    def _node_cost(self, extra_keys: int, tag: Any) -> int:
+        """Dict shell with the standard node keys, extra keys, and an object id."""
+        self._memo_count += 1
+        if not self._keys_written:
+            self._keys_written = True
+            self._total += _FIRST_KEYS
+        return _SHELL + (_NODE_KEYS + extra_keys) * _KEY + self._leaf_cost(tag) + _OBJECT_ID
+
+    def _items_cost(self, count: int) -> int:
+        """List shell for `count` items, with a MARK / APPENDS per batch."""
+        self._memo_count += 1
+        return _SHELL + 2 * (count // _BATCH)
+
+    def _visit(self, obj: Any, weight: float, push: Any) -> None:
+        # primitives, as in Serializer._visit
+        if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+            self._add(obj, self._leaf_cost(obj), weight)
+            return
+
+        ser = self._serializer
+        plan = ser._plan_cache.get(type(obj))
+        if plan is None:
+            plan = ser._compile_plan(obj)
+
+        if not plan.track:
+            if plan.kind == _PLAN_NATIVE:
+                if type(obj) is pickle.PickleBuffer:
+                    nbytes = obj.raw().nbytes
+                else:
+                    nbytes = len(obj) if type(obj) is bytearray else 0
+                self._add(obj, nbytes + (12 if nbytes else self._native_cost(obj)), weight)
+            return
+
+        # shared and circular references
+        obj_id = id(obj)
+        if obj_id in self._seen:
+            self._memo_count += 1
+            self._add(obj, _SHELL + _KEY + _OBJECT_ID, weight)
+            return
+        self._seen.add(obj_id)
+
+        kind = plan.kind
+
+        if kind == _PLAN_DICT:
+            self._memo_count += len(obj)  # one tuple per item
+            self._add(obj, self._node_cost(0, "dict") + self._items_cost(len(obj)) + _TUPLE * len(obj), weight)
+            self._push_items(obj, (value for pair in obj.items() for value in pair), len(obj), weight, push, 2)
+            return
+
+        if kind == _PLAN_LIST or kind == _PLAN_COLLECTION:
+            if len(obj) >= MIN_ROWS and (kind == _PLAN_LIST or plan.type_name == "tuple"):
+                if self._columnar(obj, weight):
+                    return
+            self._add(obj, self._node_cost(0, plan.type_name or "list") + self._items_cost(len(obj)), weight)
+            self._push_items(obj, obj, len(obj), weight, push, 1)
+            return
+
+        if kind == _PLAN_WRAPPED_NATIVE:
+            self._add(obj, self._node_cost(0, "pickle_native") + self._native_cost(obj), weight)
+            return
+
+        if kind == _PLAN_INSTANCE and ser._has_primitive_attrs(obj):
+            attrs = obj.__dict__
+            cost = self._node_cost(2, "simple_class_instance")
+            cost += self._leaf_cost(plan.module) + self._leaf_cost(plan.qualname)
+            self._memo_count += 1
+            cost += _SHELL + sum(self._leaf_cost(k) + self._leaf_cost(v) for k, v in attrs.items())
+            self._add(obj, cost, weight)
+            return
+
+        if kind == _PLAN_FUNCTION and ser._is_pickle_native_function(obj):
+            # pickled by reference - module and qualified name
+            cost = self._node_cost(0, "pickle_native_func")
+            cost += len(obj.__module__) + len(obj.__qualname__) + 8
+            self._add(obj, cost, weight)
+            return
+
+        handler = plan.handler
+        if handler is None:
+            # pickle fallback - the object is pickled as it is (probed once
+            #   per type, like the Serializer does, and measured once per type)
+            if plan.picklable is None:
+                ser._probe_pickle(obj, plan)
+            value_cost = self._native_cost(obj) if plan.picklable else 0
+            self._add(obj, self._node_cost(0, "pickle_native") + value_cost, weight)
+            return
+
+        if handler.extract_consumes:
+            # extracting would drain it - count the node and an empty state
+            self.unsized += 1
+            cost = self._node_cost(1, plan.type_name) + self._leaf_cost(plan.handler_name) + _SHELL
+            self._add(obj, cost, weight)
+            return
+
+        state = handler.extract_state(obj)
+        if type(state) is dict and plan.handler_name == "ClassInstanceHandler":
+            _share_class_fields(type(obj), state, self._class_fields)
+        self._keep.append(state)
+        cost = self._node_cost(1, plan.type_name) + self._leaf_cost(plan.handler_name)
+        self._add(obj, cost, weight)
+        push((state, weight))
+
+    def _push_items(self, obj: Any, values: Any, count: int, weight: float, push: Any, stride: int) -> None:
+        """
+        Queue a container's children - all of them, or a sample of them.
+
+        `stride` is how many values make up one item (2 for dict key / value pairs).
+        """
+        sample = self._sample
+        if sample is None or count <= sample or not self._homogeneous(obj):
+            pending = list(values)
+        else:
+            # evenly spaced items stand in for the whole container
+            items = list(obj.items()) if stride == 2 else list(obj)
+            step = count / sample
+            picked = [items[int(i * step)] for i in range(sample)]
+            pending = [v for pair in picked for v in pair] if stride == 2 else picked
+            weight = weight * count / sample
+        # leaves are counted right away, the rest go on the stack -
+        # reversed, so they are visited in order
+        leaf_cost = self._leaf_cost
+        by_type = self._by_type
+        leaves = 0
+        for value in reversed(pending):
+            if type(value) in _LEAF_TYPES:
+                if by_type:
+                    self._add(value, leaf_cost(value), weight)
+                else:
+                    leaves += leaf_cost(value)
+            else:
+                push((value, weight))
+        self._total += leaves * weight
+
+    def _homogeneous(self, obj: Any) -> bool:
+        """All items (dict values) share one type."""
+        values = obj.values() if isinstance(obj, dict) else obj
+        return len(set(map(type, values))) == 1
+
+    def _columnar(self, obj: Any, weight: float) -> bool:
+        """
+        Cost of a list of same-layout simple instances written as columns.
+
+        Uses the Serializer's own checks (Serializer._columnar_layout()).
+        Returns False (nothing counted) if the list wouldn't be columnar.
+        """
+        layout = self._serializer._columnar_layout(obj, self._seen)
+        if layout is None:
+            return False
+        plan, names, row_ids, columns = layout
+
+        rows = len(obj)
+        cost = self._node_cost(5, "instance_columns") + _KEY
+        cost += self._leaf_cost(plan.module) + self._leaf_cost(plan.qualname)
+        cost += self._items_cost(len(names)) + sum(self._leaf_cost(name) for name in names)
+        cost += self._items_cost(len(names)) + _SHELL  # columns, refs
+        for column in columns:
+            value_types = set(map(type, column))
+            value_type = value_types.pop() if len(value_types) == 1 else None
+            if value_type is int and -(1 << 63) <= min(column) and max(column) < (1 << 63):
+                low, high = min(column), max(column)
+                width = 1 if -128 <= low and high < 128 else 2 if -32768 <= low and high < 32768 else 4 if -(1 << 31) <= low and high < (1 << 31) else 8
+                cost += rows * width + 12
+            elif value_type is float:
+                cost += rows * 8 + 12
+            elif value_type is bool:
+                cost += rows + 12
+            else:
+                # a plain list - equal strings are written once
+                cost += self._items_cost(rows)
+                distinct: Dict[Any, int] = {}  # string -> memo index
+                for value in column:
+                    if type(value) is str and value in distinct:
+                        cost += 2 if distinct[value] < 256 else 5
+                        continue
+                    if type(value) is str:
+                        distinct[value] = self._memo_count
+                    cost += self._leaf_cost(value)
+
+        self._seen.update(row_ids)
+        self._add(obj, cost, weight)
+        return True
+
+
+def estimate_size(
+    serializer: Serializer,
+    obj: Any,
+    sample: Optional[int] = None,
+    by_type: bool = False,
+) -> Tuple[int, Dict[str, int]]:
+    """Estimate the serialized size of obj with a fresh SizeEstimator."""
+    if sample is not None and sample < 1:
+        raise ValueError(f"sample must be at least 1, got {sample}")
+    return SizeEstimator(serializer, sample=sample, by_type=by_type).estimate(obj)
@@ -80,6 +80,12 @@ from .memory_handler import (
     MemoryViewHandler,
 )
 
+# Numeric array handlers (array.array, numpy.ndarray when numpy is imported)
+from .array_handler import (
+    ArrayHandler,
+    NumpyArrayHandler,
+)
+
 # Threading handlers (8% + 7% + 2%)
 from .threading_handler import (
     ThreadHandler,
@@ -225,6 +231,10 @@ __all__ = [
     'FileDescriptorHandler',
     'MemoryViewHandler',
     
+    # Numeric arrays
+    'ArrayHandler',
+    'NumpyArrayHandler',
+    
     # Threading
     'ThreadHandler',
     'ThreadPoolExecutorHandler',
@@ -362,6 +372,10 @@ ALL_HANDLERS = [
     WeakValueDictionaryHandler(),
     WeakKeyDictionaryHandler(),
     
+    # Numeric arrays (raw buffers, out of band with serialize_oob())
+    ArrayHandler(),
+    NumpyArrayHandler(),
+    
     # Iterators
     IteratorHandler(),
     RangeHandler(),
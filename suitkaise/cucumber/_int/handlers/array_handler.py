@@ -0,0 +1,185 @@
+"""
+Handlers for numeric arrays: array.array and numpy.ndarray.
+
+Both are serialized as a small description (typecode or dtype, shape,
+memory order) plus the raw buffer. The buffer is handed to the serializer
+as a pickle.PickleBuffer over the array's own memory, so:
+
+- serialize_oob() (used by Pipe and Pool) sends large arrays out of band
+  straight from that memory, with no copy on the sending side
+- serialize() writes the bytes once, instead of pickle being asked whether
+  it can handle the array and then pickling it again
+- in-band data comes back as a bytearray, which the ndarray is built
+  over directly
+
+Small arrays (under INLINE_LIMIT bytes) are copied to bytes instead, which
+keeps their state a dict of primitives - cheaper than a buffer for a few
+hundred bytes.
+
+numpy is never imported by cucumber. An ndarray can only exist if numpy
+was already imported, so the handler looks it up in sys.modules and does
+nothing when it isn't there.
+"""
+
+import array
+import pickle
+import sys
+from typing import Any, Dict
+
+from .base_class import Handler
+
+# arrays smaller than this are copied into bytes - a buffer costs more than
+# the copy, and bytes can still go out of band if they're big enough
+INLINE_LIMIT = 16 * 1024
+
+
+class ArraySerializationError(Exception):
+    """Raised when array serialization or reconstruction fails."""
+    pass
+
+
+def _numpy() -> Any:
+    """The numpy module if it has been imported, else None."""
+    return sys.modules.get("numpy")
+
+
+class ArrayHandler(Handler):
+    """
+    Serializes array.array objects.
+    
+    Strategy:
+    - Extract the typecode, the machine's byte order and the buffer
+    - On reconstruction, fill a new array from the buffer (one copy - an
+      array.array always owns its memory), byte-swapping if the receiving
+      machine has the other byte order
+    """
+    
+    type_name = "array"
+    
+    def can_handle(self, obj: Any) -> bool:
+        """Check if object is exactly an array.array (subclasses keep their own state)."""
+        return type(obj) is array.array
+    
+    def extract_state(self, obj: array.array) -> Dict[str, Any]:
+        """
+        Extract array state.
+        
+        What we capture:
+        - typecode: Array item type ('d', 'i', 'B', ...)
+        - byteorder: Byte order of the items ("little" or "big")
+        - data: PickleBuffer over the array's memory (bytes for small arrays)
+        """
+        nbytes = len(obj) * obj.itemsize
+        return {
+            "typecode": obj.typecode,
+            "byteorder": sys.byteorder,
+            "data": pickle.PickleBuffer(obj) if nbytes >= INLINE_LIMIT else obj.tobytes(),
+        }
+    
+    def reconstruct(self, state: Dict[str, Any]) -> array.array:
+        """Recreate the array from its buffer."""
+        result = array.array(state["typecode"])
+        result.frombytes(state["data"])
+        if state["byteorder"] != sys.byteorder and result.itemsize > 1:
+            result.byteswap()
+        return result
+
+
+class NumpyArrayHandler(Handler):
+    """
+    Serializes numpy.ndarray objects.
+    
+    Strategy:
+    - Extract the dtype (as the .npy format describes it - byte order and
+      structured fields included), shape, memory order and the array's bytes
+    - Arrays that are C or Fortran contiguous are not copied. Other views
+      (slices with steps, transposes of non-contiguous arrays) are copied
+      into C order once, since their strides only make sense inside the
+      array they were taken from
+    - On reconstruction, the array is built directly over the received
+      buffer when that's a bytearray that came with the message (in-band
+      data, out-of-band buffers from Pool), and copied once otherwise - so
+      the result is always a writable array that shares memory with nothing
+    - Object arrays hold Python objects rather than raw values, so their
+      items are serialized one by one instead
+    
+    Only exact ndarrays are handled. Subclasses (np.matrix, masked arrays,
+    memmaps) carry extra state and go through the normal fallbacks.
+    """
+    
+    type_name = "numpy_ndarray"
+    
+    def __init__(self):
+        # dtype -> description and back (dtype_to_descr() is slow next to a small array)
+        self._descrs: Dict[Any, Any] = {}
+        self._dtypes: Dict[Any, Any] = {}
+    
+    def can_handle(self, obj: Any) -> bool:
+        """Check if object is an ndarray, without importing numpy."""
+        numpy = _numpy()
+        return numpy is not None and type(obj) is numpy.ndarray
+    
+    def extract_state(self, obj: Any) -> Dict[str, Any]:
+        """
+        Extract ndarray state.
+        
+        What we capture:
+        - dtype: dtype description from numpy.lib.format.dtype_to_descr()
+        - shape: Array shape, as comma-separated dims ("" for 0-d arrays) so
+          the state stays a dict of primitives
+        - order: "C" or "F" - memory order of the data
+        - data: PickleBuffer over the array's bytes (bytes for small arrays)
+        - items: Flat list of items instead of data, for object arrays
+        """
+        dtype = obj.dtype
+        descr = self._descrs.get(dtype)
+        if descr is None:
+            from numpy.lib.format import dtype_to_descr
+            descr = self._descrs[dtype] = dtype_to_descr(dtype)
+        
+        flags = obj.flags
+        order = "F" if flags.f_contiguous and not flags.c_contiguous else "C"
+        state = {"dtype": descr, "shape": ",".join(map(str, obj.shape)), "order": order}
+        
+        if dtype.hasobject:
+            state["items"] = obj.ravel(order=order).tolist()
+        elif obj.nbytes < INLINE_LIMIT:
+            state["data"] = obj.tobytes(order=order)
+        else:
+            # a view when the array is already contiguous in this order
+            flat = obj.ravel(order=order)
+            state["data"] = pickle.PickleBuffer(flat.view(_numpy().uint8))
+        return state
+    
+    def reconstruct(self, state: Dict[str, Any]) -> Any:
+        """Rebuild the array over the received buffer."""
+        try:
+            import numpy
+        except ImportError as e:
+            raise ArraySerializationError(
+                "Cannot reconstruct a numpy array: numpy is not installed in this process"
+            ) from e
+        
+        descr = state["dtype"]
+        dtype = self._dtypes.get(descr) if type(descr) is str else None
+        if dtype is None:
+            from numpy.lib.format import descr_to_dtype
+            dtype = descr_to_dtype(descr)
+            if type(descr) is str:
+                self._dtypes[descr] = dtype
+        
+        if "items" in state:
+            items = state["items"]
+            flat = numpy.empty(len(items), dtype=dtype)
+            for index, item in enumerate(items):
+                flat[index] = item
+        else:
+            data = memoryview(state["data"])
+            flat = numpy.frombuffer(data, dtype=dtype)
+            # read-only bytes, or the sender's own array when deserialize_oob()
+            # runs in the same process
+            if type(data.obj) is not bytearray:
+                flat = flat.copy()
+        shape = state["shape"]
+        shape = tuple(map(int, shape.split(","))) if shape else ()
+        return flat.reshape(shape, order=state["order"])
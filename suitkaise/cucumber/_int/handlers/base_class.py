@@ -29,6 +29,11 @@ class Handler(ABC):
     # subclasses must define this
     type_name: str  # "lock", "logger", "class_instance"
     
+    # extract_state() uses up or changes the object (drains a generator or
+    # a queue), so it may only run when the object is really serialized -
+    # size estimates count these objects without extracting their state
+    extract_consumes = False
+    
     @abstractmethod
     def can_handle(self, obj: Any) -> bool:
         """
@@ -18,8 +18,22 @@ Cheers
 import types
 import importlib
 import inspect
+import weakref
 from typing import Any, Dict, List, Tuple
 from .base_class import Handler
+from ..resolve import resolve
+
+
+# classes rebuilt from serialized definitions, keyed by the definition they were
+#   built from - every instance (and class object) sent with the same definition
+#   gets the same class back, instead of a new class each
+# (weak, so a class is dropped once nothing uses it anymore)
+_reconstructed_classes: "weakref.WeakValueDictionary[Tuple[Any, ...], type]" = weakref.WeakValueDictionary()
+
+
+def _unbound(value: Any) -> Any:
+    """A classmethod's function - the bound method would keep its class alive."""
+    return value.__func__ if isinstance(value, types.MethodType) else value
 
 
 class ClassInstanceHandler(Handler):
@@ -40,6 +54,17 @@ class ClassInstanceHandler(Handler):
     
     type_name = "class_instance"
     
+    # class attributes the extraction strategy depends on - a cached strategy
+    # is only reused while they are unchanged
+    _STRATEGY_ATTRS = ("__serialize__", "__deserialize__", "to_dict", "from_dict", "__slots__")
+    
+    def __init__(self):
+        # per-class caches - strategy and slot names only depend on the class,
+        # so they are worked out once instead of for every instance (weak, so
+        # dynamically created classes can still be collected)
+        self._strategy_cache = weakref.WeakKeyDictionary()  # class -> (signature, strategy)
+        self._slot_names_cache = weakref.WeakKeyDictionary()  # class -> slot names
+    
     def can_handle(self, obj: Any) -> bool:
         """
         Check if object is a class instance.
@@ -162,6 +187,25 @@ class ClassInstanceHandler(Handler):
         Returns: "custom_serialize", "custom_serialize_local", "to_dict", or "dict"
         """
         obj_class = obj.__class__
+        # classes can gain or lose these after their first instance was seen
+        signature = tuple(_unbound(getattr(obj_class, name, None)) for name in self._STRATEGY_ATTRS)
+        cached = self._strategy_cache.get(obj_class)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        strategy = self._determine_strategy_uncached(obj)
+        
+        # only cache when the strategy came from the class alone -
+        # instance-level __serialize__ / to_dict attrs can change it per object
+        instance_dict = getattr(obj, '__dict__', None)
+        if not (isinstance(instance_dict, dict) and 
+                ('__serialize__' in instance_dict or 'to_dict' in instance_dict)):
+            self._strategy_cache[obj_class] = (signature, strategy)
+        return strategy
+    
+    def _determine_strategy_uncached(self, obj: Any) -> str:
+        """Work out the extraction strategy for an object without the cache."""
+        obj_class = obj.__class__
         generic_alias_type = getattr(types, "GenericAlias", None)
         if generic_alias_type is not None and isinstance(obj, generic_alias_type):
             return "generic_alias"
@@ -222,25 +266,30 @@ class ClassInstanceHandler(Handler):
         slots_dict = {}
         obj_class = type(obj)
         
-        # collect all slots from class and parent classes
-        all_slots = set()
-        for cls in obj_class.__mro__:
-            if hasattr(cls, '__slots__'):
-                slots = cls.__slots__
-                # __slots__ can be a string, iterable, or dict
-                if isinstance(slots, str):
-                    all_slots.add(slots)
-                elif isinstance(slots, dict):
-                    all_slots.update(slots.keys())
-                else:
-                    all_slots.update(slots)
+        slot_names = self._slot_names_cache.get(obj_class)
+        if slot_names is None:
+            # collect all slots from class and parent classes
+            all_slots = set()
+            for cls in obj_class.__mro__:
+                if hasattr(cls, '__slots__'):
+                    slots = cls.__slots__
+                    # __slots__ can be a string, iterable, or dict
+                    if isinstance(slots, str):
+                        all_slots.add(slots)
+                    elif isinstance(slots, dict):
+                        all_slots.update(slots.keys())
+                    else:
+                        all_slots.update(slots)
+            
+            # skip __dict__ and __weakref__ special slots
+            slot_names = tuple(
+                name for name in all_slots
+                if name not in ('__dict__', '__weakref__')
+            )
+            self._slot_names_cache[obj_class] = slot_names
         
         # extract value for each slot
-        for slot_name in all_slots:
-            # skip __dict__ and __weakref__ special slots
-            if slot_name in ('__dict__', '__weakref__'):
-                continue
-            
+        for slot_name in slot_names:
             try:
                 value = getattr(obj, slot_name)
                 slots_dict[slot_name] = value
@@ -449,29 +498,22 @@ class ClassInstanceHandler(Handler):
         - Regular classes (e.g., "MyClass")
         - Nested classes (e.g., "Outer.Inner")
         - Classes in __main__
+        
+        Lookups are cached per process (see resolve.py).
         """
-        # import module
+        # qualname might be "Outer.Inner.DeepNested"
         try:
-            module = importlib.import_module(module_name)
+            obj = resolve(module_name, qualname)
         except ImportError:
             raise ImportError(
                 f"Cannot import module '{module_name}'. "
                 f"Ensure the module exists in the target process."
             )
-        
-        # navigate to class using qualname
-        # qualname might be "Outer.Inner.DeepNested", we need to handle this
-        parts = qualname.split('.')
-        obj: Any = module
-        
-        for part in parts:
-            try:
-                obj = getattr(obj, part)
-            except AttributeError:
-                raise AttributeError(
-                    f"Cannot find class '{qualname}' in module '{module_name}'. "
-                    f"Ensure the class definition exists in the target process."
-                )
+        except AttributeError:
+            raise AttributeError(
+                f"Cannot find class '{qualname}' in module '{module_name}'. "
+                f"Ensure the class definition exists in the target process."
+            )
         
         if not isinstance(obj, type):
             raise TypeError(f"'{qualname}' is not a class")
@@ -498,9 +540,7 @@ class ClassInstanceHandler(Handler):
         # get base classes
         bases = []
         for base_info in class_def["bases"]:
-            base_module = importlib.import_module(base_info["module"])
-            base_class = getattr(base_module, base_info["name"])
-            bases.append(base_class)
+            bases.append(resolve(base_info["module"], base_info["name"]))
         
         if not bases:
             bases = [object]
@@ -532,6 +572,19 @@ class ClassInstanceHandler(Handler):
 
             class_dict[key] = value
         
+        # same definition as a class built earlier (same bases, same attribute
+        #   objects) - reuse that class
+        key = (
+            class_def["name"],
+            class_def["module"],
+            class_def["qualname"],
+            tuple(bases),
+            tuple((name, id(value)) for name, value in class_dict.items()),
+        )
+        cls = _reconstructed_classes.get(key)
+        if cls is not None and all(cls.__dict__.get(name) is value for name, value in class_dict.items()):
+            return cls
+        
         # create class using type()
         cls = type(
             class_def["name"],
@@ -543,6 +596,7 @@ class ClassInstanceHandler(Handler):
         cls.__module__ = class_def["module"]
         cls.__qualname__ = class_def["qualname"]
         
+        _reconstructed_classes[key] = cls
         return cls
 
 
@@ -611,8 +665,7 @@ class ClassObjectHandler(Handler):
         """Reconstruct class object."""
         if state["type"] == "reference":
             # import and return class
-            module = importlib.import_module(state["module"])
-            return getattr(module, state["name"])
+            return resolve(state["module"], state["name"])
         else:
             # reconstruct dynamic class
             instance_handler = ClassInstanceHandler()
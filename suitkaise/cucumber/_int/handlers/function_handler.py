@@ -12,6 +12,7 @@ import marshal
 import pickle
 from typing import Any, Dict, Tuple
 from .base_class import Handler
+from ..resolve import resolve
 
 
 class FunctionSerializationError(Exception):
@@ -83,14 +84,9 @@ class FunctionHandler(Handler):
             return False
         
         # verify we can actually look it up and get the same function
+        # (qualname can name a class method like MyClass.method)
         try:
-            import importlib
-            module = importlib.import_module(module_name)
-            
-            # navigate qualname (handles class methods like MyClass.method)
-            obj = module
-            for part in qualname.split('.'):
-                obj = getattr(obj, part)
+            obj = resolve(module_name, qualname)
             
             # must be the exact same function object
             if obj is not func:
@@ -252,31 +248,25 @@ class FunctionHandler(Handler):
         """
         Reconstruct function by importing it from module.
         
-        Fast path - just look up the function by module + qualname.
+        Fast path - just look up the function by module + qualname
+        (cached per process, see resolve.py).
         """
-        import importlib
-        
         module_name = state["module"]
         qualname = state["qualname"]
         
+        # qualname can name a class method like MyClass.method
         try:
-            module = importlib.import_module(module_name)
+            obj = resolve(module_name, qualname)
         except ImportError as e:
             raise FunctionSerializationError(
                 f"Cannot import module '{module_name}' for function '{qualname}'. "
                 f"Ensure the module exists in the target process."
             ) from e
-        
-        # navigate qualname (handles class methods like MyClass.method)
-        obj = module
-        for part in qualname.split('.'):
-            try:
-                obj = getattr(obj, part)
-            except AttributeError as e:
-                raise FunctionSerializationError(
-                    f"Cannot find function '{qualname}' in module '{module_name}'. "
-                    f"Ensure the function definition exists in the target process."
-                ) from e
+        except AttributeError as e:
+            raise FunctionSerializationError(
+                f"Cannot find function '{qualname}' in module '{module_name}'. "
+                f"Ensure the function definition exists in the target process."
+            ) from e
         
         if not callable(obj):
             raise FunctionSerializationError(
@@ -26,9 +26,14 @@ class GeneratorHandler(Handler):
     
     Important: Generator execution state (local variables, instruction pointer)
     cannot be fully reconstructed. We can only preserve remaining values.
+    
+    Generators that are too large (or endless) to drain can be wrapped with
+    suitkaise.processing.Pipe.stream(), which serializes as a reader that
+    pulls values from the owning process in batches instead.
     """
     
     type_name = "generator"
+    extract_consumes = True
     
     def can_handle(self, obj: Any) -> bool:
         """Check if object is a generator."""
@@ -30,6 +30,7 @@ class IteratorHandler(Handler):
     """
     
     type_name = "iterator"
+    extract_consumes = True
     
     def can_handle(self, obj: Any) -> bool:
         """
@@ -151,6 +152,7 @@ class EnumerateHandler(Handler):
     """
     
     type_name = "enumerate"
+    extract_consumes = True
     
     def can_handle(self, obj: Any) -> bool:
         """Check if object is an enumerate."""
@@ -186,6 +188,7 @@ class ZipHandler(Handler):
     """
     
     type_name = "zip"
+    extract_consumes = True
     
     def can_handle(self, obj: Any) -> bool:
         """Check if object is a zip."""
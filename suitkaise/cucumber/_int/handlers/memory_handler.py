@@ -2,6 +2,11 @@
 Handler for memory-related objects.
 
 Includes memory-mapped files, shared memory, and raw file descriptors.
+
+Shared memory blocks and file-backed mmaps also have a by-reference form
+(extract_reference()), used when the serializer is told both ends are on
+the same host: only the block name, or the file path, offset and length,
+is sent, and the receiver attaches to the same memory.
  
 Limitations:
 - Raw file descriptors are reconstructed on a best-effort basis by reopening
@@ -11,11 +16,12 @@ Limitations:
 This is a Python limitation, so I did my best to work around it.
 """
 
+import ctypes
 import mmap
 import os
 import sys
 import multiprocessing
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from .base_class import Handler
 
 # try to import shared_memory (Python 3.8+)
@@ -32,6 +38,45 @@ class MemorySerializationError(Exception):
     pass
 
 
+def _mmap_mapping(obj: mmap.mmap) -> Optional[Tuple[str, int, bool]]:
+    """
+    Find the file behind a shared, file-backed mmap.
+    
+    Looks up the mapping's address in /proc/self/maps (Linux only).
+    
+    Returns:
+        (path, offset, writable), or None for anonymous, private
+        (ACCESS_COPY) and read-only maps, deleted files, and other platforms
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    
+    # the address of the mapping - only writable maps export a writable buffer
+    try:
+        view = ctypes.c_char.from_buffer(obj)
+    except (TypeError, ValueError):
+        return None
+    address = ctypes.addressof(view)
+    del view  # releases the buffer export, so the mmap can be closed again
+    
+    try:
+        with open('/proc/self/maps') as f:
+            for line in f:
+                # "start-end perms offset dev inode path"
+                fields = line.split(None, 5)
+                start, end = (int(x, 16) for x in fields[0].split('-'))
+                if not start <= address < end:
+                    continue
+                path = fields[5].rstrip('\n') if len(fields) == 6 else ""
+                if fields[1][3] != 's' or not path.startswith('/') or path.endswith(' (deleted)'):
+                    return None
+                offset = int(fields[2], 16) + (address - start)
+                return path, offset, fields[1][1] == 'w'
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
 class MemoryViewHandler(Handler):
     """
     Serializes memoryview objects.
@@ -161,10 +206,59 @@ class MMapHandler(Handler):
             "content": content,
         }
     
+    def extract_reference(self, obj: mmap.mmap) -> Optional[Dict[str, Any]]:
+        """
+        Extract a same-host reference to a file-backed mmap, without its content.
+        
+        What we capture:
+        - file_path, offset, length: The part of the file that is mapped
+        - writable: Whether the mapping can be written
+        - position: Current position in mapping
+        
+        Returns None (the content is copied instead) when the mmap is not a
+        shared mapping of a file that still exists - see _mmap_mapping().
+        """
+        if obj.closed:
+            return None
+        mapping = _mmap_mapping(obj)
+        if mapping is None:
+            return None
+        file_path, offset, writable = mapping
+        return {
+            "by_reference": True,
+            "file_path": file_path,
+            "offset": offset,
+            "length": len(obj),
+            "writable": writable,
+            "position": obj.tell(),
+        }
+    
+    def _attach(self, state: Dict[str, Any]) -> mmap.mmap:
+        """Map the same part of the same file as the sender."""
+        writable = state["writable"]
+        try:
+            with open(state["file_path"], 'r+b' if writable else 'rb') as f:
+                mm = mmap.mmap(
+                    f.fileno(),
+                    state["length"],
+                    access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ,
+                    offset=state["offset"],
+                )
+        except (OSError, ValueError) as e:
+            raise MemorySerializationError(
+                f"Cannot map '{state['file_path']}' (offset {state['offset']}, "
+                f"length {state['length']}): {e}"
+            ) from e
+        mm.seek(state["position"])
+        return mm
+    
     def reconstruct(self, state: Dict[str, Any]) -> mmap.mmap:
         """
         Reconstruct mmap.
         
+        By-reference states map the sender's file again, so both processes
+        share the same pages.
+        
         Strategy:
         1. If we have a file_path and the file exists, try to create a file-backed mmap
         2. Otherwise, create an anonymous mmap with the saved content
@@ -173,6 +267,9 @@ class MMapHandler(Handler):
         The content is always preserved, making this work for inter-process
         communication even when the backing file doesn't exist in target process.
         """
+        if state.get("by_reference"):
+            return self._attach(state)
+        
         # try file-backed mmap first (if we have a path and file exists)
         file_path = state.get("file_path")
         if file_path and os.path.exists(file_path):
@@ -203,7 +300,8 @@ class SharedMemoryHandler(Handler):
     Serializes multiprocessing.shared_memory.SharedMemory objects (3% importance).
     
     Shared memory allows multiple processes to access the same memory region.
-    We serialize the name and content.
+    We serialize the name and content, or only the name when both ends are
+    on the same host (extract_reference()).
     """
     
     type_name = "shared_memory"
@@ -237,11 +335,50 @@ class SharedMemoryHandler(Handler):
             "content": content,
         }
     
+    def extract_reference(self, obj: Any) -> Dict[str, Any]:
+        """
+        Extract a same-host reference to a shared memory block, without its content.
+        
+        What we capture:
+        - name: Shared memory block name
+        - size: Size in bytes
+        """
+        return {
+            "by_reference": True,
+            "name": obj.name,
+            "size": obj.size,
+        }
+    
+    def _attach(self, state: Dict[str, Any]) -> Any:
+        """
+        Attach to the sender's block by name.
+        
+        The block belongs to whoever created it: the attached object should
+        be closed, not unlinked. On Python 3.13+ it is attached with
+        track=False so this process's resource tracker never unlinks it.
+        Processes started by multiprocessing share their parent's tracker,
+        so on older versions attaching only registers the name again.
+        """
+        try:
+            try:
+                return shared_memory.SharedMemory(name=state["name"], create=False, track=False)
+            except TypeError:
+                # Python < 3.13 has no track argument
+                return shared_memory.SharedMemory(name=state["name"], create=False)
+        except FileNotFoundError as e:
+            raise MemorySerializationError(
+                f"Shared memory block '{state['name']}' no longer exists. "
+                f"When sending SharedMemory by reference, the sender must keep "
+                f"the block alive (not unlink it) until the receiver attaches."
+            ) from e
+    
     def reconstruct(self, state: Dict[str, Any]) -> 'shared_memory.SharedMemory':  # type: ignore
         """
         Reconstruct shared memory.
         
-        Try to attach to existing shared memory block by name.
+        By-reference states attach to the sender's block.
+        
+        Otherwise, try to attach to existing shared memory block by name.
         If it doesn't exist, create a new one.
         """
         if not HAS_SHARED_MEMORY:
@@ -249,6 +386,9 @@ class SharedMemoryHandler(Handler):
                 "Cannot reconstruct SharedMemory: not available in Python < 3.8"
             )
         
+        if state.get("by_reference"):
+            return self._attach(state)
+        
         content = state["content"]
         expected_size = len(content)
 
@@ -7,6 +7,8 @@ These are challenging because network connections don't transfer across processe
 from __future__ import annotations
 
 import socket
+import hmac
+import os
 import importlib
 from dataclasses import dataclass, field
 from typing import Any, Dict, Optional
@@ -27,6 +29,32 @@ class NetworkSerializationError(Exception):
     pass
 
 
+def _freeze(value: Any) -> Any:
+    """Turn connection details into something hashable, for cache keys."""
+    if isinstance(value, dict):
+        return tuple(sorted((repr(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(repr(v) for v in value))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+# keys auth digests, so the cache never holds a secret or a plain hash of one
+_AUTH_DIGEST_KEY = os.urandom(32)
+
+
+def _auth_digest(auth: Any) -> Any:
+    """Stand-in for auth in cache keys: equal auth gives an equal digest."""
+    if auth is None:
+        return None
+    return hmac.digest(_AUTH_DIGEST_KEY, repr(_freeze(auth)).encode(), "sha256")
+
+
 @dataclass
 class _DbReconnector(Reconnector):
     """
@@ -44,6 +72,19 @@ class _DbReconnector(Reconnector):
                 return self.details[key]
         return None
     
+    def _cache_key(self, auth: Any = None) -> Any:
+        """
+        Key for sharing one live connection between identical reconnectors.
+        
+        Reconnectors of the same type with the same details and auth
+        connect to the same place, so reconnect_all(cache_connections=True)
+        gives them one connection. Returns None for thread-affine types.
+        Auth is only kept as a digest.
+        """
+        if type(self)._thread_affine:
+            return None
+        return (type(self).__module__, type(self).__qualname__, _freeze(self.details), _auth_digest(auth))
+    
     def _import(self, name: str):
         """Import a module, raising NetworkSerializationError if missing."""
         try:
@@ -133,6 +174,7 @@ class MySQLReconnector(_DbReconnector):
 class SQLiteReconnector(_DbReconnector):
     """Reconnector for SQLite."""
     _lazy_reconnect_on_access = True
+    _thread_affine = True
     
     def __repr__(self) -> str:
         path = self.details.get("path", self.details.get("database", ":memory:"))
@@ -33,6 +33,7 @@ class QueueHandler(Handler):
     """
     
     type_name = "queue"
+    extract_consumes = True
     
     def can_handle(self, obj: Any) -> bool:
         """Check if object is a queue.Queue or queue.SimpleQueue."""
@@ -122,6 +123,7 @@ class MultiprocessingQueueHandler(Handler):
     """
     
     type_name = "mp_queue"
+    extract_consumes = True
     
     def can_handle(self, obj: Any) -> bool:
         """
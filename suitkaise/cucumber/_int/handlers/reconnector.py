@@ -32,10 +32,18 @@ class Reconnector:
     """
 
     _lazy_reconnect_on_access = False
+    
+    # the resource can only be used by the thread that created it (sqlite3),
+    # so reconnect_all() never reconnects it from a worker thread
+    _thread_affine = False
 
     def reconnect(self, *args, **kwargs) -> Any:
         raise NotImplementedError("reconnect() must be implemented by subclasses.")
 
+    def _cache_key(self, auth: Any = None) -> Any:
+        """Key for reconnect_all(cache_connections=True), or None to never share."""
+        return None
+
     def _lazy_reconnect_target(self) -> Any:
         try:
             target = object.__getattribute__(self, "_lazy_target")
@@ -2,13 +2,16 @@
 Handler for sqlite3 database connection objects.
 
 SQLite connections are database handles. We serialize the database path
-and optionally the schema and data, then reconnect in the target process.
+and, for in-memory databases, an image of the whole database, then
+reconnect in the target process.
 """
 from __future__ import annotations
 
+import os
 import sqlite3
+import tempfile
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict
 from .base_class import Handler
 from .reconnector import Reconnector
 
@@ -18,15 +21,64 @@ class SQLiteSerializationError(Exception):
     pass
 
 
+def _database_image(conn: sqlite3.Connection) -> bytes | None:
+    """
+    Copy a database's main schema into one bytes object.
+    
+    The image is the database file SQLite would write - tables, indexes,
+    triggers and views included. Uses Connection.serialize(), or the backup
+    API through a temporary file when SQLite was built without it.
+    
+    Returns None for a database with no pages yet (nothing was ever
+    created in it) - SQLite can't serialize those, and a fresh connection
+    is the same database.
+    """
+    if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+        return None
+    
+    serialize = getattr(conn, "serialize", None)
+    if serialize is not None:
+        return serialize()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "image.db")
+        target = sqlite3.connect(path)
+        try:
+            conn.backup(target)
+        finally:
+            target.close()
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def _restore_image(conn: sqlite3.Connection, image: Any) -> None:
+    """Load a database image from _database_image() into a connection."""
+    deserialize = getattr(conn, "deserialize", None)
+    if deserialize is not None:
+        deserialize(image)
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "image.db")
+        with open(path, "wb") as f:
+            f.write(image)
+        source = sqlite3.connect(path)
+        try:
+            source.backup(conn)
+        finally:
+            source.close()
+
+
 @dataclass
 class SQLiteConnectionReconnector(Reconnector):
     """
     Reconnector for sqlite3.Connection objects.
     
     Call reconnect() to create a new live connection. For in-memory databases,
-    this will also restore the schema and data that was captured during serialization.
+    this will also restore the database image that was captured during serialization.
     """
     _lazy_reconnect_on_access = True
+    _thread_affine = True
     state: Dict[str, Any]
     _conn: sqlite3.Connection | None = field(default=None, init=False, repr=False)
     
@@ -39,7 +91,7 @@ class SQLiteConnectionReconnector(Reconnector):
         Create a new SQLite connection.
         
         For file-based databases: connects to the database file.
-        For in-memory databases: creates new connection and restores schema/data.
+        For in-memory databases: creates new connection and restores the database image.
         """
         if self._conn is not None:
             return self._conn
@@ -52,12 +104,21 @@ class SQLiteConnectionReconnector(Reconnector):
         # set isolation level
         conn.isolation_level = state["isolation_level"]
         
-        # for in-memory databases, restore schema and data
-        if state["is_memory"] and (state["schema"] or state["data"]):
+        # for in-memory databases, restore the database in one call
+        image = state.get("image")
+        if state["is_memory"] and image is not None:
+            try:
+                _restore_image(conn, image)
+            except sqlite3.Error as e:
+                conn.close()
+                raise SQLiteSerializationError(f"Failed to restore SQLite database: {e}") from e
+        
+        # schema and rows, from states serialized by older versions
+        elif state["is_memory"] and (state.get("schema") or state.get("data")):
             cursor = conn.cursor()
             
             # execute CREATE statements
-            for create_stmt in state["schema"]:
+            for create_stmt in state.get("schema", []):
                 try:
                     cursor.execute(create_stmt)
                 except sqlite3.Error:
@@ -65,7 +126,7 @@ class SQLiteConnectionReconnector(Reconnector):
                     pass
             
             # insert data
-            for table_name, rows in state["data"]:
+            for table_name, rows in state.get("data", []):
                 if rows:
                     # validate table name
                     if not table_name.replace('_', '').isalnum():
@@ -100,6 +161,7 @@ class SQLiteCursorReconnector(Reconnector):
     your query after reconnecting.
     """
     _lazy_reconnect_on_access = True
+    _thread_affine = True
     state: Dict[str, Any]
     _conn: sqlite3.Connection | None = field(default=None, init=False, repr=False)
     _cursor: sqlite3.Cursor | None = field(default=None, init=False, repr=False)
@@ -147,7 +209,8 @@ class SQLiteConnectionHandler(Handler):
     
     Strategy:
     - For file-based databases: serialize path and reconnect
-    - For in-memory databases: serialize path, schema, and all data
+    - For in-memory databases: serialize path and an image of the database
+      (Connection.serialize()), restored with Connection.deserialize()
     - Capture isolation_level and other connection settings
     
     Important: For in-memory databases (':memory:'), we must serialize
@@ -171,11 +234,12 @@ class SQLiteConnectionHandler(Handler):
         - is_memory: Whether this is an in-memory database
         
         For in-memory databases, we also capture:
-        - schema: CREATE TABLE statements
-        - data: All table data
+        - image: The whole database as bytes (indexes, triggers, views and
+          uncommitted changes on this connection included), or None if
+          nothing was ever created in it
         
-        Note: Serializing data is expensive for large databases!
-        This is primarily for small in-memory databases used in testing.
+        The image is one bytes object, so serialize_oob() sends large
+        databases out of band without another copy.
         """
         # get database path
         # NOTE: In Python 3.7+, we can use connection.execute("PRAGMA database_list")
@@ -198,71 +262,28 @@ class SQLiteConnectionHandler(Handler):
         # get connection settings
         isolation_level = obj.isolation_level
         
-        # for in-memory databases, we need to dump schema and data
+        # for in-memory databases, we need a copy of the database itself
+        image = None
         if is_memory:
-            schema, data = self._dump_database(obj)
-        else:
-            schema = []
-            data = []
+            try:
+                image = _database_image(obj)
+            except sqlite3.Error as e:
+                raise SQLiteSerializationError(f"Failed to copy SQLite database: {e}") from e
         
         return {
             "database": database_path,
             "isolation_level": isolation_level,
             "is_memory": is_memory,
-            "schema": schema,
-            "data": data,
+            "image": image,
         }
     
-    def _dump_database(self, conn: sqlite3.Connection) -> Tuple[List[str], List[Tuple[str, List]]]:
-        """
-        Dump entire database schema and data.
-        
-        Returns:
-            schema: List of CREATE statements
-            data: List of (table_name, rows) tuples
-        """
-        cursor = conn.cursor()
-        
-        # get all table names (excluding sqlite internal tables)
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name NOT LIKE 'sqlite_%'
-        """)
-        tables = [row[0] for row in cursor.fetchall()]
-        
-        # get schema (CREATE statements)
-        schema = []
-        cursor.execute("""
-            SELECT sql FROM sqlite_master 
-            WHERE type='table' AND name NOT LIKE 'sqlite_%'
-        """)
-        for row in cursor.fetchall():
-            if row[0]:  # sql might be None for some tables
-                schema.append(row[0])
-        
-        # get all data
-        data = []
-        for table in tables:
-            # validate table name is a safe identifier
-            if not table.replace('_', '').isalnum():
-                raise SQLiteSerializationError(
-                    f"Invalid table name '{table}' - contains unsafe characters"
-                )
-            # use parameterized query would be ideal, but table names can't be parameterized
-            # since table names come from sqlite_master (trusted source), this is safe
-            cursor.execute(f"SELECT * FROM {table}")
-            rows = cursor.fetchall()
-            data.append((table, rows))
-        
-        return schema, data
-    
     def reconstruct(self, state: Dict[str, Any]) -> SQLiteConnectionReconnector:
         """
         Reconstruct SQLite connection.
         
         Returns a SQLiteConnectionReconnector. Call reconnect() to create
         a new live connection. For in-memory databases, reconnect() will
-        also restore the schema and data.
+        also restore the database image.
         """
         return SQLiteConnectionReconnector(state=state)
 
@@ -0,0 +1,377 @@
+"""
+Lazy views for cucumber.deserialize_lazy().
+
+deserialize() reconstructs the whole object graph up front. For large
+payloads where only a few fields are read, deserialize_lazy() decodes the
+IR and returns views instead:
+
+- LazyDict: read-only mapping over a serialized dict
+- LazyList: read-only sequence over a serialized list
+- LazyObject: read-only attribute access over a serialized class instance
+
+A view reconstructs a child the first time it is read. Nested dicts, lists
+and instances become views of their own, anything else (tuples, sets,
+handler objects like locks or functions, ...) is reconstructed with the
+normal Deserializer paths when it is first read.
+
+All views from one deserialize_lazy() call share a LazyContext, which owns
+the Deserializer. Objects reconstructed for one view are registered there,
+so shared and circular references resolve to the same object no matter
+which view reached them first.
+
+materialize() turns a view into the real object (dict, list or instance).
+Once a view has been materialized, it reads through to the real object.
+"""
+
+import reprlib
+import threading
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, List, Optional
+
+from .deserializer import Deserializer, DeserializationError, _FINAL_TYPES, _ReconstructionPlaceholder
+
+# marks values that haven't been reconstructed yet
+_UNSET = object()
+
+
+class LazyContext:
+    """
+    Shared state for the views of one deserialize_lazy() call.
+
+    Keeps the decoded IR, the views created so far (by object id), and the
+    Deserializer whose registry holds every object reconstructed so far.
+    """
+
+    def __init__(self, deserializer: Deserializer, ir: Any):
+        self.deserializer = deserializer
+        self.ir = ir
+
+        # object_id -> view, so shared and circular references get the same view
+        self.views: Dict[Any, Any] = {}
+
+        # object_id -> IR node, only built if a reference needs a node
+        #   that hasn't been reached yet
+        self.nodes: Optional[Dict[Any, Any]] = None
+
+        # views can be read from several threads, the Deserializer isn't thread-safe
+        self.lock = threading.RLock()
+
+        deserializer._lazy_lookup = self.lookup
+
+    def root(self) -> Any:
+        """View (or reconstructed object) for the root of the IR."""
+        return self.value(self.ir)
+
+    def value(self, ir: Any) -> Any:
+        """
+        Turn one IR value into a view, a final value, or a reconstructed object.
+        """
+        if type(ir) in _FINAL_TYPES:
+            return ir
+
+        with self.lock:
+            if type(ir) is dict:
+                if len(ir) == 1 and "__cucumber_ref__" in ir:
+                    return self.resolve(ir["__cucumber_ref__"])
+
+                view_type = _view_type(ir)
+                if view_type is not None:
+                    obj_id = ir.get("__object_id__")
+                    view = self.views.get(obj_id) if obj_id is not None else None
+                    if view is None:
+                        view = view_type(self, ir)
+                        if obj_id is not None:
+                            self.views[obj_id] = view
+                    return view
+
+            return self.materialize_node(ir)
+
+    def key(self, ir: Any) -> Any:
+        """Reconstruct a dict key - keys have to be real (hashable) objects."""
+        if type(ir) in _FINAL_TYPES:
+            return ir
+        return self.materialize_node(ir)
+
+    def resolve(self, obj_id: Any) -> Any:
+        """Resolve a __cucumber_ref__ to a view or an already reconstructed object."""
+        view = self.views.get(obj_id)
+        if view is not None:
+            return view
+
+        existing = self.deserializer._object_registry.get(obj_id, _UNSET)
+        if existing is not _UNSET and type(existing) is not _ReconstructionPlaceholder:
+            return existing
+
+        node = self.lookup(obj_id)
+        if node is None:
+            raise DeserializationError(
+                f"Reference to object {obj_id} not found in the serialized data"
+            )
+        if node.get("__object_id__") != obj_id:
+            # a row of a columnar list - rebuilding the list registers it
+            self.materialize_node(node)
+            return self.deserializer._object_registry[obj_id]
+        return self.value(node)
+
+    def lookup(self, obj_id: Any) -> Any:
+        """Find the IR node that defines an object, or None."""
+        if self.nodes is None:
+            self.nodes = _index_nodes(self.ir)
+        return self.nodes.get(obj_id)
+
+    def materialize_node(self, ir: Any) -> Any:
+        """Fully reconstruct an IR node with the shared Deserializer."""
+        with self.lock:
+            return self.deserializer.reconstruct_subtree(ir)
+
+
+class LazyDict(Mapping):
+    """
+    Read-only view of a serialized dict.
+
+    Keys are reconstructed the first time the dict is indexed, values the
+    first time each one is read.
+    """
+    __slots__ = ("_lazy_ctx", "_lazy_node", "_lazy_keys", "_lazy_values", "_lazy_real")
+
+    def __init__(self, ctx: LazyContext, node: Dict[str, Any]):
+        self._lazy_ctx = ctx
+        self._lazy_node = node
+        self._lazy_keys: Optional[Dict[Any, int]] = None  # key -> position in items
+        self._lazy_values: Optional[List[Any]] = None
+        self._lazy_real = _UNSET
+
+    def _lazy_index(self) -> Dict[Any, int]:
+        if self._lazy_keys is None:
+            key = self._lazy_ctx.key
+            items = self._lazy_node["items"]
+            keys = {key(item[0]): position for position, item in enumerate(items)}
+            self._lazy_values = [_UNSET] * len(items)
+            self._lazy_keys = keys
+        return self._lazy_keys
+
+    def __getitem__(self, key: Any) -> Any:
+        if self._lazy_real is not _UNSET:
+            return self._lazy_real[key]
+        position = self._lazy_index()[key]
+        value = self._lazy_values[position]
+        if value is _UNSET:
+            value = self._lazy_ctx.value(self._lazy_node["items"][position][1])
+            self._lazy_values[position] = value
+        return value
+
+    def __iter__(self):
+        if self._lazy_real is not _UNSET:
+            return iter(self._lazy_real)
+        return iter(self._lazy_index())
+
+    def __len__(self) -> int:
+        if self._lazy_real is not _UNSET:
+            return len(self._lazy_real)
+        return len(self._lazy_node["items"])
+
+    @reprlib.recursive_repr()
+    def __repr__(self) -> str:
+        return f"LazyDict({dict(self.items())!r})"
+
+    def _materialize_view(self) -> dict:
+        if self._lazy_real is _UNSET:
+            self._lazy_real = self._lazy_ctx.materialize_node(self._lazy_node)
+        return self._lazy_real
+
+
+class LazyList(Sequence):
+    """
+    Read-only view of a serialized list.
+
+    Each item is reconstructed the first time it is read.
+    """
+    __slots__ = ("_lazy_ctx", "_lazy_node", "_lazy_values", "_lazy_real")
+
+    def __init__(self, ctx: LazyContext, node: Dict[str, Any]):
+        self._lazy_ctx = ctx
+        self._lazy_node = node
+        self._lazy_values: Optional[List[Any]] = None
+        self._lazy_real = _UNSET
+
+    def _lazy_item(self, index: int) -> Any:
+        values = self._lazy_values
+        if values is None:
+            values = self._lazy_values = [_UNSET] * len(self._lazy_node["items"])
+        value = values[index]
+        if value is _UNSET:
+            value = self._lazy_ctx.value(self._lazy_node["items"][index])
+            values[index] = value
+        return value
+
+    def __getitem__(self, index: Any) -> Any:
+        if self._lazy_real is not _UNSET:
+            return self._lazy_real[index]
+        size = len(self._lazy_node["items"])
+        if isinstance(index, slice):
+            return [self._lazy_item(i) for i in range(*index.indices(size))]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("list index out of range")
+        return self._lazy_item(index)
+
+    def __len__(self) -> int:
+        if self._lazy_real is not _UNSET:
+            return len(self._lazy_real)
+        return len(self._lazy_node["items"])
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (list, LazyList)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    @reprlib.recursive_repr()
+    def __repr__(self) -> str:
+        return f"LazyList({list(self)!r})"
+
+    def _materialize_view(self) -> list:
+        if self._lazy_real is _UNSET:
+            self._lazy_real = self._lazy_ctx.materialize_node(self._lazy_node)
+        return self._lazy_real
+
+
+class LazyObject:
+    """
+    Read-only view of a serialized class instance.
+
+    Instance attributes are reconstructed the first time each one is read.
+    Anything else (methods, properties, class attributes) materializes the
+    real instance and is read from it.
+    """
+    __slots__ = ("_lazy_ctx", "_lazy_node", "_lazy_attrs", "_lazy_values", "_lazy_real")
+
+    def __init__(self, ctx: LazyContext, node: Dict[str, Any]):
+        object.__setattr__(self, "_lazy_ctx", ctx)
+        object.__setattr__(self, "_lazy_node", node)
+        object.__setattr__(self, "_lazy_attrs", None)  # attr name -> IR value
+        object.__setattr__(self, "_lazy_values", {})
+        object.__setattr__(self, "_lazy_real", _UNSET)
+
+    def __getattr__(self, name: str) -> Any:
+        real = self._lazy_real
+        if real is not _UNSET:
+            return getattr(real, name)
+
+        values = self._lazy_values
+        if name in values:
+            return values[name]
+
+        attrs = self._lazy_attrs
+        if attrs is None:
+            attrs = _instance_attrs(self._lazy_node)
+            object.__setattr__(self, "_lazy_attrs", attrs)
+        if name in attrs:
+            value = self._lazy_ctx.value(attrs[name])
+            values[name] = value
+            return value
+
+        return getattr(self._materialize_view(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(
+            "LazyObject views are read-only - use cucumber.materialize() to get the real object"
+        )
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(
+            "LazyObject views are read-only - use cucumber.materialize() to get the real object"
+        )
+
+    def __repr__(self) -> str:
+        return f"<LazyObject {_instance_qualname(self._lazy_node)}>"
+
+    def _materialize_view(self) -> Any:
+        if self._lazy_real is _UNSET:
+            object.__setattr__(self, "_lazy_real", self._lazy_ctx.materialize_node(self._lazy_node))
+        return self._lazy_real
+
+
+def materialize(value: Any) -> Any:
+    """
+    Get the real object behind a lazy view.
+
+    Reconstructs the whole subtree of the view (once - later calls return
+    the same object). Anything that isn't a view is returned as-is.
+    """
+    materialize_view = getattr(type(value), "_materialize_view", None)
+    if materialize_view is None:
+        return value
+    return materialize_view(value)
+
+
+def _view_type(node: Dict[str, Any]) -> Any:
+    """Pick the view class for an IR node, or None to reconstruct it right away."""
+    type_name = node.get("__cucumber_type__")
+    if type_name == "dict" and "items" in node and "__handler__" not in node:
+        return LazyDict
+    if type_name == "list" and "items" in node and "__handler__" not in node:
+        return LazyList
+    if type_name == "simple_class_instance":
+        return LazyObject
+    if type_name == "class_instance" and _instance_dict_node(node) is not None:
+        return LazyObject
+    return None
+
+
+def _state_items(node: Dict[str, Any]) -> Dict[Any, Any]:
+    """Top-level keys of a handler node's state (a wrapped dict in the IR)."""
+    state = node.get("state")
+    if type(state) is not dict or state.get("__cucumber_type__") != "dict":
+        return {}
+    return {key: value for key, value in state["items"] if type(key) is str}
+
+
+def _instance_dict_node(node: Dict[str, Any]) -> Any:
+    """The serialized __dict__ of a ClassInstanceHandler node, if it only has a __dict__."""
+    if node.get("__handler__") != "ClassInstanceHandler":
+        return None
+    state = _state_items(node)
+    instance_dict = state.get("instance_dict")
+    if state.get("strategy") != "dict" or type(instance_dict) is not dict:
+        return None
+    if instance_dict.get("__cucumber_type__") != "dict":
+        return None
+    return instance_dict
+
+
+def _instance_attrs(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Map attribute names to their IR values for a LazyObject node."""
+    if node["__cucumber_type__"] == "simple_class_instance":
+        return dict(node["attrs"])
+    return {key: value for key, value in _instance_dict_node(node)["items"]}
+
+
+def _instance_qualname(node: Dict[str, Any]) -> str:
+    if node["__cucumber_type__"] == "simple_class_instance":
+        return node["qualname"]
+    return _state_items(node).get("qualname", "object")
+
+
+def _index_nodes(ir: Any) -> Dict[Any, Any]:
+    """Map every object id in an IR to the node that defines it."""
+    nodes: Dict[Any, Any] = {}
+    stack = [ir]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type is dict:
+            if "__cucumber_type__" in value:
+                obj_id = value.get("__object_id__")
+                if obj_id is not None and obj_id not in nodes:
+                    nodes[obj_id] = value
+                if value["__cucumber_type__"] == "instance_columns":
+                    # referenced rows are defined by their list's node
+                    for _, row_id in value["refs"]:
+                        nodes.setdefault(row_id, value)
+            stack.extend(value.values())
+        elif value_type is list or value_type is tuple:
+            stack.extend(value)
+    return nodes
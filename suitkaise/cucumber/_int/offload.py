@@ -0,0 +1,61 @@
+"""
+Running cucumber calls off an asyncio event loop.
+
+serialize_async() and deserialize_async() decide per call whether the
+work is big enough to be worth handing to an executor: handing off costs
+a thread switch (or, for a process executor, pickling the arguments), so
+small objects are serialized inline on the loop.
+
+Deserializing is judged by the length of the data. Serializing is judged
+by a sampled size estimate (see estimate.py) that stops walking as soon
+as it passes the threshold, so it stays cheap for big objects too. The
+estimate doesn't drain generators, iterators or queues - objects holding
+one are offloaded, since their size can't be known up front.
+"""
+
+import asyncio
+import functools
+from typing import Any, Callable, Optional
+
+from .serializer import Serializer, SerializationError
+from .estimate import SizeEstimator
+
+# serialized size (estimated, for serialize) above which work is offloaded -
+#   roughly a few milliseconds of serializing or deserializing
+ASYNC_THRESHOLD = 64 * 1024
+
+# containers of one type only have this many items walked by the estimate
+_ESTIMATE_SAMPLE = 64
+
+
+def exceeds(serializer: Serializer, obj: Any, threshold: int) -> bool:
+    """Whether obj is estimated to serialize to more than threshold bytes."""
+    estimator = SizeEstimator(serializer, sample=_ESTIMATE_SAMPLE, limit=threshold)
+    try:
+        size, _ = estimator.estimate(obj)
+    except SerializationError:
+        # let the real serialize() report it, wherever it runs
+        return True
+    return size > threshold or estimator.unsized > 0
+
+
+def data_size(data: Any) -> int:
+    """Length in bytes of serialized data (bytes, bytearray or memoryview)."""
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    return memoryview(data).nbytes
+
+
+async def run(executor: Optional[Any], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run fn in an executor and wait for it.
+
+    Args:
+        executor: concurrent.futures executor, or None for the loop's
+            default thread pool (via asyncio.to_thread)
+        fn: Function to run (must be picklable for a process executor)
+    """
+    if executor is None:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
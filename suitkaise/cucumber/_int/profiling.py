@@ -0,0 +1,281 @@
+"""
+Profiling for cucumber serialize / deserialize.
+
+A Profile collects, per handler and per type:
+- how many times handler.extract_state() (or extract_reference()) and
+  handler.reconstruct() ran, and the time spent inside them
+- estimated bytes each type contributed to the output (see estimate.py)
+
+and how often the serializer fell back to probing an object with
+pickle.dumps() because no handler matched its type.
+
+Profiles are process-wide: while one is active, every Serializer and
+Deserializer in the process records into it, from any thread. Work done
+in other processes (Share's coordinator, Pool workers) is not seen.
+
+Handler times are self times. A handler only extracts its own object's
+state - nested objects in that state are serialized afterwards as their
+own nodes, with their own handler calls.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Tuple
+
+# active profiles, innermost last - read by the Serializer and Deserializer
+#   at the start of each call (an empty tuple means profiling is off)
+_active: Tuple["Profile", ...] = ()
+_active_lock = threading.Lock()
+
+# columns of the report, in order
+_REPORT_COLUMNS = (
+    ("extract_calls", "extract"),
+    ("extract_time", "extract ms"),
+    ("reconstruct_calls", "rebuild"),
+    ("reconstruct_time", "rebuild ms"),
+    ("fallback_calls", "fallback"),
+    ("bytes", "bytes"),
+)
+
+
+def active() -> Tuple["Profile", ...]:
+    """Profiles currently recording."""
+    return _active
+
+
+def type_label(obj_type: type) -> str:
+    """Name a type the way profiles and estimate_size(by_type=True) do."""
+    if obj_type.__module__ == "builtins":
+        return obj_type.__qualname__
+    return f"{obj_type.__module__}.{obj_type.__qualname__}"
+
+
+def _new_stats() -> Dict[str, Any]:
+    return {
+        "extract_calls": 0,
+        "extract_time": 0.0,
+        "reconstruct_calls": 0,
+        "reconstruct_time": 0.0,
+        "fallback_calls": 0,
+        "fallback_time": 0.0,
+        "bytes": 0,
+    }
+
+
+class Profile:
+    """
+    Counters and timings recorded while a profile is active.
+
+    Start and stop it with start() / stop(), or use cucumber.profile()
+    as a context manager.
+    """
+
+    def __init__(self, sizes: bool = True):
+        """
+        Args:
+            sizes: Also estimate the bytes each type contributes (added up
+                from each IR after it is built)
+        """
+        self.sizes = sizes
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, Dict[str, Any]] = {}
+        self._types: Dict[str, Dict[str, Any]] = {}
+        self._handler_types: Dict[str, set] = {}
+        self._totals = {
+            "serialize_calls": 0,
+            "serialize_time": 0.0,
+            "deserialize_calls": 0,
+            "deserialize_time": 0.0,
+            "fallback_calls": 0,
+            "fallback_time": 0.0,
+            "fallback_failures": 0,
+        }
+
+    def start(self) -> "Profile":
+        """Start recording (profiles can be nested - all active ones record)."""
+        global _active
+        with _active_lock:
+            if self not in _active:
+                _active = _active + (self,)
+        return self
+
+    def stop(self) -> None:
+        """Stop recording. The collected data stays available."""
+        global _active
+        with _active_lock:
+            _active = tuple(p for p in _active if p is not self)
+
+    def __enter__(self) -> "Profile":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    # -------------------------------------------------------------------------
+    # Recording (called by the Serializer and Deserializer)
+    # -------------------------------------------------------------------------
+
+    def _stats(self, obj_type: type, handler_name: str | None) -> Tuple[Dict[str, Any], Dict[str, Any] | None]:
+        """Per-type stats, and per-handler stats if there is a handler (lock held)."""
+        name = type_label(obj_type)
+        type_stats = self._types.get(name)
+        if type_stats is None:
+            type_stats = self._types[name] = _new_stats()
+        if handler_name is None:
+            return type_stats, None
+        handler_stats = self._handlers.get(handler_name)
+        if handler_stats is None:
+            handler_stats = self._handlers[handler_name] = _new_stats()
+            self._handler_types[handler_name] = set()
+        self._handler_types[handler_name].add(name)
+        return type_stats, handler_stats
+
+    def record_extract(self, handler_name: str, obj_type: type, seconds: float) -> None:
+        """A handler extracted the state of one object."""
+        with self._lock:
+            for stats in self._stats(obj_type, handler_name):
+                stats["extract_calls"] += 1
+                stats["extract_time"] += seconds
+
+    def record_reconstruct(self, handler_name: str, obj_type: type, seconds: float) -> None:
+        """A handler reconstructed one object."""
+        with self._lock:
+            for stats in self._stats(obj_type, handler_name):
+                stats["reconstruct_calls"] += 1
+                stats["reconstruct_time"] += seconds
+
+    def record_fallback(self, obj_type: type, seconds: float, failed: bool) -> None:
+        """The serializer probed an object with pickle.dumps() (no handler matched)."""
+        with self._lock:
+            stats, _ = self._stats(obj_type, None)
+            stats["fallback_calls"] += 1
+            stats["fallback_time"] += seconds
+            totals = self._totals
+            totals["fallback_calls"] += 1
+            totals["fallback_time"] += seconds
+            if failed:
+                totals["fallback_failures"] += 1
+
+    def record_bytes(self, by_type: Dict[str, int]) -> None:
+        """Add estimated bytes per type (from estimate_size(by_type=True))."""
+        with self._lock:
+            for name, size in by_type.items():
+                stats = self._types.get(name)
+                if stats is None:
+                    stats = self._types[name] = _new_stats()
+                stats["bytes"] += size
+            # handlers contribute the bytes of the types they handled
+            for handler_name, names in self._handler_types.items():
+                self._handlers[handler_name]["bytes"] = sum(
+                    self._types[name]["bytes"] for name in names
+                )
+
+    def record_call(self, kind: str, seconds: float) -> None:
+        """One serialize (IR build) or deserialize (reconstruction) finished."""
+        with self._lock:
+            self._totals[f"{kind}_calls"] += 1
+            self._totals[f"{kind}_time"] += seconds
+
+    # -------------------------------------------------------------------------
+    # Results
+    # -------------------------------------------------------------------------
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Everything recorded so far, as plain dicts.
+
+        Returns:
+            {
+                "serialize": {"calls", "time"},
+                "deserialize": {"calls", "time"},
+                "pickle_fallback": {"calls", "time", "failures"},
+                "handlers": {handler name: stats, with "types": [type names]},
+                "types": {type name: stats},
+            }
+            where stats are extract_calls, extract_time, reconstruct_calls,
+            reconstruct_time, fallback_calls, fallback_time and bytes.
+            Times are in seconds.
+        """
+        with self._lock:
+            totals = self._totals
+            handlers = {}
+            for name, stats in self._handlers.items():
+                handlers[name] = dict(stats, types=sorted(self._handler_types[name]))
+            return {
+                "serialize": {"calls": totals["serialize_calls"], "time": totals["serialize_time"]},
+                "deserialize": {"calls": totals["deserialize_calls"], "time": totals["deserialize_time"]},
+                "pickle_fallback": {
+                    "calls": totals["fallback_calls"],
+                    "time": totals["fallback_time"],
+                    "failures": totals["fallback_failures"],
+                },
+                "handlers": handlers,
+                "types": {name: dict(stats) for name, stats in self._types.items()},
+            }
+
+    def report(self, sort: str = "time", limit: int | None = None) -> str:
+        """
+        Text report of the handlers and types recorded, slowest first.
+
+        Args:
+            sort: "time" (extract + reconstruct + fallback time), "calls" or "bytes"
+            limit: Only show this many rows per table
+
+        Returns:
+            str: The report
+        """
+        if sort not in ("time", "calls", "bytes"):
+            raise ValueError(f"Unknown sort {sort!r}, expected 'time', 'calls' or 'bytes'")
+        data = self.as_dict()
+
+        def sort_key(item: Tuple[str, Dict[str, Any]]) -> Any:
+            stats = item[1]
+            if sort == "calls":
+                value = stats["extract_calls"] + stats["reconstruct_calls"] + stats["fallback_calls"]
+            elif sort == "bytes":
+                value = stats["bytes"]
+            else:
+                value = stats["extract_time"] + stats["reconstruct_time"] + stats["fallback_time"]
+            return (-value, item[0])
+
+        serialize, deserialize, fallback = data["serialize"], data["deserialize"], data["pickle_fallback"]
+        lines = [
+            f"cucumber profile (sorted by {sort})",
+            f"  serialize:   {serialize['calls']} calls, {serialize['time'] * 1000:.3f} ms",
+            f"  deserialize: {deserialize['calls']} calls, {deserialize['time'] * 1000:.3f} ms",
+            f"  pickle fallback probes: {fallback['calls']} ({fallback['failures']} failed), "
+            f"{fallback['time'] * 1000:.3f} ms",
+        ]
+        for title, table in (("handler", data["handlers"]), ("type", data["types"])):
+            rows = sorted(table.items(), key=sort_key)[:limit]
+            if not rows:
+                continue
+            cells = [[name] + [_format_cell(key, stats[key]) for key, _ in _REPORT_COLUMNS] for name, stats in rows]
+            header = [title] + [label for _, label in _REPORT_COLUMNS]
+            widths = [max(len(row[i]) for row in cells + [header]) for i in range(len(header))]
+            lines.append("")
+            lines.append(_format_row(header, widths))
+            lines.append(_format_row(["-" * width for width in widths], widths))
+            lines.extend(_format_row(row, widths) for row in cells)
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        totals = self._totals
+        return (
+            f"<Profile serialize={totals['serialize_calls']} "
+            f"deserialize={totals['deserialize_calls']} handlers={len(self._handlers)}>"
+        )
+
+
+def _format_cell(key: str, value: Any) -> str:
+    if key.endswith("_time"):
+        return f"{value * 1000:.3f}"
+    return str(value)
+
+
+def _format_row(cells: Any, widths: Any) -> str:
+    # names left aligned, numbers right aligned
+    first = cells[0].ljust(widths[0])
+    rest = [cell.rjust(width) for cell, width in zip(cells[1:], widths[1:])]
+    return "  " + "  ".join([first] + rest)
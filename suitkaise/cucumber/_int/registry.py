@@ -0,0 +1,182 @@
+"""
+Handler registry for cucumber.
+
+The Serializer picks a handler for an object, the Deserializer picks one
+for an IR node. Both used to scan the handler list in order. The registry
+keeps that list, plus indexes so lookups don't have to scan:
+
+- by (type_name, handler class name) for the Deserializer
+- by handler class name, for IR written by a version with other type names
+- by exact type (checked along the MRO) for handlers registered with types=,
+  one index for priority >= 0 and one for negative priorities
+
+Handlers added with register_handler() are ranked by priority. Those with
+priority >= 0 are checked before the built-in handlers, and before the
+serializer's own fast paths for instances and collections - that's what
+lets a handler take over one of your own classes. Negative priorities go
+after the built-ins, as a fallback.
+
+Every change bumps `version`, so Serializers can drop the per-type plans
+they compiled against the old handlers.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .handlers import ALL_HANDLERS
+from .handlers.base_class import Handler
+
+# node types the Deserializer handles itself, before it looks for a handler
+RESERVED_TYPE_NAMES = frozenset((
+    "dict", "list", "tuple", "set", "frozenset",
+    "pickle_native", "pickle_native_func", "simple_class_instance",
+    "instance_columns", "buffer", "session_ref", "session_def",
+))
+
+
+class _Registration:
+    """One register_handler() call."""
+    __slots__ = ("handler", "types", "priority", "order")
+
+    def __init__(self, handler: Handler, types: Tuple[type, ...], priority: int, order: int):
+        self.handler = handler
+        self.types = types
+        self.priority = priority
+        self.order = order
+
+    def rank(self) -> Tuple[int, int]:
+        # higher priority first, then the most recent registration
+        return (-self.priority, -self.order)
+
+
+class HandlerRegistry:
+    """
+    Ordered handlers plus lookup indexes.
+
+    Lookups only read attributes that are replaced as a whole when the
+    registry changes, so they don't need the lock.
+    """
+
+    def __init__(self, handlers: Iterable[Handler]):
+        self._builtin: List[Handler] = list(handlers)
+        self._registrations: List[_Registration] = []
+        self._next_order = 0
+        self._lock = threading.Lock()
+        self.version = 0
+        self._rebuild()
+
+    def register(self, handler: Handler, types: Iterable[type] = (), priority: int = 0) -> None:
+        """Add a handler (see cucumber.register_handler())."""
+        if not isinstance(handler, Handler):
+            raise TypeError(
+                f"Expected a Handler instance, got {type(handler).__name__}"
+            )
+        type_name = getattr(handler, "type_name", None)
+        if not isinstance(type_name, str) or not type_name:
+            raise ValueError(f"{type(handler).__name__} must define a type_name string")
+        if type_name in RESERVED_TYPE_NAMES:
+            raise ValueError(f"type_name {type_name!r} is reserved by cucumber")
+        types = tuple(types)
+        for cls in types:
+            if not isinstance(cls, type):
+                raise TypeError(f"types must be classes, got {cls!r}")
+        if not isinstance(priority, int):
+            raise TypeError(f"priority must be an int, got {type(priority).__name__}")
+
+        with self._lock:
+            self._registrations = [r for r in self._registrations if r.handler is not handler]
+            self._registrations.append(_Registration(handler, types, priority, self._next_order))
+            self._next_order += 1
+            self._rebuild()
+
+    def unregister(self, handler: Handler) -> bool:
+        """Remove a registered handler. Returns False if it wasn't registered."""
+        with self._lock:
+            remaining = [r for r in self._registrations if r.handler is not handler]
+            if len(remaining) == len(self._registrations):
+                return False
+            self._registrations = remaining
+            self._rebuild()
+            return True
+
+    def _rebuild(self) -> None:
+        ranked = sorted(self._registrations, key=_Registration.rank)
+        ahead = [r.handler for r in ranked if r.priority >= 0]
+        behind = [r.handler for r in ranked if r.priority < 0]
+
+        # scan order for can_handle()
+        handlers = ahead + self._builtin + behind
+
+        # earlier in scan order wins, same as a linear scan would
+        by_name: Dict[Tuple[str, str], Handler] = {}
+        by_class_name: Dict[str, Handler] = {}
+        for handler in handlers:
+            by_name.setdefault((handler.type_name, type(handler).__name__), handler)
+            by_class_name.setdefault(type(handler).__name__, handler)
+
+        # negative priorities are fallbacks - they must not jump ahead of the
+        #   built-ins just because they were registered for the type
+        by_type: Dict[type, Handler] = {}
+        fallback_by_type: Dict[type, Handler] = {}
+        for registration in ranked:
+            index = by_type if registration.priority >= 0 else fallback_by_type
+            for cls in registration.types:
+                index.setdefault(cls, registration.handler)
+
+        self.handlers = handlers
+        self.priority_handlers = ahead
+        self.fallback_handlers = behind
+        self._by_name = by_name
+        self._by_class_name = by_class_name
+        self._by_type = by_type
+        self._fallback_by_type = fallback_by_type
+        self.version += 1
+
+    def for_type(self, cls: type) -> Optional[Handler]:
+        """Handler registered with priority >= 0 for cls or its nearest base class, if any."""
+        return _lookup_mro(self._by_type, cls)
+
+    def fallback_for_type(self, cls: type) -> Optional[Handler]:
+        """Handler registered with a negative priority for cls or its nearest base class, if any."""
+        return _lookup_mro(self._fallback_by_type, cls)
+
+    def by_name(self, type_name: str, handler_name: str) -> Optional[Handler]:
+        """Handler for an IR node's __cucumber_type__ and __handler__."""
+        return self._by_name.get((type_name, handler_name))
+
+    def by_class_name(self, handler_name: str) -> Optional[Handler]:
+        """Handler by class name only."""
+        return self._by_class_name.get(handler_name)
+
+
+def _lookup_mro(by_type: Dict[type, Handler], cls: type) -> Optional[Handler]:
+    if not by_type:
+        return None
+    for base in cls.__mro__:
+        handler = by_type.get(base)
+        if handler is not None:
+            return handler
+    return None
+
+
+# registry used by every Serializer and by Deserializers without their own handler list
+DEFAULT_REGISTRY = HandlerRegistry(ALL_HANDLERS)
+
+
+def find_priority_handler(registry: HandlerRegistry, obj: Any) -> Optional[Handler]:
+    """
+    Handler that takes over an object before the serializer's fast paths.
+
+    Checks handlers registered with priority >= 0 for the object's type,
+    then the can_handle() of registered handlers with priority >= 0.
+    """
+    handler = registry.for_type(type(obj))
+    if handler is not None:
+        return handler
+    for handler in registry.priority_handlers:
+        try:
+            if handler.can_handle(obj):
+                return handler
+        except Exception:
+            continue
+    return None
@@ -0,0 +1,133 @@
+"""
+Process-wide cache of objects looked up by module and qualified name.
+
+Classes of simple instances, functions sent by reference and classes of
+handler-built instances are all found the same way: import the module,
+then getattr() down the qualname. For a payload with a million instances
+of one class that's a million imports and attribute walks for the same
+class, so results are cached here by (module, qualname) - failed lookups
+too, since a failed import searches the filesystem every time.
+
+Entries are checked before they are used, so they don't go stale:
+- the module must still be the one in sys.modules (catches reloads and
+  modules that were removed or replaced)
+- the first name of the qualname must still be the same object in the
+  module (catches a class or function being redefined, e.g. by running a
+  notebook cell or a script's __main__ again)
+- a failed import is retried once the module shows up in sys.modules or
+  sys.path changes
+
+Changes further down a qualname (Outer.Inner being replaced on Outer) are
+not seen - clear_resolve_cache() drops entries by hand.
+"""
+
+import importlib
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+_MISSING = object()
+
+# (module, qualname) -> (module object, first qualname part, resolved object)
+_found: Dict[Tuple[str, str], Tuple[Any, Any, Any]] = {}
+
+# (module, qualname) -> (module object or None, first qualname part, sys.path copy,
+#   error type, error args) - module object is None when the import itself failed
+_failed: Dict[Tuple[str, str], Tuple[Any, Any, Any, type, tuple]] = {}
+
+# negative entries are keyed by whatever names arrive in payloads - keep them bounded
+_MAX_FAILED = 4096
+
+
+def resolve(module_name: str, qualname: str) -> Any:
+    """
+    Import a module and look up a dotted qualname in it.
+
+    Args:
+        module_name: Module to import
+        qualname: Qualified name in that module, e.g. "Outer.Inner"
+
+    Returns:
+        The object found
+
+    Raises:
+        ImportError: If the module can't be imported
+        AttributeError: If a part of the qualname doesn't exist
+    """
+    key = (module_name, qualname)
+
+    entry = _found.get(key)
+    if entry is not None:
+        module, head, obj = entry
+        if sys.modules.get(module_name) is module and _head(module, qualname) is head:
+            return obj
+        _found.pop(key, None)
+
+    failure = _failed.get(key)
+    if failure is not None:
+        module, head, path, error_type, error_args = failure
+        if module is None:
+            still_failing = module_name not in sys.modules and sys.path == path
+        else:
+            still_failing = sys.modules.get(module_name) is module and _head(module, qualname) is head
+        if still_failing:
+            raise error_type(*error_args)
+        _failed.pop(key, None)
+
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        _remember_failure(key, None, _MISSING, e)
+        raise
+
+    obj = module
+    try:
+        for part in qualname.split('.'):
+            obj = getattr(obj, part)
+    except AttributeError as e:
+        _remember_failure(key, module, _head(module, qualname), e)
+        raise
+
+    head = _head(module, qualname)
+    if head is not _MISSING:
+        # names only reachable through a module __getattr__ can't be checked, so aren't cached
+        _found[key] = (module, head, obj)
+    return obj
+
+
+def clear_resolve_cache(module_name: Optional[str] = None) -> int:
+    """
+    Drop cached lookups.
+
+    Args:
+        module_name: Only drop lookups in this module (None drops all)
+
+    Returns:
+        int: Number of entries dropped (found and failed)
+    """
+    if module_name is None:
+        count = len(_found) + len(_failed)
+        _found.clear()
+        _failed.clear()
+        return count
+
+    count = 0
+    for cache in (_found, _failed):
+        for key in [key for key in list(cache) if key[0] == module_name]:
+            if cache.pop(key, None) is not None:
+                count += 1
+    return count
+
+
+def _head(module: Any, qualname: str) -> Any:
+    """The object the first part of a qualname names in a module's namespace."""
+    namespace = getattr(module, "__dict__", None)
+    if namespace is None:
+        return _MISSING
+    return namespace.get(qualname.partition('.')[0], _MISSING)
+
+
+def _remember_failure(key: Tuple[str, str], module: Any, head: Any, error: Exception) -> None:
+    if len(_failed) >= _MAX_FAILED:
+        _failed.clear()
+    # the error itself isn't kept - its traceback would keep the failed lookup's frames alive
+    _failed[key] = (module, head, list(sys.path), type(error), error.args)
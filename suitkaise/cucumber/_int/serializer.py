@@ -4,12 +4,14 @@
 #
 # TOP LEVEL (serialize function):
 # 1. reset all tracking state (circular reference tracker, depth counter, etc)
-# 2. call the recursive serializer to build the intermediate representation
+# 2. call _build_ir to build the intermediate representation
 # 3. use pickle.dumps() to convert the IR to bytes
+#    (or the compact encoder, if the IR is too deep for pickle's recursive C pickler)
 # 4. return the bytes
 #
-# RECURSIVE LEVEL (_serialize_recursive function):
-# 0. check recursion depth hasn't exceeded safety limit
+# PER-OBJECT LEVEL (_visit function, driven by _walk's explicit stack):
+# 0. track depth and path for verbose output and error messages
+#    (no depth limit - nesting is only limited by memory)
 #
 # 1. check if we've already serialized this exact object (circular reference check)
 #    - if yes: return a reference marker pointing to the already-serialized version
@@ -27,7 +29,7 @@
 #    - handler returns a dict/list of the object's state
 #    - but this state might contain MORE complex objects!
 #
-# 5. recursively serialize the extracted state
+# 5. serialize the extracted state (pushed onto the work stack as a child)
 #    - THIS IS THE KEY STEP!
 #    - the handler gave us state that might have locks, loggers, nested objects
 #    - we need to recursively process ALL of that until everything is pickle-native
@@ -47,14 +49,188 @@
 # No locks, no loggers, no complex objects - all converted to simple data
 # Then pickle can serialize it to bytes
 
+import collections
+import copy
+import itertools
+import operator
 import pickle
-from typing import Any, Dict, Optional
-from .handlers import ALL_HANDLERS
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from .registry import DEFAULT_REGISTRY, find_priority_handler
+from . import compact
+from . import compression
+from . import profiling
+from .compression import COMPRESS_THRESHOLD
+from .columnar import MIN_ROWS, pack_column
+from .resolve import resolve
+from .streams import RECORD_HEADER
 
 class SerializationError(Exception):
     """Raised when serialization fails."""
     pass
 
+
+# wire formats accepted by Serializer.serialize()
+WIRE_FORMATS = ("pickle", "compact")
+
+# buffers at least this large are kept out of band by serialize_oob()
+OOB_THRESHOLD = 64 * 1024
+
+
+# pickle's C pickler recurses once per nesting level, and each object level
+# in the IR nests up to this many containers (node dict, items list, (k, v) tuple)
+_PICKLE_LEVELS_PER_DEPTH = 3
+# recursion headroom kept free for the caller's own stack when pickling
+_PICKLE_STACK_MARGIN = 200
+
+
+# plan kinds - how _visit encodes objects of a given type
+_PLAN_NATIVE = 0          # complex, bytearray: returned as-is, never tracked
+_PLAN_WRAPPED_NATIVE = 1  # pickle-native value wrapped with an __object_id__
+_PLAN_DICT = 2            # dict: items recursively serialized
+_PLAN_LIST = 3            # list: items recursively serialized
+_PLAN_COLLECTION = 4      # tuple, set, frozenset
+_PLAN_INSTANCE = 5        # simple instance candidate (checks attrs per object)
+_PLAN_FUNCTION = 6        # function (checks reference-ability per object)
+_PLAN_HANDLER = 7         # handler-backed object (or pickle fallback if no handler)
+_PLAN_SESSION = 8         # _SessionEntry: definition sent once per Session
+
+
+# reads obj.__dict__ (used with map() when checking columnar lists)
+_get_dict = operator.attrgetter("__dict__")
+
+# breadcrumbs for the open frames only, without an object being visited
+_NO_OBJECT = object()
+
+
+# handler types whose objects a Session sends once and refers to by id afterwards
+# (definitions - classes, functions, code and modules - not data)
+_SESSION_TYPES = frozenset(("class_object", "function", "lambda", "code_object", "module"))
+
+
+# pickle-native dict subclasses whose equality ignores item order - their
+#   items are sorted in a canonical encoding (OrderedDict's order counts)
+_UNORDERED_DICTS = (collections.Counter, collections.defaultdict)
+
+
+# instance state fields that only depend on the class - the first instance of
+#   a class in a payload sends them, later instances reference that copy
+_CLASS_FIELDS = ("class_definition", "nested_classes")
+
+
+def _share_class_fields(cls: type, state: Dict[str, Any], shared: Dict[Tuple[type, str], Any]) -> None:
+    """Swap an instance state's class-level fields for the first copy sent for its class."""
+    for field in _CLASS_FIELDS:
+        if field in state:
+            state[field] = shared.setdefault((cls, field), state[field])
+
+
+class _TypePlan:
+    """
+    Compiled serialization plan for one type.
+    
+    Built once by Serializer._compile_plan() and cached by type, so that the
+    per-object work is only the encoding itself.
+    """
+    __slots__ = (
+        "kind", "track", "type_name", "handler", "handler_name",
+        "module", "qualname", "buffer_kind", "picklable", "pickle_error",
+    )
+    
+    def __init__(self):
+        self.kind = _PLAN_HANDLER
+        self.track = True  # False means the type can never take part in a cycle
+        self.type_name = None  # __cucumber_type__ tag for collections and handler objects
+        self.handler = None
+        self.handler_name = None
+        self.module = None  # class identity for simple instances
+        self.qualname = None
+        self.buffer_kind = None  # "bytearray" / "memoryview" if eligible for out-of-band transfer
+        self.picklable = None  # handler-less types: pickle probe result (None until probed)
+        self.pickle_error = None  # why the probe failed
+
+
+class _SessionTable:
+    """
+    Definitions a Session has already sent, shared by all of its messages.
+    
+    Objects are kept alive by the table, so their id() can't be reused by
+    a different object while the session exists.
+    """
+    __slots__ = ("objects", "classes", "open", "added", "next_id")
+    
+    def __init__(self):
+        self.objects: Dict[int, Tuple[int, Any]] = {}  # id(obj) -> (session id, obj)
+        self.classes: Dict[type, int] = {}  # class -> session id of its instance class definition
+        self.open: set = set()  # class definition session ids still being serialized
+        self.added: List[Any] = []  # keys added by the message being built
+        self.next_id = 0
+    
+    def add_object(self, obj: Any) -> int:
+        session_id = self.next_id
+        self.next_id += 1
+        self.objects[id(obj)] = (session_id, obj)
+        self.added.append(id(obj))
+        return session_id
+    
+    def add_class(self, cls: type) -> int:
+        session_id = self.next_id
+        self.next_id += 1
+        self.classes[cls] = session_id
+        self.added.append(cls)
+        return session_id
+    
+    def commit(self) -> None:
+        """The message was sent - its definitions can be referenced from now on."""
+        self.added.clear()
+        self.open.clear()
+    
+    def rollback(self) -> None:
+        """The message failed - forget the definitions it would have sent."""
+        for key in self.added:
+            if type(key) is int:
+                self.objects.pop(key, None)
+            else:
+                self.classes.pop(key, None)
+        self.added.clear()
+        self.open.clear()
+
+
+class _SessionEntry:
+    """
+    Stand-in for a class definition in handler state while a Session is active.
+    
+    `value` is the definition to send (first time) or None (already sent,
+    only the session id is written).
+    """
+    __slots__ = ("session_id", "value")
+    
+    def __init__(self, session_id: int, value: Any):
+        self.session_id = session_id
+        self.value = value
+
+
+class _Frame:
+    """
+    A container or handler node whose children are still being serialized.
+    
+    `children` is an iterator over the objects still to visit, `results`
+    collects their IR in order, and `node` is the IR dict being built.
+    
+    `obj` is the object the node is for. The stack of open frames is the
+    path from the root to the object being visited, so error messages
+    and verbose output build their breadcrumbs from it.
+    """
+    __slots__ = ("kind", "node", "results", "children", "obj")
+    
+    def __init__(self, kind: int, node: Dict[str, Any], results: List[Any], children: Any, obj: Any):
+        self.kind = kind
+        self.node = node
+        self.results = results
+        self.children = children
+        self.obj = obj
+
 class Serializer:
     """
     Central serializer that coordinates object serialization.
@@ -71,29 +247,71 @@ class Serializer:
             debug: Enable debug mode (more detailed error messages)
             verbose: Enable verbose mode (print serialization progress)
         """
-        # handler registry
-        self.handlers = ALL_HANDLERS
+        # handler registry (shared, so handlers added with register_handler() apply here too)
+        self._registry = DEFAULT_REGISTRY
+        self._registry_version = self._registry.version
         
         # configuration
         self.debug = debug
         self.verbose = verbose
         
         # handler cache: maps type -> handler (persists across serialize() calls)
-        # handlers are static, so caching by type is safe and avoids repeated lookups
+        # cleared along with the plan cache when the registry changes
         self._handler_cache: Dict[type, Optional[Any]] = {}
         
+        # plan cache: maps type -> compiled _TypePlan (persists across serialize() calls)
+        # classification of a type only changes when a handler is registered
+        self._plan_cache: Dict[type, _TypePlan] = {}
+        
+        # definitions already sent - only set on the Serializer a Session owns
+        self._session: Optional[_SessionTable] = None
+        
+        # out-of-band buffer threshold - only set while serialize_oob() runs
+        self._oob_threshold: Optional[int] = None
+        # buffer nodes by id(obj), so a buffer seen twice is only sent once
+        self._oob_nodes: Dict[int, Dict[str, Any]] = {}
+        
+        # same-host mode - only set while serialize(same_host=True) / serialize_oob() run
+        #   (handlers with extract_reference() send a reference instead of a copy)
+        self._same_host = False
+        
+        # canonical mode - only set while serialize_canonical() / write_canonical() run
+        #   (dict items, set items and instance attrs are written in sorted order)
+        self._canonical = False
+        # encodes dict keys and set items that sort by their canonical encoding
+        #   (made on first use and reused, so its plan cache carries over)
+        self._key_serializer: Optional["Serializer"] = None
+        
+        # columnar list nodes built so far, with the id() of each row
+        #   (only rows that are referenced again get their id in the IR)
+        self._columnar_nodes: List[Tuple[Dict[str, Any], List[int]]] = []
+        
+        # class definitions (and nested class definitions) sent so far in this
+        #   payload, by (class, state field) - see _share_class_fields()
+        self._class_fields: Dict[Tuple[type, str], Any] = {}
+        
+        # profiles recording this call - read from cucumber.profile() when each IR build starts
+        self._profiles: Tuple[Any, ...] = ()
+        
         # state tracking (reset for each serialize() call)
         self.seen_objects: Dict[int, Any] = {}
-        self._serialization_depth = 0
-        self._max_depth = 1000
-        self._object_path: list = []  # breadcrumb trail for error reporting
+        self._max_depth_seen = 0  # deepest object nesting in the last IR built
+        self._stack: List[_Frame] = []  # open frames, root first (the breadcrumb trail)
+        self._error_path: Optional[str] = None  # breadcrumbs to the object that failed
         
         # Debug tracking
         self._all_object_ids: set = set()  # all __object_id__ values added
         self._all_circular_refs: set = set()  # all __cucumber_ref__ values created
         self._circular_ref_details: list = []  # (obj_id, type, path) for each circular ref
     
-    def serialize(self, obj: Any) -> bytes:
+    def serialize(
+        self,
+        obj: Any,
+        format: str = "pickle",
+        compress: Optional[str] = None,
+        compress_threshold: int = COMPRESS_THRESHOLD,
+        same_host: bool = False,
+    ) -> bytes:
         """
         Serialize any Python object to bytes.
         
@@ -101,6 +319,11 @@ class Serializer:
         
         Args:
             obj: Object to serialize
+            format: Wire format - "pickle" (pickled IR) or "compact" (tagged binary)
+            compress: Optional codec - "auto", "zlib", "lzma" or "bz2"
+            compress_threshold: Outputs shorter than this are not compressed
+            same_host: The output is only deserialized on this machine, so
+                shared memory and file-backed mmaps are sent by reference
             
         Returns:
             bytes: Serialized representation
@@ -108,10 +331,16 @@ class Serializer:
         Raises:
             SerializationError: If serialization fails
         """
+        if format not in WIRE_FORMATS:
+            raise ValueError(
+                f"Unknown format {format!r}, expected one of: {', '.join(WIRE_FORMATS)}"
+            )
+        compression.check_codec(compress)
+        
         # reset state for fresh serialization
         self.seen_objects = {}
-        self._serialization_depth = 0
-        self._object_path = []
+        self._max_depth_seen = 0
+        self._error_path = None
         self._all_object_ids = set()
         self._all_circular_refs = set()
         self._circular_ref_details = []
@@ -120,14 +349,15 @@ class Serializer:
             print(f"[CUCUMBER] Starting serialization of {type(obj).__name__}")
         
         # build intermediate representation (nested dicts/lists)
+        self._same_host = same_host
         try:
-            ir = self._serialize_recursive(obj)
+            ir = self._build_ir(obj)
         except SerializationError:
             # already a SerializationError with good message, just re-raise
             raise
         except Exception as e:
             # unexpected error - wrap it
-            path_str = " -> ".join(self._object_path) if self._object_path else "root"
+            path_str = self._error_path or "root"
             raise SerializationError(
                 f"\n{'='*70}\n"
                 f"SERIALIZATION FAILED\n"
@@ -137,17 +367,45 @@ class Serializer:
                 f"Error: {e}\n"
                 f"{'='*70}"
             ) from e
+        finally:
+            self._same_host = False
         
-        if self.verbose:
+        if self.verbose and self._fits_pickle():
+            # (str() of an IR too deep for pickle would hit the recursion limit too)
             print(f"[CUCUMBER] Built IR successfully, size: {len(str(ir))} chars")
         
+        if format == "pickle" and not self._fits_pickle():
+            # pickle.dumps() recurses in C once per nesting level, the compact
+            # encoder doesn't - deserialize() detects either format
+            if self.verbose:
+                print(f"[CUCUMBER] IR nested {self._max_depth_seen} objects deep, using compact format")
+            format = "compact"
+        
+        if format == "compact":
+            try:
+                result = compact.encode(ir)
+                if self.verbose:
+                    print(f"[CUCUMBER] Serialization complete (compact), bytes: {len(result)}")
+            except Exception as e:
+                self._forget_picklable()
+                raise SerializationError(
+                    f"\n{'='*70}\n"
+                    f"COMPACT ENCODING FAILED ON IR\n"
+                    f"{'='*70}\n"
+                    f"The intermediate representation was built successfully,\n"
+                    f"but it could not be written in the compact format.\n"
+                    f"\nError: {e}\n"
+                    f"{'='*70}"
+                ) from e
+            return self._compress(result, compress, compress_threshold)
+        
         # use pickle to convert IR to bytes
         try:
             result = pickle.dumps(ir, protocol=pickle.HIGHEST_PROTOCOL)
             if self.verbose:
                 print(f"[CUCUMBER] Serialization complete, bytes: {len(result)}")
-            return result
         except Exception as e:
+            self._forget_picklable()
             raise SerializationError(
                 f"\n{'='*70}\n"
                 f"PICKLE FAILED ON IR\n"
@@ -159,15 +417,233 @@ class Serializer:
                 f"\nError: {e}\n"
                 f"{'='*70}"
             ) from e
+        return self._compress(result, compress, compress_threshold)
+    
+    def _compress(self, data: bytes, codec: Optional[str], threshold: int) -> bytes:
+        """Wrap serialized bytes in a compression frame, if it's worth it."""
+        if codec is None:
+            return data
+        result = compression.compress(data, codec, threshold)
+        if self.verbose:
+            if result is data:
+                print(f"[CUCUMBER] Left uncompressed ({len(data)} bytes)")
+            else:
+                print(f"[CUCUMBER] Compressed with {compression.codec_of(result)}: "
+                      f"{len(data)} -> {len(result)} bytes")
+        return result
 
+    def serialize_oob(
+        self,
+        obj: Any,
+        threshold: int = OOB_THRESHOLD,
+        compress: Optional[str] = None,
+        compress_threshold: int = COMPRESS_THRESHOLD,
+        same_host: bool = False,
+    ) -> Tuple[bytes, List[pickle.PickleBuffer]]:
+        """
+        Serialize an object, keeping large buffers out of band.
+        
+        bytes, bytearray and contiguous memoryview objects of at least
+        `threshold` bytes are not copied into the output. Instead, the output
+        header references them and they are returned separately as
+        pickle.PickleBuffer views of the original memory (pickle protocol 5).
+        
+        Only the header is compressed when `compress` is set - the buffers
+        are left as views of the original memory.
+        
+        Args:
+            obj: Object to serialize
+            threshold: Minimum buffer size in bytes to keep out of band
+            compress: Optional codec for the header - "auto", "zlib", "lzma" or "bz2"
+            compress_threshold: Headers shorter than this are not compressed
+            same_host: The output is only deserialized on this machine, so
+                shared memory and file-backed mmaps are sent by reference
+            
+        Returns:
+            (header, buffers): header bytes and the list of out-of-band buffers
+            
+        Raises:
+            SerializationError: If serialization fails
+        """
+        compression.check_codec(compress)
+        self._oob_threshold = threshold
+        self._oob_nodes = {}
+        self._same_host = same_host
+        try:
+            ir = self.serialize_ir(obj)
+        finally:
+            self._oob_threshold = None
+            self._oob_nodes = {}
+            self._same_host = False
+        
+        buffers: List[pickle.PickleBuffer] = []
+        if not self._fits_pickle():
+            # too deep for pickle - buffers stay in band, deserialize_oob() detects it
+            try:
+                header = compact.encode(ir)
+            except Exception as e:
+                raise SerializationError(f"Compact encoding failed on IR: {e}") from e
+            return self._compress(header, compress, compress_threshold), buffers
+        try:
+            header = pickle.dumps(ir, protocol=5, buffer_callback=buffers.append)
+        except Exception as e:
+            self._forget_picklable()
+            raise SerializationError(
+                f"\n{'='*70}\n"
+                f"PICKLE FAILED ON IR\n"
+                f"{'='*70}\n"
+                f"The intermediate representation was built successfully,\n"
+                f"but pickle.dumps() failed to serialize it.\n"
+                f"This suggests the IR contains non-picklable objects.\n"
+                f"This is a bug in a handler or the serializer.\n"
+                f"\nError: {e}\n"
+                f"{'='*70}"
+            ) from e
+        
+        if self.verbose:
+            total = sum(memoryview(b).nbytes for b in buffers)
+            print(f"[CUCUMBER] Serialization complete, header bytes: {len(header)}, "
+                  f"out-of-band buffers: {len(buffers)} ({total} bytes)")
+        return self._compress(header, compress, compress_threshold), buffers
+    
+    def serialize_canonical(self, obj: Any) -> bytes:
+        """
+        Serialize an object to deterministic bytes.
+        
+        Equal objects built the same way give the same bytes, no matter
+        where they live in memory or in what order their dicts and sets
+        were filled. The output is in the compact format, and can be read
+        back with deserialize().
+        
+        - object ids are numbered in traversal order (the compact format
+          always does this)
+        - dict items, set items and instance attributes are sorted
+        
+        Args:
+            obj: Object to serialize
+            
+        Returns:
+            bytes: Canonical compact encoding
+            
+        Raises:
+            SerializationError: If serialization fails
+        """
+        ir = self._canonical_ir(obj)
+        try:
+            return compact.encode(ir)
+        except Exception as e:
+            raise SerializationError(f"Compact encoding failed: {e}") from e
+    
+    def write_canonical(self, obj: Any, write: Any) -> int:
+        """
+        Write the canonical encoding of an object out in chunks.
+        
+        Same bytes as serialize_canonical(), handed to `write` as they are
+        encoded (hash.update, file.write, ...).
+        
+        Returns:
+            int: Total number of bytes written
+        """
+        ir = self._canonical_ir(obj)
+        try:
+            return compact.encode_to(ir, write)
+        except Exception as e:
+            raise SerializationError(f"Compact encoding failed: {e}") from e
+    
+    def _canonical_ir(self, obj: Any) -> Any:
+        """Build the IR with dict items, set items and attrs in sorted order."""
+        self._canonical = True
+        try:
+            return self.serialize_ir(obj)
+        finally:
+            self._canonical = False
+    
+    def dump(self, obj: Any, file: Any, format: str = "pickle") -> None:
+        """
+        Serialize an object straight into a writable binary file-like object.
+        
+        The IR is written out as it is encoded, so the full serialized bytes
+        never exist in memory next to the IR.
+        
+        Args:
+            obj: Object to serialize
+            file: Object with a write() method accepting bytes
+            format: Wire format - "pickle" (pickled IR) or "compact" (tagged binary)
+            
+        Raises:
+            SerializationError: If serialization fails
+        """
+        if format not in WIRE_FORMATS:
+            raise ValueError(
+                f"Unknown format {format!r}, expected one of: {', '.join(WIRE_FORMATS)}"
+            )
+        
+        ir = self.serialize_ir(obj)
+        if not self._fits_pickle():
+            format = "compact"
+        
+        try:
+            if format == "compact":
+                written = compact.encode_to(ir, file.write)
+                if self.verbose:
+                    print(f"[CUCUMBER] Dump complete (compact), bytes: {written}")
+            else:
+                # Pickler writes frame by frame, and large bytes go straight to file
+                pickle.Pickler(file, protocol=pickle.HIGHEST_PROTOCOL).dump(ir)
+                if self.verbose:
+                    print("[CUCUMBER] Dump complete")
+        except Exception as e:
+            self._forget_picklable()
+            raise SerializationError(
+                f"\n{'='*70}\n"
+                f"WRITING IR TO FILE FAILED\n"
+                f"{'='*70}\n"
+                f"The intermediate representation was built successfully,\n"
+                f"but it could not be written to {type(file).__name__}.\n"
+                f"\nError: {e}\n"
+                f"{'='*70}"
+            ) from e
+    
+    def iter_dump(self, iterable: Any, file: Any, format: str = "pickle") -> int:
+        """
+        Serialize each item of an iterable as its own record in a framed stream.
+        
+        Each record is written as soon as it is serialized, so only one
+        record is held in memory at a time. Records are independent - objects
+        shared between two records are serialized (and later rebuilt) twice.
+        
+        Args:
+            iterable: Items to serialize, consumed lazily
+            file: Object with a write() method accepting bytes
+            format: Wire format for each record
+            
+        Returns:
+            int: Number of records written
+            
+        Raises:
+            SerializationError: If serializing or writing a record fails
+        """
+        count = 0
+        for item in iterable:
+            data = self.serialize(item, format=format)
+            try:
+                file.write(RECORD_HEADER.pack(len(data)))
+                file.write(data)
+            except Exception as e:
+                raise SerializationError(
+                    f"Failed to write record {count} to {type(file).__name__}: {e}"
+                ) from e
+            count += 1
+        return count
+    
     def serialize_ir(self, obj: Any) -> Any:
         """
         Build and return the intermediate representation (IR) without pickling.
         """
         # reset state for fresh serialization
         self.seen_objects = {}
-        self._serialization_depth = 0
-        self._object_path = []
+        self._max_depth_seen = 0
+        self._error_path = None
         self._all_object_ids = set()
         self._all_circular_refs = set()
         self._circular_ref_details = []
@@ -176,11 +652,11 @@ class Serializer:
             print(f"[CUCUMBER] Starting IR build for {type(obj).__name__}")
         
         try:
-            return self._serialize_recursive(obj)
+            return self._build_ir(obj)
         except SerializationError:
             raise
         except Exception as e:
-            path_str = " -> ".join(self._object_path) if self._object_path else "root"
+            path_str = self._error_path or "root"
             raise SerializationError(
                 f"\n{'='*70}\n"
                 f"IR BUILD FAILED\n"
@@ -191,277 +667,274 @@ class Serializer:
                 f"{'='*70}"
             ) from e
     
-    def _serialize_recursive(self, obj: Any) -> Any:
+    def _fits_pickle(self) -> bool:
+        """Check if the last IR built is shallow enough for pickle.dumps()."""
+        levels = self._max_depth_seen * _PICKLE_LEVELS_PER_DEPTH
+        return levels < sys.getrecursionlimit() - _PICKLE_STACK_MARGIN
+    
+    def _build_ir(self, root: Any) -> Any:
         """
-        Recursively serialize object to intermediate representation.
+        Serialize an object graph to intermediate representation.
         
         Converts object to nested dict/list structure of pickle-native types.
+        While a cucumber.profile() is active, the build is timed and the
+        bytes each type contributes are estimated from the finished IR.
         
         Args:
-            obj: Object to serialize
+            root: Object to serialize
             
         Returns:
             Intermediate representation (pickle-native nested structure)
         """
+        self._refresh_plans()
+        
+        try:
+            profiles = self._profiles = profiling.active()
+            if not profiles:
+                return self._walk(root)
+            
+            start = time.perf_counter()
+            ir = self._walk(root)
+            elapsed = time.perf_counter() - start
+            for profile in profiles:
+                profile.record_call("serialize", elapsed)
+            
+            sized = [profile for profile in profiles if profile.sizes]
+            if sized:
+                # sized from the IR just built - nothing is extracted twice
+                from .estimate import SizeEstimator
+                _, by_type = SizeEstimator(self, by_type=True).estimate_ir(ir, self.seen_objects)
+                for profile in sized:
+                    profile.record_bytes(by_type)
+            return ir
+        finally:
+            # serializers are reused (one per thread) - don't keep the
+            # last object graph alive until the next call
+            self.seen_objects = {}
+    
+    def _walk(self, root: Any) -> Any:
+        """
+        Walk an object graph, building its intermediate representation.
+        
+        Works with an explicit stack of _Frames instead of Python recursion,
+        so nesting depth is only limited by memory. Objects are visited in
+        the same depth-first order as a recursive walk would visit them,
+        which keeps circular reference decisions (first occurrence gets the
+        full node, later ones get a __cucumber_ref__) exactly the same.
+        
+        Args:
+            root: Object to serialize
+            
+        Returns:
+            Intermediate representation (pickle-native nested structure)
+        """
+        self._columnar_nodes = []
+        self._class_fields = {}
+        visit = self._visit
+        stack: List[_Frame] = []
+        self._stack = stack
+        self._max_depth_seen = 1
+        
+        # the object being visited, only read if something raises
+        current = root
+        try:
+            result = visit(root)
+            if type(result) is not _Frame:
+                return self._link_columnar_rows(result)
+            
+            stack.append(result)
+            while True:
+                frame = stack[-1]
+                for child in frame.children:
+                    current = child
+                    value = visit(child)
+                    if type(value) is _Frame:
+                        # descend - this frame resumes from its iterator once the child is done
+                        stack.append(value)
+                        if len(stack) >= self._max_depth_seen:
+                            self._max_depth_seen = len(stack) + 1
+                        break
+                    frame.results.append(value)
+                else:
+                    # all children done - finish this node and hand it to the parent
+                    current = _NO_OBJECT
+                    node = self._finish_frame(frame)
+                    stack.pop()
+                    if not stack:
+                        return self._link_columnar_rows(node)
+                    stack[-1].results.append(node)
+        except Exception:
+            # breadcrumbs are only built when something fails
+            if self._error_path is None:
+                self._error_path = self._breadcrumbs(current)
+            raise
+        finally:
+            self._stack = []
+    
+    def _refresh_plans(self) -> None:
+        """Drop compiled plans if handlers were registered or removed since they were built."""
+        if self._registry_version != self._registry.version:
+            self._plan_cache.clear()
+            self._handler_cache.clear()
+            self._registry_version = self._registry.version
+    
+    def _finish_frame(self, frame: "_Frame") -> Dict[str, Any]:
+        """Fill in a container node once all of its children are serialized."""
+        results = frame.results
+        if frame.kind == _PLAN_DICT:
+            # children were visited as k, v, k, v, ...
+            pairs = iter(results)
+            frame.node["items"] = list(zip(pairs, pairs))
+        elif frame.kind == _PLAN_HANDLER:
+            frame.node["state"] = results[0]
+        elif frame.kind == _PLAN_SESSION:
+            frame.node["value"] = results[0]
+            self._session.open.discard(frame.node["__session_id__"])
+        # list / collection nodes already hold results as their items
+        return frame.node
+    
+    def _visit(self, obj: Any) -> Any:
+        """
+        Serialize one object.
+        
+        Returns the finished IR for leaves, or a _Frame for containers and
+        handler objects whose children still need to be serialized - 
+        _walk() serializes the children and then calls _finish_frame().
+        
+        Classification is done once per type by _compile_plan() and cached,
+        so repeated objects of the same type go straight to their encoder.
+        
+        Args:
+            obj: Object to serialize
+            
+        Returns:
+            Intermediate representation, or a _Frame
+        """
         # fast path: Immutable primitives can skip ALL overhead
         # these types are never circular and pickle handles them natively
         # place this FIRST to avoid depth/path tracking overhead
         if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+            if self._oob_threshold is not None and type(obj) is bytes and len(obj) >= self._oob_threshold:
+                return self._serialize_buffer(obj, "bytes")
             return obj
         
-        # check recursion depth for safety
-        self._serialization_depth += 1
-        if self._serialization_depth > self._max_depth:
-            path_str = " -> ".join(self._object_path) if self._object_path else "root"
-            raise RecursionError(
-                f"Serialization depth exceeded {self._max_depth}.\n"
-                f"Path: {path_str}\n"
-                f"This indicates a circular reference or deeply nested structure."
-            )
-        
-        # add current object to breadcrumb trail
-        obj_name = f"{type(obj).__name__}"
-        if self.debug:
-            obj_name += f"@{id(obj)}"
-        self._object_path.append(obj_name)
+        # look up (or compile) the plan for this type
+        plan = self._plan_cache.get(type(obj))
+        if plan is None:
+            plan = self._compile_plan(obj)
+        
+        # large bytearrays and memoryviews go out of band when serialize_oob() is running
+        if plan.buffer_kind is not None and self._oob_threshold is not None:
+            node = self._serialize_buffer(obj, plan.buffer_kind)
+            if node is not None:
+                return node
+            if type(obj) is pickle.PickleBuffer:
+                # a handler's buffer under the threshold stays in the header
+                # (pickle would send every PickleBuffer out of band)
+                return obj.raw().tobytes()
+        
+        # untracked pickle-native values (complex, bytearray) can't hold
+        # references to other objects, so they skip cycle tracking entirely
+        if not plan.track:
+            if plan.kind == _PLAN_SESSION:
+                return self._visit_session_entry(obj)
+            return obj
         
         if self.verbose:
-            # show path context with color-coded levels
-            # take last 6 levels, truncate each to 10 chars, color code
-            path_levels = self._object_path[-6:]
-            
-            # color codes: red -> orange -> yellow -> green -> blue -> purple
-            # colors cycle based on actual depth, so depth 1,7,13 = red, 2,8,14 = orange, etc.
-            colors = [
-                "\033[91m",      # red (depths 1, 7, 13, ...)
-                "\033[38;5;208m", # orange (depths 2, 8, 14, ...)
-                "\033[93m",      # yellow (depths 3, 9, 15, ...)
-                "\033[92m",      # green (depths 4, 10, 16, ...)
-                "\033[94m",      # blue (depths 5, 11, 17, ...)
-                "\033[95m",      # magenta/purple (depths 6, 12, 18, ...)
-            ]
-            reset = "\033[0m"
-            
-            # build colored path string
-            colored_parts = []
-            # calculate actual depth for each displayed level
-            total_levels = len(self._object_path)
-            start_depth = total_levels - len(path_levels)  # depth of first displayed level
-            
-            for i, level in enumerate(path_levels):
-                # truncate to 10 chars
-                truncated = level[:10] if len(level) > 10 else level
-                # color based on actual depth (1-indexed, so depth 1 = colors[0])
-                actual_depth = start_depth + i + 1
-                color = colors[(actual_depth - 1) % 6]
-                colored_parts.append(f"{color}{truncated}{reset}")
-            
-            path_str = " → ".join(colored_parts)
-            if len(self._object_path) > 6:
-                path_str = "... → " + path_str
-            
-            indent = "  " * min(self._serialization_depth, 5)  # cap indent at 5 levels
-            print(f"{indent}[{self._serialization_depth}] {path_str}")
+            self._print_path(obj)
+        
+        # check for circular references
+        obj_id = id(obj)
+        if obj_id in self.seen_objects:
+            # already serialized - return reference marker
+            self._all_circular_refs.add(obj_id)
+            if self.debug:
+                path_str = " → ".join(self._breadcrumb_names(obj)[-3:])
+                self._circular_ref_details.append((obj_id, type(obj).__name__, path_str))
+            return {"__cucumber_ref__": obj_id}
+        # mark as seen
+        self.seen_objects[obj_id] = obj
+        
+        kind = plan.kind
+        
+        if kind == _PLAN_DICT:
+            self._all_object_ids.add(obj_id)
+            # fast path: if all keys and values are primitives, copy directly
+            # (unless serialize_oob() needs to wrap a large bytes value)
+            if self._is_all_primitive_dict(obj) and not self._has_oob_bytes(obj.values()):
+                return {
+                    "__cucumber_type__": "dict",
+                    # direct copy - no recursion needed
+                    "items": list(obj.items()) if not self._canonical else self._sorted_items(obj),
+                    "__object_id__": obj_id,
+                }
+            # slow path: serialize BOTH keys and values
+            # keys can be tuples/frozensets with complex objects inside
+            node = {
+                "__cucumber_type__": "dict",
+                "items": None,
+                "__object_id__": obj_id,
+            }
+            items = obj.items() if not self._canonical else self._sorted_items(obj)
+            return _Frame(kind, node, [], itertools.chain.from_iterable(items), obj)
         
-        try:
-            # check for circular references
-            obj_id = id(obj)
-            
-            # only track objects that can participate in circular refs
-            if self._is_circular_capable(obj):
-                if obj_id in self.seen_objects:
-                    # already serialized - return reference marker
-                    self._all_circular_refs.add(obj_id)
-                    path_str = " → ".join(self._object_path[-3:])
-                    self._circular_ref_details.append((obj_id, type(obj).__name__, path_str))
-                    return {"__cucumber_ref__": obj_id}
-                # mark as seen
-                self.seen_objects[obj_id] = obj
-            
-            # check if base pickle can handle natively
-            if self._is_pickle_native(obj):
-                # primitives - check if they need __object_id__ (for circular refs)
-                # singletons and immutable primitives
-                if obj is None or obj is Ellipsis or obj is NotImplemented:
-                    # check if circular ref
-                    if obj_id in self.seen_objects:
-                        self._all_object_ids.add(obj_id)
-                        return {
-                            "__cucumber_type__": "pickle_native",
-                            "__object_id__": obj_id,
-                            "value": obj,
-                        }
-                    return obj
-                
-                if isinstance(obj, (bool, int, float, complex, str, bytes, bytearray)):
-                    # these are never circular (immutable primitives)
-                    return obj
-                
-                if isinstance(obj, (range, slice)):
-                    # check if circular ref
-                    if obj_id in self.seen_objects:
-                        self._all_object_ids.add(obj_id)
-                        return {
-                            "__cucumber_type__": "pickle_native",
-                            "__object_id__": obj_id,
-                            "value": obj,
-                        }
-                    return obj
-                
-                # collections - recursively serialize contents
-                # check for special collection types first (Counter, defaultdict, etc.)
-                # these are dict/list subclasses but pickle handles them correctly
-                if self._is_special_pickle_native(obj):
-                    # special collections types - return as-is (with object_id if needed)
-                    if obj_id in self.seen_objects:
-                        self._all_object_ids.add(obj_id)
-                        return {
-                            "__cucumber_type__": "pickle_native",
-                            "__object_id__": obj_id,
-                            "value": obj,
-                        }
-                    return obj
-                
-                elif isinstance(obj, dict):
-                    # fast path: if all keys and values are primitives, copy directly
-                    if self._is_all_primitive_dict(obj):
-                        # direct copy - no recursion needed
-                        result = {
-                            "__cucumber_type__": "dict",
-                            "items": list(obj.items()),  # direct copy
-                        }
-                        if obj_id in self.seen_objects:
-                            result["__object_id__"] = obj_id
-                            self._all_object_ids.add(obj_id)
-                        return result
-                    
-                    # slow path: recursively serialize BOTH keys and values
-                    # keys can be tuples/frozensets with complex objects inside
-                    serialized_items = [
-                        (self._serialize_recursive(k), self._serialize_recursive(v))
-                        for k, v in obj.items()
-                    ]
-                    result = {
-                        "__cucumber_type__": "dict",
-                        "items": serialized_items,
-                    }
-                    # add object_id if this dict is circular-capable (was tracked)
-                    if obj_id in self.seen_objects:
-                        result["__object_id__"] = obj_id
-                        self._all_object_ids.add(obj_id)
-                    return result
-                
-                elif isinstance(obj, list):
-                    # recursively serialize list items
-                    # lists come out as plain lists (not wrapped) unless they have circular refs
-                    serialized_items = [
-                        self._serialize_recursive(item)
-                        for item in obj
-                    ]
-                    # if list is circular-capable, wrap it with metadata
-                    if obj_id in self.seen_objects:
-                        self._all_object_ids.add(obj_id)
-                        return {
-                            "__cucumber_type__": "list",
-                            "items": serialized_items,
-                            "__object_id__": obj_id,
-                        }
-                    return serialized_items
-                
-                elif isinstance(obj, tuple):
-                    # namedtuples are tuple subclasses — skip inline path
-                    # so they fall through to the handler dispatch below,
-                    # preserving field names and class info
-                    if not (hasattr(type(obj), '_fields') and hasattr(type(obj), '_make')):
-                        # plain tuple: recursively serialize items
-                        serialized_items = [
-                            self._serialize_recursive(item)
-                            for item in obj
-                        ]
-                        result = {
-                            "__cucumber_type__": "tuple",
-                            "items": serialized_items,
-                        }
-                        # add object_id if this tuple is circular-capable (was tracked)
-                        if obj_id in self.seen_objects:
-                            result["__object_id__"] = obj_id
-                            self._all_object_ids.add(obj_id)
-                        return result
-                
-                elif isinstance(obj, set):
-                    # recursively serialize set items
-                    serialized_items = [
-                        self._serialize_recursive(item)
-                        for item in obj
-                    ]
-                    result = {
-                        "__cucumber_type__": "set",
-                        "items": serialized_items,
-                    }
-                    # add object_id if this set is circular-capable (was tracked)
-                    if obj_id in self.seen_objects:
-                        result["__object_id__"] = obj_id
-                        self._all_object_ids.add(obj_id)
-                    return result
-                
-                elif isinstance(obj, frozenset):
-                    # recursively serialize frozenset items
-                    serialized_items = [
-                        self._serialize_recursive(item)
-                        for item in obj
-                    ]
-                    result = {
-                        "__cucumber_type__": "frozenset",
-                        "items": serialized_items,
-                    }
-                    # add object_id if this frozenset is circular-capable (was tracked)
-                    if obj_id in self.seen_objects:
-                        result["__object_id__"] = obj_id
-                        self._all_object_ids.add(obj_id)
-                    return result
-                
-                # other pickle-native types (datetime, UUID, Decimal, Path, etc.)
-                # these implement __reduce__ properly
-                # BUT: if they're circular-capable and were seen, we need to track their ID
-                else:
-                    # check if this object needs an __object_id__ (is in seen_objects)
-                    if obj_id in self.seen_objects:
-                        # Wrap with metadata to include __object_id__
-                        self._all_object_ids.add(obj_id)
-                        return {
-                            "__cucumber_type__": "pickle_native",
-                            "__object_id__": obj_id,
-                            "value": obj,
-                        }
-                    else:
-                        # no circular refs, return as-is
-                        return obj
-            
-            # check for simple instance fast path
-            if self._is_simple_instance(obj):
+        if kind == _PLAN_LIST or kind == _PLAN_COLLECTION:
+            # list, tuple, set and frozenset share one encoder - only the type tag differs
+            self._all_object_ids.add(obj_id)
+            
+            # lists and tuples of same-layout simple instances go column by column
+            if len(obj) >= MIN_ROWS and (kind == _PLAN_LIST or plan.type_name == "tuple"):
+                node = self._serialize_columnar(obj, obj_id, kind)
+                if node is not None:
+                    return node
+            
+            items: List[Any] = []
+            node = {
+                "__cucumber_type__": "list" if kind == _PLAN_LIST else plan.type_name,
+                "items": items,
+                "__object_id__": obj_id,
+            }
+            if self._canonical and plan.type_name in ("set", "frozenset"):
+                return _Frame(kind, node, items, iter(sorted(obj, key=self._canonical_key)), obj)
+            return _Frame(kind, node, items, iter(obj), obj)
+        
+        if kind == _PLAN_WRAPPED_NATIVE:
+            # pickle-native values (datetime, UUID, Path, Counter, range, ...)
+            # wrapped so they carry an __object_id__ for circular refs
+            self._all_object_ids.add(obj_id)
+            if self._canonical and isinstance(obj, _UNORDERED_DICTS):
+                obj = self._canonical_dict_copy(obj)
+            return {
+                "__cucumber_type__": "pickle_native",
+                "__object_id__": obj_id,
+                "value": obj,
+            }
+        
+        if kind == _PLAN_INSTANCE:
+            # type already passed the simple instance checks, 
+            # only the attr values need to be checked per object
+            if self._has_primitive_attrs(obj) and not self._has_oob_bytes(obj.__dict__.values()):
                 if self.verbose:
-                    indent = "  " * min(self._serialization_depth, 5)
+                    indent = "  " * min(self._depth(), 5)
                     print(f"{indent}    ↳ Simple instance fast path")
-                # register object for circular reference support
-                self.seen_objects[obj_id] = obj
                 self._all_object_ids.add(obj_id)
+                # direct copy of primitive attrs
+                attrs = obj.__dict__ if not self._canonical else self._sorted_items(obj.__dict__)
                 return {
                     "__cucumber_type__": "simple_class_instance",
                     "__object_id__": obj_id,
-                    "module": type(obj).__module__,
-                    "qualname": type(obj).__qualname__,
-                    "attrs": dict(obj.__dict__),  # direct copy of primitive attrs
+                    "module": plan.module,
+                    "qualname": plan.qualname,
+                    "attrs": dict(attrs),
                 }
-            
-            # check for pickle-native function fast path
+        
+        elif kind == _PLAN_FUNCTION:
             # functions that can be imported by reference don't need cucumber overhead
             # just let pickle handle them with its efficient GLOBAL opcode
             if self._is_pickle_native_function(obj):
                 if self.verbose:
-                    indent = "  " * min(self._serialization_depth, 5)
+                    indent = "  " * min(self._depth(), 5)
                     print(f"{indent}    ↳ Pickle-native function (reference)")
-                # register object for circular reference support
-                self.seen_objects[obj_id] = obj
                 self._all_object_ids.add(obj_id)
                 # wrap in IR with object_id so deserializer can register it
                 return {
@@ -469,84 +942,401 @@ class Serializer:
                     "__object_id__": obj_id,
                     "value": obj,
                 }
-            
-            # find handler for complex object
-            handler = self._find_handler(obj)
-            
-            if handler is None:
-                # no handler found - try pickle as last resort
-                try:
-                    pickle.dumps(obj)
-                    # if we get here, pickle can handle it
-                    if self.verbose:
-                        indent = "  " * min(self._serialization_depth, 5)
-                        print(f"{indent}    ↳ Pickle native (no handler)")
-                    
-                    # check if it needs __object_id__ (for circular refs)
-                    if obj_id in self.seen_objects:
-                        self._all_object_ids.add(obj_id)
-                        return {
-                            "__cucumber_type__": "pickle_native",
-                            "__object_id__": obj_id,
-                            "value": obj,
-                        }
-                    
-                    return obj
-                except Exception as pickle_err:
-                    path_str = " -> ".join(self._object_path)
-                    raise SerializationError(
-                        f"\n{'='*70}\n"
-                        f"NO HANDLER FOUND\n"
-                        f"{'='*70}\n"
-                        f"Path: {path_str}\n"
-                        f"Type: {type(obj).__name__}\n"
-                        f"Module: {type(obj).__module__}\n"
-                        f"\nNo cucumber handler exists for this type,\n"
-                        f"and base pickle cannot serialize it either.\n"
-                        f"\nPickle error: {pickle_err}\n"
-                        f"{'='*70}"
-                    ) from pickle_err
-            
-            if self.verbose:
-                indent = "  " * min(self._serialization_depth, 5)
-                print(f"{indent}    ↳ Handler: {handler.__class__.__name__}")
-            
-            # use handler to extract state
-            try:
-                state = handler.extract_state(obj)
-            except Exception as e:
-                path_str = " -> ".join(self._object_path)
+        
+        # handler for complex object (found once when the plan was compiled)
+        handler = plan.handler
+        
+        if handler is None:
+            # no handler found - try pickle as last resort
+            # (probed once per type - later objects of the type reuse the answer)
+            pickle_err = None
+            if plan.picklable is None:
+                pickle_err = self._probe_pickle(obj, plan)
+            if not plan.picklable:
+                path_str = self._breadcrumbs(obj)
                 raise SerializationError(
                     f"\n{'='*70}\n"
-                    f"HANDLER FAILED\n"
+                    f"NO HANDLER FOUND\n"
                     f"{'='*70}\n"
                     f"Path: {path_str}\n"
-                    f"Handler: {handler.__class__.__name__}\n"
-                    f"Object: {type(obj).__name__}\n"
-                    f"\nThe handler failed to extract state from this object.\n"
-                    f"\nError: {e}\n"
+                    f"Type: {type(obj).__name__}\n"
+                    f"Module: {type(obj).__module__}\n"
+                    f"\nNo cucumber handler exists for this type,\n"
+                    f"and base pickle cannot serialize it either.\n"
+                    f"\nPickle error: {plan.pickle_error}\n"
                     f"{'='*70}"
-                ) from e
+                ) from pickle_err
             
-            # RECURSIVELY serialize the extracted state
-            # this is critical - the handler returns state that may contain complex objects
-            serialized_state = self._serialize_recursive(state)
+            # if we get here, pickle can handle it
+            if self.verbose:
+                indent = "  " * min(self._depth(), 5)
+                print(f"{indent}    ↳ Pickle native (no handler)")
             
-            # wrap in metadata
-            # ALWAYS include object_id for handler objects - keeps things simple and consistent
             self._all_object_ids.add(obj_id)
             return {
-                "__cucumber_type__": handler.type_name,
-                "__handler__": handler.__class__.__name__,
+                "__cucumber_type__": "pickle_native",
                 "__object_id__": obj_id,
-                "state": serialized_state,
+                "value": obj,
             }
         
-        finally:
-            # always clean up tracking state when exiting
-            self._serialization_depth -= 1
-            if self._object_path:
-                self._object_path.pop()
+        # definitions a Session already sent are referenced by session id
+        session = self._session
+        if session is not None and plan.type_name in _SESSION_TYPES:
+            entry = session.objects.get(obj_id)
+            if entry is not None:
+                self._all_object_ids.add(obj_id)
+                return {
+                    "__cucumber_type__": "session_ref",
+                    "__session_id__": entry[0],
+                    "__object_id__": obj_id,
+                }
+        
+        if self.verbose:
+            indent = "  " * min(self._depth(), 5)
+            print(f"{indent}    ↳ Handler: {plan.handler_name}")
+        
+        # use handler to extract state
+        # (same-host mode: a reference instead, if the handler can give one for this object)
+        profiles = self._profiles
+        if profiles:
+            start = time.perf_counter()
+        try:
+            state = None
+            if self._same_host:
+                extract_reference = getattr(handler, "extract_reference", None)
+                if extract_reference is not None:
+                    state = extract_reference(obj)
+            if state is None:
+                state = handler.extract_state(obj)
+        except Exception as e:
+            path_str = self._breadcrumbs(obj)
+            raise SerializationError(
+                f"\n{'='*70}\n"
+                f"HANDLER FAILED\n"
+                f"{'='*70}\n"
+                f"Path: {path_str}\n"
+                f"Handler: {plan.handler_name}\n"
+                f"Object: {type(obj).__name__}\n"
+                f"\nThe handler failed to extract state from this object.\n"
+                f"\nError: {e}\n"
+                f"{'='*70}"
+            ) from e
+        
+        if profiles:
+            elapsed = time.perf_counter() - start
+            for profile in profiles:
+                profile.record_extract(plan.handler_name, type(obj), elapsed)
+        
+        # the extracted state is serialized as this node's only child
+        # this is critical - the handler returns state that may contain complex objects
+        # ALWAYS include object_id for handler objects - keeps things simple and consistent
+        self._all_object_ids.add(obj_id)
+        node = {
+            "__cucumber_type__": plan.type_name,
+            "__handler__": plan.handler_name,
+            "__object_id__": obj_id,
+            "state": None,
+        }
+        if session is not None:
+            if plan.type_name in _SESSION_TYPES:
+                node["__session_id__"] = session.add_object(obj)
+            elif type(state) is dict and "class_definition" in state:
+                state["class_definition"] = self._session_class_definition(
+                    type(obj), state["class_definition"]
+                )
+        elif type(state) is dict and plan.handler_name == "ClassInstanceHandler":
+            # __main__ and local classes carry their definition - only the
+            # first instance of each class sends it, the rest are references
+            _share_class_fields(type(obj), state, self._class_fields)
+        return _Frame(_PLAN_HANDLER, node, [], iter((state,)), obj)
+    
+    def _probe_pickle(self, obj: Any, plan: "_TypePlan") -> Optional[Exception]:
+        """
+        Check whether pickle can serialize a type with no handler.
+        
+        The answer is cached on the type's plan, so only the first object
+        of a type is pickled twice (here, and again with the IR). Types
+        that get here are ones no handler claims - mostly C-level value
+        types, whose picklability doesn't depend on the instance.
+        
+        Returns:
+            The pickle error, or None if the object pickled
+        """
+        profiles = self._profiles
+        if profiles:
+            start = time.perf_counter()
+        error = None
+        try:
+            pickle.dumps(obj)
+            plan.picklable = True
+        except Exception as e:
+            plan.picklable = False
+            plan.pickle_error = str(e)
+            error = e
+        if profiles:
+            elapsed = time.perf_counter() - start
+            for profile in profiles:
+                profile.record_fallback(type(obj), elapsed, error is not None)
+        return error
+    
+    def _forget_picklable(self) -> None:
+        """
+        Re-probe types cached as picklable on the next call.
+        
+        Called when pickling a finished IR fails - one of those types may
+        not have been picklable for every instance after all.
+        """
+        for plan in self._plan_cache.values():
+            if plan.picklable:
+                plan.picklable = None
+    
+    def _session_class_definition(self, cls: type, definition: Any) -> Any:
+        """
+        Swap an instance's class definition for a _SessionEntry.
+        
+        The first instance of a class sends the definition, later ones (in
+        this message or later messages) only send its session id.
+        """
+        session = self._session
+        session_id = session.classes.get(cls)
+        if session_id is None:
+            session_id = session.add_class(cls)
+            session.open.add(session_id)
+            return _SessionEntry(session_id, definition)
+        if session_id in session.open:
+            # definition hasn't been written out yet (we're inside it), so the
+            # receiver won't have it in time - send this copy inline
+            return definition
+        return _SessionEntry(session_id, None)
+    
+    def _visit_session_entry(self, entry: "_SessionEntry") -> Any:
+        """Serialize a _SessionEntry - a reference, or a definition to send once."""
+        if entry.value is None:
+            return {
+                "__cucumber_type__": "session_ref",
+                "__session_id__": entry.session_id,
+                "__object_id__": None,
+            }
+        
+        node = {
+            "__cucumber_type__": "session_def",
+            "__session_id__": entry.session_id,
+            "value": None,
+        }
+        return _Frame(_PLAN_SESSION, node, [], iter((entry.value,)), entry)
+    
+    def _depth(self) -> int:
+        """Nesting depth of the object being visited (the root is 1)."""
+        return len(self._stack) + 1
+    
+    def _breadcrumb_names(self, obj: Any = _NO_OBJECT) -> List[str]:
+        """
+        Names along the path from the root to obj.
+        
+        Built from the open frames on demand, so serializing doesn't
+        have to keep a path up to date for every object it visits.
+        """
+        path = [frame.obj for frame in self._stack]
+        if obj is not _NO_OBJECT:
+            path.append(obj)
+        names = []
+        for item in path:
+            if type(item) is _SessionEntry:
+                names.append("class_definition")
+                continue
+            name = type(item).__name__
+            if self.debug:
+                name += f"@{id(item)}"
+            names.append(name)
+        return names
+    
+    def _breadcrumbs(self, obj: Any = _NO_OBJECT) -> str:
+        """Path from the root to obj, for error messages."""
+        return " -> ".join(self._breadcrumb_names(obj)) or "root"
+    
+    def _print_path(self, obj: Any) -> None:
+        """Print the path to the object being visited, for verbose mode."""
+        # show path context with color-coded levels
+        # take last 6 levels, truncate each to 10 chars, color code
+        object_path = self._breadcrumb_names(obj)
+        path_levels = object_path[-6:]
+        
+        # color codes: red -> orange -> yellow -> green -> blue -> purple
+        # colors cycle based on actual depth, so depth 1,7,13 = red, 2,8,14 = orange, etc.
+        colors = [
+            "\033[91m",      # red (depths 1, 7, 13, ...)
+            "\033[38;5;208m", # orange (depths 2, 8, 14, ...)
+            "\033[93m",      # yellow (depths 3, 9, 15, ...)
+            "\033[92m",      # green (depths 4, 10, 16, ...)
+            "\033[94m",      # blue (depths 5, 11, 17, ...)
+            "\033[95m",      # magenta/purple (depths 6, 12, 18, ...)
+        ]
+        reset = "\033[0m"
+        
+        # build colored path string
+        colored_parts = []
+        # calculate actual depth for each displayed level
+        total_levels = len(object_path)
+        start_depth = total_levels - len(path_levels)  # depth of first displayed level
+        
+        for i, level in enumerate(path_levels):
+            # truncate to 10 chars
+            truncated = level[:10] if len(level) > 10 else level
+            # color based on actual depth (1-indexed, so depth 1 = colors[0])
+            actual_depth = start_depth + i + 1
+            color = colors[(actual_depth - 1) % 6]
+            colored_parts.append(f"{color}{truncated}{reset}")
+        
+        path_str = " → ".join(colored_parts)
+        if len(object_path) > 6:
+            path_str = "... → " + path_str
+        
+        depth = self._depth()
+        indent = "  " * min(depth, 5)  # cap indent at 5 levels
+        print(f"{indent}[{depth}] {path_str}")
+    
+
+    def _has_oob_bytes(self, values: Any) -> bool:
+        """Check if any value is a bytes object serialize_oob() should keep out of band."""
+        threshold = self._oob_threshold
+        if threshold is None:
+            return False
+        for value in values:
+            if type(value) is bytes and len(value) >= threshold:
+                return True
+        return False
+    
+    def _serialize_buffer(self, obj: Any, kind: str) -> Optional[Dict[str, Any]]:
+        """
+        Wrap a large contiguous buffer in a PickleBuffer for out-of-band transfer.
+        
+        Returns None if the buffer is too small or can't be exposed without
+        a copy (non-contiguous memoryviews), so the normal path handles it.
+        """
+        node = self._oob_nodes.get(id(obj))
+        if node is not None:
+            # same buffer again - reuse the node so pickle only emits it once
+            return node
+        try:
+            view = memoryview(obj)
+        except TypeError:
+            return None
+        if not view.contiguous or view.nbytes < self._oob_threshold:
+            return None
+        node = {
+            "__cucumber_type__": "buffer",
+            "kind": kind,
+            "data": pickle.PickleBuffer(obj),
+        }
+        self._oob_nodes[id(obj)] = node
+        return node
+    
+    def _compile_plan(self, obj: Any) -> "_TypePlan":
+        """
+        Classify an object's type once and cache the result.
+        
+        Runs the same checks that used to run for every
+        object (pickle-native, simple instance, function, handler lookup),
+        in the same order, and stores the outcome keyed by type(obj).
+        
+        Checks that depend on the object's values (primitive attrs for
+        simple instances, reference-ability for functions) are still
+        done per object - the plan just records that they are needed.
+        
+        Args:
+            obj: Sample object of the type to compile a plan for
+            
+        Returns:
+            _TypePlan for type(obj)
+        """
+        import types
+        
+        obj_type = type(obj)
+        plan = _TypePlan()
+        
+        # handlers added with register_handler() go ahead of the checks below,
+        # so they can take over instances, collection subclasses, etc.
+        priority_handler = find_priority_handler(self._registry, obj)
+        
+        if obj_type is _SessionEntry:
+            plan.kind = _PLAN_SESSION
+            plan.track = False
+        
+        elif priority_handler is not None:
+            plan.kind = _PLAN_HANDLER
+            plan.handler = priority_handler
+            plan.handler_name = priority_handler.__class__.__name__
+            plan.type_name = priority_handler.type_name
+        
+        elif isinstance(obj, (complex, bytearray)):
+            # immutable / leaf-only primitives
+            plan.kind = _PLAN_NATIVE
+            plan.track = False
+            if obj_type is bytearray:
+                plan.buffer_kind = "bytearray"
+        
+        elif obj_type is pickle.PickleBuffer:
+            # raw buffers from handlers (array / ndarray data) - pickled in band
+            # as bytes or bytearray, sent out of band by serialize_oob()
+            plan.kind = _PLAN_NATIVE
+            plan.track = False
+            plan.buffer_kind = "memoryview"
+        
+        elif obj is Ellipsis or obj is NotImplemented or isinstance(obj, (range, slice)):
+            plan.kind = _PLAN_WRAPPED_NATIVE
+        
+        # special collection types first (Counter, defaultdict, etc.)
+        # these are dict/list subclasses but pickle handles them correctly
+        elif self._is_special_pickle_native(obj):
+            plan.kind = _PLAN_WRAPPED_NATIVE
+        
+        elif isinstance(obj, dict):
+            plan.kind = _PLAN_DICT
+        
+        elif isinstance(obj, list):
+            plan.kind = _PLAN_LIST
+        
+        # namedtuples are tuple subclasses — they skip the inline path
+        # so they get handler dispatch, preserving field names and class info
+        elif isinstance(obj, tuple) and not (hasattr(obj_type, '_fields') and hasattr(obj_type, '_make')):
+            plan.kind = _PLAN_COLLECTION
+            plan.type_name = "tuple"
+        
+        elif isinstance(obj, set):
+            plan.kind = _PLAN_COLLECTION
+            plan.type_name = "set"
+        
+        elif isinstance(obj, frozenset):
+            plan.kind = _PLAN_COLLECTION
+            plan.type_name = "frozenset"
+        
+        # other pickle-native types (datetime, UUID, Decimal, Path, etc.)
+        elif self._is_pickle_native(obj) and not isinstance(obj, tuple):
+            plan.kind = _PLAN_WRAPPED_NATIVE
+        
+        else:
+            if self._is_simple_instance_type(obj):
+                plan.kind = _PLAN_INSTANCE
+                plan.module = obj_type.__module__
+                plan.qualname = obj_type.__qualname__
+            elif isinstance(obj, types.FunctionType):
+                plan.kind = _PLAN_FUNCTION
+            else:
+                plan.kind = _PLAN_HANDLER
+            
+            if obj_type is memoryview:
+                plan.buffer_kind = "memoryview"
+            
+            # simple instances and functions still need a handler
+            # when the per-object fast path check fails
+            handler = self._find_handler(obj)
+            if handler is not None:
+                plan.handler = handler
+                plan.handler_name = handler.__class__.__name__
+                plan.type_name = handler.type_name
+        
+        self._plan_cache[obj_type] = plan
+        return plan
     
     def _is_special_pickle_native(self, obj: Any) -> bool:
         """
@@ -636,31 +1426,6 @@ class Serializer:
         
         return False
     
-    def _is_circular_capable(self, obj: Any) -> bool:
-        """
-        Check if object can participate in circular references.
-        
-        Returns False for immutable primitives (int, str, etc).
-        Returns True for collections and class instances.
-        
-        Args:
-            obj: Object to check
-            
-        Returns:
-            bool: True if object needs circular reference tracking
-        """
-        # primitives never participate in circular references
-        if isinstance(obj, (type(None), bool, int, float, complex, str, bytes)):
-            return False
-        
-        # immutable collections need tracking (can contain circular refs)
-        if isinstance(obj, (tuple, frozenset)):
-            return True
-        
-        # everything else might have circular refs
-        # (mutable collections, class instances, etc.)
-        return True
-    
     # primitive types that can be directly copied without recursion
     _PRIMITIVE_TYPES = (type(None), bool, int, float, str, bytes)
     
@@ -705,9 +1470,17 @@ class Serializer:
         Returns:
             bool: True if simple instance eligible for fast path
         """
+        return self._is_simple_instance_type(obj) and self._has_primitive_attrs(obj)
+    
+    def _is_simple_instance_type(self, obj: Any) -> bool:
+        """
+        Type-level part of the simple instance check.
+        
+        Everything except the attr values is decided by the object's class,
+        so this only runs once per type when a plan is compiled.
+        """
         import types
         import functools
-        import sys
         
         obj_class = type(obj)
         module_name = obj_class.__module__
@@ -758,7 +1531,12 @@ class Serializer:
         if hasattr(obj, '__serialize__'):
             return False
         
-        # all attrs must be primitives
+        return True
+    
+    def _has_primitive_attrs(self, obj: Any) -> bool:
+        """
+        Per-object part of the simple instance check: all attrs are primitives.
+        """
         try:
             obj_dict = obj.__dict__
             if not isinstance(obj_dict, dict):
@@ -818,14 +1596,9 @@ class Serializer:
             return False
         
         # verify we can actually look it up and get the same function
+        # (qualname can name a class method like MyClass.method)
         try:
-            import importlib
-            module = importlib.import_module(module_name)
-            
-            # navigate qualname (handles class methods like MyClass.method)
-            looked_up = module
-            for part in qualname.split('.'):
-                looked_up = getattr(looked_up, part)
+            looked_up = resolve(module_name, qualname)
             
             # must be the exact same function object
             if looked_up is not obj:
@@ -836,35 +1609,189 @@ class Serializer:
         
         return True
     
-    def _serialize_simple_instance(self, obj: Any) -> dict:
+    def _serialize_columnar(self, obj: Any, obj_id: int, kind: int) -> Optional[Dict[str, Any]]:
+        """
+        Serialize a list or tuple of simple instances as columns.
+        
+        Only used when every item is a simple instance of the same class,
+        with the same attribute names in the same order and only primitive
+        attribute values, and no item has been serialized before (or appears
+        twice). Otherwise returns None and the items are serialized one by one.
+        
+        Format: {
+            "__cucumber_type__": "instance_columns",
+            "__object_id__": <id>,
+            "container": "list" or "tuple",
+            "module": "...",
+            "qualname": "...",
+            "names": [attr names],
+            "columns": [one column of values per attr],
+            "refs": [(row, <id>), ...]  # rows referenced elsewhere in the IR
+        }
+        
+        Int, float and bool columns are packed into array buffers (see columnar.py).
         """
-        Serialize a simple instance using flat IR format.
+        layout = self._columnar_layout(obj, self.seen_objects.keys())
+        if layout is None:
+            return None
+        plan, names, row_ids, columns = layout
+        cls = type(obj[0])
         
-        Fast path that skips:
-        - Circular reference tracking (primitives can't have circular refs)
-        - Recursive serialization (attrs are all primitives)
-        - Handler lookup (we know how to handle it)
+        for index, column in enumerate(columns):
+            if self._has_oob_bytes(column):
+                return None
+            columns[index] = pack_column(column)
+        
+        if self.verbose:
+            indent = "  " * min(self._depth(), 5)
+            print(f"{indent}    ↳ Columnar {cls.__name__} list ({len(row_ids)} rows)")
+        
+        self.seen_objects.update(zip(row_ids, obj))
+        self._all_object_ids.update(row_ids)
+        
+        node = {
+            "__cucumber_type__": "instance_columns",
+            "__object_id__": obj_id,
+            "container": "list" if kind == _PLAN_LIST else "tuple",
+            "module": plan.module,
+            "qualname": plan.qualname,
+            "names": list(names),
+            "columns": columns,
+            "refs": [],
+        }
+        self._columnar_nodes.append((node, row_ids))
+        return node
+    
+    def _columnar_layout(
+        self, obj: Any, seen: Any
+    ) -> Optional[Tuple["_TypePlan", Tuple[str, ...], List[int], List[List[Any]]]]:
+        """
+        Check whether a list or tuple can be written as columns.
+        
+        Shared by _serialize_columnar() and the size estimator. `seen` holds
+        the ids of objects already written - rows among them can't be columns.
         
-        Args:
-            obj: Simple instance to serialize
-            
         Returns:
-            Flat IR dict
+            (plan, names, row_ids, columns) with one unpacked column of
+            values per attr, or None if the items must be written one by one
         """
-        obj_class = type(obj)
-        return {
-            "__cucumber_type__": "simple_class_instance",
-            "module": obj_class.__module__,
-            "qualname": obj_class.__qualname__,
-            "attrs": dict(obj.__dict__),  # direct copy - all primitives
-        }
+        first = obj[0]
+        cls = type(first)
+        if cls in self._PRIMITIVE_TYPES:
+            return None
+        plan = self._plan_cache.get(cls)
+        if plan is None:
+            plan = self._compile_plan(first)
+        if plan.kind != _PLAN_INSTANCE:
+            return None
+        
+        names = tuple(first.__dict__)
+        if not names:
+            return None
+        
+        # checks run over the whole list at once (map() keeps the loops in C)
+        if set(map(type, obj)) != {cls}:
+            return None
+        item_dicts = list(map(_get_dict, obj))
+        if not self._canonical:
+            if set(map(tuple, item_dicts)) != {names}:
+                return None
+        else:
+            # attribute order doesn't count in a canonical encoding
+            names = tuple(sorted(names, key=self._canonical_key))
+            if set(map(frozenset, item_dicts)) != {frozenset(names)}:
+                return None
+        
+        # every row gets its own object - shared or already serialized items can't
+        row_ids = list(map(id, obj))
+        if len(set(row_ids)) != len(row_ids) or not seen.isdisjoint(row_ids):
+            return None
+        
+        columns = []
+        primitive_types = self._PRIMITIVE_TYPES
+        for name in names:
+            column = list(map(operator.itemgetter(name), item_dicts))
+            if not all(issubclass(value_type, primitive_types) for value_type in set(map(type, column))):
+                return None
+            columns.append(column)
+        return plan, names, row_ids, columns
+    
+    def _canonical_dict_copy(self, d: dict) -> dict:
+        """
+        Copy of a pickle-native dict subclass with its items in canonical key order.
+        
+        Counter and defaultdict compare equal whatever order they were
+        filled in, but pickle writes their items in insertion order.
+        Values are pickled as they are.
+        """
+        ordered = copy.copy(d)
+        dict.clear(ordered)
+        for key, value in self._sorted_items(d):
+            dict.__setitem__(ordered, key, value)
+        return ordered
+    
+    def _sorted_items(self, d: dict) -> List[Tuple[Any, Any]]:
+        """Dict items in canonical key order."""
+        canonical_key = self._canonical_key
+        return sorted(d.items(), key=lambda item: canonical_key(item[0]))
+    
+    def _canonical_key(self, value: Any) -> Tuple[Any, ...]:
+        """
+        Sort key for dict keys and set items in canonical mode.
+        
+        Keys of different kinds never get compared to each other: the first
+        element ranks the kind. Primitives, tuples and frozensets sort by
+        value, anything else by its own canonical encoding.
+        """
+        value_type = type(value)
+        if value is None:
+            return (0,)
+        if value_type is bool:
+            return (1, value)
+        if value_type is int or value_type is float:
+            return (2, value)
+        if value_type is str:
+            return (3, value)
+        if value_type is bytes:
+            return (4, value)
+        if value_type is tuple:
+            return (5, tuple(map(self._canonical_key, value)))
+        if value_type is frozenset:
+            return (6, tuple(sorted(map(self._canonical_key, value))))
+        # serialized on its own, so it doesn't disturb this serializer's state
+        key_serializer = self._key_serializer
+        if key_serializer is None:
+            key_serializer = self._key_serializer = Serializer()
+        encoding = key_serializer.serialize_canonical(value)
+        return (7, value_type.__module__, value_type.__qualname__, encoding)
+    
+    def _link_columnar_rows(self, ir: Any) -> Any:
+        """
+        Record which columnar rows are referenced elsewhere, once the IR is built.
+        
+        References to a row always come after its columnar node, so the full
+        set of referenced ids is only known at the end.
+        """
+        if self._columnar_nodes:
+            referenced = self._all_circular_refs
+            for node, row_ids in self._columnar_nodes:
+                node["refs"] = [
+                    (row, row_id) for row, row_id in enumerate(row_ids) if row_id in referenced
+                ]
+            self._columnar_nodes = []
+        return ir
+    
+    @property
+    def handlers(self) -> List[Any]:
+        """Handlers in lookup order."""
+        return self._registry.handlers
     
     def _find_handler(self, obj: Any) -> Optional[Any]:
         """
         Find appropriate handler for object.
         
         Uses type-based caching to avoid repeated lookups.
-        Cache persists across serialize() calls since handlers are static.
+        Cache persists across serialize() calls until the registry changes.
         
         Args:
             obj: Object to find handler for
@@ -897,20 +1824,39 @@ class Serializer:
         Returns:
             Handler instance or None
         """
+        registry = self._registry
+        
+        # handlers registered for this exact type (or a base class)
+        handler = registry.for_type(type(obj))
+        if handler is not None:
+            return handler
+        
         # try each handler in order
         # order matters - specific handlers come before general ones
-        for handler in self.handlers:
+        fallbacks = registry.fallback_handlers
+        primary = registry.handlers[:len(registry.handlers) - len(fallbacks)]
+        handler = self._first_can_handle(primary, obj)
+        if handler is not None:
+            return handler
+        
+        # negative priorities only once the built-ins have all passed
+        handler = registry.fallback_for_type(type(obj))
+        if handler is not None:
+            return handler
+        return self._first_can_handle(fallbacks, obj)
+    
+    def _first_can_handle(self, handlers: List[Any], obj: Any) -> Optional[Any]:
+        """First handler whose can_handle() accepts obj."""
+        for handler in handlers:
             try:
                 if handler.can_handle(obj):
                     return handler
             except Exception as e:
                 # handler's can_handle() raised exception
                 if self.debug:
-                    print(f"  {'  ' * self._serialization_depth}Handler {handler.__class__.__name__}.can_handle() raised: {e}")
+                    print(f"  {'  ' * self._depth()}Handler {handler.__class__.__name__}.can_handle() raised: {e}")
                 # skip this handler and continue
                 continue
-        
-        # no handler found
         return None
 
 
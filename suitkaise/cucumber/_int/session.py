@@ -0,0 +1,158 @@
+"""
+Session-scoped serialization for cucumber.
+
+serialize() starts from scratch for every call, so a stream of messages
+that all carry the same class, function or module re-sends its definition
+every time. A Session keeps a table of what it already sent:
+
+- definitions (classes, functions, code objects, modules, and the class
+  definitions of __main__ / locally-defined class instances) are sent once
+  with a session id, and later messages send only the id
+- in the compact format, the string table (attribute names, handler names,
+  qualnames, ...) carries over from message to message
+
+The receiving Session keeps the matching table of what it received, so
+messages have to be deserialized in the order they were serialized, each
+exactly once. Use one Session per direction of a point-to-point channel.
+
+Definitions are assumed not to change once sent: if a class attribute or
+a function's defaults are changed after the first message that carried
+them, later messages still refer to the version the receiver already has.
+"""
+
+import pickle
+import threading
+from typing import Any, Dict, List
+
+from . import compact
+from .serializer import Serializer, SerializationError, WIRE_FORMATS, _SessionTable
+from .deserializer import Deserializer, DeserializationError
+
+
+class Session:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+
+        # sender
+        tx = cucumber.Session()
+        data = tx.serialize(obj)
+
+        # receiver
+        rx = cucumber.Session()
+        obj = rx.deserialize(data)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Paired encoder/decoder that sends each definition once per session.
+
+    Classes, functions, code objects and modules (including the class
+    definitions of __main__ and locally-defined class instances) are sent
+    in full the first time, and by session id in every later message.
+    With the compact format, strings are also only sent once.
+
+    The sending side calls serialize(), the receiving side calls
+    deserialize() on its own Session, in the same order. A single Session
+    can do both - the outgoing and incoming tables are separate.
+
+    A Session only works between one sender and one receiver. Channels
+    where several processes read from the same queue (like Pool's task
+    queue) need plain serialize()/deserialize().
+    """
+
+    def __init__(self, format: str = "compact", debug: bool = False, verbose: bool = False):
+        """
+        Args:
+            format: Wire format - "compact" (default, also shares the string
+                table across messages) or "pickle"
+            debug: Enable debug mode (more detailed error messages)
+            verbose: Enable verbose mode (print progress)
+        """
+        if format not in WIRE_FORMATS:
+            raise ValueError(
+                f"Unknown format {format!r}, expected one of: {', '.join(WIRE_FORMATS)}"
+            )
+        self.format = format
+
+        # outgoing: definitions sent and compact strings written so far
+        self._serializer = Serializer(debug=debug, verbose=verbose)
+        self._sent = _SessionTable()
+        self._serializer._session = self._sent
+        self._sent_strings: Dict[str, int] = {}
+        self._send_lock = threading.Lock()
+
+        # incoming: definitions received and compact strings read so far
+        self._deserializer = Deserializer(debug=debug, verbose=verbose)
+        self._received: Dict[int, Any] = {}
+        self._deserializer._session_objects = self._received
+        self._received_strings: List[str] = []
+        self._receive_lock = threading.Lock()
+
+    def serialize(self, obj: Any) -> bytes:
+        """
+        Serialize an object as the next message of this session.
+
+        Args:
+            obj: Object to serialize
+
+        Returns:
+            bytes: Serialized message (only the peer Session can read it)
+
+        Raises:
+            SerializationError: If serialization fails - the session is
+                left as it was, so the next message can still be sent
+        """
+        with self._send_lock:
+            strings_before = len(self._sent_strings)
+            try:
+                data = self._encode(obj)
+            except BaseException:
+                # the peer never sees this message, so forget what it would have sent
+                self._sent.rollback()
+                while len(self._sent_strings) > strings_before:
+                    self._sent_strings.popitem()
+                raise
+            self._sent.commit()
+            return data
+
+    def deserialize(self, data: bytes) -> Any:
+        """
+        Deserialize the next message produced by the peer Session.
+
+        Args:
+            data: Bytes from the peer's serialize()
+
+        Returns:
+            Reconstructed Python object
+
+        Raises:
+            DeserializationError: If reconstruction fails, or the message
+                refers to a definition this session never received
+        """
+        with self._receive_lock:
+            try:
+                if compact.is_compact(data):
+                    ir = compact.decode(data, self._received_strings)
+                else:
+                    ir = pickle.loads(data)
+            except Exception as e:
+                raise DeserializationError(f"Failed to deserialize: {e}") from e
+            return self._deserializer.deserialize_ir(ir)
+
+    def _encode(self, obj: Any) -> bytes:
+        """Build the IR and write it in the session's format."""
+        serializer = self._serializer
+        ir = serializer.serialize_ir(obj)
+
+        # same deep-IR fallback as Serializer.serialize()
+        if self.format == "compact" or not serializer._fits_pickle():
+            try:
+                return compact.encode(ir, self._sent_strings)
+            except Exception as e:
+                raise SerializationError(f"Compact encoding failed: {e}") from e
+        try:
+            return pickle.dumps(ir, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            serializer._forget_picklable()
+            raise SerializationError(f"Pickling the IR failed: {e}") from e
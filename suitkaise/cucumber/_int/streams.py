@@ -0,0 +1,114 @@
+"""
+File-like object helpers for cucumber's dump()/load() and record streams.
+
+Record streams (iter_dump()/iter_load()) are a sequence of frames:
+
+    [8 byte little-endian payload length][payload]
+
+where each payload is one serialize() output, in either wire format.
+A stream that ends exactly on a frame boundary is complete; one that ends
+inside a frame is truncated.
+
+Batches (serialize_many()/deserialize_many()) are one buffer with an index
+up front, so records can be found without reading the ones before them:
+
+    BATCH_MAGIC | [8 byte record count]
+    | [8 byte length][1 byte flags] per record
+    | record payloads, back to back
+"""
+
+import struct
+from typing import Any
+
+RECORD_HEADER = struct.Struct("<Q")
+
+BATCH_MAGIC = b"CUKB\x01"
+BATCH_COUNT = struct.Struct("<Q")
+BATCH_ENTRY = struct.Struct("<QB")
+BATCH_DEFINES = 0x01  # entry flag: the record sends definitions later records refer to
+
+
+def is_batch(data: Any) -> bool:
+    """Check if serialized data is a batch from serialize_many()."""
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:len(BATCH_MAGIC)]) == BATCH_MAGIC
+
+
+def read_exact(file: Any, size: int) -> bytes:
+    """
+    Read exactly `size` bytes from a file-like object.
+
+    Keeps reading on short reads (pipes, sockets, raw files), so the only
+    way to get fewer bytes back is reaching the end of the stream.
+    """
+    data = file.read(size)
+    if data is None:
+        data = b""
+    if len(data) == size or not data:
+        return data
+
+    chunks = [data]
+    remaining = size - len(data)
+    while remaining:
+        chunk = file.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+class PrefixedReader:
+    """
+    Read-only file wrapper that replays a few already-read bytes first.
+
+    load() has to read the first bytes of a stream to detect its wire format.
+    Not every stream can seek back, so the bytes are handed back to the
+    unpickler through this wrapper instead. Sized reads also retry short
+    reads, so raw pipes and sockets work the same as buffered files.
+    """
+
+    def __init__(self, prefix: bytes, file: Any):
+        self._prefix = prefix
+        self._file = file
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            data = self._prefix + self._file.read()
+            self._prefix = b""
+            return data
+        if not self._prefix:
+            # pickle treats a short read as truncated data, so never return one early
+            return read_exact(self._file, size)
+        if size <= len(self._prefix):
+            data = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return data
+        data = self._prefix + read_exact(self._file, size - len(self._prefix))
+        self._prefix = b""
+        return data
+
+    def readinto(self, buffer: Any) -> int:
+        view = memoryview(buffer).cast("B")
+        readinto = getattr(self._file, "readinto", None)
+        if self._prefix or readinto is None:
+            data = self.read(len(view))
+            view[:len(data)] = data
+            return len(data)
+        # large pickled bytes are read straight into their final buffer
+        filled = 0
+        while filled < len(view):
+            count = readinto(view[filled:])
+            if not count:
+                break
+            filled += count
+        return filled
+
+    def readline(self, size: int = -1) -> bytes:
+        if self._prefix:
+            index = self._prefix.find(b"\n")
+            if index != -1:
+                return self.read(index + 1)
+            data = self._prefix
+            self._prefix = b""
+            return data + self._file.readline()
+        return self._file.readline(size)
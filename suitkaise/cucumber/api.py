@@ -15,13 +15,29 @@ Additionally, includes a function to reconnect all live objects that need to
 be reauthenticated or reinitialized after serialization.
 """
 
+import os
 import threading
 
-from ._int.serializer import Serializer, SerializationError
+from ._int.serializer import Serializer, SerializationError, OOB_THRESHOLD
+from ._int.compression import COMPRESS_THRESHOLD
 from ._int.deserializer import Deserializer, DeserializationError
+from ._int.session import Session
+from ._int.batch import BatchReader
+from ._int import offload as _offload
+from ._int.offload import ASYNC_THRESHOLD
+from ._int.batch import serialize_many as _serialize_many
+from ._int.canonical import Hasher, DIGEST_SIZE
+from ._int.canonical import digest as _digest
+from ._int.estimate import estimate_size as _estimate_size
+from ._int.profiling import Profile
+from ._int.resolve import clear_resolve_cache as _clear_resolve_cache
+from ._int.lazy import LazyDict, LazyList, LazyObject
+from ._int.lazy import materialize as _materialize
 from ._int.ir_json import ir_to_json as _ir_to_json
 from ._int.ir_json import ir_to_jsonable as _ir_to_jsonable
 from ._int.handlers.reconnector import Reconnector
+from ._int.handlers.base_class import Handler
+from ._int.registry import DEFAULT_REGISTRY as _registry
 
 # thread-local serializer/deserializer instances — both have mutable per-call
 # state (seen_objects, _object_registry, etc.) that is NOT thread-safe.
@@ -29,174 +45,1066 @@ from ._int.handlers.reconnector import Reconnector
 _thread_local = threading.local()
 
 
-def serialize(obj, debug: bool = False, verbose: bool = False) -> bytes:
+def serialize(
+    obj,
+    debug: bool = False,
+    verbose: bool = False,
+    format: str = "pickle",
+    compress: str | None = None,
+    compress_threshold: int = COMPRESS_THRESHOLD,
+    same_host: bool = False,
+) -> bytes:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        # Serialize any object to bytes
+        data = cucumber.serialize(obj)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Serialize any Python object to bytes.
+    
+    Handles many Python objects that otherwise be unserializable.
+
+    Some objects cannot be truly serialized due to Python's design.
+    This is what we do:
+
+    1. try to keep the exact object intact
+    2. recreate an exact copy of the object using the object's state at serialization time
+    3. give a placeholder object that can be used to recreate an exact copy of the object
+    4. give info on the object's state pre-serialization
+    
+    Args:
+        obj: Object to serialize
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print serialization progress
+        format: Wire format. "pickle" (default) pickles the IR, "compact"
+            writes small type tags and varint object ids instead, which is
+            smaller and faster for object-heavy payloads.
+            `deserialize()` detects the format automatically.
+            Objects nested too deeply for pickle's recursive C pickler are
+            always written in the compact format.
+        compress: Compress the output with a standard library codec -
+            "auto" (fast zlib), "zlib", "lzma" or "bz2". The codec is
+            recorded in a small header, so `deserialize()` decompresses
+            automatically. Outputs that don't shrink are left as they are.
+        compress_threshold: Outputs shorter than this many bytes are never
+            compressed (default 1 KiB)
+        same_host: The bytes will only be deserialized on this machine.
+            `SharedMemory` blocks and file-backed `mmap`s are then sent as
+            a reference (block name, or file path, offset and length) and
+            the receiver attaches to the same memory instead of getting a copy.
+        
+    Returns:
+        bytes: Serialized representation
+        
+    Raises:
+        SerializationError: If serialization fails
+        ValueError: If format is not "pickle" or "compact", or compress
+            is not a known codec
+    
+    ────────────────────────────────────────────────────────
+        ```python
+        # Serialize an object with locks, loggers, and a database connection
+        import threading
+        import logging
+        
+        class ComplexService:
+            def __init__(self):
+                self.lock = threading.Lock()
+                self.logger = logging.getLogger("service")
+                self.conn = psycopg2.connect(
+                    host="localhost",
+                    database="mydatabase",
+                    user="myuser",
+                    password="mypassword",
+                )
+        
+        service = ComplexService()
+        
+        # cucumber handles all of these objects automatically
+        serialized = cucumber.serialize(service)
+        ```
+    ────────────────────────────────────────────────────────
+    """
+    if debug or verbose:
+        return Serializer(debug=debug, verbose=verbose).serialize(
+            obj, format=format, compress=compress, compress_threshold=compress_threshold,
+            same_host=same_host,
+        )
+    
+    ser = getattr(_thread_local, 'serializer', None)
+    if ser is None:
+        ser = Serializer()
+        _thread_local.serializer = ser
+    return ser.serialize(
+        obj, format=format, compress=compress, compress_threshold=compress_threshold,
+        same_host=same_host,
+    )
+
+
+def serialize_oob(
+    obj,
+    *,
+    threshold: int = OOB_THRESHOLD,
+    compress: str | None = None,
+    compress_threshold: int = COMPRESS_THRESHOLD,
+    same_host: bool = False,
+    debug: bool = False,
+    verbose: bool = False,
+) -> tuple[bytes, list]:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        header, buffers = cucumber.serialize_oob(obj)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Serialize an object, keeping large buffers out of band.
+    
+    `bytes`, `bytearray` and contiguous `memoryview` objects of at least
+    `threshold` bytes are not copied into the output. They are returned
+    separately as `pickle.PickleBuffer` views of the original memory,
+    so they can be written to a pipe, socket or file without an extra copy.
+    
+    Args:
+        obj: Object to serialize
+        threshold: Minimum buffer size in bytes to keep out of band (default 64 KiB)
+        compress: Compress the header, like `serialize(compress=...)`.
+            The out-of-band buffers are never compressed.
+        compress_threshold: Headers shorter than this many bytes are never compressed
+        same_host: Send `SharedMemory` blocks and file-backed `mmap`s by
+            reference, like `serialize(same_host=True)`
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print serialization progress
+        
+    Returns:
+        (header, buffers): header bytes and a list of PickleBuffer objects
+        
+    Raises:
+        SerializationError: If serialization fails
+    
+    ────────────────────────────────────────────────────────
+        ```python
+        payload = {"name": "features", "blob": big_bytes}
+        
+        header, buffers = cucumber.serialize_oob(payload)
+        
+        # ... send header and each buffer separately ...
+        
+        restored = cucumber.deserialize_oob(header, buffers)
+        ```
+    ────────────────────────────────────────────────────────
+    """
+    if debug or verbose:
+        return Serializer(debug=debug, verbose=verbose).serialize_oob(
+            obj, threshold=threshold, compress=compress, compress_threshold=compress_threshold,
+            same_host=same_host,
+        )
+    
+    ser = getattr(_thread_local, 'serializer', None)
+    if ser is None:
+        ser = Serializer()
+        _thread_local.serializer = ser
+    return ser.serialize_oob(
+        obj, threshold=threshold, compress=compress, compress_threshold=compress_threshold,
+        same_host=same_host,
+    )
+
+
+def serialize_ir(obj, debug: bool = False, verbose: bool = False):
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        ir = cucumber.serialize_ir(my_complex_object)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Build and return the intermediate representation (IR) 
+    without converting fully to bytes.
+    
+    Args:
+        obj: Object to convert to IR
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print serialization progress
+        
+    Returns:
+        IR: Nested dict/list structure of pickle-native types
+
+    ```python
+    {
+        "__cucumber_type__": "lock",
+        "__handler__": "LockHandler",
+        "__object_id__": 140234567890,
+        "state": {
+            "locked": False
+        }
+    }
+    """
+    if debug or verbose:
+        return Serializer(debug=debug, verbose=verbose).serialize_ir(obj)
+    
+    ser = getattr(_thread_local, 'serializer', None)
+    if ser is None:
+        ser = Serializer()
+        _thread_local.serializer = ser
+    return ser.serialize_ir(obj)
+
+
+def serialize_canonical(obj, debug: bool = False, verbose: bool = False) -> bytes:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        data = cucumber.serialize_canonical(obj)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Serialize an object to deterministic bytes.
+    
+    `serialize()` output depends on memory addresses and on the order
+    dicts and sets were filled in, so two equal objects rarely give the
+    same bytes. `serialize_canonical()` numbers objects in traversal order
+    and writes dict items, set items and instance attributes sorted, so
+    equal objects built the same way always give the same bytes.
+    
+    Output is in the compact format, and `deserialize()` reads it back.
+    
+    Args:
+        obj: Object to serialize
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print serialization progress
+        
+    Returns:
+        bytes: Canonical serialized representation
+        
+    Raises:
+        SerializationError: If serialization fails
+    
+    ────────────────────────────────────────────────────────
+        ```python
+        a = {"b": 2, "a": 1, "tags": {"x", "y"}}
+        b = {"a": 1, "tags": {"y", "x"}, "b": 2}
+        
+        assert cucumber.serialize_canonical(a) == cucumber.serialize_canonical(b)
+        ```
+    ────────────────────────────────────────────────────────
+    """
+    if debug or verbose:
+        return Serializer(debug=debug, verbose=verbose).serialize_canonical(obj)
+    
+    ser = getattr(_thread_local, 'serializer', None)
+    if ser is None:
+        ser = Serializer()
+        _thread_local.serializer = ser
+    return ser.serialize_canonical(obj)
+
+
+def digest(
+    obj,
+    *,
+    digest_size: int = DIGEST_SIZE,
+    key: bytes = b"",
+    debug: bool = False,
+    verbose: bool = False,
+) -> bytes:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        cache_key = cucumber.digest(obj)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Content digest of any object, for memoization and cache keys.
+    
+    blake2b hash of `serialize_canonical(obj)`, computed as the encoding
+    is written (the full bytes are never built). Equal objects built the
+    same way give the same digest, in any process.
+    
+    For several objects, or objects added over time, use `Hasher`.
+    
+    Args:
+        obj: Object to hash
+        digest_size: Digest size in bytes, 1 to 64 (default 32)
+        key: Optional blake2b key (up to 64 bytes) for keyed hashing
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print serialization progress
+        
+    Returns:
+        bytes: The digest
+        
+    Raises:
+        SerializationError: If serialization fails
+    
+    ────────────────────────────────────────────────────────
+        ```python
+        results = {}
+        
+        def cached_run(task):
+            key = cucumber.digest(task)
+            if key not in results:
+                results[key] = run(task)
+            return results[key]
+        ```
+    ────────────────────────────────────────────────────────
+    """
+    if debug or verbose:
+        return _digest(Serializer(debug=debug, verbose=verbose), obj, digest_size, key)
+    
+    ser = getattr(_thread_local, 'serializer', None)
+    if ser is None:
+        ser = Serializer()
+        _thread_local.serializer = ser
+    return _digest(ser, obj, digest_size, key)
+
+
+def estimate_size(obj, *, sample: int | None = None, by_type: bool = False):
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        size = cucumber.estimate_size(obj)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Estimate how many bytes `serialize(obj)` would return, without serializing.
+    
+    Walks the object like `serialize()` does - same handlers, same fast
+    paths - but adds up what each part would cost instead of building and
+    pickling the IR. Usually within 10% of the real size of the default
+    format (uncompressed, in band).
+    
+    The object is left as it was: generators, iterators and queues (which
+    serialize() drains) are counted as empty instead of being looked into.
+    
+    Args:
+        obj: Object to estimate
+        sample: Lists, tuples, sets and dicts with more than this many items,
+            all of one type, only have `sample` evenly spaced items walked,
+            and their cost is scaled up. None (default) walks everything.
+        by_type: Also return how many bytes each type contributed (the
+            fixed header and format overhead aren't counted against any type)
+        
+    Returns:
+        int: Estimated size in bytes, or (size, {type name: bytes}) with by_type
+        
+    Raises:
+        SerializationError: If a handler fails to extract an object's state
+        ValueError: If sample is less than 1
+    
+    ────────────────────────────────────────────────────────
+        ```python
+        # batch items up to ~1 MB per message
+        batch, batch_size = [], 0
+        for item in items:
+            size = cucumber.estimate_size(item, sample=100)
+            if batch and batch_size + size > 1_000_000:
+                send(batch)
+                batch, batch_size = [], 0
+            batch.append(item)
+            batch_size += size
+        ```
+    ────────────────────────────────────────────────────────
+    """
+    ser = getattr(_thread_local, 'serializer', None)
+    if ser is None:
+        ser = Serializer()
+        _thread_local.serializer = ser
+    size, types = _estimate_size(ser, obj, sample, by_type)
+    if by_type:
+        return size, types
+    return size
+
+
+def profile(*, sizes: bool = True) -> Profile:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        with cucumber.profile() as prof:
+            share.data = payload
+        
+        print(prof.report())
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Record where serialize and deserialize spend their time.
+    
+    While the profile is active, every serialize and deserialize in this
+    process (any thread, including ones made by Share and Pipe) records,
+    per handler and per type:
+    - calls to and time spent in the handler's `extract_state()` and
+      `reconstruct()`
+    - estimated bytes contributed to the output
+    
+    and how many objects with no handler were probed with `pickle.dumps()`.
+    
+    Handler times are self times - nested objects in a handler's state are
+    timed under their own handler. Work done in other processes is not seen.
+    
+    Args:
+        sizes: Also estimate bytes per type, added up from each IR after
+            it is built (not included in the serialize time).
+        
+    Returns:
+        Profile: Context manager. Use `start()` / `stop()` to control it
+        without `with`, `as_dict()` for the numbers and `report()` for
+        a sorted text table.
+    
+    ────────────────────────────────────────────────────────
+        ```python
+        prof = cucumber.profile(sizes=False).start()
+        run_workload()
+        prof.stop()
+        
+        stats = prof.as_dict()
+        stats["handlers"]["ClassInstanceHandler"]["extract_time"]
+        stats["pickle_fallback"]["calls"]
+        
+        print(prof.report(sort="bytes", limit=10))
+        ```
+    ────────────────────────────────────────────────────────
+    """
+    return Profile(sizes=sizes)
+
+
+def dump(obj, file, *, format: str = "pickle", debug: bool = False, verbose: bool = False) -> None:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        with open("state.cuke", "wb") as f:
+            cucumber.dump(obj, f)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Serialize an object straight into a binary file-like object.
+    
+    Same output as `serialize()`, but written to `file` as it is encoded,
+    so the full serialized bytes are never held in memory. Use this to
+    checkpoint large state to disk.
+    
+    Args:
+        obj: Object to serialize
+        file: Writable binary file-like object (anything with `write(bytes)`)
+        format: Wire format, "pickle" (default) or "compact"
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print serialization progress
+        
+    Raises:
+        SerializationError: If serialization or writing fails
+        ValueError: If format is not "pickle" or "compact"
+    """
+    if debug or verbose:
+        return Serializer(debug=debug, verbose=verbose).dump(obj, file, format=format)
+    
+    ser = getattr(_thread_local, 'serializer', None)
+    if ser is None:
+        ser = Serializer()
+        _thread_local.serializer = ser
+    return ser.dump(obj, file, format=format)
+
+
+def iter_dump(iterable, file, *, format: str = "pickle", debug: bool = False, verbose: bool = False) -> int:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        with open("events.cuke", "wb") as f:
+            count = cucumber.iter_dump(events, f)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Write each item of an iterable as a separate record in a framed stream.
+    
+    Items are serialized and written one at a time, so `iterable` can be
+    a generator producing more data than fits in memory. Read the records
+    back with `iter_load()`.
+    
+    Each record is independent: an object shared between two items is
+    serialized with each of them, and comes back as two separate objects.
+    
+    Args:
+        iterable: Items to write
+        file: Writable binary file-like object (anything with `write(bytes)`)
+        format: Wire format for each record, "pickle" (default) or "compact"
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print serialization progress
+        
+    Returns:
+        int: Number of records written
+        
+    Raises:
+        SerializationError: If serializing or writing a record fails
+        ValueError: If format is not "pickle" or "compact"
+    """
+    if debug or verbose:
+        return Serializer(debug=debug, verbose=verbose).iter_dump(iterable, file, format=format)
+    
+    ser = getattr(_thread_local, 'serializer', None)
+    if ser is None:
+        ser = Serializer()
+        _thread_local.serializer = ser
+    return ser.iter_dump(iterable, file, format=format)
+
+
+def serialize_many(objs, *, format: str = "pickle", debug: bool = False, verbose: bool = False) -> bytes:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        data = cucumber.serialize_many(items)
+        
+        items = cucumber.deserialize_many(data)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Serialize many objects into one batch.
+    
+    Each object becomes a record of the batch. Classes, functions, lambdas
+    and modules are only sent once for the whole batch: the first record
+    that uses one carries its definition, later records refer to it. A
+    list of items that all use the same `__main__` class or lambda comes
+    out much smaller, and faster to read back, than calling `serialize()`
+    on each of them.
+    
+    Any other object shared between two items is serialized with each of
+    them, and comes back as two separate objects - as with `iter_dump()`.
+    
+    Read the batch back with `deserialize_many()`, or pick records out of
+    it with `BatchReader`.
+    
+    Args:
+        objs: Objects to serialize (any iterable)
+        format: Wire format for each record, "pickle" (default) or "compact"
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print serialization progress
+        
+    Returns:
+        bytes: The batch
+        
+    Raises:
+        SerializationError: If any object fails to serialize
+        ValueError: If format is not "pickle" or "compact"
+    """
+    if debug or verbose:
+        return _serialize_many(Serializer(debug=debug, verbose=verbose), objs, format=format)
+    
+    ser = getattr(_thread_local, 'serializer', None)
+    if ser is None:
+        ser = Serializer()
+        _thread_local.serializer = ser
+    return _serialize_many(ser, objs, format=format)
+
+
+def deserialize(data: bytes, debug: bool = False, verbose: bool = False):
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        # Deserialize bytes back to an object
+        obj = cucumber.deserialize(data)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Deserialize bytes back to a Python object.
+    
+    Reconstructs objects serialized with cucumber.serialize().
+    Both the default and "compact" formats are detected automatically.
+    
+    Args:
+        data: Serialized bytes from cucumber.serialize()
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print deserialization progress
+        
+    Returns:
+        Reconstructed Python object
+        
+    Raises:
+        DeserializationError: If deserialization fails
+    
+    ────────────────────────────────────────────────────────
+        ```python
+        # round-trip
+        original = ComplexService()
+        
+        # serialize
+        serialized = cucumber.serialize(original)
+        
+        # deserialize
+        restored = cucumber.deserialize(serialized)
+        
+        # state is preserved
+        with restored.lock: # will work
+
+        # once reconnected, conn will work
+        restored.conn.reconnect(auth="mypassword")
+        ```
+    ────────────────────────────────────────────────────────
+    """
+    if debug or verbose:
+        # debug/verbose mode: one-off instance with those flags
+        return Deserializer(debug=debug, verbose=verbose).deserialize(data)
+    
+    # fast path: reuse a per-thread Deserializer (avoids rebuilding
+    # handler registries every call while staying thread-safe)
+    deser = getattr(_thread_local, 'deserializer', None)
+    if deser is None:
+        deser = Deserializer()
+        _thread_local.deserializer = deser
+    return deser.deserialize(data)
+
+
+async def serialize_async(
+    obj,
+    *,
+    executor=None,
+    threshold: int = ASYNC_THRESHOLD,
+    debug: bool = False,
+    verbose: bool = False,
+    format: str = "pickle",
+    compress: str | None = None,
+    compress_threshold: int = COMPRESS_THRESHOLD,
+    same_host: bool = False,
+) -> bytes:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        data = await cucumber.serialize_async(obj)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    `serialize()` for asyncio code, without blocking the event loop on big objects.
+    
+    Objects estimated to serialize to more than `threshold` bytes are
+    serialized in `executor`; smaller ones are serialized inline, where
+    handing off would cost more than it saves. The estimate is sampled
+    and stops as soon as it passes `threshold`, so it is cheap either way.
+    It leaves `obj` as it was: objects holding a generator, iterator or
+    queue (which only serializing may drain) are always offloaded.
+    
+    Each thread keeps its own serializer, so a thread pool's workers reuse
+    theirs from call to call.
+    
+    Args:
+        obj: Object to serialize
+        executor: `concurrent.futures` executor to run in. None (default)
+            uses the event loop's default thread pool. With a process
+            executor, `obj` is sent to the worker with plain pickle, so it
+            has to be picklable.
+        threshold: Estimated size in bytes above which serializing is
+            offloaded (64 KiB by default, 0 always offloads)
+        debug, verbose, format, compress, compress_threshold, same_host:
+            Same as `serialize()`
+        
+    Returns:
+        bytes: Serialized representation, same as `serialize()`
+        
+    Raises:
+        SerializationError: If serialization fails
+        ValueError: If format is not "pickle" or "compact", or compress
+            is not a known codec
+    """
+    options = dict(
+        debug=debug, verbose=verbose, format=format, compress=compress,
+        compress_threshold=compress_threshold, same_host=same_host,
+    )
+    ser = getattr(_thread_local, 'serializer', None)
+    if ser is None:
+        ser = Serializer()
+        _thread_local.serializer = ser
+    if threshold > 0 and not _offload.exceeds(ser, obj, threshold):
+        return serialize(obj, **options)
+    return await _offload.run(executor, serialize, obj, **options)
+
+
+async def deserialize_async(
+    data: bytes,
+    *,
+    executor=None,
+    threshold: int = ASYNC_THRESHOLD,
+    debug: bool = False,
+    verbose: bool = False,
+):
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        obj = await cucumber.deserialize_async(data)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    `deserialize()` for asyncio code, without blocking the event loop on big payloads.
+    
+    Data longer than `threshold` bytes is deserialized in `executor`;
+    shorter data is deserialized inline.
+    
+    Args:
+        data: Serialized bytes from cucumber.serialize()
+        executor: `concurrent.futures` executor to run in. None (default)
+            uses the event loop's default thread pool. With a process
+            executor, the result is sent back with plain pickle, so it has
+            to be picklable.
+        threshold: Length in bytes above which deserializing is offloaded
+            (64 KiB by default, 0 always offloads)
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print deserialization progress
+        
+    Returns:
+        Reconstructed Python object
+        
+    Raises:
+        DeserializationError: If deserialization fails
+    """
+    if threshold > 0 and _offload.data_size(data) <= threshold:
+        return deserialize(data, debug=debug, verbose=verbose)
+    return await _offload.run(executor, deserialize, data, debug=debug, verbose=verbose)
+
+
+def deserialize_lazy(data: bytes, debug: bool = False, verbose: bool = False):
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        # only reconstruct what you read
+        view = cucumber.deserialize_lazy(data)
+        name = view["users"][0].name
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Deserialize bytes into views that reconstruct their contents on access.
+    
+    Dicts, lists and class instances come back as read-only `LazyDict`,
+    `LazyList` and `LazyObject` views. A view reconstructs each child the
+    first time it is read, so reading a few fields of a large payload only
+    reconstructs those fields. Everything else (tuples, sets, locks,
+    functions, ...) is reconstructed normally when it is first read.
+    
+    Shared and circular references work the same as with deserialize().
+    Use `cucumber.materialize(view)` to get the real dict, list or instance.
+    
+    Args:
+        data: Serialized bytes from cucumber.serialize()
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print deserialization progress
+        
+    Returns:
+        A view, or the reconstructed object if the root isn't a dict,
+        list or class instance
+        
+    Raises:
+        DeserializationError: If the data can't be decoded (errors in
+            parts of the data are raised when those parts are read)
+    """
+    # every call needs its own Deserializer - the views keep using its registry
+    return Deserializer(debug=debug, verbose=verbose).deserialize_lazy(data)
+
+
+def materialize(value):
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        view = cucumber.deserialize_lazy(data)
+        users = cucumber.materialize(view["users"])  # a real list
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Get the real object behind a view from deserialize_lazy().
+    
+    Reconstructs the view's whole subtree the first time, and returns the
+    same object on later calls. Once materialized, the view reads through
+    to the real object. Values that aren't views are returned as-is.
+    
+    Args:
+        value: A LazyDict, LazyList or LazyObject (or any other value)
+        
+    Returns:
+        The real dict, list or instance
+    """
+    return _materialize(value)
+
+
+def deserialize_oob(header: bytes, buffers, debug: bool = False, verbose: bool = False):
     """
     ────────────────────────────────────────────────────────
         ```python
         from suitkaise import cucumber
         
-        # Serialize any object to bytes
-        data = cucumber.serialize(obj)
+        obj = cucumber.deserialize_oob(header, buffers)
         ```
     ────────────────────────────────────────────────────────\n
 
-    Serialize any Python object to bytes.
+    Deserialize the output of `serialize_oob()`.
     
-    Handles many Python objects that otherwise be unserializable.
-
-    Some objects cannot be truly serialized due to Python's design.
-    This is what we do:
-
-    1. try to keep the exact object intact
-    2. recreate an exact copy of the object using the object's state at serialization time
-    3. give a placeholder object that can be used to recreate an exact copy of the object
-    4. give info on the object's state pre-serialization
+    `buffers` can be any buffer objects (`bytes`, `bytearray`, `memoryview`,
+    `PickleBuffer`, ...) in the order `serialize_oob()` returned them.
+    Received `bytes` and `bytearray` buffers are used as-is, not copied.
     
     Args:
-        obj: Object to serialize
+        header: Header bytes from cucumber.serialize_oob()
+        buffers: Out-of-band buffers from cucumber.serialize_oob()
         debug: Enable debug mode for detailed error messages
-        verbose: Enable verbose mode to print serialization progress
+        verbose: Enable verbose mode to print deserialization progress
         
     Returns:
-        bytes: Serialized representation
+        Reconstructed Python object
         
     Raises:
-        SerializationError: If serialization fails
+        DeserializationError: If deserialization fails
+    """
+    if debug or verbose:
+        return Deserializer(debug=debug, verbose=verbose).deserialize_oob(header, buffers)
     
+    deser = getattr(_thread_local, 'deserializer', None)
+    if deser is None:
+        deser = Deserializer()
+        _thread_local.deserializer = deser
+    return deser.deserialize_oob(header, buffers)
+
+
+def load(file, debug: bool = False, verbose: bool = False):
+    """
     ────────────────────────────────────────────────────────
         ```python
-        # Serialize an object with locks, loggers, and a database connection
-        import threading
-        import logging
+        from suitkaise import cucumber
         
-        class ComplexService:
-            def __init__(self):
-                self.lock = threading.Lock()
-                self.logger = logging.getLogger("service")
-                self.conn = psycopg2.connect(
-                    host="localhost",
-                    database="mydatabase",
-                    user="myuser",
-                    password="mypassword",
-                )
+        with open("state.cuke", "rb") as f:
+            obj = cucumber.load(f)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Deserialize an object from a binary file-like object.
+    
+    Counterpart to `dump()`. Also reads anything written by `serialize()`.
+    Both wire formats are detected automatically.
+    
+    Default format data is read incrementally, and only up to the end of the
+    object, so several `dump()` calls to the same file can be loaded back
+    with several `load()` calls. Compact data is read to the end of the file.
+    
+    Args:
+        file: Readable binary file-like object (anything with `read(n)`)
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print deserialization progress
         
-        service = ComplexService()
+    Returns:
+        Reconstructed Python object
         
-        # cucumber handles all of these objects automatically
-        serialized = cucumber.serialize(service)
-        ```
-    ────────────────────────────────────────────────────────
+    Raises:
+        DeserializationError: If the file is empty or deserialization fails
     """
     if debug or verbose:
-        return Serializer(debug=debug, verbose=verbose).serialize(obj)
+        return Deserializer(debug=debug, verbose=verbose).load(file)
     
-    ser = getattr(_thread_local, 'serializer', None)
-    if ser is None:
-        ser = Serializer()
-        _thread_local.serializer = ser
-    return ser.serialize(obj)
+    deser = getattr(_thread_local, 'deserializer', None)
+    if deser is None:
+        deser = Deserializer()
+        _thread_local.deserializer = deser
+    return deser.load(file)
 
 
-def serialize_ir(obj, debug: bool = False, verbose: bool = False):
+def iter_load(file, debug: bool = False, verbose: bool = False):
     """
     ────────────────────────────────────────────────────────
         ```python
         from suitkaise import cucumber
         
-        ir = cucumber.serialize_ir(my_complex_object)
+        with open("events.cuke", "rb") as f:
+            for event in cucumber.iter_load(f):
+                handle(event)
         ```
     ────────────────────────────────────────────────────────\n
 
-    Build and return the intermediate representation (IR) 
-    without converting fully to bytes.
+    Read records one at a time from a stream written by `iter_dump()`.
+    
+    Only one record is held in memory at a time.
     
     Args:
-        obj: Object to convert to IR
+        file: Readable binary file-like object (anything with `read(n)`)
         debug: Enable debug mode for detailed error messages
-        verbose: Enable verbose mode to print serialization progress
+        verbose: Enable verbose mode to print deserialization progress
         
-    Returns:
-        IR: Nested dict/list structure of pickle-native types
-
-    ```python
-    {
-        "__cucumber_type__": "lock",
-        "__handler__": "LockHandler",
-        "__object_id__": 140234567890,
-        "state": {
-            "locked": False
-        }
-    }
+    Yields:
+        Each reconstructed record, in the order it was written
+        
+    Raises:
+        DeserializationError: If the stream is truncated or a record fails
     """
     if debug or verbose:
-        return Serializer(debug=debug, verbose=verbose).serialize_ir(obj)
+        yield from Deserializer(debug=debug, verbose=verbose).iter_load(file)
+        return
     
-    ser = getattr(_thread_local, 'serializer', None)
-    if ser is None:
-        ser = Serializer()
-        _thread_local.serializer = ser
-    return ser.serialize_ir(obj)
+    # looked up when iteration starts, so the deserializer belongs to the
+    # thread that actually consumes the records
+    deser = getattr(_thread_local, 'deserializer', None)
+    if deser is None:
+        deser = Deserializer()
+        _thread_local.deserializer = deser
+    yield from deser.iter_load(file)
 
 
-def deserialize(data: bytes, debug: bool = False, verbose: bool = False):
+def deserialize_many(data: bytes, debug: bool = False, verbose: bool = False) -> list:
     """
     ────────────────────────────────────────────────────────
         ```python
         from suitkaise import cucumber
         
-        # Deserialize bytes back to an object
-        obj = cucumber.deserialize(data)
+        items = cucumber.deserialize_many(data)
         ```
     ────────────────────────────────────────────────────────\n
 
-    Deserialize bytes back to a Python object.
+    Deserialize every record of a batch from `serialize_many()`.
     
-    Reconstructs objects serialized with cucumber.serialize().
+    Use `BatchReader` instead to read only some of the records.
     
     Args:
-        data: Serialized bytes from cucumber.serialize()
+        data: Batch bytes from cucumber.serialize_many()
         debug: Enable debug mode for detailed error messages
         verbose: Enable verbose mode to print deserialization progress
         
     Returns:
-        Reconstructed Python object
+        list: The reconstructed objects, in the order they were serialized
         
     Raises:
-        DeserializationError: If deserialization fails
-    
+        DeserializationError: If data isn't a batch or a record fails
+    """
+    return list(BatchReader(data, debug=debug, verbose=verbose))
+
+
+def deserialize_ir(ir, debug: bool = False, verbose: bool = False):
+    """
     ────────────────────────────────────────────────────────
         ```python
-        # round-trip
-        original = ComplexService()
+        from suitkaise import cucumber
         
-        # serialize
-        serialized = cucumber.serialize(original)
+        ir = cucumber.serialize_ir(obj)
+        restored = cucumber.deserialize_ir(ir)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Reconstruct a Python object from an intermediate representation (IR).
+    
+    Counterpart to `serialize_ir()`.
+    
+    Args:
+        ir: IR from cucumber.serialize_ir()
+        debug: Enable debug mode for detailed error messages
+        verbose: Enable verbose mode to print deserialization progress
         
-        # deserialize
-        restored = cucumber.deserialize(serialized)
+    Returns:
+        Reconstructed Python object
         
-        # state is preserved
-        with restored.lock: # will work
-
-        # once reconnected, conn will work
-        restored.conn.reconnect(auth="mypassword")
-        ```
-    ────────────────────────────────────────────────────────
+    Raises:
+        DeserializationError: If deserialization fails
     """
     if debug or verbose:
-        # debug/verbose mode: one-off instance with those flags
-        return Deserializer(debug=debug, verbose=verbose).deserialize(data)
+        return Deserializer(debug=debug, verbose=verbose).deserialize_ir(ir)
     
-    # fast path: reuse a per-thread Deserializer (avoids rebuilding
-    # handler registries every call while staying thread-safe)
     deser = getattr(_thread_local, 'deserializer', None)
     if deser is None:
         deser = Deserializer()
         _thread_local.deserializer = deser
-    return deser.deserialize(data)
+    return deser.deserialize_ir(ir)
+
+
+def register_handler(handler, *, types=None, priority: int = 0) -> None:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        class PointHandler(cucumber.Handler):
+            type_name = "point"
+            
+            def can_handle(self, obj):
+                return isinstance(obj, Point)
+            
+            def extract_state(self, obj):
+                return {"x": obj.x, "y": obj.y}
+            
+            def reconstruct(self, state):
+                return Point(state["x"], state["y"])
+        
+        cucumber.register_handler(PointHandler(), types=[Point])
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Add a handler for your own types.
+    
+    Registered handlers are checked before cucumber's built-in handlers
+    and fast paths, so they can take over classes cucumber would
+    otherwise serialize on its own. Types listed in `types` (and their
+    subclasses) are matched with a dict lookup; without `types`, the
+    handler's `can_handle()` is asked once per new type.
+    
+    Registering the same handler again replaces its earlier registration.
+    The process that deserializes needs the handler registered too -
+    nodes are matched to handlers by `type_name` and class name.
+    
+    Args:
+        handler: Handler instance (subclass of cucumber.Handler)
+        types: Optional classes this handler serializes
+        priority: Higher priorities are checked first. Handlers with a
+            negative priority are only checked after the built-in ones,
+            as a fallback.
+        
+    Raises:
+        TypeError: If handler is not a Handler, or types holds a non-class
+        ValueError: If the handler has no type_name, or uses one reserved by cucumber
+    """
+    _registry.register(handler, types=types or (), priority=priority)
+
+
+def unregister_handler(handler) -> bool:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        cucumber.unregister_handler(handler)
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Remove a handler added with `register_handler()`.
+    
+    Args:
+        handler: The registered handler instance
+        
+    Returns:
+        bool: False if the handler wasn't registered
+    """
+    return _registry.unregister(handler)
 
 
-def reconnect_all(obj, *, start_threads: bool = False, **auth):
+def reconnect_all(
+    obj,
+    *,
+    start_threads: bool = False,
+    max_concurrency: int = 1,
+    cache_connections: bool = False,
+    **auth,
+):
     """
     ────────────────────────────────────────────────────────
         ```python
@@ -217,9 +1125,23 @@ def reconnect_all(obj, *, start_threads: bool = False, **auth):
     and __slots__ when available. If a `Reconnector` is found, its `reconnect()`
     method is called and the result is placed back into the structure.
     
+    With `max_concurrency` above 1, all `Reconnectors` are found first and
+    reconnected from a thread pool, so startup takes about as long as the
+    slowest connection instead of the sum of all of them. SQLite
+    connections can only be used by the thread that opened them, so they
+    are always reconnected on the calling thread.
+    
     Args:
         obj: Object or container to traverse.
         start_threads: If True, auto-start any reconnected threads.
+        max_concurrency: Number of reconnects to run at once (default 1, one
+            after another).
+        cache_connections: If True, database reconnectors with the same
+            type, connection details and auth share one live connection,
+            and it is kept for later reconnect_all() calls in this process
+            (Pool workers reconnecting each item reuse it). A cached
+            connection that has since been closed is replaced. Clear it
+            with `clear_connection_cache()`.
         **auth: Credentials keyed by type. dict[str, str] pattern
             ```python 
             auth = {
@@ -237,8 +1159,6 @@ def reconnect_all(obj, *, start_threads: bool = False, **auth):
             The `"*"` key provides default auth for all instances of that type.
             Specific attr names override the default.
     """
-    import threading
-    
     visited: set[int] = set()
     
     def _get_reconnector_type_key(reconnector: Reconnector) -> str | None:
@@ -291,29 +1211,49 @@ def reconnect_all(obj, *, start_threads: bool = False, **auth):
             return type_auth[attr_name]
         return type_auth.get("*")
     
+    def _connect(item: Reconnector, auth_value: str | None):
+        if auth_value is None:
+            return item.reconnect()
+        try:
+            return item.reconnect(auth_value)
+        except TypeError:
+            try:
+                return item.reconnect(auth=auth_value)
+            except TypeError:
+                return item.reconnect(password=auth_value)
+    
+    def _reconnect(item: Reconnector, attr_name: str | None):
+        """Reconnect one Reconnector, or give it back if reconnecting fails."""
+        try:
+            auth_value = _get_auth_for(item, attr_name)
+            
+            cache_key = item._cache_key(auth_value) if cache_connections else None
+            if cache_key is not None:
+                # one connect per key at a time, so concurrent calls share it
+                with _connection_key_lock(cache_key):
+                    result = _get_cached_connection(cache_key)
+                    if result is None:
+                        result = _connect(item, auth_value)
+                        _cache_connection(cache_key, result)
+            else:
+                result = _connect(item, auth_value)
+            
+            if start_threads and isinstance(result, threading.Thread):
+                try:
+                    if not result.is_alive():
+                        result.start()
+                except RuntimeError:
+                    pass
+            return result
+        except Exception:
+            return item
+    
+    # what a Reconnector found by _recurse() is replaced with
+    resolve = _reconnect
+    
     def _recurse(item, attr_name: str | None = None):
         if isinstance(item, Reconnector):
-            try:
-                auth_value = _get_auth_for(item, attr_name)
-                if auth_value is None:
-                    result = item.reconnect()
-                else:
-                    try:
-                        result = item.reconnect(auth_value)
-                    except TypeError:
-                        try:
-                            result = item.reconnect(auth=auth_value)
-                        except TypeError:
-                            result = item.reconnect(password=auth_value)
-                if start_threads and isinstance(result, threading.Thread):
-                    try:
-                        if not result.is_alive():
-                            result.start()
-                    except RuntimeError:
-                        pass
-                return result
-            except Exception:
-                return item
+            return resolve(item, attr_name)
         
         item_id = id(item)
         if item_id in visited:
@@ -382,9 +1322,184 @@ def reconnect_all(obj, *, start_threads: bool = False, **auth):
         
         return item
     
+    if max_concurrency <= 1:
+        return _recurse(obj, None)
+    
+    # first pass: find every Reconnector (and the attr name its auth is looked up by)
+    found: dict[tuple[int, str | None], tuple[Reconnector, str | None]] = {}
+    
+    def _collect(item: Reconnector, attr_name: str | None):
+        found.setdefault((id(item), attr_name), (item, attr_name))
+        return item
+    
+    resolve = _collect
+    _recurse(obj, None)
+    visited.clear()
+    
+    # reconnect - thread-affine ones here, the rest from a thread pool, and
+    # reconnectors that would share a cached connection only once
+    results: dict = {}
+    groups: dict = {}
+    for site, (item, attr_name) in found.items():
+        if type(item)._thread_affine:
+            results[site] = _reconnect(item, attr_name)
+            continue
+        group = site
+        if cache_connections:
+            try:
+                cache_key = item._cache_key(_get_auth_for(item, attr_name))
+            except Exception:
+                cache_key = None
+            if cache_key is not None:
+                group = ("cache", cache_key)
+        groups.setdefault(group, []).append(site)
+    
+    if groups:
+        from concurrent.futures import ThreadPoolExecutor
+        
+        sites = list(groups.values())
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(sites))) as pool:
+            live = pool.map(lambda group_sites: _reconnect(*found[group_sites[0]]), sites)
+            for group_sites, result in zip(sites, live):
+                first_item = found[group_sites[0]][0]
+                for site in group_sites:
+                    # a failed reconnect gives back its own Reconnector
+                    results[site] = found[site][0] if result is first_item else result
+    
+    # second pass: put the results in place
+    resolve = lambda item, attr_name: results.get((id(item), attr_name), item)
     return _recurse(obj, None)
 
 
+# live connections shared by reconnect_all(cache_connections=True), by cache key
+# (dropped in a forked child - the parent's sockets must not be reused there)
+_connection_cache: dict = {}
+_connection_key_locks: dict = {}  # held while a key's connection is opened
+_connection_cache_pid = os.getpid()
+_connection_cache_lock = threading.Lock()
+
+
+def _check_connection_cache_pid() -> None:
+    """Drop the parent's connections and locks in a forked child (call with the lock held)."""
+    global _connection_cache_pid
+    if _connection_cache_pid != os.getpid():
+        _connection_cache.clear()
+        _connection_key_locks.clear()
+        _connection_cache_pid = os.getpid()
+
+
+def _connection_key_lock(key) -> threading.Lock:
+    """Lock held while looking up or opening the connection for key."""
+    with _connection_cache_lock:
+        _check_connection_cache_pid()
+        lock = _connection_key_locks.get(key)
+        if lock is None:
+            lock = _connection_key_locks[key] = threading.Lock()
+        return lock
+
+
+def _connection_is_live(connection) -> bool:
+    """
+    Whether a cached connection still looks usable.
+    
+    Checks the flags common client libraries set on close (closed, open,
+    is_shutdown, is_healthy()); a connection without any is assumed live.
+    """
+    try:
+        if getattr(connection, "is_shutdown", False) is True:
+            return False
+        closed = getattr(connection, "closed", False)
+        if not callable(closed) and closed:
+            return False
+        if getattr(connection, "open", True) is False:
+            return False
+        is_healthy = getattr(connection, "is_healthy", None)
+        if callable(is_healthy) and is_healthy() is False:
+            return False
+    except Exception:
+        return False
+    return True
+
+
+def _get_cached_connection(key):
+    """The live connection cached under key in this process, or None (closed ones are dropped)."""
+    with _connection_cache_lock:
+        _check_connection_cache_pid()
+        connection = _connection_cache.get(key)
+    if connection is None or _connection_is_live(connection):
+        return connection
+    with _connection_cache_lock:
+        if _connection_cache.get(key) is connection:
+            del _connection_cache[key]
+    return None
+
+
+def _cache_connection(key, connection) -> None:
+    """Cache a new connection (call with the key's lock held)."""
+    with _connection_cache_lock:
+        _connection_cache[key] = connection
+
+
+def clear_connection_cache() -> int:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        cucumber.clear_connection_cache()
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Forget the connections cached by `reconnect_all(cache_connections=True)`.
+    
+    Cached connections that have been closed are dropped (and reopened) by
+    `reconnect_all()` on its own; this forgets all of them. The connections
+    are not closed - objects that were given them keep
+    working. The next `reconnect_all()` opens new ones.
+    
+    Returns:
+        int: Number of connections that were cached
+    """
+    with _connection_cache_lock:
+        count = len(_connection_cache)
+        _connection_cache.clear()
+        _connection_key_locks.clear()
+    return count
+
+
+def clear_resolve_cache(module: str | None = None) -> int:
+    """
+    ────────────────────────────────────────────────────────
+        ```python
+        from suitkaise import cucumber
+        
+        cucumber.clear_resolve_cache()
+        ```
+    ────────────────────────────────────────────────────────\n
+
+    Forget cached class and function lookups.
+    
+    Classes and functions sent by reference are found by importing their
+    module and looking up their qualified name. The result (or the error,
+    if the lookup failed) is cached per process, so each class is only
+    looked up once.
+    
+    Cached lookups are checked before use: reloaded modules, classes or
+    functions redefined at module level, and modules that became
+    importable are all noticed. Call this after changing something deeper,
+    like replacing a nested class on its outer class.
+    
+    Args:
+        module: Only forget lookups in this module (None forgets all)
+        
+    Returns:
+        int: Number of lookups forgotten
+    """
+    return _clear_resolve_cache(module)
+
+
+
+
 def ir_to_jsonable(ir):
     """
     ────────────────────────────────────────────────────────
@@ -467,14 +1582,45 @@ def to_json(
 __all__ = [
     # main functions
     'serialize',
+    'serialize_oob',
     'serialize_ir',
+    'serialize_canonical',
+    'digest',
+    'estimate_size',
+    'profile',
     'deserialize',
+    'serialize_async',
+    'deserialize_async',
+    'deserialize_lazy',
+    'materialize',
+    'deserialize_oob',
+    'deserialize_ir',
+    'dump',
+    'load',
+    'iter_dump',
+    'iter_load',
+    'serialize_many',
+    'deserialize_many',
     'reconnect_all',
+    'clear_connection_cache',
+    'clear_resolve_cache',
+    'register_handler',
+    'unregister_handler',
     'ir_to_jsonable',
     'ir_to_json',
     'to_jsonable',
     'to_json',
     
+    # classes
+    'Session',
+    'BatchReader',
+    'Hasher',
+    'Handler',
+    'Profile',
+    'LazyDict',
+    'LazyList',
+    'LazyObject',
+    
     # exceptions
     'SerializationError',
     'DeserializationError',
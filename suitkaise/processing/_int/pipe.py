@@ -7,28 +7,137 @@ Design goals:
 - Use cucumber for send/recv payloads
 - No post-init reattachment
 - ensure OH is minimal
+
+Pipe.stream() wraps a generator so it can be handed to other processes
+without being drained. Serializing a stream only registers it with its
+process's stream server (one listener, made on first use) and puts the
+server's address in the payload. Nothing else happens until a reader is
+read from: it then connects, names its stream, and gets a thread in the
+owning process that pulls values from the generator a batch at a time as
+the reader asks for them. Payloads that are never read (size estimates,
+digests) leave no threads or connections behind, and the server holds
+streams weakly, so they don't keep their generators alive either.
 """
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
+import itertools
 import multiprocessing
+import os
 import pickle
+import struct
+import threading
+import weakref
 from multiprocessing import reduction
-from typing import Any, Optional, Tuple
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from suitkaise import cucumber
 
 
+# first message of a send() that has out-of-band buffers
+# (cucumber payloads never start with a null byte)
+_OOB_MARKER = b"\x00SKOOB"
+_OOB_COUNT = struct.Struct("<I")
+
+# values a stream reader asks for at a time, unless told otherwise
+_STREAM_BATCH = 64
+
+_STREAM_END = object()
+
+
 class PipeEndpointError(RuntimeError):
     """Raised when a pipe endpoint is misused or unpaired."""
 
 
+class _StreamServer:
+    """
+    Serves this process's Pipe.Streams to readers in other processes.
+
+    One per process, made the first time a stream is serialized: a
+    Listener on a local address (authenticated with the process authkey,
+    which child processes share) and a thread accepting readers. Each
+    reader that connects gets a thread until it is done.
+
+    Streams are held weakly: the entry goes away when its stream is
+    garbage collected, so payloads that are never read don't keep their
+    generators alive. A reader being served holds its stream until it
+    closes.
+    """
+
+    _lock = threading.Lock()
+    _current: Optional["_StreamServer"] = None
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self._listener = Listener(authkey=bytes(multiprocessing.current_process().authkey))
+        self.address = self._listener.address
+        # streams by id, for as long as their owners (or connected readers) keep them
+        self._streams: "weakref.WeakValueDictionary[int, Pipe.Stream]" = weakref.WeakValueDictionary()
+        self._ids = itertools.count()
+        threading.Thread(
+            target=self._accept, name="suitkaise-pipe-stream-server", daemon=True,
+        ).start()
+
+    @classmethod
+    def get(cls) -> "_StreamServer":
+        """This process's server, made on first use."""
+        with cls._lock:
+            server = cls._current
+            if server is None or server.pid != os.getpid():
+                # a forked child serves its own streams (the listener it
+                # inherited is still the parent's)
+                server = cls._current = cls()
+            return server
+
+    def register(self, stream: "Pipe.Stream") -> int:
+        """Make a stream reachable by readers, until it is garbage collected."""
+        stream_id = next(self._ids)
+        self._streams[stream_id] = stream
+        return stream_id
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return
+            except Exception:
+                # failed authentication - not one of our readers
+                continue
+            threading.Thread(
+                target=self._serve, args=(conn,), name="suitkaise-pipe-stream", daemon=True,
+            ).start()
+
+    def _serve(self, conn: Any) -> None:
+        anchor = Pipe.Anchor(conn)
+        try:
+            stream_id = anchor.recv()
+        except Exception:
+            anchor.close()
+            return
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            try:
+                anchor.send(([], True, PipeEndpointError(
+                    "The stream's owner no longer has it. Keep a reference to the "
+                    "Pipe.Stream until its readers are done."
+                )))
+            except Exception:
+                pass
+            anchor.close()
+            return
+        stream._serve(anchor)
+
+
 @dataclass
 class _PipeEndpoint:
     _conn: Optional[Any]
     _locked: bool = False
     _role: str = "point"  # "anchor" or "point"
+    _same_host: bool = False  # send SharedMemory/mmap by reference
 
     def lock(self) -> None:
         """Prevent this endpoint from being transferred."""
@@ -50,15 +159,35 @@ class _PipeEndpoint:
         return self._conn
 
     def send(self, obj: Any) -> None:
-        """Serialize with cucumber and send through the pipe."""
+        """
+        Serialize with cucumber and send through the pipe.
+
+        Large buffers (bytes, bytearray, memoryview) are sent as their own
+        messages straight from their memory instead of being copied into
+        the serialized payload. Pairs made with same_host=True send
+        SharedMemory blocks and file-backed mmaps by reference.
+        """
         conn = self._ensure_conn()
-        conn.send_bytes(cucumber.serialize(obj))
+        header, buffers = cucumber.serialize_oob(obj, same_host=self._same_host)
+        if not buffers:
+            conn.send_bytes(header)
+            return
+        # announce how many buffer messages follow the header
+        conn.send_bytes(_OOB_MARKER + _OOB_COUNT.pack(len(buffers)))
+        conn.send_bytes(header)
+        for buf in buffers:
+            conn.send_bytes(buf.raw())
 
     def recv(self) -> Any:
         """Receive from the pipe and deserialize with cucumber."""
         conn = self._ensure_conn()
         data = conn.recv_bytes()
-        return cucumber.deserialize(data)
+        if data[:len(_OOB_MARKER)] != _OOB_MARKER:
+            return cucumber.deserialize(data)
+        (count,) = _OOB_COUNT.unpack_from(data, len(_OOB_MARKER))
+        header = conn.recv_bytes()
+        buffers = [conn.recv_bytes() for _ in range(count)]
+        return cucumber.deserialize_oob(header, buffers)
 
     def close(self) -> None:
         """Close the underlying connection if present."""
@@ -80,7 +209,7 @@ class _PipeEndpoint:
                 "Locked pipe endpoint cannot be transferred. "
                 "Keep it in the parent process."
             )
-        return (self.__class__._rebuild, (self._conn, self._locked, self._role))
+        return (self.__class__._rebuild, (self._conn, self._locked, self._role, self._same_host))
 
     def __serialize__(self) -> dict:
         """
@@ -103,12 +232,15 @@ class _PipeEndpoint:
             "conn_pickle": payload,
             "locked": self._locked,
             "role": self._role,
+            "same_host": self._same_host,
         }
 
     @classmethod
     def __deserialize__(cls, state: dict) -> "_PipeEndpoint":
         conn = reduction.ForkingPickler.loads(state["conn_pickle"])
-        return cls(conn, state.get("locked", False), state.get("role", "point"))
+        return cls(
+            conn, state.get("locked", False), state.get("role", "point"), state.get("same_host", False),
+        )
 
     @classmethod
     def _rebuild(
@@ -116,8 +248,9 @@ class _PipeEndpoint:
         conn: Optional[Any],
         locked: bool,
         role: str,
+        same_host: bool = False,
     ) -> "_PipeEndpoint":
-        return cls(conn, locked, role)
+        return cls(conn, locked, role, same_host)
 
 
 class Pipe:
@@ -131,8 +264,9 @@ class Pipe:
             conn: Optional[Any],
             locked: bool = True,
             role: str = "anchor",
+            same_host: bool = False,
         ):
-            super().__init__(conn, True, role)
+            super().__init__(conn, True, role, same_host)
 
         def unlock(self) -> None:
             """Anchor endpoints are always locked."""
@@ -142,12 +276,15 @@ class Pipe:
         pass
 
     @staticmethod
-    def pair(one_way: bool = False) -> Tuple["Pipe.Anchor", "Pipe.Point"]:
+    def pair(one_way: bool = False, same_host: bool = False) -> Tuple["Pipe.Anchor", "Pipe.Point"]:
         """
         Create a pipe pair.
 
         Args:
             one_way: If True, creates a one-way pipe (duplex=False).
+            same_host: If True, SharedMemory blocks and file-backed mmaps are
+                sent by reference instead of copied (see `cucumber.serialize`).
+                Only for pairs whose ends stay on this machine.
 
         Returns:
             (anchor, point) where anchor is locked by default.
@@ -155,9 +292,186 @@ class Pipe:
         conn1, conn2 = multiprocessing.Pipe(duplex=not one_way)
         if one_way:
             # multiprocessing.Pipe(duplex=False) returns recv-end first, send-end second
-            anchor = Pipe.Anchor(conn2)
-            point = Pipe.Point(conn1, False, "point")
+            anchor = Pipe.Anchor(conn2, same_host=same_host)
+            point = Pipe.Point(conn1, False, "point", same_host)
         else:
-            anchor = Pipe.Anchor(conn1)
-            point = Pipe.Point(conn2, False, "point")
+            anchor = Pipe.Anchor(conn1, same_host=same_host)
+            point = Pipe.Point(conn2, False, "point", same_host)
         return anchor, point
+
+    @staticmethod
+    def stream(iterable: Iterable[Any], batch: int = _STREAM_BATCH) -> "Pipe.Stream":
+        """
+        Wrap a generator (or any iterable) so it streams when serialized.
+
+        Args:
+            iterable: Values to stream
+            batch: How many values a reader asks for at a time
+
+        Returns:
+            A Pipe.Stream. Every process it is sent to gets a Pipe.StreamReader
+            pulling from the same iterable.
+        """
+        return Pipe.Stream(iterable, batch)
+
+    class Stream:
+        """
+        Owner side of a streamed generator.
+
+        Serializing it doesn't drain the generator, and doesn't start
+        anything: the receiver gets a Pipe.StreamReader that connects to
+        this process the first time it is read from, and pulls values in
+        batches. Every value goes to exactly one reader (or to this
+        process, if it iterates the stream itself).
+
+        The owning process has to keep running, and keep a reference to
+        the stream, until readers are done. Its stream server only holds
+        the stream weakly, so a stream the owner drops is collected
+        (with its generator) once no reader is connected to it.
+        """
+
+        def __init__(self, iterable: Iterable[Any], batch: int = _STREAM_BATCH):
+            if batch < 1:
+                raise ValueError(f"batch must be at least 1, got {batch}")
+            self._iterator = iter(iterable)
+            self._batch = batch
+            self._lock = threading.Lock()
+            self._finished = False
+            self._server: Optional[_StreamServer] = None
+            self._stream_id: Optional[int] = None
+
+        def __iter__(self) -> "Pipe.Stream":
+            return self
+
+        def __next__(self) -> Any:
+            values, _, error = self._take(1)
+            if error is not None:
+                raise error
+            if not values:
+                raise StopIteration
+            return values[0]
+
+        def _take(self, count: int) -> Tuple[list, bool, Optional[BaseException]]:
+            """Pull up to count values: (values, finished, error raised by the iterable)."""
+            values: list = []
+            with self._lock:
+                if self._finished:
+                    return values, True, None
+                try:
+                    for _ in range(count):
+                        value = next(self._iterator, _STREAM_END)
+                        if value is _STREAM_END:
+                            self._finished = True
+                            break
+                        values.append(value)
+                except Exception as e:
+                    self._finished = True
+                    e.__traceback__ = None
+                    return values, True, e
+                return values, self._finished, None
+
+        def _serve(self, anchor: "Pipe.Anchor") -> None:
+            """Answer one reader's requests until the stream ends or the reader goes away."""
+            try:
+                while True:
+                    try:
+                        count = anchor.recv()
+                    except (EOFError, OSError):
+                        return
+                    values, finished, error = self._take(count)
+                    try:
+                        anchor.send((values, finished, error))
+                    except (EOFError, OSError):
+                        return
+                    except Exception as e:
+                        # a value (or the error) couldn't be serialized - end this reader
+                        anchor.send(([], True, PipeEndpointError(f"Stream values could not be sent: {e}")))
+                        return
+                    if finished:
+                        return
+            finally:
+                anchor.close()
+
+        def __serialize__(self) -> dict:
+            with self._lock:
+                if self._finished:
+                    return {"address": None, "stream": None, "batch": self._batch}
+                server = _StreamServer.get()
+                if self._server is not server:
+                    # registered once per process - later payloads reuse the id
+                    self._server = server
+                    self._stream_id = server.register(self)
+                return {"address": server.address, "stream": self._stream_id, "batch": self._batch}
+
+        @classmethod
+        def __deserialize__(cls, state: dict) -> "Pipe.StreamReader":
+            return Pipe.StreamReader(state["address"], state["stream"], state["batch"])
+
+    class StreamReader:
+        """
+        Receiving side of a streamed generator.
+
+        An iterator that asks the owning process for values a batch at a
+        time, connecting to it on first use. Exceptions raised by the
+        generator are raised here, after the values yielded before them.
+        """
+
+        def __init__(self, address: Any, stream_id: Optional[int], batch: int = _STREAM_BATCH):
+            self._address = address
+            self._stream_id = stream_id
+            self._point: Optional[Pipe.Point] = None
+            self._batch = batch
+            self._buffer: deque = deque()
+            self._done = address is None  # the stream had already ended
+            self._error: Optional[BaseException] = None
+
+        def __iter__(self) -> "Pipe.StreamReader":
+            return self
+
+        def __next__(self) -> Any:
+            if not self._buffer and not self._done:
+                self._fetch()
+            if self._buffer:
+                return self._buffer.popleft()
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            raise StopIteration
+
+        def _connect(self) -> None:
+            try:
+                conn = Client(self._address, authkey=bytes(multiprocessing.current_process().authkey))
+            except (OSError, multiprocessing.AuthenticationError) as e:
+                self.close()
+                raise PipeEndpointError("Could not connect to the stream's owner.") from e
+            self._point = Pipe.Point(conn, False, "point")
+            self._point.send(self._stream_id)
+
+        def _fetch(self) -> None:
+            if self._point is None:
+                self._connect()
+            try:
+                self._point.send(self._batch)
+                values, finished, error = self._point.recv()
+            except (EOFError, OSError) as e:
+                self.close()
+                raise PipeEndpointError("Stream owner went away before the stream ended.") from e
+            self._buffer.extend(values)
+            if finished:
+                self._error = error
+                self.close()
+
+        def close(self) -> None:
+            """Stop reading. Values already sent to this reader are dropped."""
+            self._done = True
+            if self._point is not None:
+                self._point.close()
+
+        def __serialize__(self) -> dict:
+            raise PipeEndpointError(
+                "A stream reader cannot be sent on. Send the Pipe.Stream from its owner instead."
+            )
+
+        @classmethod
+        def __deserialize__(cls, state: dict) -> "Pipe.StreamReader":
+            raise PipeEndpointError("A stream reader cannot be deserialized.")
@@ -728,14 +728,27 @@ class Pool:
     ────────────────────────────────────────────────────────\n
     """
     
-    def __init__(self, workers: int | None = None):
+    def __init__(
+        self,
+        workers: int | None = None,
+        *,
+        compress: str | None = None,
+        same_host: bool = False,
+    ):
         """
         Create a new Pool.
         
         Args:
             workers: Max concurrent workers. None = number of CPUs.
+            compress: Compress functions, items and results sent to and from
+                workers ("auto", "zlib", "lzma" or "bz2", see `cucumber.serialize()`).
+                Off by default - it only pays off for large, repetitive payloads.
+            same_host: Send SharedMemory blocks and file-backed mmaps in items
+                and results by reference instead of copying them
+                (see `cucumber.serialize()`). Off by default.
         """
         self._workers = workers or multiprocessing.cpu_count()
+        self._payload_options = {"compress": compress, "same_host": same_host}
         self._active_processes: list[multiprocessing.Process] = []
         self._mp_pool: multiprocessing.pool.Pool | None = multiprocessing.Pool(
             processes=self._workers
@@ -750,6 +763,7 @@ class Pool:
         return {
             "workers": self._workers,
             "closed": self._mp_pool is None,
+            "payload_options": self._payload_options,
         }
 
     @classmethod
@@ -760,6 +774,7 @@ class Pool:
         obj = cls.__new__(cls)
         workers = state.get("workers") or multiprocessing.cpu_count()
         obj._workers = workers
+        obj._payload_options = state.get("payload_options") or {"compress": None, "same_host": False}
         obj._active_processes = []
         if state.get("closed"):
             obj._mp_pool = None
@@ -992,7 +1007,7 @@ class Pool:
         # worker process executes the function for one item and writes to queue
         worker = multiprocessing.Process(
             target=_pool_worker,
-            args=(serialized_fn, serialized_item, is_star, result_queue),
+            args=(serialized_fn, serialized_item, is_star, result_queue, self._payload_options),
         )
         worker.start()
         self._active_processes.append(worker)
@@ -1013,22 +1028,22 @@ class Pool:
             return []
         
         # serialize the function or Skprocess class once for reuse
-        serialized_fn = cucumber.serialize(fn_or_process)
+        serialized_fn = cucumber.serialize(fn_or_process, compress=self._payload_options["compress"])
 
         # results preserves input order for map
         results = [None] * len(items)
 
         if timeout is None and self._mp_pool is not None:
             args = [
-                (serialized_fn, cucumber.serialize(item), is_star)
+                (serialized_fn, _dumps_payload(item, **self._payload_options), is_star, self._payload_options)
                 for item in items
             ]
             messages = self._mp_pool.map(_pool_worker_bytes_args, args)
             for idx, message in enumerate(messages):
                 if message["type"] == "error":
-                    error = cucumber.deserialize(message["data"])
+                    error = _loads_payload(message["data"])
                     raise error
-                results[idx] = cucumber.deserialize(message["data"])
+                results[idx] = _loads_payload(message["data"])
             return results
         
         max_workers = self._workers
@@ -1040,7 +1055,7 @@ class Pool:
         
         def start_one(idx: int) -> None:
             # serialize each item and start one worker
-            serialized_item = cucumber.serialize(items[idx])
+            serialized_item = _dumps_payload(items[idx], **self._payload_options)
             q, w = self._spawn_worker(serialized_fn, serialized_item, is_star)
             active.append((idx, q, w))
         
@@ -1062,9 +1077,9 @@ class Pool:
                     # read one message per worker and decode result or error
                     message = q.get()
                     if message["type"] == "error":
-                        error = cucumber.deserialize(message["data"])
+                        error = _loads_payload(message["data"])
                         raise error
-                    results[idx] = cucumber.deserialize(message["data"])
+                    results[idx] = _loads_payload(message["data"])
                 except queue_module.Empty:
                     results[idx] = None
                 finally:
@@ -1091,18 +1106,18 @@ class Pool:
             return iter([])
         
         # serialize the function or Skprocess class once for reuse
-        serialized_fn = cucumber.serialize(fn_or_process)
+        serialized_fn = cucumber.serialize(fn_or_process, compress=self._payload_options["compress"])
         if timeout is None and self._mp_pool is not None:
             args = [
-                (serialized_fn, cucumber.serialize(item), is_star)
+                (serialized_fn, _dumps_payload(item, **self._payload_options), is_star, self._payload_options)
                 for item in items
             ]
             def iterator() -> Iterator:
                 for message in self._mp_pool.imap(_pool_worker_bytes_args, args):
                     if message["type"] == "error":
-                        error = cucumber.deserialize(message["data"])
+                        error = _loads_payload(message["data"])
                         raise error
-                    yield cucumber.deserialize(message["data"])
+                    yield _loads_payload(message["data"])
             return iterator()
 
         max_workers = self._workers
@@ -1116,7 +1131,7 @@ class Pool:
             
             def start_one(idx: int) -> None:
                 # serialize each item and start one worker
-                serialized_item = cucumber.serialize(items[idx])
+                serialized_item = _dumps_payload(items[idx], **self._payload_options)
                 q, w = self._spawn_worker(serialized_fn, serialized_item, is_star)
                 active[idx] = (q, w)
             
@@ -1142,9 +1157,9 @@ class Pool:
                     # decode the next result in order
                     message = q.get()
                     if message["type"] == "error":
-                        error = cucumber.deserialize(message["data"])
+                        error = _loads_payload(message["data"])
                         raise error
-                    yield cucumber.deserialize(message["data"])
+                    yield _loads_payload(message["data"])
                 except queue_module.Empty:
                     yield None
                 finally:
@@ -1169,7 +1184,7 @@ class Pool:
 
         def _decode_payload(payload: Any, kind: str) -> Any:
             try:
-                return cucumber.deserialize(payload)
+                return _loads_payload(payload)
             except Exception as exc:
                 payload_type = type(payload).__name__
                 payload_len = len(payload) if isinstance(payload, (bytes, bytearray)) else None
@@ -1182,10 +1197,10 @@ class Pool:
             return iter([])
         
         # serialize the function or Skprocess class once for reuse
-        serialized_fn = cucumber.serialize(fn_or_process)
+        serialized_fn = cucumber.serialize(fn_or_process, compress=self._payload_options["compress"])
         if timeout is None and self._mp_pool is not None:
             args = [
-                (serialized_fn, cucumber.serialize(item), is_star)
+                (serialized_fn, _dumps_payload(item, **self._payload_options), is_star, self._payload_options)
                 for item in items
             ]
             def iterator() -> Iterator:
@@ -1207,7 +1222,7 @@ class Pool:
             
             def start_one(idx: int) -> None:
                 # serialize each item and start one worker
-                serialized_item = cucumber.serialize(items[idx])
+                serialized_item = _dumps_payload(items[idx], **self._payload_options)
                 q, w = self._spawn_worker(serialized_fn, serialized_item, is_star)
                 active.append((idx, q, w))
             
@@ -1274,10 +1289,10 @@ def _ordered_results(
             # decode the result or error message
             message = q.get()
             if message["type"] == "error":
-                error = cucumber.deserialize(message["data"])
+                error = _loads_payload(message["data"])
                 raise error
             else:
-                yield cucumber.deserialize(message["data"])
+                yield _loads_payload(message["data"])
         except queue_module.Empty:
             yield None
         finally:
@@ -1320,10 +1335,10 @@ def _unordered_results(
                 try:
                     message = q.get()
                     if message["type"] == "error":
-                        error = cucumber.deserialize(message["data"])
+                        error = _loads_payload(message["data"])
                         raise error
                     else:
-                        yield cucumber.deserialize(message["data"])
+                        yield _loads_payload(message["data"])
                 except queue_module.Empty:
                     yield None
                 finally:
@@ -1351,11 +1366,57 @@ def _drain_queue(q) -> None:
         pass
 
 
+def _dumps_payload(
+    obj: Any,
+    compress: str | None = None,
+    same_host: bool = False,
+) -> Union[bytes, tuple]:
+    """
+    Serialize an item or result for transfer through multiprocessing.
+
+    Small payloads are plain cucumber bytes. Payloads with large buffers
+    are sent as (header, buffers), where the buffers are the original
+    bytes/bytearray objects, so multiprocessing writes them straight into
+    its own pickle stream instead of cucumber copying them first.
+
+    With same_host, SharedMemory blocks and file-backed mmaps are sent
+    by reference instead of copied.
+    """
+    from suitkaise import cucumber
+
+    header, buffers = cucumber.serialize_oob(obj, compress=compress, same_host=same_host)
+    if not buffers:
+        return header
+    return (header, [_buffer_payload(buf) for buf in buffers])
+
+
+def _buffer_payload(buf: Any) -> Any:
+    """Get a picklable object for an out-of-band buffer, without copying when possible."""
+    view = buf.raw()
+    owner = view.obj
+    if type(owner) in (bytes, bytearray) and view.nbytes == len(owner):
+        return owner
+    # memoryview slices and other exporters (numpy arrays) have to be copied
+    # once - into a bytearray, so the worker can build on it without copying again
+    return bytearray(view)
+
+
+def _loads_payload(payload: Any) -> Any:
+    """Deserialize a payload produced by _dumps_payload()."""
+    from suitkaise import cucumber
+
+    if isinstance(payload, tuple):
+        header, buffers = payload
+        return cucumber.deserialize_oob(header, buffers)
+    return cucumber.deserialize(payload)
+
+
 def _pool_worker(
     serialized_fn: bytes,
     serialized_item: bytes,
     is_star: bool,
-    result_queue: multiprocessing.Queue
+    result_queue: multiprocessing.Queue,
+    payload_options: dict | None = None,
 ) -> None:
     """
     Worker function that runs in subprocess.
@@ -1368,7 +1429,7 @@ def _pool_worker(
     try:
         # Deserialize using cucumber
         fn_or_process = cucumber.deserialize(serialized_fn)
-        item = cucumber.deserialize(serialized_item)
+        item = _loads_payload(serialized_item)
         
         # Unpack args if star mode
         if is_star:
@@ -1396,7 +1457,7 @@ def _pool_worker(
                 result = fn_or_process(item)
         
         # Serialize and send result
-        serialized_result = cucumber.serialize(result)
+        serialized_result = _dumps_payload(result, **(payload_options or {}))
         result_queue.put({
             "type": "result",
             "data": serialized_result
@@ -1416,6 +1477,7 @@ def _pool_worker_bytes(
     serialized_fn: bytes,
     serialized_item: bytes,
     is_star: bool,
+    payload_options: dict | None = None,
 ) -> dict:
     """
     Worker for multiprocessing.Pool that returns serialized result/error.
@@ -1424,7 +1486,7 @@ def _pool_worker_bytes(
 
     try:
         fn_or_process = cucumber.deserialize(serialized_fn)
-        item = cucumber.deserialize(serialized_item)
+        item = _loads_payload(serialized_item)
 
         if is_star:
             if isinstance(item, tuple):
@@ -1442,14 +1504,14 @@ def _pool_worker_bytes(
         else:
             result = fn_or_process(*args) if is_star else fn_or_process(item)
 
-        return {"type": "result", "data": cucumber.serialize(result)}
+        return {"type": "result", "data": _dumps_payload(result, **(payload_options or {}))}
     except Exception as e:
         import traceback
         error_msg = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
         return {"type": "error", "data": cucumber.serialize(RuntimeError(error_msg))}
 
 
-def _pool_worker_bytes_args(args: tuple[bytes, bytes, bool]) -> dict:
+def _pool_worker_bytes_args(args: tuple[bytes, bytes, bool, dict]) -> dict:
     """Unpack args for Pool.imap/imap_unordered."""
     return _pool_worker_bytes(*args)
 
@@ -38,6 +38,7 @@ class _Coordinator:
         self,
         manager: Optional[SyncManager] = None,
         *,
+        compress: str | None = None,
         command_queue: Any | None = None,
         counter_registry: Any | None = None,
         source_store: Any | None = None,
@@ -49,10 +50,13 @@ class _Coordinator:
         
         Args:
             manager: Optional SyncManager to use. Creates one if not provided.
+            compress: Codec for source of truth entries, passed to
+                `cucumber.serialize(compress=...)`. None stores them uncompressed.
         """
         from multiprocessing import Manager
         
         self._manager = manager
+        self._compress = compress
         
         # shared primitives - all use Manager for cross-process access
         if command_queue is None or counter_registry is None or source_store is None or source_lock is None or object_names is None:
@@ -90,6 +94,7 @@ class _Coordinator:
             "source_lock": self._source_lock,
             "object_names": self._object_names,
             "poll_timeout": self._poll_timeout,
+            "compress": self._compress,
         }
 
     @staticmethod
@@ -125,6 +130,7 @@ class _Coordinator:
         """Create a coordinator instance bound to existing shared proxies."""
         coord = cls(
             manager=None,
+            compress=state.get("compress"),
             command_queue=state["command_queue"],
             counter_registry=state["counter_registry"],
             source_store=state["source_store"],
@@ -150,7 +156,7 @@ class _Coordinator:
         
         # persist initial serialized state as source of truth
         with self._source_lock:
-            serialized = cucumber.serialize(obj)
+            serialized = cucumber.serialize(obj, compress=self._compress)
             self._source_store[object_name] = serialized
         
         # track names for introspection and cleanup
@@ -179,6 +185,33 @@ class _Coordinator:
                 return None
             return cucumber.deserialize(serialized)
 
+    def get_object_attr(self, object_name: str, name: str) -> Any:
+        """
+        Read one attribute of an object from source of truth.
+        
+        Only the attribute's value is reconstructed, not the whole object
+        (methods and properties still need the whole object).
+        
+        Args:
+            object_name: Name of the shared object.
+            name: Attribute to read.
+        
+        Returns:
+            The attribute's value.
+        
+        Raises:
+            KeyError: If the object is not found.
+            AttributeError: If the object has no such attribute.
+        """
+        from suitkaise import cucumber
+        
+        with self._source_lock:
+            serialized = self._source_store.get(object_name)
+            if serialized is None:
+                raise KeyError(object_name)
+            view = cucumber.deserialize_lazy(serialized)
+            return cucumber.materialize(getattr(view, name))
+
     def atomic_apply(self, object_name: str, operation: str, operand: Any = None) -> Optional[Any]:
         """
         Atomically apply an operation to a shared primitive value.
@@ -232,7 +265,7 @@ class _Coordinator:
                 updated = unary_ops[operation](current)
             else:
                 raise ValueError(f"Unsupported atomic operation: {operation}")
-            self._source_store[object_name] = cucumber.serialize(updated)
+            self._source_store[object_name] = cucumber.serialize(updated, compress=self._compress)
             return updated
 
     def has_object(self, object_name: str) -> bool:
@@ -427,6 +460,7 @@ class _Coordinator:
                 self._stop_event,
                 self._error_event,
                 self._poll_timeout,
+                self._compress,
             ),
             daemon=True,
         )
@@ -565,6 +599,7 @@ def _coordinator_main(
     stop_event: Event,
     error_event: Event,
     poll_timeout: float,
+    compress: str | None = None,
 ) -> None:
     """
     Main function for the coordinator process.
@@ -581,6 +616,7 @@ def _coordinator_main(
         stop_event: Event to signal shutdown.
         error_event: Event to signal errors to parent.
         poll_timeout: Seconds to wait for each queue.get().
+        compress: Codec for committed source of truth entries.
     """
     import queue as queue_module
     from suitkaise import cucumber
@@ -672,7 +708,7 @@ def _coordinator_main(
             
             # commit updated state to source of truth
             with source_lock:
-                serialized = cucumber.serialize(mirror)
+                serialized = cucumber.serialize(mirror, compress=compress)
                 source_store[object_name] = serialized
             
             # update counters: decrement pending, increment completed
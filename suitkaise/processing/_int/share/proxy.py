@@ -289,11 +289,11 @@ class _ObjectProxy:
         if all_keys:
             self._coordinator.wait_for_read(all_keys, timeout=10.0)
         
-        obj = self._coordinator.get_object(self._object_name)
-        if obj is None:
-            raise AttributeError(f"Object '{self._object_name}' not found")
-        
-        return getattr(obj, name)
+        # only the attr itself is reconstructed, not the whole object
+        try:
+            return self._coordinator.get_object_attr(self._object_name, name)
+        except KeyError:
+            raise AttributeError(f"Object '{self._object_name}' not found") from None
     
     def __repr__(self) -> str:
         return f"Proxy({self._object_name}: {self._wrapped_class.__name__})"
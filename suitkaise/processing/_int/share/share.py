@@ -414,6 +414,7 @@ class Share:
         self,
         manager: Optional[SyncManager] = None,
         *,
+        compress: str | None = None,
         auto_start: bool = True,
         client_mode: bool = False,
         coordinator: Optional[_Coordinator] = None,
@@ -423,8 +424,11 @@ class Share:
         
         Args:
             manager: Optional SyncManager to use. Creates one if not provided.
+            compress: Compress the serialized objects the coordinator keeps
+                ("auto", "zlib", "lzma" or "bz2", see `cucumber.serialize()`).
+                Off by default - it only pays off for large, repetitive objects.
         """
-        object.__setattr__(self, '_coordinator', coordinator or _Coordinator(manager))
+        object.__setattr__(self, '_coordinator', coordinator or _Coordinator(manager, compress=compress))
         object.__setattr__(self, '_proxies', {})  # name -> proxy
         object.__setattr__(self, '_started', False)
         object.__setattr__(self, '_coordinator_state_cache', None)
@@ -815,6 +819,7 @@ class Share:
             "objects": objects,
             "started": started,
             "coordinator_state": coordinator_state,
+            "compress": coordinator._compress,
         }
 
     @staticmethod
@@ -850,7 +855,7 @@ class Share:
             if cache_key is not None:
                 Share._LIVE_DESERIALIZE_CACHE[cache_key] = weakref.ref(share)
         else:
-            share = Share()
+            share = Share(compress=state.get("compress"))
 
         def _restore_snapshot(name: str, serialized_obj: bytes, obj: Any) -> None:
             coordinator = object.__getattribute__(share, '_coordinator')
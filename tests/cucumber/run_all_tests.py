@@ -42,6 +42,8 @@ def run_all_tests():
     from tests.cucumber.test_ir_json import run_all_tests as run_ir_json_tests
     from tests.cucumber.test_reconnect import run_all_tests as run_reconnect_tests
     from tests.cucumber.test_network_handler import run_all_tests as run_network_handler_tests
+    from tests.cucumber.test_wire_formats import run_all_tests as run_wire_formats_tests
+    from tests.cucumber.test_lazy import run_all_tests as run_lazy_tests
     
     results = []
     
@@ -72,6 +74,12 @@ def run_all_tests():
     print(f"\n{CYAN}Running Network Handler tests...{RESET}")
     results.append(("Network Handler", run_network_handler_tests()))
     
+    print(f"\n{CYAN}Running Wire Format tests...{RESET}")
+    results.append(("Wire Formats", run_wire_formats_tests()))
+    
+    print(f"\n{CYAN}Running Lazy Deserialization tests...{RESET}")
+    results.append(("Lazy Deserialization", run_lazy_tests()))
+    
     # Summary
     print(f"\n{BOLD}{CYAN}{'='*80}{RESET}")
     print(f"{BOLD}{CYAN}{' SUMMARY ':=^80}{RESET}")
@@ -167,6 +167,14 @@ class CircularB:
         self.a = None
 
 
+class DLNode:
+    """For back-patching testing (doubly linked list)."""
+    def __init__(self, value):
+        self.value = value
+        self.prev = None
+        self.next = None
+
+
 # =============================================================================
 # Simple Class Tests
 # =============================================================================
@@ -349,6 +357,60 @@ def test_dict_with_circular():
     assert result["self"] is result
 
 
+def test_doubly_linked_list():
+    """Every prev/next link should point back at the same node."""
+    nodes = [DLNode(i) for i in range(200)]
+    for left, right in zip(nodes, nodes[1:]):
+        left.next = right
+        right.prev = left
+
+    result = deserialize(serialize(nodes[0]))
+
+    current = result
+    count = 1
+    while current.next is not None:
+        assert current.next.prev is current
+        current = current.next
+        count += 1
+    assert count == 200
+    assert current.value == 199
+
+
+def test_tuple_containing_self():
+    """Tuple attribute that contains its owner should be back-patched."""
+    obj = NestedClass(1)
+    obj.child = (obj, "x")
+
+    result = deserialize(serialize(obj))
+
+    assert isinstance(result.child, tuple)
+    assert result.child[0] is result
+    assert result.child[1] == "x"
+
+
+def test_self_as_dict_key_and_set_member():
+    """Object used as a dict key / set member inside itself should be back-patched."""
+    obj = NestedClass(1)
+    obj.child = {"keys": {obj: "me"}, "members": {obj}}
+
+    result = deserialize(serialize(obj))
+
+    assert list(result.child["keys"]) == [result]
+    assert result.child["keys"][result] == "me"
+    assert list(result.child["members"]) == [result]
+
+
+def test_tuple_cycle_through_list():
+    """Tuple that reaches itself through a list should resolve to the same tuple."""
+    t = ([],)
+    t[0].append(t)
+
+    result = deserialize(serialize(t))
+
+    assert isinstance(result, tuple)
+    assert result[0][0] is result
+
+
 # =============================================================================
 # Complex Structure Tests
 # =============================================================================
@@ -403,6 +465,10 @@ def run_all_tests():
     runner.run_test("Self reference", test_self_reference)
     runner.run_test("List with circular", test_list_with_circular)
     runner.run_test("Dict with circular", test_dict_with_circular)
+    runner.run_test("Doubly linked list", test_doubly_linked_list)
+    runner.run_test("Tuple containing self", test_tuple_containing_self)
+    runner.run_test("Self as dict key and set member", test_self_as_dict_key_and_set_member)
+    runner.run_test("Tuple cycle through list", test_tuple_cycle_through_list)
     
     # Complex structure tests
     runner.run_test("Mixed complex structure", test_mixed_complex_structure)
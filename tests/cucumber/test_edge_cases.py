@@ -250,6 +250,54 @@ def test_complex_number():
     assert result == original
 
 
+def test_shared_bytearray():
+    """The same bytearray appearing twice should round-trip."""
+    buf = bytearray(b"shared")
+    original = [buf, buf, complex(1, 2)]
+    data = serialize(original)
+    result = deserialize(data)
+    
+    assert result[0] == bytearray(b"shared")
+    assert result[1] == bytearray(b"shared")
+    assert result[2] == complex(1, 2)
+
+
+# =============================================================================
+# Repeated Type Tests
+# =============================================================================
+
+class _Point:
+    """Module-level class used by the repeated type tests."""
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def test_many_instances_same_class():
+    """Many instances of one class should all round-trip."""
+    original = [_Point(i, i * 2) for i in range(500)]
+    data = serialize(original)
+    result = deserialize(data)
+    
+    assert len(result) == 500
+    assert all(type(p).__name__ == "_Point" for p in result)
+    assert result[123].x == 123 and result[123].y == 246
+
+
+def test_same_class_mixed_attrs():
+    """Instances of one class with primitive and non-primitive attrs should both work."""
+    simple = _Point(1, 2)
+    nested = _Point([1, 2], {"k": simple})
+    original = [simple, nested, _Point(3, 4)]
+    data = serialize(original)
+    result = deserialize(data)
+    
+    assert result[0].x == 1
+    assert result[1].x == [1, 2]
+    assert result[1].y["k"] is result[0]
+    assert result[2].y == 4
+
+
 # =============================================================================
 # Nested Collection Tests
 # =============================================================================
@@ -289,6 +337,93 @@ def test_tuple_of_sets():
     assert result == original
 
 
+# =============================================================================
+# Deep Nesting Tests
+# =============================================================================
+
+class _Link:
+    """Module-level linked list node used by the deep nesting tests."""
+    def __init__(self, value, next_link):
+        self.value = value
+        self.next = next_link
+
+
+def test_deeply_nested_lists():
+    """Nesting far past the recursion limit should round-trip."""
+    original = []
+    for i in range(20000):
+        original = [original, i]
+    
+    result = deserialize(serialize(original))
+    
+    depth = 0
+    while result:
+        assert result[1] == 19999 - depth
+        result = result[0]
+        depth += 1
+    assert depth == 20000
+
+
+def test_deeply_nested_dicts_compact():
+    """Deep dicts should round-trip through the compact format too."""
+    original = {}
+    current = original
+    for i in range(20000):
+        current["child"] = {"i": i}
+        current = current["child"]
+    
+    result = deserialize(serialize(original, format="compact"))
+    
+    for _ in range(20000):
+        result = result["child"]
+    assert result == {"i": 19999}
+
+
+def test_long_linked_list():
+    """A long chain of class instances should round-trip."""
+    head = None
+    for i in range(3000):
+        head = _Link(i, head)
+    
+    result = deserialize(serialize(head))
+    
+    count = 0
+    while result is not None:
+        assert result.value == 2999 - count
+        result = result.next
+        count += 1
+    assert count == 3000
+
+
+def test_deep_cycle():
+    """A cycle that closes at the bottom of a deep chain should be preserved."""
+    root = []
+    current = root
+    for _ in range(5000):
+        child = []
+        current.append(child)
+        current = child
+    current.append(root)
+    
+    result = deserialize(serialize(root))
+    
+    current = result
+    for _ in range(5000):
+        current = current[0]
+    assert current[0] is result
+
+
+def test_shared_list_in_handler_state():
+    """A list shared between a container and a handler object's attrs should stay shared."""
+    import threading
+    
+    shared = [1, 2, 3]
+    holder = _Point(shared, threading.Lock())
+    result = deserialize(serialize([shared, holder]))
+    
+    assert result[1].x is result[0]
+
+
 # =============================================================================
 # bytes Output Tests
 # =============================================================================
@@ -384,6 +519,40 @@ def test_deserialization_error_catchable():
     assert caught
 
 
+def test_serialization_error_path():
+    """SerializationError should name the path to the object that failed."""
+    from suitkaise.cucumber import Handler, register_handler, unregister_handler
+    
+    class Unextractable:
+        pass
+    
+    class FailingHandler(Handler):
+        type_name = "test_unextractable"
+        
+        def can_handle(self, obj):
+            return isinstance(obj, Unextractable)
+        
+        def extract_state(self, obj):
+            raise RuntimeError("cannot extract")
+        
+        def reconstruct(self, state):
+            return Unextractable()
+    
+    handler = FailingHandler()
+    register_handler(handler, types=[Unextractable])
+    try:
+        try:
+            serialize({"outer": [1, (2, Unextractable())]})
+            assert False, "Should have raised"
+        except SerializationError as e:
+            assert "Path: dict -> list -> tuple -> Unextractable" in str(e), str(e)
+        
+        # the failed call leaves nothing behind for the next one
+        assert deserialize(serialize({"outer": [1, (2, 3)]})) == {"outer": [1, (2, 3)]}
+    finally:
+        unregister_handler(handler)
+
+
 def test_deserialize_invalid_data():
     """deserialize() with invalid data should raise DeserializationError."""
     invalid_data = b"this is not valid serialized data"
@@ -396,6 +565,134 @@ def test_deserialize_invalid_data():
         pass
 
 
+def test_pickle_fallback_probed_once_per_type():
+    """Types with no handler should only be probed with pickle.dumps() once."""
+    import struct
+    from suitkaise.cucumber import profile
+    from suitkaise.cucumber._int.serializer import Serializer
+    
+    ser = Serializer()
+    with profile(sizes=False) as prof:
+        restored = deserialize(ser.serialize([object() for _ in range(50)]))
+        for _ in range(3):
+            try:
+                ser.serialize({"s": struct.Struct("i")})
+                assert False, "Should have raised"
+            except SerializationError as e:
+                assert "NO HANDLER FOUND" in str(e)
+                assert "Struct" in str(e)
+    
+    assert len(restored) == 50
+    fallback = prof.as_dict()["pickle_fallback"]
+    assert fallback["calls"] == 2
+    assert fallback["failures"] == 1
+
+
+def test_pickle_fallback_cache_reset():
+    """A cached probe that turns out wrong should be probed again next time."""
+    import struct
+    from suitkaise.cucumber._int.serializer import Serializer
+    
+    ser = Serializer()
+    ser.serialize(object())
+    try:
+        ser.serialize(struct.Struct("i"))
+    except SerializationError:
+        pass
+    plan = ser._plan_cache[struct.Struct]
+    assert plan.picklable is False
+    
+    # pretend the probe passed for an earlier instance
+    plan.picklable = True
+    try:
+        ser.serialize(struct.Struct("i"))
+        assert False, "Should have raised"
+    except SerializationError as e:
+        assert "PICKLE FAILED ON IR" in str(e)
+    assert plan.picklable is None
+    assert ser._plan_cache[object].picklable is None
+    
+    try:
+        ser.serialize(struct.Struct("i"))
+        assert False, "Should have raised"
+    except SerializationError as e:
+        assert "NO HANDLER FOUND" in str(e)
+
+
+def _module_with_class(name):
+    import types as types_module
+    
+    module = types_module.ModuleType(name)
+    exec("class Item:\n    def __init__(self, n):\n        self.n = n\n", module.__dict__)
+    module.Item.__module__ = name
+    sys.modules[name] = module
+    return module
+
+
+def test_resolve_cache_notices_redefinition():
+    """Cached class lookups should follow a class being redefined or its module reloaded."""
+    name = "_cucumber_resolve_redefine"
+    module = _module_with_class(name)
+    try:
+        first = module.Item
+        data = serialize([first(1), first(2)])
+        assert all(type(obj) is first for obj in deserialize(data))
+        
+        # redefined in place (a notebook cell run again)
+        second = _module_with_class(name).Item
+        restored = deserialize(data)
+        assert all(type(obj) is second for obj in restored)
+        assert [obj.n for obj in restored] == [1, 2]
+    finally:
+        sys.modules.pop(name, None)
+
+
+def test_resolve_cache_failed_lookups():
+    """Failed lookups are cached, and retried once the class or module shows up."""
+    name = "_cucumber_resolve_missing"
+    module = _module_with_class(name)
+    data = serialize(module.Item(5))
+    
+    try:
+        del module.Item
+        for _ in range(2):
+            try:
+                deserialize(data)
+                assert False, "Should have raised"
+            except DeserializationError as e:
+                assert "Item" in str(e)
+        module.__dict__.update(_module_with_class(name).__dict__)
+        assert deserialize(data).n == 5
+        
+        sys.modules.pop(name)
+        try:
+            deserialize(data)
+            assert False, "Should have raised"
+        except DeserializationError as e:
+            assert name in str(e)
+        _module_with_class(name)
+        assert deserialize(data).n == 5
+    finally:
+        sys.modules.pop(name, None)
+
+
+def test_clear_resolve_cache():
+    """clear_resolve_cache() should drop all lookups, or one module's."""
+    from suitkaise.cucumber import clear_resolve_cache
+    
+    names = ("_cucumber_resolve_clear_a", "_cucumber_resolve_clear_b")
+    try:
+        for name in names:
+            deserialize(serialize(_module_with_class(name).Item(1)))
+        assert clear_resolve_cache(names[0]) == 1
+        assert clear_resolve_cache(names[0]) == 0
+        assert clear_resolve_cache() >= 1
+        assert clear_resolve_cache(names[1]) == 0
+    finally:
+        for name in names:
+            sys.modules.pop(name, None)
+
+
 # =============================================================================
 # Main Entry Point
 # =============================================================================
@@ -421,12 +718,24 @@ def run_all_tests():
     runner.run_test("Float NaN", test_float_nan)
     runner.run_test("Frozenset", test_frozenset)
     runner.run_test("Complex number", test_complex_number)
+    runner.run_test("Shared bytearray", test_shared_bytearray)
+    
+    # Repeated type tests
+    runner.run_test("Many instances same class", test_many_instances_same_class)
+    runner.run_test("Same class mixed attrs", test_same_class_mixed_attrs)
     
     # Nested collection tests
     runner.run_test("Dict of lists", test_dict_of_lists)
     runner.run_test("List of dicts", test_list_of_dicts)
     runner.run_test("Tuple of sets", test_tuple_of_sets)
     
+    # Deep nesting tests
+    runner.run_test("Deeply nested lists", test_deeply_nested_lists)
+    runner.run_test("Deeply nested dicts (compact)", test_deeply_nested_dicts_compact)
+    runner.run_test("Long linked list", test_long_linked_list)
+    runner.run_test("Deep cycle", test_deep_cycle)
+    runner.run_test("Shared list in handler state", test_shared_list_in_handler_state)
+    
     # bytes output tests
     runner.run_test("serialize returns bytes", test_serialize_returns_bytes)
     runner.run_test("serialize non-empty", test_serialize_non_empty)
@@ -442,7 +751,13 @@ def run_all_tests():
     runner.run_test("DeserializationError is Exception", test_deserialization_error_is_exception)
     runner.run_test("DeserializationError can be raised", test_deserialization_error_can_be_raised)
     runner.run_test("DeserializationError catchable", test_deserialization_error_catchable)
+    runner.run_test("SerializationError path", test_serialization_error_path)
     runner.run_test("deserialize invalid data", test_deserialize_invalid_data)
+    runner.run_test("Pickle fallback probed once per type", test_pickle_fallback_probed_once_per_type)
+    runner.run_test("Pickle fallback cache reset", test_pickle_fallback_cache_reset)
+    runner.run_test("Resolve cache notices redefinition", test_resolve_cache_notices_redefinition)
+    runner.run_test("Resolve cache failed lookups", test_resolve_cache_failed_lookups)
+    runner.run_test("clear_resolve_cache", test_clear_resolve_cache)
     
     return runner.print_results()
 
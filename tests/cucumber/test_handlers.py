@@ -7,6 +7,7 @@ Tests public API usage of:
 - Stream serialization
 - Debug and verbose modes
 - Custom type handling
+- Handler registration
 """
 
 import sys
@@ -25,7 +26,8 @@ def _find_project_root(start: Path) -> Path:
 project_root = _find_project_root(Path(__file__).resolve())
 sys.path.insert(0, str(project_root))
 
-from suitkaise.cucumber import serialize, deserialize
+from suitkaise.cucumber import serialize, deserialize, serialize_ir
+from suitkaise.cucumber import Handler, register_handler, unregister_handler
 
 
 # =============================================================================
@@ -451,6 +453,142 @@ def test_serialize_multiple_calls():
     assert deserialize(result2) == {"b": 2}
 
 
+# =============================================================================
+# Handler Registry Tests
+# =============================================================================
+
+class _Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class _PointHandler(Handler):
+    type_name = "test_point"
+    
+    def can_handle(self, obj):
+        return isinstance(obj, _Point)
+    
+    def extract_state(self, obj):
+        return [obj.x, obj.y]
+    
+    def reconstruct(self, state):
+        point = _Point(*state)
+        point.via = type(self).__name__
+        return point
+
+
+class _OtherPointHandler(_PointHandler):
+    type_name = "test_point_other"
+
+
+def test_register_handler_takes_over_type():
+    """A registered handler should be used ahead of the simple instance path."""
+    before = serialize_ir(_Point(1, 2))
+    assert before.get("__handler__") != "_PointHandler"
+    
+    handler = _PointHandler()
+    register_handler(handler, types=[_Point])
+    try:
+        ir = serialize_ir(_Point(1, 2))
+        assert ir["__cucumber_type__"] == "test_point"
+        assert ir["__handler__"] == "_PointHandler"
+        restored = deserialize(serialize([_Point(3, 4)]))
+        assert (restored[0].x, restored[0].y) == (3, 4)
+        assert restored[0].via == "_PointHandler"
+    finally:
+        assert unregister_handler(handler) is True
+    
+    # cached plans are dropped once the handler is removed
+    assert serialize_ir(_Point(1, 2)).get("__handler__") != "_PointHandler"
+    assert unregister_handler(handler) is False
+
+
+def test_register_handler_priority():
+    """Higher priority should win, and can_handle() works without types."""
+    low = _PointHandler()
+    high = _OtherPointHandler()
+    register_handler(low, types=[_Point])
+    register_handler(high, priority=5)
+    try:
+        assert serialize_ir(_Point(0, 0))["__handler__"] == "_PointHandler"
+        # type matches are checked before can_handle() matches
+        unregister_handler(low)
+        assert serialize_ir(_Point(0, 0))["__handler__"] == "_OtherPointHandler"
+        register_handler(low, types=[_Point], priority=10)
+        restored = deserialize(serialize(_Point(5, 6)))
+        assert restored.via == "_PointHandler"
+    finally:
+        unregister_handler(low)
+        unregister_handler(high)
+
+
+def test_register_handler_negative_priority_is_fallback():
+    """A negative priority handler registered for a type should not beat a built-in handler."""
+    import struct
+    import threading
+    
+    class _LockFallback(_PointHandler):
+        type_name = "test_lock_fallback"
+        
+        def can_handle(self, obj):
+            return False
+    
+    class _StructFallback(_PointHandler):
+        type_name = "test_struct_fallback"
+        
+        def can_handle(self, obj):
+            return False
+        
+        def extract_state(self, obj):
+            return obj.format
+        
+        def reconstruct(self, state):
+            return struct.Struct(state)
+    
+    lock_fallback = _LockFallback()
+    struct_fallback = _StructFallback()
+    register_handler(lock_fallback, types=[type(threading.Lock())], priority=-1)
+    register_handler(struct_fallback, types=[struct.Struct], priority=-1)
+    try:
+        assert serialize_ir(threading.Lock())["__handler__"] == "LockHandler"
+        # types no built-in handles still reach the fallback
+        assert serialize_ir(struct.Struct("<i"))["__handler__"] == "_StructFallback"
+        assert deserialize(serialize(struct.Struct("<i"))).format == "<i"
+    finally:
+        unregister_handler(lock_fallback)
+        unregister_handler(struct_fallback)
+
+
+def test_register_handler_rejects_bad_handlers():
+    """register_handler should validate its arguments."""
+    class _DictHandler(_PointHandler):
+        type_name = "dict"
+    
+    for bad, kwargs, error in (
+        (object(), {}, TypeError),
+        (_DictHandler(), {}, ValueError),
+        (_PointHandler(), {"types": ["not a class"]}, TypeError),
+    ):
+        try:
+            register_handler(bad, **kwargs)
+            assert False, "Should have raised"
+        except error:
+            pass
+
+
+def test_deserializer_handler_index():
+    """Deserializer should find handlers by type_name and class name."""
+    from suitkaise.cucumber._int.deserializer import Deserializer
+    
+    handler = _PointHandler()
+    deserializer = Deserializer(handlers=[handler])
+    assert deserializer._find_handler("test_point", "_PointHandler") is handler
+    # type_name changed between versions - found by class name
+    assert deserializer._find_handler("renamed", "_PointHandler") is handler
+    assert deserializer._find_handler("test_point", "Missing") is None
+
+
 # =============================================================================
 # Docstring Examples
 # =============================================================================
@@ -536,6 +674,13 @@ def run_all_tests():
     runner.run_test("serialize format", test_serialize_format)
     runner.run_test("serialize multiple calls", test_serialize_multiple_calls)
     
+    # Handler registry tests
+    runner.run_test("register_handler takes over type", test_register_handler_takes_over_type)
+    runner.run_test("register_handler priority", test_register_handler_priority)
+    runner.run_test("register_handler negative priority is fallback", test_register_handler_negative_priority_is_fallback)
+    runner.run_test("register_handler rejects bad handlers", test_register_handler_rejects_bad_handlers)
+    runner.run_test("deserializer handler index", test_deserializer_handler_index)
+    
     # docstring examples
     runner.run_test("doc: serialize", test_doc_serialize_example)
     runner.run_test("doc: deserialize", test_doc_deserialize_example)
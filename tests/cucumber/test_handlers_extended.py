@@ -6,6 +6,7 @@ Covers additional handler implementations with low coverage.
 
 from __future__ import annotations
 
+import array
 import asyncio
 import enum
 import io
@@ -70,6 +71,11 @@ from suitkaise.cucumber._int.handlers.memory_handler import (
     MemoryViewHandler,
     MemorySerializationError,
 )
+from suitkaise.cucumber._int.handlers.array_handler import (
+    ArrayHandler,
+    NumpyArrayHandler,
+    INLINE_LIMIT,
+)
 from suitkaise.cucumber._int.handlers.function_handler import (
     FunctionHandler,
     FunctionSerializationError,
@@ -584,6 +590,32 @@ def test_class_instance_slots_and_dict():
     assert both_restored.extra == "x"
 
 
+def test_class_instance_strategy_cache():
+    """Cached strategies follow class changes and don't keep classes alive."""
+    import gc
+    import weakref
+    
+    handler = ClassInstanceHandler()
+    
+    class Dynamic:
+        def __init__(self):
+            self.x = 1
+    
+    assert handler.extract_state(Dynamic())["strategy"] == "dict"
+    
+    # the class gains to_dict / from_dict after its first instance was cached
+    Dynamic.__qualname__ = "Dynamic"
+    Dynamic.to_dict = lambda self: {"x": self.x}
+    Dynamic.from_dict = classmethod(lambda cls, data: cls())
+    assert handler.extract_state(Dynamic())["strategy"] == "to_dict"
+    
+    ref = weakref.ref(Dynamic)
+    del Dynamic
+    gc.collect()
+    assert ref() is None
+    assert len(handler._strategy_cache) == 0
+
+
 def test_class_instance_nested_class_definitions():
     """Nested classes should include nested class definitions."""
     handler = ClassInstanceHandler()
@@ -613,6 +645,33 @@ def test_class_definition_allow_callables():
     assert hasattr(restored, "ping")
 
 
+def test_local_class_definition_sent_once():
+    """A local class's definition should be sent once per payload, and rebuilt once."""
+    def make():
+        class Local:
+            kind = "local"
+            
+            def __init__(self, n):
+                self.n = n
+        return Local
+    
+    Local = make()
+    one = cucumber.serialize([Local(0)])
+    many = cucumber.serialize([Local(i) for i in range(200)])
+    # each further instance only adds its own state - the definition isn't repeated
+    assert len(many) < len(one) + 199 * 150, (len(one), len(many))
+    
+    restored = cucumber.deserialize(many)
+    assert [obj.n for obj in restored] == list(range(200))
+    assert len({type(obj) for obj in restored}) == 1
+    assert type(restored[0]).kind == "local"
+    
+    # the same definition in a separate state rebuilds to the same class too
+    handler = ClassInstanceHandler()
+    class_def = handler._serialize_class_definition(Local)
+    assert handler._reconstruct_class_definition(class_def) is handler._reconstruct_class_definition(class_def)
+
+
 # =============================================================================
 # Context Manager Handler Tests
 # =============================================================================
@@ -1003,6 +1062,53 @@ def test_sqlite_connection_roundtrip():
     conn.close()
 
 
+def test_sqlite_connection_keeps_schema_objects():
+    """In-memory databases keep indexes, views, triggers and uncommitted rows."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.execute("CREATE INDEX test_name ON test (name)")
+    conn.execute("CREATE VIEW names AS SELECT name FROM test")
+    conn.execute("CREATE TABLE log (id INTEGER)")
+    conn.execute("CREATE TRIGGER test_log AFTER INSERT ON test BEGIN INSERT INTO log VALUES (new.id); END")
+    conn.executemany("INSERT INTO test (name) VALUES (?)", [("a",), ("b",)])
+
+    restored = cucumber.deserialize(cucumber.serialize(conn)).reconnect()
+    objects = restored.execute("SELECT type, name FROM sqlite_master ORDER BY name").fetchall()
+    assert ("index", "test_name") in objects
+    assert ("view", "names") in objects
+    assert ("trigger", "test_log") in objects
+    assert restored.execute("SELECT * FROM names").fetchall() == [("a",), ("b",)]
+    restored.execute("INSERT INTO test (name) VALUES ('c')")
+    assert restored.execute("SELECT id FROM log").fetchall() == [(1,), (2,), (3,)]
+    restored.close()
+    conn.close()
+
+
+def test_sqlite_connection_empty_memory():
+    """An in-memory database with nothing in it yet reconnects empty."""
+    conn = sqlite3.connect(":memory:")
+
+    restored = cucumber.deserialize(cucumber.serialize(conn)).reconnect()
+    assert restored.execute("SELECT name FROM sqlite_master").fetchall() == []
+    restored.execute("CREATE TABLE test (id INTEGER)")
+    restored.close()
+    conn.close()
+
+
+def test_sqlite_connection_legacy_state():
+    """States with schema and rows (from older versions) still reconnect."""
+    state = {
+        "database": ":memory:",
+        "isolation_level": "",
+        "is_memory": True,
+        "schema": ["CREATE TABLE test (id INTEGER)"],
+        "data": [("test", [(1,), (2,)])],
+    }
+    restored = SQLiteConnectionHandler().reconstruct(state).reconnect()
+    assert restored.execute("SELECT id FROM test").fetchall() == [(1,), (2,)]
+    restored.close()
+
+
 def test_sqlite_cursor_roundtrip():
     """SQLiteCursorHandler should reconstruct cursor objects."""
     conn = sqlite3.connect(":memory:")
@@ -1054,6 +1160,80 @@ def test_memoryview_roundtrip():
     assert bytes(restored) == b"abc"
 
 
+def test_array_roundtrip():
+    """array.array should round-trip small and large arrays, in band and out of band."""
+    small = array.array("i", [1, -2, 3])
+    large = array.array("d", range(INLINE_LIMIT))
+    assert ArrayHandler().can_handle(small)
+
+    for original in (small, large, array.array("u", "text"), array.array("b")):
+        restored = cucumber.deserialize(cucumber.serialize(original))
+        assert type(restored) is array.array
+        assert restored == original
+
+    header, buffers = cucumber.serialize_oob({"a": large, "b": large})
+    assert len(buffers) == 1
+    restored = cucumber.deserialize_oob(header, buffers)
+    assert restored["a"] == large
+    assert restored["a"] is restored["b"]
+
+
+def test_array_byteswap_on_other_byteorder():
+    """Arrays from a machine with the other byte order are byte-swapped."""
+    handler = ArrayHandler()
+    original = array.array("h", [1, 256, -2])
+    state = handler.extract_state(original)
+    swapped = array.array("h", original)
+    swapped.byteswap()
+    state["data"] = swapped.tobytes()
+    state["byteorder"] = "big" if sys.byteorder == "little" else "little"
+    assert handler.reconstruct(state) == original
+
+
+def test_numpy_array_roundtrip():
+    """numpy arrays keep dtype, shape and memory order, and come back writable."""
+    try:
+        import numpy as np
+    except ImportError:
+        return
+
+    base = np.arange(INLINE_LIMIT, dtype=np.float64).reshape(-1, 64)
+    cases = [
+        np.arange(12, dtype=np.int32).reshape(3, 4),
+        base,
+        np.asfortranarray(base),
+        base[::3, 1::2],
+        np.array(7.5),
+        np.zeros((0, 3)),
+        np.array([1, "x", None], dtype=object),
+        np.array([(1, 2.0)], dtype=[("a", ">i4"), ("b", "<f8")]),
+        np.array(["2024-01-01", "2024-06-30"], dtype="M8[D]"),
+    ]
+    for original in cases:
+        assert NumpyArrayHandler().can_handle(original)
+        for restored in (
+            cucumber.deserialize(cucumber.serialize(original)),
+            cucumber.deserialize_oob(*cucumber.serialize_oob(original)),
+        ):
+            assert type(restored) is np.ndarray
+            assert restored.dtype == original.dtype
+            assert restored.shape == original.shape
+            assert restored.tolist() == original.tolist()
+            assert restored.flags.writeable
+            assert not np.shares_memory(restored, original)
+
+    restored = cucumber.deserialize(cucumber.serialize(np.asfortranarray(base)))
+    assert restored.flags.f_contiguous
+
+    # large arrays go out of band straight from the array's memory
+    header, buffers = cucumber.serialize_oob(base)
+    assert len(buffers) == 1 and buffers[0].raw().nbytes == base.nbytes
+    assert len(header) < 1024
+
+    # subclasses keep going through the normal fallbacks
+    assert not NumpyArrayHandler().can_handle(np.ma.masked_array([1, 2]))
+
+
 def test_mmap_closed_raises():
     """Closed mmap should raise MemorySerializationError."""
     handler = MMapHandler()
@@ -1144,6 +1324,67 @@ def test_shared_memory_attach_existing():
         shm.close()
 
 
+def test_shared_memory_same_host_reference():
+    """same_host=True sends only the block name, and the receiver attaches to it."""
+    if not HAS_SHARED_MEMORY:
+        return
+    shm = shared_memory.SharedMemory(create=True, size=1 << 20)
+    try:
+        shm.buf[:5] = b"hello"
+        data = cucumber.serialize(shm, same_host=True)
+        assert len(data) < 1024
+        restored = cucumber.deserialize(data)
+        try:
+            assert restored.name == shm.name
+            assert bytes(restored.buf[:5]) == b"hello"
+            restored.buf[:5] = b"HELLO"
+            assert bytes(shm.buf[:5]) == b"HELLO"
+        finally:
+            restored.close()
+        # copies are still the default
+        assert len(cucumber.serialize(shm)) > shm.size
+    finally:
+        shm.close()
+        shm.unlink()
+    try:
+        cucumber.deserialize(data)
+        assert False, "Expected an error for an unlinked block"
+    except Exception as e:
+        assert "no longer exists" in str(e)
+
+
+def test_mmap_same_host_reference():
+    """same_host=True maps the sender's file again instead of copying it (Linux)."""
+    if not sys.platform.startswith("linux"):
+        return
+    with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
+        f.write(b"x" * mmap.ALLOCATIONGRANULARITY + b"hello world")
+        path = f.name
+    try:
+        with open(path, "r+b") as f:
+            mm = mmap.mmap(f.fileno(), 11, offset=mmap.ALLOCATIONGRANULARITY)
+        mm.seek(6)
+        header, buffers = cucumber.serialize_oob(mm, same_host=True, threshold=0)
+        assert buffers == []
+        restored = cucumber.deserialize_oob(header, buffers)
+        assert len(restored) == 11 and restored.tell() == 6
+        restored[:5] = b"HELLO"
+        assert mm[:11] == b"HELLO world"
+        restored.close()
+        mm.close()
+
+        # private (copy-on-write) maps don't share pages, so they are copied
+        with open(path, "r+b") as f:
+            private = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        private[:1] = b"!"
+        restored = cucumber.deserialize(cucumber.serialize(private, same_host=True))
+        assert restored[:1] == b"!"
+        restored.close()
+        private.close()
+    finally:
+        os.unlink(path)
+
+
 def test_mmap_file_backed_reconstruct():
     """MMapHandler should prefer file-backed reconstruction when path exists."""
     handler = MMapHandler()
@@ -2145,9 +2386,11 @@ def run_all_tests():
     runner.run_test("Class instance custom serialize local", test_class_instance_custom_serialize_local)
     runner.run_test("Class instance to_dict", test_class_instance_to_dict)
     runner.run_test("Class instance slots/dict", test_class_instance_slots_and_dict)
+    runner.run_test("Class instance strategy cache", test_class_instance_strategy_cache)
     runner.run_test("Class instance nested classes", test_class_instance_nested_class_definitions)
     runner.run_test("Class object dynamic definition", test_class_object_dynamic_definition)
     runner.run_test("Class definition allow callables", test_class_definition_allow_callables)
+    runner.run_test("Local class definition sent once", test_local_class_definition_sent_once)
     runner.run_test("Context manager handler", test_context_manager_handler_roundtrip)
     runner.run_test("Contextlib generator handler", test_contextlib_generator_handler_roundtrip)
     runner.run_test("Thread handler roundtrip", test_thread_handler_roundtrip)
@@ -2179,6 +2422,9 @@ def run_all_tests():
     runner.run_test("Generator handler roundtrip", test_generator_handler_roundtrip)
 
     runner.run_test("SQLite connection roundtrip", test_sqlite_connection_roundtrip)
+    runner.run_test("SQLite connection schema objects", test_sqlite_connection_keeps_schema_objects)
+    runner.run_test("SQLite connection empty in-memory", test_sqlite_connection_empty_memory)
+    runner.run_test("SQLite connection legacy state", test_sqlite_connection_legacy_state)
     runner.run_test("SQLite cursor roundtrip", test_sqlite_cursor_roundtrip)
 
     runner.run_test("File handle roundtrip text", test_file_handle_roundtrip_text)
@@ -2248,10 +2494,15 @@ def run_all_tests():
 
     runner.run_test("mmap roundtrip", test_mmap_roundtrip)
     runner.run_test("memoryview roundtrip", test_memoryview_roundtrip)
+    runner.run_test("array.array roundtrip", test_array_roundtrip)
+    runner.run_test("array.array byte order", test_array_byteswap_on_other_byteorder)
+    runner.run_test("numpy array roundtrip", test_numpy_array_roundtrip)
     runner.run_test("shared memory roundtrip", test_shared_memory_roundtrip)
     runner.run_test("Shared memory attach existing", test_shared_memory_attach_existing)
     runner.run_test("mmap closed raises", test_mmap_closed_raises)
     runner.run_test("Shared memory recreate missing", test_shared_memory_recreate_missing)
+    runner.run_test("Shared memory same-host reference", test_shared_memory_same_host_reference)
+    runner.run_test("mmap same-host reference", test_mmap_same_host_reference)
     runner.run_test("mmap file-backed reconstruct", test_mmap_file_backed_reconstruct)
     runner.run_test("file descriptor handler errors", test_file_descriptor_handler_errors)
 
@@ -0,0 +1,313 @@
+"""
+Cucumber Lazy Deserialization Tests
+
+Tests deserialize_lazy() views:
+- LazyDict / LazyList / LazyObject access
+- Shared and circular references across views
+- materialize()
+"""
+
+import sys
+import threading
+
+from pathlib import Path
+
+# Add project root to path (auto-detect by marker files)
+
+def _find_project_root(start: Path) -> Path:
+    for parent in [start] + list(start.parents):
+        if (parent / 'pyproject.toml').exists() or (parent / 'setup.py').exists():
+            return parent
+    return start
+
+project_root = _find_project_root(Path(__file__).resolve())
+sys.path.insert(0, str(project_root))
+
+from suitkaise.cucumber import (
+    serialize, deserialize, deserialize_lazy, materialize,
+    LazyDict, LazyList, LazyObject, DeserializationError,
+)
+
+
+# =============================================================================
+# Test Infrastructure
+# =============================================================================
+
+class TestResult:
+    def __init__(self, name: str, passed: bool, message: str = "", error: str = ""):
+        self.name = name
+        self.passed = passed
+        self.message = message
+        self.error = error
+
+
+class TestRunner:
+    def __init__(self, suite_name: str):
+        self.suite_name = suite_name
+        self.results = []
+        self.GREEN = '\033[92m'
+        self.RED = '\033[91m'
+        self.YELLOW = '\033[93m'
+        self.CYAN = '\033[96m'
+        self.BOLD = '\033[1m'
+        self.RESET = '\033[0m'
+    
+    def run_test(self, name: str, test_func):
+        try:
+            test_func()
+            self.results.append(TestResult(name, True))
+        except AssertionError as e:
+            self.results.append(TestResult(name, False, error=str(e)))
+        except Exception as e:
+            self.results.append(TestResult(name, False, error=f"{type(e).__name__}: {e}"))
+    
+    def print_results(self):
+        print(f"\n{self.BOLD}{self.CYAN}{'='*70}{self.RESET}")
+        print(f"{self.BOLD}{self.CYAN}{self.suite_name:^70}{self.RESET}")
+        print(f"{self.BOLD}{self.CYAN}{'='*70}{self.RESET}\n")
+        
+        passed = sum(1 for r in self.results if r.passed)
+        failed = len(self.results) - passed
+        
+        for result in self.results:
+            if result.passed:
+                status = f"{self.GREEN}✓ PASS{self.RESET}"
+            else:
+                status = f"{self.RED}✗ FAIL{self.RESET}"
+            print(f"  {status}  {result.name}")
+            if result.error:
+                print(f"         {self.RED}└─ {result.error}{self.RESET}")
+        
+        print(f"\n{self.BOLD}{'-'*70}{self.RESET}")
+        if failed == 0:
+            print(f"  {self.GREEN}{self.BOLD}All {passed} tests passed!{self.RESET}")
+        else:
+            print(f"  {self.YELLOW}Passed: {passed}{self.RESET}  |  {self.RED}Failed: {failed}{self.RESET}")
+        print(f"{self.BOLD}{'-'*70}{self.RESET}\n")
+
+        if failed != 0:
+            print(f"{self.BOLD}{self.RED}Failed tests (recap):{self.RESET}")
+            for result in self.results:
+                if not result.passed:
+                    print(f"  {self.RED}✗ {result.name}{self.RESET}")
+                    if result.error:
+                        print(f"     {self.RED}└─ {result.error}{self.RESET}")
+            print()
+
+
+        try:
+            from tests._failure_registry import record_failures
+            record_failures(self.suite_name, [r for r in self.results if not r.passed])
+        except Exception:
+            pass
+
+        return failed == 0
+
+
+
+# =============================================================================
+# Test Classes
+# =============================================================================
+
+class _Point:
+    """Simple instance (primitive attrs only)."""
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+    
+    def total(self):
+        return self.x + self.y
+
+
+class _User:
+    """Instance with nested attrs (goes through ClassInstanceHandler)."""
+    def __init__(self, name, tags):
+        self.name = name
+        self.tags = tags
+        self.friend = None
+    
+    def greet(self):
+        return f"hi {self.name}"
+
+
+# =============================================================================
+# View Tests
+# =============================================================================
+
+def test_lazy_dict_and_list():
+    """Dicts and lists should come back as views with the same contents."""
+    original = {"a": [1, 2, {"b": "c"}], "n": None, (1, 2): "tuple key"}
+    result = deserialize_lazy(serialize(original))
+    
+    assert isinstance(result, LazyDict)
+    assert isinstance(result["a"], LazyList)
+    assert len(result) == 3
+    assert result["a"][2]["b"] == "c"
+    assert result["a"][-1]["b"] == "c"
+    assert result["a"][:2] == [1, 2]
+    assert result[(1, 2)] == "tuple key"
+    assert "missing" not in result
+    assert result == original
+
+
+def test_lazy_objects():
+    """Class instances should come back as views with attribute access."""
+    user = _User("ada", ["x", "y"])
+    original = [_Point(1, 2), user]
+    result = deserialize_lazy(serialize(original))
+    
+    assert isinstance(result[0], LazyObject)
+    assert result[0].x == 1
+    assert result[0].total() == 3
+    assert isinstance(result[1], LazyObject)
+    assert result[1].name == "ada"
+    assert list(result[1].tags) == ["x", "y"]
+    assert result[1].greet() == "hi ada"
+
+
+def test_lazy_views_read_only():
+    """Views should refuse writes."""
+    result = deserialize_lazy(serialize({"p": _Point(1, 2)}))
+    
+    try:
+        result["p"].x = 5
+        assert False, "Should have raised AttributeError"
+    except AttributeError:
+        pass
+    try:
+        result["new"] = 1
+        assert False, "Should have raised TypeError"
+    except TypeError:
+        pass
+
+
+def test_lazy_only_reads_what_is_accessed():
+    """Unread children should not be reconstructed."""
+    original = {"small": 1, "big": [threading.Lock() for _ in range(10)]}
+    result = deserialize_lazy(serialize(original))
+    
+    assert result["small"] == 1
+    assert not any(isinstance(value, LazyList) for value in result._lazy_values)
+    big = result["big"]
+    assert big._lazy_values is None
+    assert hasattr(big[3], "acquire")
+    assert sum(1 for value in big._lazy_values if hasattr(value, "acquire")) == 1
+
+
+# =============================================================================
+# Reference Tests
+# =============================================================================
+
+def test_lazy_shared_references():
+    """Shared objects should be the same view wherever they are reached."""
+    shared = {"k": 1}
+    original = {"a": shared, "b": shared, "t": (shared, 2)}
+    result = deserialize_lazy(serialize(original))
+    
+    assert result["a"] is result["b"]
+    # tuples are reconstructed right away, so they hold the real dict
+    assert result["t"][0] is materialize(result["a"])
+
+
+def test_lazy_circular_references():
+    """Circular references should resolve through views."""
+    a = _User("a", [])
+    b = _User("b", [])
+    a.friend = b
+    b.friend = a
+    lst = [1]
+    lst.append(lst)
+    result = deserialize_lazy(serialize({"users": [a, b], "self": lst}))
+    
+    assert result["users"][0].friend.friend is result["users"][0]
+    assert result["users"][0].friend is result["users"][1]
+    assert result["self"][1] is result["self"]
+
+
+def test_lazy_reference_into_unread_subtree():
+    """A reference to an object in a subtree that hasn't been read should resolve."""
+    shared = [1, 2, 3]
+    original = {"first": {"deep": shared}, "second": (shared,)}
+    result = deserialize_lazy(serialize(original))
+    
+    # read the tuple before the subtree that defines the list
+    second = result["second"]
+    assert second[0] == [1, 2, 3]
+    assert materialize(result["first"]["deep"]) is second[0]
+
+
+# =============================================================================
+# Materialize Tests
+# =============================================================================
+
+def test_materialize():
+    """materialize() should return real objects with references intact."""
+    shared = {"k": 1}
+    original = {"a": shared, "b": shared, "users": [_User("u", ["t"])]}
+    view = deserialize_lazy(serialize(original))
+    result = materialize(view)
+    
+    assert type(result) is dict
+    assert result["a"] is result["b"]
+    assert type(result["users"]) is list
+    assert result["users"][0].tags == ["t"]
+    assert materialize(view) is result
+    # the view now reads through to the real object
+    assert view["a"] is result["a"]
+    assert materialize(5) == 5
+
+
+def test_lazy_non_view_root():
+    """Roots that aren't dicts, lists or instances should be reconstructed."""
+    assert deserialize_lazy(serialize((1, 2))) == (1, 2)
+    assert deserialize_lazy(serialize("text")) == "text"
+
+
+def test_lazy_compact_format():
+    """Lazy views should work with the compact format."""
+    original = {"rows": [{"id": i} for i in range(20)]}
+    result = deserialize_lazy(serialize(original, format="compact"))
+    
+    assert result["rows"][7]["id"] == 7
+
+
+def test_lazy_invalid_data():
+    """Undecodable data should raise DeserializationError right away."""
+    try:
+        deserialize_lazy(b"not cucumber data")
+        assert False, "Should have raised DeserializationError"
+    except DeserializationError:
+        pass
+
+
+# =============================================================================
+# Main Entry Point
+# =============================================================================
+
+def run_all_tests():
+    """Run all lazy deserialization tests."""
+    runner = TestRunner("Cucumber Lazy Deserialization Tests")
+    
+    # View tests
+    runner.run_test("Lazy dict and list", test_lazy_dict_and_list)
+    runner.run_test("Lazy objects", test_lazy_objects)
+    runner.run_test("Lazy views read-only", test_lazy_views_read_only)
+    runner.run_test("Lazy only reads what is accessed", test_lazy_only_reads_what_is_accessed)
+    
+    # Reference tests
+    runner.run_test("Lazy shared references", test_lazy_shared_references)
+    runner.run_test("Lazy circular references", test_lazy_circular_references)
+    runner.run_test("Lazy reference into unread subtree", test_lazy_reference_into_unread_subtree)
+    
+    # Materialize tests
+    runner.run_test("Materialize", test_materialize)
+    runner.run_test("Lazy non-view root", test_lazy_non_view_root)
+    runner.run_test("Lazy compact format", test_lazy_compact_format)
+    runner.run_test("Lazy invalid data", test_lazy_invalid_data)
+    
+    return runner.print_results()
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -540,6 +540,167 @@ def test_reconnect_all_handles_sets_and_cycles():
     assert cycle[1] == "reconnected-cycle"
 
 
+def test_reconnect_all_max_concurrency():
+    """max_concurrency reconnects in parallel, keeping sqlite on the calling thread."""
+    import time
+    
+    class SlowReconnector(Reconnector):
+        def __init__(self, name):
+            self.name = name
+        
+        def reconnect(self):
+            time.sleep(0.2)
+            if self.name == "bad":
+                raise RuntimeError("fail")
+            return f"reconnected-{self.name}"
+    
+    class Service:
+        pass
+    
+    service = Service()
+    service.dbs = [SlowReconnector(str(i)) for i in range(8)]
+    service.pair = (SlowReconnector("t"), SimpleReconnector("u"))
+    service.bad = SlowReconnector("bad")
+    service.lite = SQLiteReconnector(details={"path": ":memory:"})
+    
+    start = time.perf_counter()
+    result = reconnect_all(service, max_concurrency=16)
+    elapsed = time.perf_counter() - start
+    
+    assert result is service
+    assert service.dbs == [f"reconnected-{i}" for i in range(8)]
+    assert service.pair == ("reconnected-t", "reconnected-u")
+    assert isinstance(service.bad, SlowReconnector)
+    # sqlite connections only work on the thread that opened them
+    assert service.lite.execute("SELECT 1").fetchone() == (1,)
+    assert elapsed < 1.0, f"Expected parallel reconnects, took {elapsed:.2f}s"
+
+
+def test_reconnect_all_connection_cache():
+    """cache_connections shares one connection per type, details and auth."""
+    opened = []
+    
+    def counting_reconnector(details):
+        rec = PostgresReconnector(details=details)
+        
+        def reconnect(auth=None):
+            conn = object()
+            opened.append(conn)
+            return conn
+        
+        rec.reconnect = reconnect
+        return rec
+    
+    cucumber.clear_connection_cache()
+    try:
+        for max_concurrency in (1, 4):
+            cucumber.clear_connection_cache()
+            opened.clear()
+            obj = {
+                "a": counting_reconnector(details={"host": "db", "port": 5432}),
+                "b": counting_reconnector(details={"port": 5432, "host": "db"}),
+                "other": counting_reconnector(details={"host": "other"}),
+                "special": counting_reconnector(details={"host": "db", "port": 5432}),
+            }
+            auth = {"psycopg2.Connection": {"*": "pw", "special": "pw2"}}
+            reconnect_all(obj, max_concurrency=max_concurrency, cache_connections=True, **auth)
+            assert obj["a"] is obj["b"]
+            assert obj["other"] is not obj["a"]
+            assert obj["special"] is not obj["a"]
+            assert len(opened) == 3
+            
+            # later calls in this process reuse the live connection
+            again = {"a": counting_reconnector(details={"host": "db", "port": 5432})}
+            reconnect_all(again, cache_connections=True, **auth)
+            assert again["a"] is obj["a"]
+            assert len(opened) == 3
+        
+        assert cucumber.clear_connection_cache() == 3
+        
+        # without the cache, every reconnector gets its own connection
+        opened.clear()
+        obj = [counting_reconnector(details={"host": "db"}) for _ in range(2)]
+        reconnect_all(obj)
+        assert obj[0] is not obj[1] and len(opened) == 2
+    finally:
+        cucumber.clear_connection_cache()
+
+
+def test_reconnect_all_connection_cache_replaces_closed():
+    """A cached connection that was closed is dropped and reopened."""
+    class FakeConnection:
+        closed = False
+    
+    opened = []
+    
+    def reconnector():
+        rec = PostgresReconnector(details={"host": "db"})
+        
+        def reconnect(auth=None):
+            opened.append(FakeConnection())
+            return opened[-1]
+        
+        rec.reconnect = reconnect
+        return rec
+    
+    cucumber.clear_connection_cache()
+    try:
+        first = reconnect_all([reconnector()], cache_connections=True)[0]
+        assert reconnect_all([reconnector()], cache_connections=True)[0] is first
+        first.closed = True
+        second = reconnect_all([reconnector()], cache_connections=True)[0]
+        assert second is not first and not second.closed
+        assert len(opened) == 2
+    finally:
+        cucumber.clear_connection_cache()
+
+
+def test_reconnect_all_connection_cache_concurrent_calls():
+    """Concurrent reconnect_all() calls open one connection per key."""
+    import time
+    
+    opened = []
+    
+    def reconnector():
+        rec = PostgresReconnector(details={"host": "db"})
+        
+        def reconnect(auth=None):
+            time.sleep(0.05)
+            conn = object()
+            opened.append(conn)
+            return conn
+        
+        rec.reconnect = reconnect
+        return rec
+    
+    cucumber.clear_connection_cache()
+    try:
+        results = []
+        
+        def call():
+            results.append(reconnect_all([reconnector()], cache_connections=True)[0])
+        
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(opened) == 1
+        assert all(result is opened[0] for result in results)
+    finally:
+        cucumber.clear_connection_cache()
+
+
+def test_connection_cache_key_hides_auth():
+    """Cache keys hold a digest of the auth, not the secret."""
+    rec = PostgresReconnector(details={"host": "db"})
+    key = rec._cache_key("hunter2")
+    assert "hunter2" not in repr(key)
+    assert key == rec._cache_key("hunter2")
+    assert key != rec._cache_key("other")
+    assert rec._cache_key(None) != key
+
+
 # =============================================================================
 # Main
 # =============================================================================
@@ -575,6 +736,11 @@ def run_all_tests():
     runner.run_test("attr-specific dict key", test_reconnect_all_attr_specific_dict_key)
     runner.run_test("reconnect_all handles failures", test_reconnect_all_handles_failures)
     runner.run_test("reconnect_all sets/cycles", test_reconnect_all_handles_sets_and_cycles)
+    runner.run_test("reconnect_all max_concurrency", test_reconnect_all_max_concurrency)
+    runner.run_test("reconnect_all connection cache", test_reconnect_all_connection_cache)
+    runner.run_test("reconnect_all cache replaces closed", test_reconnect_all_connection_cache_replaces_closed)
+    runner.run_test("reconnect_all cache concurrent calls", test_reconnect_all_connection_cache_concurrent_calls)
+    runner.run_test("Connection cache key hides auth", test_connection_cache_key_hides_auth)
     runner.run_test("pipe reconnector endpoints", test_pipe_reconnector_reconnect_peer_pair)
     
     return runner.print_results()
@@ -179,6 +179,29 @@ def test_worst_possible_object_roundtrip():
                 pass
 
 
+def test_worst_possible_object_roundtrip_compact():
+    """WorstPossibleObject should round-trip through the compact format."""
+    random.seed(1337)
+    original = WorstPossibleObject()
+    restored = None
+    try:
+        data = serialize(original, format="compact")
+        restored = deserialize(data)
+        restored = reconnect_all(restored)
+        passed, failures = original.verify(restored)
+        assert passed, "Verification failed:\n" + _format_failures(failures)
+    finally:
+        try:
+            original.cleanup()
+        except Exception:
+            pass
+        if restored is not None:
+            try:
+                restored.cleanup()
+            except Exception:
+                pass
+
+
 def test_worst_possible_object_roundtrip_cross_process():
     """WorstPossibleObject should roundtrip across a process boundary."""
     from suitkaise.cucumber import serialize, deserialize, reconnect_all
@@ -241,6 +264,7 @@ def run_all_tests():
     """Run all WorstPossibleObject tests."""
     runner = TestRunner("Cucumber WorstPossibleObject Tests")
     runner.run_test("worst_possible_object_roundtrip", test_worst_possible_object_roundtrip)
+    runner.run_test("worst_possible_object_roundtrip_compact", test_worst_possible_object_roundtrip_compact)
     runner.run_test("worst_possible_object_roundtrip_cross_process", test_worst_possible_object_roundtrip_cross_process)
     return runner.print_results()
 
@@ -155,6 +155,25 @@ def test_coordinator_register_get_queue():
         coordinator.stop()
 
 
+def test_coordinator_get_object_attr():
+    """Coordinator should read a single attr without returning the object."""
+    coordinator = _Coordinator()
+    obj = Counter()
+    coordinator.register_object("counter", obj, attrs={"value"})
+    
+    assert coordinator.get_object_attr("counter", "value") == 0
+    try:
+        coordinator.get_object_attr("missing", "value")
+        assert False, "Should have raised KeyError"
+    except KeyError:
+        pass
+    try:
+        coordinator.get_object_attr("counter", "no_such_attr")
+        assert False, "Should have raised AttributeError"
+    except AttributeError:
+        pass
+
+
 def test_coordinator_read_wait_and_clear():
     """Coordinator should wait for reads and clear."""
     coordinator = _Coordinator()
@@ -286,6 +305,7 @@ def run_all_tests():
     runner = TestRunner("Coordinator Tests")
 
     runner.run_test("Coordinator register/get/queue", test_coordinator_register_get_queue)
+    runner.run_test("Coordinator get_object_attr", test_coordinator_get_object_attr)
     runner.run_test("Coordinator read wait/clear", test_coordinator_read_wait_and_clear)
     runner.run_test("Coordinator main loop in-process", test_coordinator_main_loop_in_process)
     runner.run_test("Coordinator start/stop idempotent", test_coordinator_start_stop_idempotent)
@@ -189,6 +189,187 @@ def test_point_multiprocess_round_trip():
         point.close()
 
 
+def test_point_multiprocess_large_buffer():
+    ctx = multiprocessing.get_context("spawn")
+    anchor, point = Pipe.pair()
+    blob = bytes(range(256)) * 1024
+    payload = {"small": b"s", "count": 3}
+    try:
+        proc = ctx.Process(target=_child_round_trip, args=(point, payload))
+        proc.start()
+        anchor.send({"blob": blob, "again": blob, "buf": bytearray(blob)})
+        result = anchor.recv()
+        proc.join(timeout=5)
+        assert proc.exitcode == 0
+        received = result["received"]
+        assert received["blob"] == blob
+        assert received["again"] is received["blob"]
+        assert isinstance(received["buf"], bytearray) and received["buf"] == blob
+        assert result["payload"] == payload
+    finally:
+        anchor.close()
+        point.close()
+
+
+def test_point_same_host_option():
+    from multiprocessing import shared_memory
+
+    for same_host in (False, True):
+        anchor, point = Pipe.pair(same_host=same_host)
+        point = deserialize(serialize(point))
+        assert point._same_host is same_host
+        shm = shared_memory.SharedMemory(create=True, size=1 << 16)
+        try:
+            shm.buf[:5] = b"hello"
+            point.send(shm)
+        finally:
+            shm.close()
+            shm.unlink()
+        try:
+            # a copy outlives the sender's block, a reference does not
+            restored = anchor.recv()
+            assert not same_host
+            assert bytes(restored.buf[:5]) == b"hello"
+            restored.close()
+            restored.unlink()
+        except Exception as e:
+            assert same_host, e
+            assert "no longer exists" in str(e)
+        finally:
+            anchor.close()
+            point.close()
+
+
+def _counting_gen(n, pulled):
+    for i in range(n):
+        pulled.append(i)
+        yield i
+
+
+def _failing_gen():
+    yield 1
+    yield 2
+    raise ValueError("generator failed")
+
+
+def test_stream_round_trip():
+    pulled = []
+    stream = Pipe.stream(_counting_gen(100, pulled), batch=8)
+    reader = deserialize(serialize(stream))
+    assert pulled == []
+    assert isinstance(reader, Pipe.StreamReader)
+    assert next(reader) == 0
+    assert len(pulled) == 8
+    assert list(reader) == list(range(1, 100))
+
+
+def test_stream_readers_share_values():
+    stream = Pipe.stream(range(50), batch=5)
+    first = deserialize(serialize(stream))
+    second = deserialize(serialize(stream))
+    values = [next(first), next(second), next(stream)]
+    values += list(second) + list(first)
+    assert sorted(values) == list(range(50))
+
+
+def test_stream_error_after_values():
+    stream = Pipe.stream(_failing_gen())
+    reader = deserialize(serialize(stream))
+    received = []
+    try:
+        for value in reader:
+            received.append(value)
+        raise AssertionError("Expected ValueError to be raised")
+    except ValueError as e:
+        assert "generator failed" in str(e)
+    assert received == [1, 2]
+    assert list(reader) == []
+
+
+def test_stream_reader_not_transferable():
+    reader = deserialize(serialize(Pipe.stream(range(3))))
+    try:
+        _assert_raises(SerializationError, lambda: serialize(reader))
+    finally:
+        reader.close()
+    _assert_raises(ValueError, lambda: Pipe.stream(range(3), batch=0))
+
+
+def test_stream_serialize_starts_nothing():
+    import os
+    import threading
+    from suitkaise import cucumber
+
+    # the process's stream server is made by the first serialization
+    serialize(Pipe.stream(range(3)))
+    threads = set(threading.enumerate())
+    fds = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else None
+
+    pulled = []
+    stream = Pipe.stream(_counting_gen(100, pulled))
+    for _ in range(20):
+        cucumber.estimate_size(stream)
+        cucumber.digest(stream)
+        serialize(stream)
+    started = [t.name for t in threading.enumerate() if t not in threads]
+    assert started == [], started
+    if fds is not None:
+        # (earlier tests' connections may still be closing)
+        assert len(os.listdir("/proc/self/fd")) <= fds, (len(os.listdir("/proc/self/fd")), fds)
+    assert pulled == []
+
+    # a payload read later still streams everything
+    assert list(deserialize(serialize(stream))) == list(range(100))
+
+
+def test_stream_registered_weakly():
+    import gc
+    from suitkaise.processing._int.pipe import _StreamServer
+
+    stream = Pipe.stream(_counting_gen(100, []))
+    payloads = [serialize(stream) for _ in range(20)]
+    server = _StreamServer.get()
+    gc.collect()
+    # one registration, reused by every payload
+    assert list(server._streams.values()) == [stream]
+
+    # never read, then dropped - nothing is left behind
+    del stream
+    gc.collect()
+    assert len(server._streams) == 0
+    reader = deserialize(payloads[0])
+    _assert_raises(PipeEndpointError, lambda: next(reader))
+
+    # a finished stream still answers late readers while its owner keeps it
+    stream = Pipe.stream(range(3))
+    late = deserialize(serialize(stream))
+    assert list(stream) == [0, 1, 2]
+    assert list(late) == []
+
+
+def _child_stream_sum(data, point):
+    try:
+        point.send(sum(deserialize(data)))
+    finally:
+        point.close()
+
+
+def test_stream_multiprocess():
+    ctx = multiprocessing.get_context("spawn")
+    anchor, point = Pipe.pair()
+    stream = Pipe.stream(range(10000))
+    try:
+        proc = ctx.Process(target=_child_stream_sum, args=(serialize(stream), point))
+        proc.start()
+        total = anchor.recv()
+        proc.join(timeout=5)
+        assert proc.exitcode == 0
+        assert total == sum(range(10000))
+    finally:
+        anchor.close()
+        point.close()
+
+
 def run_all_tests():
     runner = TestRunner("Pipe Tests")
     runner.run_test("anchor locked always", test_anchor_locked_always)
@@ -199,6 +380,15 @@ def run_all_tests():
     runner.run_test("anchor pickle raises", test_anchor_pickle_raises)
     runner.run_test("point without peer raises", test_point_without_peer_raises)
     runner.run_test("point multiprocess round trip", test_point_multiprocess_round_trip)
+    runner.run_test("point multiprocess large buffer", test_point_multiprocess_large_buffer)
+    runner.run_test("point same_host option", test_point_same_host_option)
+    runner.run_test("stream round trip", test_stream_round_trip)
+    runner.run_test("stream readers share values", test_stream_readers_share_values)
+    runner.run_test("stream error after values", test_stream_error_after_values)
+    runner.run_test("stream reader not transferable", test_stream_reader_not_transferable)
+    runner.run_test("stream serialize starts nothing", test_stream_serialize_starts_nothing)
+    runner.run_test("stream registered weakly", test_stream_registered_weakly)
+    runner.run_test("stream multiprocess", test_stream_multiprocess)
     return runner.print_results()
 
 
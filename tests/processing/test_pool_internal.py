@@ -24,7 +24,10 @@ project_root = _find_project_root(Path(__file__).resolve())
 sys.path.insert(0, str(project_root))
 
 from suitkaise import cucumber
-from suitkaise.processing._int.pool import _pool_worker, _run_process_inline, _ordered_results, _unordered_results
+from suitkaise.processing._int.pool import (
+    _pool_worker, _run_process_inline, _ordered_results, _unordered_results,
+    _dumps_payload, _loads_payload,
+)
 from suitkaise.processing import Skprocess, Pool
 
 Process = Skprocess
@@ -263,6 +266,97 @@ def test_pool_serialize_roundtrip_functionality():
             restored.close()
 
 
+def test_payload_small_is_bytes():
+    """Payloads without large buffers should stay plain cucumber bytes."""
+    payload = _dumps_payload({"a": [1, 2, 3]})
+    assert isinstance(payload, bytes)
+    assert _loads_payload(payload) == {"a": [1, 2, 3]}
+
+
+def test_payload_large_buffer_out_of_band():
+    """Large buffers should be passed as the original objects, not copied into the payload."""
+    blob = b"x" * (1 << 17)
+    payload = _dumps_payload({"blob": blob})
+    assert isinstance(payload, tuple)
+    header, buffers = payload
+    assert len(header) < 1024
+    assert buffers[0] is blob
+    assert _loads_payload(payload)["blob"] == blob
+
+
+def test_payload_compress_option():
+    """Payloads should only be compressed when a codec is given."""
+    from suitkaise.cucumber._int.compression import is_compressed
+
+    data = ["repeated text"] * 1000
+    assert not is_compressed(_dumps_payload(data))
+    payload = _dumps_payload(data, compress="zlib")
+    assert is_compressed(payload)
+    assert _loads_payload(payload) == data
+
+
+def test_pool_compress_option():
+    """Pool(compress=...) should reach the workers and survive serialization."""
+    pool = Pool(workers=1, compress="zlib")
+    restored = None
+    assert Pool(workers=1)._payload_options == {"compress": None, "same_host": False}
+    try:
+        assert pool.map(len, [["a"] * 2000, ["b"] * 3000]) == [2000, 3000]
+        restored = cucumber.deserialize(cucumber.serialize(pool))
+        assert restored._payload_options == {"compress": "zlib", "same_host": False}
+    finally:
+        pool.close()
+        if restored is not None:
+            restored.close()
+
+
+def test_payload_same_host_option():
+    """SharedMemory items should be copied unless same_host is set."""
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(create=True, size=1 << 16)
+    try:
+        shm.buf[:5] = b"hello"
+        copied = _dumps_payload(shm)
+        referenced = _dumps_payload(shm, same_host=True)
+        pool = Pool(workers=1, same_host=True)
+        try:
+            assert pool._payload_options["same_host"] is True
+            assert pool.map(_first_bytes, [shm]) == [b"hello"]
+        finally:
+            pool.close()
+    finally:
+        shm.close()
+        shm.unlink()
+    assert isinstance(referenced, bytes) and len(referenced) < 1024
+    # the copy still has the data after the block is gone, the reference doesn't
+    restored = _loads_payload(copied)
+    try:
+        assert bytes(restored.buf[:5]) == b"hello"
+    finally:
+        restored.close()
+        restored.unlink()
+    try:
+        _loads_payload(referenced)
+        assert False, "Expected an error for an unlinked block"
+    except Exception as e:
+        assert "no longer exists" in str(e)
+
+
+def _first_bytes(shm):
+    return bytes(shm.buf[:5])
+
+
+def test_pool_worker_large_item():
+    """_pool_worker should accept out-of-band item payloads."""
+    q = multiprocessing.Queue()
+    blob = b"y" * (1 << 17)
+    _pool_worker(cucumber.serialize(len), _dumps_payload(blob), False, q)
+    msg = q.get(timeout=1)
+    assert msg["type"] == "result"
+    assert _loads_payload(msg["data"]) == len(blob)
+
+
 def test_ordered_results():
     """_ordered_results should yield in order."""
     queues = []
@@ -350,6 +444,12 @@ def run_all_tests():
     runner.run_test("run process inline timeout", test_run_process_inline_timeout)
     runner.run_test("pool worker star", test_pool_worker_star)
     runner.run_test("pool worker process class", test_pool_worker_process_class)
+    runner.run_test("payload small is bytes", test_payload_small_is_bytes)
+    runner.run_test("payload large buffer out of band", test_payload_large_buffer_out_of_band)
+    runner.run_test("payload compress option", test_payload_compress_option)
+    runner.run_test("pool compress option", test_pool_compress_option)
+    runner.run_test("payload same_host option", test_payload_same_host_option)
+    runner.run_test("pool worker large item", test_pool_worker_large_item)
     runner.run_test("ordered results", test_ordered_results)
     runner.run_test("ordered results error", test_ordered_results_error)
     runner.run_test("unordered results", test_unordered_results)
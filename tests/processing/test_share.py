@@ -530,6 +530,23 @@ def test_share_delete_object_cleans_state():
         share.exit()
 
 
+def test_share_compress_option():
+    """Share(compress=...) should compress source of truth entries, and not by default."""
+    from suitkaise.cucumber._int.compression import is_compressed
+
+    for compress, expected in ((None, False), ("zlib", True)):
+        share = Share(compress=compress)
+        try:
+            share.text = "x" * 8192
+            assert is_compressed(share._coordinator._source_store["text"]) is expected
+            share.text += "y"
+            assert is_compressed(share._coordinator._source_store["text"]) is expected
+            assert share.text == "x" * 8192 + "y"
+            assert share.__serialize__()["compress"] == compress
+        finally:
+            share.exit()
+
+
 # =============================================================================
 # Share Operations Tests
 # =============================================================================
@@ -896,6 +913,7 @@ def run_all_tests():
     runner.run_test("Share concurrent increments", test_share_concurrent_increments, timeout=20)
     runner.run_test("Share clear", test_share_clear, timeout=10)
     runner.run_test("Share delete object cleans state", test_share_delete_object_cleans_state, timeout=10)
+    runner.run_test("Share compress option", test_share_compress_option, timeout=15)
     
     # Share operations tests
     runner.run_test("Share Sktimer add_time()", test_share_timer_add_time, timeout=15)
@@ -5,6 +5,7 @@ Ensures that every cucumber supported type can be added to Share and updated
 from multiple processes.
 """
 
+import array
 import asyncio
 import concurrent.futures
 import contextlib
@@ -480,6 +481,19 @@ def _make_requests_session():
     return requests.Session()
 
 
+def _make_numpy_array(values: list) -> Any:
+    try:
+        numpy = importlib.import_module("numpy")
+    except ImportError:
+        return _skip("numpy not installed")
+    return numpy.array(values, dtype=numpy.float64)
+
+
+def _verify_array_equals(stored: Any, updated: Any) -> None:
+    assert type(stored) is type(updated)
+    assert stored.tolist() == updated.tolist()
+
+
 def _make_db_connection(module_name: str, constructor: str) -> Any:
     try:
         mod = importlib.import_module(module_name)
@@ -697,6 +711,8 @@ def _build_specs() -> List[SupportedTypeSpec]:
     specs.append(SupportedTypeSpec("multiprocessing.shared_memory.SharedMemory", lambda: _skip("multiprocessing.shared_memory is not Share-supported"), lambda: _skip("multiprocessing.shared_memory is not Share-supported"), _verify_type_only, cleanup=_safe_shared_memory_cleanup))
     specs.append(SupportedTypeSpec("int (file descriptors)", _make_fd, _make_fd, _verify_type_only, cleanup=os.close))
     specs.append(SupportedTypeSpec("memoryview", lambda: memoryview(b"abc"), lambda: memoryview(b"def"), _verify_type_only))
+    specs.append(SupportedTypeSpec("array.array", lambda: array.array("d", [1.0, 2.0]), lambda: array.array("d", [3.0, 4.0, 5.0]), _verify_array_equals))
+    specs.append(SupportedTypeSpec("numpy.ndarray", lambda: _make_numpy_array([1.0, 2.0]), lambda: _make_numpy_array([3.0, 4.0, 5.0]), _verify_array_equals))
     specs.append(SupportedTypeSpec("threading.Thread", lambda: threading.Thread(target=lambda: None), lambda: threading.Thread(target=lambda: None), _verify_instance_of(ThreadReconnector), expected_type=ThreadReconnector))
     specs.append(SupportedTypeSpec("concurrent.futures.ThreadPoolExecutor", lambda: concurrent.futures.ThreadPoolExecutor(max_workers=1), lambda: concurrent.futures.ThreadPoolExecutor(max_workers=1), _verify_type_only, cleanup=lambda e: e.shutdown(wait=False)))
     specs.append(SupportedTypeSpec("concurrent.futures.ProcessPoolExecutor", lambda: concurrent.futures.ProcessPoolExecutor(max_workers=1), lambda: concurrent.futures.ProcessPoolExecutor(max_workers=1), _verify_type_only, cleanup=lambda e: e.shutdown(wait=False)))